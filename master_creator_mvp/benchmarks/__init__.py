@@ -0,0 +1,18 @@
+"""
+End-to-end performance benchmarks.
+
+Scenarios run the real pipeline, graders, adaptive engine and bulk importer
+against a temporary SQLite database and Chroma directory, with the fake LLM
+backend (LLM_BACKEND=fake) and hashing embeddings, so they need no API key
+or network and results are comparable between runs.
+
+Run with the CLI (JSON results, regression check):
+    python scripts/benchmark_performance.py
+
+or pytest-benchmark (pip install pytest-benchmark):
+    pytest benchmarks/ -o addopts="" --benchmark-autosave
+
+Load tests (loadtest.py) run the API in a local uvicorn server and drive
+concurrent teachers and dashboard WebSockets against it:
+    python scripts/load_test.py
+"""
@@ -0,0 +1,22 @@
+"""
+Pytest-benchmark configuration.
+
+Points the app at a throwaway database, Chroma directory, fake LLM and
+hashing embeddings before any `src` module is imported.
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from benchmarks import scenarios
+
+_WORKDIR = tempfile.TemporaryDirectory(prefix="mc_bench_")
+scenarios.configure_environment(Path(_WORKDIR.name))
+
+
+@pytest.fixture(scope="session")
+def stores():
+    """Stores shared by all benchmarks (tables created once)."""
+    return scenarios.BenchmarkStores()
@@ -0,0 +1,593 @@
+"""
+Load tests for the FastAPI + WebSocket stack.
+
+Starts the API in a uvicorn subprocess (fake LLM backend, throwaway SQLite
+database), seeds a class, then drives each scenario's mix of virtual
+teachers and /ws/dashboard/{class_id} subscribers for a fixed duration.
+
+Per scenario it reports request latency percentiles and throughput (overall
+and per workload), broadcast delivery latency to dashboards, and the server's
+event-loop lag and resident memory, scraped from /metrics.
+
+Like scenarios.py, call configure_environment() before using anything here.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .scenarios import CONCEPT_IDS, PROJECT_ROOT, BenchmarkStores
+
+# Dashboard WebSocket handshakes in flight at once while subscribers connect
+CONNECT_CONCURRENCY = 50
+
+# /metrics scrape interval for peak memory
+METRICS_SAMPLE_INTERVAL = 0.5
+
+SERVER_START_TIMEOUT = 60.0
+
+
+# ═══════════════════════════════════════════════════════════
+# STATISTICS
+# ═══════════════════════════════════════════════════════════
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100); None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(values: List[float], duration: float) -> Dict:
+    """Count, throughput and p50/p95/p99/max (seconds) for a list of latencies."""
+    summary = {
+        "count": len(values),
+        "throughput_per_s": round(len(values) / duration, 2) if duration > 0 else None,
+    }
+    for name, q in (("p50_s", 50), ("p95_s", 95), ("p99_s", 99), ("max_s", 100)):
+        value = percentile(values, q)
+        summary[name] = round(value, 6) if value is not None else None
+    return summary
+
+
+def parse_metrics(text: str) -> Dict[str, List[Tuple[Dict[str, str], float]]]:
+    """
+    Parse Prometheus text exposition.
+
+    Args:
+        text: /metrics response body
+
+    Returns:
+        {sample name: [(labels, value), ...]}
+    """
+    samples: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        series, _, value = line.rpartition(" ")
+        name, _, label_str = series.partition("{")
+        labels = {}
+        for pair in label_str.rstrip("}").split('",'):
+            if "=" in pair:
+                key, _, label_value = pair.partition("=")
+                labels[key.strip()] = label_value.strip().strip('"')
+        samples.setdefault(name, []).append((labels, float(value)))
+    return samples
+
+
+def _buckets(samples: Dict, name: str) -> Dict[float, float]:
+    """Cumulative bucket counts {upper bound: count} of an unlabelled histogram."""
+    return {
+        float(labels["le"]): value
+        for labels, value in samples.get(f"{name}_bucket", [])
+        if "le" in labels
+    }
+
+
+def histogram_quantile(q: float, before: Dict, after: Dict, name: str) -> Optional[float]:
+    """
+    Quantile of the observations a histogram received between two scrapes.
+
+    Interpolates linearly within the bucket (as PromQL's histogram_quantile);
+    values in the +Inf bucket report the largest finite bound.
+
+    Args:
+        q: Quantile (0-1)
+        before: parse_metrics() of the first scrape
+        after: parse_metrics() of the second scrape
+        name: Histogram name
+
+    Returns:
+        Quantile in the histogram's unit, or None without observations
+    """
+    start = _buckets(before, name)
+    end = _buckets(after, name)
+    bounds = sorted(end)
+    counts = [end[b] - start.get(b, 0.0) for b in bounds]
+    if not counts or counts[-1] <= 0:
+        return None
+
+    target = q * counts[-1]
+    previous_bound, previous_count = 0.0, 0.0
+    for bound, count in zip(bounds, counts):
+        if count >= target:
+            if math.isinf(bound):
+                return previous_bound
+            if count == previous_count:
+                return bound
+            return previous_bound + (bound - previous_bound) * (target - previous_count) / (count - previous_count)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+
+def _gauge(samples: Dict, name: str) -> Optional[float]:
+    values = samples.get(name)
+    return values[0][1] if values else None
+
+
+# ═══════════════════════════════════════════════════════════
+# SERVER
+# ═══════════════════════════════════════════════════════════
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """The API in a uvicorn subprocess, inheriting this process's environment."""
+
+    def __init__(self, log_path: Path, port: Optional[int] = None):
+        """
+        Initialize server.
+
+        Args:
+            log_path: File receiving the server's stdout/stderr
+            port: Port to listen on (default: a free port)
+        """
+        self.port = port or _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.log_path = log_path
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self):
+        import httpx
+
+        env = dict(os.environ, METRICS_ENABLED="true", API_WARM_START="true")
+        with open(self.log_path, "wb") as log:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "src.api.main:app",
+                 "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+                cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if httpx.get(f"{self.base_url}/health", timeout=1.0).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+
+        self.__exit__(None, None, None)
+        log_tail = self.log_path.read_text(errors="replace")[-2000:]
+        raise RuntimeError(f"API server did not start on port {self.port}:\n{log_tail}")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+# ═══════════════════════════════════════════════════════════
+# FIXTURE AND REQUEST PAYLOADS
+# ═══════════════════════════════════════════════════════════
+
+
+@dataclass
+class LoadFixture:
+    """Seeded data the virtual users address."""
+
+    class_id: str
+    student_ids: List[str]
+
+
+def seed_fixture(num_students: int) -> LoadFixture:
+    """Create the class every scenario targets (before the server starts)."""
+    from src.student_model.database import StudentModel
+
+    stores = BenchmarkStores()
+    class_id = stores.seed_class(num_students)
+    session = stores.session_factory()
+    try:
+        student_ids = [row[0] for row in session.query(StudentModel.student_id).filter_by(class_id=class_id)]
+    finally:
+        session.close()
+    return LoadFixture(class_id=class_id, student_ids=student_ids)
+
+
+def lesson_request(fixture: LoadFixture, rng: random.Random) -> Tuple[str, Dict, Dict]:
+    return "/api/lessons/lessons", {}, {
+        "topic": rng.choice(["Photosynthesis", "Cellular Respiration", "Energy Flow in Ecosystems"]),
+        "grade_level": "9",
+        "subject": "Science",
+        "class_id": fixture.class_id,
+    }
+
+
+def worksheet_request(fixture: LoadFixture, rng: random.Random) -> Tuple[str, Dict, Dict]:
+    tiers = ("tier_1", "tier_2", "tier_3")
+    return "/api/worksheets/generate", {}, {
+        "lesson_topic": "Photosynthesis",
+        "learning_objective": "Students will explain how plants convert light energy into chemical energy",
+        "grade_level": "9",
+        "subject": "Science",
+        "class_id": fixture.class_id,
+        "diagnostic_results": {
+            "student_estimates": [
+                {"student_id": student_id, "recommended_tier": rng.choice(tiers)}
+                for student_id in fixture.student_ids
+            ],
+        },
+    }
+
+
+GRADING_QUESTIONS = [
+    {
+        "question_id": f"q{i}",
+        "question_text": f"Multiple choice question {i}",
+        "question_type": "multiple_choice",
+        "concept_id": concept_id,
+        "points_possible": 1.0,
+        "correct_answer": "B",
+    }
+    for i, concept_id in enumerate(CONCEPT_IDS, start=1)
+] + [
+    {
+        "question_id": "q_cr",
+        "question_text": "Explain how photosynthesis stores energy.",
+        "question_type": "constructed_response",
+        "concept_id": CONCEPT_IDS[0],
+        "points_possible": 4.0,
+        "rubric": {
+            "rubric_id": "load_rubric",
+            "rubric_type": "analytic",
+            "total_points": 4.0,
+            "criteria": [{
+                "criterion_name": "Content Accuracy",
+                "description": "Scientific accuracy of the explanation",
+                "points_possible": 4.0,
+                "levels": {"4": "Exemplary", "3": "Proficient", "2": "Developing", "1": "Beginning"},
+            }],
+        },
+    },
+]
+
+
+def grading_request(fixture: LoadFixture, rng: random.Random, burst_size: int = 30) -> Tuple[str, Dict, Dict]:
+    students = rng.sample(fixture.student_ids, min(burst_size, len(fixture.student_ids)))
+    submissions = [
+        {
+            "student_id": student_id,
+            "responses": [
+                {"question_id": q["question_id"], "answer": rng.choice("ABCD")}
+                for q in GRADING_QUESTIONS if q["question_type"] == "multiple_choice"
+            ] + [{"question_id": "q_cr", "answer": "Light energy is stored as glucose in chloroplasts."}],
+        }
+        for student_id in students
+    ]
+    params = {"assessment_id": f"load_assessment_{rng.randrange(10**6)}"}
+    return "/api/assessments/batch-grade", params, {"questions": GRADING_QUESTIONS, "submissions": submissions}
+
+
+WORKLOADS = {
+    "lesson": lesson_request,
+    "worksheet": worksheet_request,
+    "grading_burst": grading_request,
+}
+
+
+# ═══════════════════════════════════════════════════════════
+# SCENARIOS
+# ═══════════════════════════════════════════════════════════
+
+
+@dataclass
+class LoadScenario:
+    """
+    A traffic mix held for a fixed duration.
+
+    users maps workload name (WORKLOADS) to concurrent virtual teachers; each
+    sends a request, waits for the response, then thinks for an exponentially
+    distributed time (mean think_time_s) before the next.
+    """
+
+    name: str
+    users: Dict[str, int]
+    dashboards: int = 0
+    duration_s: float = 20.0
+    think_time_s: float = 1.0
+    grading_burst_size: int = 30
+
+
+def default_load_scenarios(quick: bool = False) -> List[LoadScenario]:
+    """Lessons, worksheets, grading bursts, dashboard fan-out and a mixed load."""
+    duration = 5.0 if quick else 20.0
+    scale = 0.25 if quick else 1.0
+
+    def users(count: int) -> int:
+        return max(1, int(count * scale))
+
+    return [
+        LoadScenario("lesson_generation", {"lesson": users(20)}, duration_s=duration),
+        LoadScenario("worksheet_generation", {"worksheet": users(10)}, duration_s=duration),
+        LoadScenario("grading_bursts", {"grading_burst": users(4)}, dashboards=users(200), duration_s=duration),
+        LoadScenario("dashboard_fanout", {"grading_burst": 1}, dashboards=users(500), duration_s=duration),
+        LoadScenario(
+            "mixed",
+            {"lesson": users(10), "worksheet": users(5), "grading_burst": users(2)},
+            dashboards=users(200),
+            duration_s=duration,
+        ),
+    ]
+
+
+# ═══════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════
+
+
+@dataclass
+class _Recorder:
+    """Raw measurements collected while a scenario runs."""
+
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    connect_latencies: List[float] = field(default_factory=list)
+    connect_failures: int = 0
+    messages: int = 0
+    delivery_delays: List[float] = field(default_factory=list)
+    peak_rss: float = 0.0
+    client_loop_lag: List[float] = field(default_factory=list)
+
+
+async def _virtual_user(client, workload: str, fixture, scenario: LoadScenario, deadline: float, rec: _Recorder, seed: int):
+    rng = random.Random(seed)
+    build = WORKLOADS[workload]
+    while time.monotonic() < deadline:
+        if workload == "grading_burst":
+            path, params, body = build(fixture, rng, scenario.grading_burst_size)
+        else:
+            path, params, body = build(fixture, rng)
+        start = time.perf_counter()
+        try:
+            response = await client.post(path, params=params, json=body)
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        rec.latencies.setdefault(workload, []).append(time.perf_counter() - start)
+        if not ok:
+            rec.errors[workload] = rec.errors.get(workload, 0) + 1
+        if scenario.think_time_s > 0:
+            await asyncio.sleep(min(rng.expovariate(1 / scenario.think_time_s), max(0.0, deadline - time.monotonic())))
+
+
+async def _dashboard(url: str, rec: _Recorder, connected: asyncio.Event, ready: List[int], total: int, gate: asyncio.Semaphore):
+    import websockets
+
+    try:
+        async with gate:
+            start = time.perf_counter()
+            ws = await websockets.connect(url, ping_interval=None, open_timeout=30, max_size=None)
+            await ws.recv()  # connection_confirmed
+            rec.connect_latencies.append(time.perf_counter() - start)
+    except Exception:
+        rec.connect_failures += 1
+        ws = None
+    ready[0] += 1
+    if ready[0] >= total:
+        connected.set()
+    if ws is None:
+        return
+
+    try:
+        async for raw in ws:
+            rec.messages += 1
+            graded_at = json.loads(raw).get("graded_at")
+            if graded_at:
+                # Grading finished -> event received (server and harness share a clock)
+                delay = datetime.utcnow() - datetime.fromisoformat(graded_at)
+                rec.delivery_delays.append(delay.total_seconds())
+    except Exception:
+        pass
+    finally:
+        await ws.close()
+
+
+async def _sample_server(client, rec: _Recorder, stop: asyncio.Event):
+    while not stop.is_set():
+        with contextlib.suppress(Exception):
+            rss = _gauge(parse_metrics((await client.get("/metrics")).text), "process_resident_memory_bytes")
+            rec.peak_rss = max(rec.peak_rss, rss or 0.0)
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stop.wait(), METRICS_SAMPLE_INTERVAL)
+
+
+async def _monitor_client_loop(rec: _Recorder, stop: asyncio.Event, interval: float = 0.1):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        rec.client_loop_lag.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_load_scenario(scenario: LoadScenario, base_url: str, fixture: LoadFixture, seed: int = 7) -> Dict:
+    """
+    Run one scenario against a running server.
+
+    Args:
+        scenario: Traffic mix
+        base_url: Server URL (http://host:port)
+        fixture: Seeded class the requests address
+        seed: RNG seed for request contents and think times
+
+    Returns:
+        Result dict (request latency/throughput, WebSocket delivery, server lag and memory)
+    """
+    import httpx
+
+    rec = _Recorder()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0, limits=limits) as client:
+        # Subscribers connect before the timed phase
+        ws_url = base_url.replace("http://", "ws://") + f"/ws/dashboard/{fixture.class_id}"
+        connected = asyncio.Event()
+        if scenario.dashboards == 0:
+            connected.set()
+        gate = asyncio.Semaphore(CONNECT_CONCURRENCY)
+        ready = [0]
+        dashboards = [
+            asyncio.create_task(_dashboard(ws_url, rec, connected, ready, scenario.dashboards, gate))
+            for _ in range(scenario.dashboards)
+        ]
+        await connected.wait()
+
+        before = parse_metrics((await client.get("/metrics")).text)
+        rss_start = _gauge(before, "process_resident_memory_bytes")
+        rec.peak_rss = rss_start or 0.0
+
+        stop = asyncio.Event()
+        monitors = [
+            asyncio.create_task(_sample_server(client, rec, stop)),
+            asyncio.create_task(_monitor_client_loop(rec, stop)),
+        ]
+
+        start = time.monotonic()
+        deadline = start + scenario.duration_s
+        users = [
+            _virtual_user(client, workload, fixture, scenario, deadline, rec, seed * 1000 + i * 100 + n)
+            for i, (workload, count) in enumerate(sorted(scenario.users.items()))
+            for n in range(count)
+        ]
+        await asyncio.gather(*users)
+        elapsed = time.monotonic() - start
+
+        # Let broadcasts from the last responses drain before disconnecting
+        await asyncio.sleep(0.5)
+        stop.set()
+        await asyncio.gather(*monitors)
+        after = parse_metrics((await client.get("/metrics")).text)
+        for task in dashboards:
+            task.cancel()
+        await asyncio.gather(*dashboards, return_exceptions=True)
+
+    all_latencies = [value for values in rec.latencies.values() for value in values]
+    total_errors = sum(rec.errors.values())
+    lag = {
+        f"event_loop_lag_p{int(q * 100)}_s": (
+            round(value, 6) if (value := histogram_quantile(q, before, after, "event_loop_lag_seconds")) is not None else None
+        )
+        for q in (0.5, 0.95, 0.99)
+    }
+    rss_end = _gauge(after, "process_resident_memory_bytes")
+
+    def mb(value: Optional[float]) -> Optional[float]:
+        return round(value / 2**20, 1) if value else None
+
+    return {
+        "params": {
+            "users": scenario.users,
+            "dashboards": scenario.dashboards,
+            "duration_s": scenario.duration_s,
+            "think_time_s": scenario.think_time_s,
+            "grading_burst_size": scenario.grading_burst_size,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(all_latencies),
+        "errors": total_errors,
+        "error_rate": round(total_errors / len(all_latencies), 4) if all_latencies else 0.0,
+        **{k: v for k, v in latency_summary(all_latencies, elapsed).items() if k != "count"},
+        "workloads": {
+            workload: {**latency_summary(values, elapsed), "errors": rec.errors.get(workload, 0)}
+            for workload, values in sorted(rec.latencies.items())
+        },
+        "websocket": {
+            "subscribers": scenario.dashboards,
+            "connected": len(rec.connect_latencies),
+            "connect_failures": rec.connect_failures,
+            "connect_p95_s": percentile(rec.connect_latencies, 95),
+            "messages": rec.messages,
+            "messages_per_s": round(rec.messages / elapsed, 2) if elapsed > 0 else None,
+            **{
+                f"delivery_{k}": v
+                for k, v in latency_summary(rec.delivery_delays, elapsed).items()
+                if k in ("p50_s", "p95_s", "p99_s", "max_s")
+            },
+        },
+        "server": {
+            **lag,
+            "rss_start_mb": mb(rss_start),
+            "rss_peak_mb": mb(rec.peak_rss),
+            "rss_end_mb": mb(rss_end),
+        },
+        "client_loop_lag_p99_s": percentile(rec.client_loop_lag, 99),
+    }
+
+
+async def warm_up(base_url: str, fixture: LoadFixture) -> None:
+    """One untimed request per workload (lazy imports, first DB connections)."""
+    import httpx
+
+    rng = random.Random(0)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0) as client:
+        for build in WORKLOADS.values():
+            path, params, body = build(fixture, rng)
+            with contextlib.suppress(httpx.HTTPError):
+                await client.post(path, params=params, json=body)
+
+
+def run_load_suite(suite: List[LoadScenario], workdir: Path, num_students: int = 200, port: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Seed a class, start the server and run each scenario in turn.
+
+    Args:
+        suite: Scenarios to run
+        workdir: Directory for the server log (database location comes from the environment)
+        num_students: Class size for the seeded class
+        port: Server port (default: a free port)
+
+    Returns:
+        {scenario name: result}
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        fixture = seed_fixture(num_students)
+
+    results = {}
+    with LocalServer(workdir / "server.log", port=port) as server:
+        asyncio.run(warm_up(server.base_url, fixture))
+        for scenario in suite:
+            results[scenario.name] = asyncio.run(run_load_scenario(scenario, server.base_url, fixture))
+    return results
@@ -0,0 +1,455 @@
+"""
+Benchmark scenarios, timing and result files.
+
+Module-level settings in src/ are read from the environment at import, so
+call configure_environment() before anything from src is imported; the
+scenarios below import src lazily for that reason.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+RESULTS_SCHEMA_VERSION = 1
+
+CONCEPT_IDS = ["photosynthesis_process", "cellular_respiration", "energy_flow"]
+
+LEARNING_PREFERENCES = ["Visual", "Auditory", "Reading/Writing", "Kinesthetic"]
+READING_LEVELS = ["Below Basic", "Basic", "Proficient", "Advanced"]
+DISABILITIES = ["Specific Learning Disability", "ADHD", "Autism Spectrum Disorder"]
+ACCOMMODATIONS = ["Extended Time", "Text-to-Speech", "Graphic Organizers", "Word Bank"]
+
+# Fake LLM settings recorded with every result (they change what is measured)
+FAKE_LLM_SETTINGS = (
+    "FAKE_LLM_LATENCY_MS",
+    "FAKE_LLM_LATENCY_JITTER_MS",
+    "FAKE_LLM_MS_PER_OUTPUT_TOKEN",
+    "FAKE_LLM_OUTPUT_TOKENS",
+    "FAKE_LLM_OUTPUT_TOKENS_JITTER",
+    "FAKE_LLM_SEED",
+)
+
+
+def configure_environment(workdir: Path, llm_latency_ms: Optional[float] = None, llm_ms_per_token: Optional[float] = None):
+    """
+    Point the app at throwaway stores and local backends.
+
+    Args:
+        workdir: Directory for the SQLite database and Chroma data
+        llm_latency_ms: Fake LLM time to first token (default: FAKE_LLM_LATENCY_MS or 0)
+        llm_ms_per_token: Fake LLM time per output token (default: FAKE_LLM_MS_PER_OUTPUT_TOKEN or 0)
+    """
+    workdir.mkdir(parents=True, exist_ok=True)
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{workdir / 'benchmark.db'}",
+        "CHROMA_PERSIST_DIRECTORY": str(workdir / "chroma"),
+        "LLM_BACKEND": "fake",
+        "EMBEDDING_BACKEND": "hashing",
+        "EMBEDDING_CACHE_DIR": "",
+        "TRACING_EXPORTER": "none",
+    })
+    if llm_latency_ms is not None:
+        os.environ["FAKE_LLM_LATENCY_MS"] = str(llm_latency_ms)
+    if llm_ms_per_token is not None:
+        os.environ["FAKE_LLM_MS_PER_OUTPUT_TOKEN"] = str(llm_ms_per_token)
+
+
+# ═══════════════════════════════════════════════════════════
+# FIXTURE DATA
+# ═══════════════════════════════════════════════════════════
+
+
+def roster_csv(num_students: int, id_prefix: str, seed: int = 7) -> str:
+    """Synthetic SIS roster export (~15% IEP students)."""
+    rng = random.Random(seed)
+    out = io.StringIO()
+    out.write("student_id,student_name,grade_level,reading_level,iep_status,primary_disability,learning_preferences,accommodations\n")
+    for i in range(num_students):
+        has_iep = rng.random() < 0.15
+        out.write(",".join([
+            f"{id_prefix}_{i:06d}",
+            f"Student {i}",
+            rng.choice(["9", "10", "11", "12"]),
+            rng.choice(READING_LEVELS),
+            "yes" if has_iep else "no",
+            rng.choice(DISABILITIES) if has_iep else "",
+            "|".join(rng.sample(LEARNING_PREFERENCES, rng.randint(1, 2))),
+            "|".join(rng.sample(ACCOMMODATIONS, 2)) if has_iep else "",
+        ]) + "\n")
+    return out.getvalue()
+
+
+class BenchmarkStores:
+    """Tables, vector store and class seeding shared by the scenarios."""
+
+    def __init__(self):
+        import src.content_storage.models  # noqa: F401  (registers content tables for create_tables)
+        from src.student_model.database import SessionLocal, create_tables
+        from src.student_model.vector_store import StudentVectorStore
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_tables()
+        self.session_factory = SessionLocal
+        self.vector_store = StudentVectorStore()
+        self._classes = 0
+
+    def student_model(self):
+        """A fresh StudentModelInterface (one per run, like one per request)."""
+        from src.student_model.interface import StudentModelInterface
+
+        return StudentModelInterface(db_session=self.session_factory(), vector_store=self.vector_store)
+
+    def create_class(self) -> str:
+        """Insert an empty class and return its id."""
+        from src.student_model.database import ClassModel
+        from src.student_model.schemas import GradeLevel, Subject
+
+        self._classes += 1
+        class_id = f"bench_class_{self._classes}_{os.getpid()}"
+        session = self.session_factory()
+        try:
+            session.add(ClassModel(
+                class_id=class_id,
+                class_name=f"Benchmark class {self._classes}",
+                grade_level=GradeLevel("9"),
+                subject=Subject.SCIENCE,
+                teacher_id="bench_teacher",
+            ))
+            session.commit()
+        finally:
+            session.close()
+        return class_id
+
+    def seed_class(self, num_students: int, concept_ids: List[str] = CONCEPT_IDS, seed: int = 7) -> str:
+        """
+        Create a class with students, IEPs, preference vectors and mastery.
+
+        Args:
+            num_students: Class size
+            concept_ids: Concepts to give every student a mastery estimate for
+            seed: RNG seed for the synthetic data
+
+        Returns:
+            class_id
+        """
+        from sqlalchemy import insert
+
+        from src.student_model.database import MasteryModel
+
+        class_id = self.create_class()
+        with self.student_model() as model:
+            result = model.import_students_stream(io.StringIO(roster_csv(num_students, class_id, seed)), class_id)
+
+        rng = random.Random(seed)
+        now = datetime.utcnow()
+        rows = [
+            {
+                "student_id": student_id,
+                "concept_id": concept_id,
+                "concept_name": concept_id.replace("_", " ").title(),
+                "mastery_probability": round(rng.betavariate(2, 2), 3),
+                "num_observations": rng.randint(0, 10),
+                "last_updated": now,
+                "created_at": now,
+            }
+            for student_id in result.created_student_ids
+            for concept_id in concept_ids
+        ]
+        session = self.session_factory()
+        try:
+            session.execute(insert(MasteryModel), rows)
+            session.commit()
+        finally:
+            session.close()
+        return class_id
+
+
+# ═══════════════════════════════════════════════════════════
+# SCENARIOS
+# ═══════════════════════════════════════════════════════════
+
+
+@dataclass
+class Scenario:
+    """
+    A benchmark: setup once, then time run() for each round.
+
+    setup(stores) returns the zero-argument callable to time; per_round
+    (optional) builds fresh state before each round, outside the timer,
+    and returns the callable for that round instead.
+    """
+
+    name: str
+    items: int  # Units of work per round (students, submissions, rows)
+    setup: Callable
+    per_round: Optional[Callable] = None
+    params: Dict = field(default_factory=dict)
+
+
+def pipeline_scenario(class_size: int) -> Scenario:
+    """Full sync pipeline (lesson, diagnostic, worksheets, IEP) for one class."""
+
+    def setup(stores: BenchmarkStores):
+        from src.orchestration.pipeline import MasterCreatorPipeline, PipelineInput
+
+        class_id = stores.seed_class(class_size)
+        params = PipelineInput(
+            lesson_topic="Photosynthesis",
+            grade_level="9",
+            subject="Science",
+            class_id=class_id,
+            concept_ids=CONCEPT_IDS,
+        )
+
+        def run():
+            with stores.student_model() as model:
+                output = MasterCreatorPipeline(student_model=model, enable_logging=False).run(params)
+            if output.errors:
+                raise RuntimeError(f"Pipeline failed: {output.errors}")
+            return output
+
+        return run
+
+    return Scenario(f"pipeline_class_{class_size}", class_size, setup, params={"class_size": class_size})
+
+
+def grading_scenario(num_submissions: int) -> Scenario:
+    """Rubric grading of constructed responses (one LLM call each)."""
+
+    def setup(stores: BenchmarkStores):
+        from src.grader.rubric_engine import ConstructedResponse, Rubric, RubricCriterion, RubricGradingEngine
+
+        rubric = Rubric(
+            rubric_id="bench_rubric",
+            rubric_type="analytic",
+            total_points=8.0,
+            criteria=[
+                RubricCriterion(
+                    criterion_name=name,
+                    description=f"{name} of the explanation",
+                    points_possible=4.0,
+                    levels={"4": "Exemplary", "3": "Proficient", "2": "Developing", "1": "Beginning"},
+                )
+                for name in ("Content Accuracy", "Use of Evidence")
+            ],
+        )
+        responses = [
+            ConstructedResponse(
+                question_id="q1",
+                student_id=f"student_{i:05d}",
+                response_text=f"Plants use light energy to make glucose (response {i}).",
+            )
+            for i in range(num_submissions)
+        ]
+
+        def run():
+            grades = RubricGradingEngine().grade_batch("Explain photosynthesis.", responses, rubric)
+            if len(grades) != num_submissions:
+                raise RuntimeError(f"Graded {len(grades)} of {num_submissions} submissions")
+            return grades
+
+        return run
+
+    return Scenario(f"grading_batch_{num_submissions}", num_submissions, setup, params={"submissions": num_submissions})
+
+
+def adaptive_scenario(class_size: int) -> Scenario:
+    """Class adaptive plan (tiers, groups, similar students, learning paths)."""
+
+    def setup(stores: BenchmarkStores):
+        from src.engines.engine_4_adaptive import AdaptiveEngine
+
+        class_id = stores.seed_class(class_size)
+
+        def run():
+            with stores.student_model() as model:
+                plan = AdaptiveEngine(student_model=model).generate_class_plan(class_id, CONCEPT_IDS)
+            if plan.total_students != class_size:
+                raise RuntimeError(f"Plan covers {plan.total_students} of {class_size} students")
+            return plan
+
+        return run
+
+    return Scenario(f"adaptive_plan_{class_size}", class_size, setup, params={"class_size": class_size})
+
+
+def bulk_import_scenario(num_rows: int) -> Scenario:
+    """Streaming CSV roster import (validation, inserts, preference embeddings)."""
+
+    def setup(stores: BenchmarkStores):
+        return None
+
+    def per_round(stores: BenchmarkStores):
+        class_id = stores.create_class()
+        upload = roster_csv(num_rows, class_id)
+
+        def run():
+            with stores.student_model() as model:
+                result = model.import_students_stream(io.StringIO(upload), class_id)
+            if result.successful_imports != num_rows:
+                raise RuntimeError(f"Imported {result.successful_imports} of {num_rows} rows: {result.errors[:3]}")
+            return result
+
+        return run
+
+    return Scenario(f"bulk_import_{num_rows}", num_rows, setup, per_round, params={"rows": num_rows})
+
+
+def default_scenarios(quick: bool = False) -> List[Scenario]:
+    """
+    The standard suite.
+
+    Args:
+        quick: Use small sizes (CI smoke run) instead of the full sizes
+
+    Returns:
+        Scenarios in run order
+    """
+    if quick:
+        return [
+            pipeline_scenario(20),
+            grading_scenario(50),
+            adaptive_scenario(60),
+            bulk_import_scenario(1000),
+        ]
+    return [
+        pipeline_scenario(20),
+        pipeline_scenario(200),
+        pipeline_scenario(2000),
+        grading_scenario(1000),
+        adaptive_scenario(600),
+        bulk_import_scenario(50000),
+    ]
+
+
+# ═══════════════════════════════════════════════════════════
+# TIMING AND RESULTS
+# ═══════════════════════════════════════════════════════════
+
+
+def summarize(seconds: List[float], items: int) -> Dict:
+    """Timing statistics for one scenario's rounds."""
+    median = statistics.median(seconds)
+    return {
+        "rounds": len(seconds),
+        "min_s": round(min(seconds), 6),
+        "median_s": round(median, 6),
+        "mean_s": round(statistics.fmean(seconds), 6),
+        "max_s": round(max(seconds), 6),
+        "stdev_s": round(statistics.stdev(seconds), 6) if len(seconds) > 1 else 0.0,
+        "items_per_second": round(items / median, 2) if median > 0 else None,
+    }
+
+
+def run_scenario(scenario: Scenario, stores: BenchmarkStores, rounds: int = 3, warmup: int = 1) -> Dict:
+    """
+    Time a scenario.
+
+    Args:
+        scenario: Scenario to run
+        stores: Shared benchmark stores
+        rounds: Timed rounds
+        warmup: Untimed rounds first (imports, caches, lazy model loads)
+
+    Returns:
+        Result dict (params, items, timing summary, LLM calls per round)
+    """
+    from src.engines.llm_backends import FakeLLMClient
+
+    # Engines print debug output; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = scenario.setup(stores)
+        seconds = []
+        llm_calls_before = FakeLLMClient.total_calls
+        for round_number in range(warmup + rounds):
+            if scenario.per_round is not None:
+                run = scenario.per_round(stores)
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            if round_number >= warmup:
+                seconds.append(elapsed)
+        llm_calls = (FakeLLMClient.total_calls - llm_calls_before) // (warmup + rounds)
+
+    return {
+        "params": scenario.params,
+        "items": scenario.items,
+        "llm_calls_per_round": llm_calls,
+        **summarize(seconds, scenario.items),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.strip() or None
+
+
+def build_report(results: Dict[str, Dict]) -> Dict:
+    """Results file contents: scenario results plus the environment they were measured in."""
+    return {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "fake_llm": {name: os.getenv(name) for name in FAKE_LLM_SETTINGS if os.getenv(name) is not None},
+        "scenarios": results,
+    }
+
+
+def save_report(report: Dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def compare_reports(current: Dict, baseline: Dict, max_regression: float = 0.2, metric: str = "median_s") -> List[Dict]:
+    """
+    Compare a timing metric against a baseline results file.
+
+    Args:
+        current: Report from build_report()
+        baseline: Earlier report
+        max_regression: Allowed slowdown (0.2 = 20% slower than baseline)
+        metric: Per-scenario result key to compare (lower is better)
+
+    Returns:
+        One entry per scenario present in both, with "regressed" flagged
+    """
+    comparisons = []
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None or not previous.get(metric) or result.get(metric) is None:
+            continue
+        ratio = result[metric] / previous[metric]
+        comparisons.append({
+            "scenario": name,
+            "metric": metric,
+            "baseline": previous[metric],
+            "current": result[metric],
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1 + max_regression,
+        })
+    return comparisons
+
+
+def ensure_importable() -> None:
+    """Make `import src` work when run as a script."""
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
@@ -0,0 +1,32 @@
+"""
+End-to-end benchmarks for pytest-benchmark.
+
+Same scenarios as scripts/benchmark_performance.py; set BENCHMARK_QUICK=1
+for the small sizes.
+"""
+
+import contextlib
+import io
+import os
+
+import pytest
+
+from benchmarks import scenarios
+
+pytest.importorskip("pytest_benchmark")
+
+SCENARIOS = scenarios.default_scenarios(quick=os.getenv("BENCHMARK_QUICK", "").lower() in ("1", "true"))
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=[s.name for s in SCENARIOS])
+def test_scenario(benchmark, stores, scenario):
+    benchmark.group = scenario.name.rsplit("_", 1)[0]
+    benchmark.extra_info.update(scenario.params, items=scenario.items)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = scenario.setup(stores)
+        if scenario.per_round is None:
+            benchmark.pedantic(run, rounds=3, warmup_rounds=1)
+        else:
+            # Fresh state per round, built outside the timer
+            benchmark.pedantic(lambda fn: fn(), setup=lambda: ((scenario.per_round(stores),), {}), rounds=3)
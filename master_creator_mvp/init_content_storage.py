@@ -54,6 +54,7 @@ def main():
     print("    - feedback_reports")
     print("    - graded_assessments")
     print("    - pipeline_executions")
+    print("    - pipeline_checkpoints")
 
     print("\n💡 Next steps:")
     print("  1. Load sample data: python load_sample_data.py")
@@ -0,0 +1,176 @@
+"""
+Benchmark Embedding Backends
+
+Compares the EMBEDDING_BACKEND options on the texts the vector store
+actually embeds (student learning preference texts):
+- Load time and peak resident memory (each backend in a fresh subprocess)
+- Batch throughput (texts/second)
+- Single-text latency (p50 / p95)
+- Agreement with the reference backend (cosine similarity of vectors)
+
+Usage:
+    python scripts/benchmark_embeddings.py
+    python scripts/benchmark_embeddings.py --backends onnx onnx-int8 --texts 5000 --batch-size 64
+"""
+
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+LEARNING_PREFERENCES = ["Visual", "Auditory", "Reading/Writing", "Kinesthetic"]
+READING_LEVELS = ["Below Basic", "Basic", "Proficient", "Advanced"]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def generate_texts(count: int, seed: int = 7):
+    """Synthetic preference texts in the same format as the Student Model."""
+    from student_model.vector_store import build_preferences_text
+
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        prefs = rng.sample(LEARNING_PREFERENCES, rng.randint(1, 3))
+        texts.append(build_preferences_text(f"Student {i}", prefs, rng.choice(READING_LEVELS)))
+    return texts
+
+
+# ═══════════════════════════════════════════════════════════
+# SINGLE-BACKEND RUN (subprocess)
+# ═══════════════════════════════════════════════════════════
+
+
+def run_backend(backend_name: str, num_texts: int, batch_size: int, latency_samples: int, vectors_out: str) -> dict:
+    """Measure one backend in the current process."""
+    from student_model.embedding_backends import get_embedding_backend
+
+    texts = generate_texts(num_texts)
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    backend = get_embedding_backend(backend_name, batch_size=batch_size)
+    backend.embed(texts[:1])  # Forces model load
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectors = backend.embed(texts)
+    batch_seconds = time.perf_counter() - start
+
+    latencies = []
+    for text in texts[:latency_samples]:
+        start = time.perf_counter()
+        backend.embed([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    np.save(vectors_out, vectors)
+
+    return {
+        "backend": backend_name,
+        "load_seconds": load_seconds,
+        "throughput_texts_per_second": len(texts) / batch_seconds,
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "peak_rss_mb": peak_rss_mb(),
+        "model_rss_mb": peak_rss_mb() - rss_before,
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+# COMPARISON
+# ═══════════════════════════════════════════════════════════
+
+
+def main():
+    """Run each backend in its own process and print a comparison table."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark vector store embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["sentence-transformers", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=2000, help="Texts embedded in the throughput run")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--latency-samples", type=int, default=200)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_backend(args.child, args.texts, args.batch_size, args.latency_samples, args.vectors_out)
+        print(json.dumps(result))
+        return
+
+    print("=" * 60)
+    print("Embedding Backend Benchmark")
+    print("=" * 60)
+    print(f"Texts: {args.texts}   Batch size: {args.batch_size}   Latency samples: {args.latency_samples}")
+    print()
+
+    results = []
+    vectors = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            vectors_out = str(Path(tmp) / f"{backend}.npy")
+            print(f"Running {backend}...")
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--child",
+                    backend,
+                    "--texts",
+                    str(args.texts),
+                    "--batch-size",
+                    str(args.batch_size),
+                    "--latency-samples",
+                    str(args.latency_samples),
+                    "--vectors-out",
+                    vectors_out,
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                print(f"  ❌ {backend} failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr else 'unknown error'}")
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            vectors[backend] = np.load(vectors_out)
+
+    if not results:
+        sys.exit(1)
+
+    # Agreement with the first backend that ran (the reference)
+    reference = results[0]["backend"]
+    for result in results:
+        cosine = np.sum(vectors[reference] * vectors[result["backend"]], axis=1)
+        result["cosine_min"] = float(cosine.min())
+        result["cosine_mean"] = float(cosine.mean())
+
+    print()
+    header = f"{'backend':22s} {'load s':>7s} {'texts/s':>9s} {'p50 ms':>7s} {'p95 ms':>7s} {'RSS MB':>7s} {'cos min':>8s}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['backend']:22s} {r['load_seconds']:7.2f} {r['throughput_texts_per_second']:9.1f} "
+            f"{r['latency_p50_ms']:7.2f} {r['latency_p95_ms']:7.2f} {r['peak_rss_mb']:7.0f} {r['cosine_min']:8.4f}"
+        )
+    print()
+    print(f"Cosine similarity is measured against '{reference}'.")
+
+
+if __name__ == "__main__":
+    main()
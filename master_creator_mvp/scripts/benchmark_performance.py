@@ -0,0 +1,87 @@
+"""
+End-to-End Performance Benchmark
+
+Runs the benchmark scenarios (benchmarks/scenarios.py) without real Claude
+calls: engines use the deterministic fake LLM backend, embeddings use the
+hashing backend, and data lives in a temporary SQLite database.
+
+Default suite:
+- Full pipeline for class sizes 20 / 200 / 2000
+- Rubric grading of 1,000 submissions
+- Adaptive plan for a 600-student class
+- Bulk import of 50,000 roster rows
+
+Results are written as JSON; pass --baseline to compare median times with
+an earlier results file (exits with status 1 on a regression).
+
+Usage:
+    python scripts/benchmark_performance.py
+    python scripts/benchmark_performance.py --quick --rounds 1
+    python scripts/benchmark_performance.py --only pipeline grading --llm-latency-ms 800 --llm-ms-per-token 10
+    python scripts/benchmark_performance.py --baseline benchmarks/results/baseline.json --max-regression 0.2
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks import scenarios  # noqa: E402  (stdlib only; src is imported after configuration)
+
+DEFAULT_OUTPUT = scenarios.PROJECT_ROOT / "benchmarks" / "results" / "latest.json"
+
+
+def main():
+    """CLI entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="End-to-end performance benchmarks (fake LLM backend)")
+    parser.add_argument("--quick", action="store_true", help="Small sizes (smoke run)")
+    parser.add_argument("--only", nargs="+", help="Run scenarios whose name starts with one of these prefixes")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed rounds per scenario")
+    parser.add_argument("--llm-latency-ms", type=float, help="Fake LLM time to first token")
+    parser.add_argument("--llm-ms-per-token", type=float, help="Fake LLM time per output token")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Results JSON path")
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed median slowdown vs. baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mc_bench_") as workdir:
+        scenarios.configure_environment(Path(workdir), args.llm_latency_ms, args.llm_ms_per_token)
+        suite = scenarios.default_scenarios(quick=args.quick)
+        if args.only:
+            suite = [s for s in suite if any(s.name.startswith(prefix) for prefix in args.only)]
+
+        print(f"Running {len(suite)} scenarios ({args.warmup} warmup + {args.rounds} timed rounds each)\n")
+        stores = scenarios.BenchmarkStores()
+        results = {}
+        for scenario in suite:
+            result = scenarios.run_scenario(scenario, stores, rounds=args.rounds, warmup=args.warmup)
+            results[scenario.name] = result
+            print(
+                f"{scenario.name:<24} median {result['median_s']:>9.3f}s  "
+                f"min {result['min_s']:>9.3f}s  {result['items_per_second']:>10} items/s  "
+                f"{result['llm_calls_per_round']} LLM calls"
+            )
+
+        report = scenarios.build_report(results)
+
+    scenarios.save_report(report, args.output)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        comparisons = scenarios.compare_reports(report, baseline, args.max_regression)
+        print(f"\nComparison with {args.baseline} (max regression {args.max_regression:.0%}):")
+        for c in comparisons:
+            flag = "REGRESSED" if c["regressed"] else "ok"
+            print(f"  {c['scenario']:<24} {c['baseline']:.3f}s -> {c['current']:.3f}s  x{c['ratio']:.2f}  {flag}")
+        if any(c["regressed"] for c in comparisons):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark API Cold Start
+
+Measures how long a fresh interpreter takes to become ready to serve:
+- Import time of src.api.main (routes, schemas, app construction)
+- Time until the first /health response (startup hooks + first request)
+- Which heavy dependencies were loaded along the way (should be none:
+  anthropic, langgraph, chromadb, etc. load on first use)
+
+Each run is a fresh subprocess, so nothing is served from the module cache.
+Exits with status 1 if the median cold start exceeds --max-seconds or a
+deferred dependency was imported, so it can guard cold start in CI.
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --max-seconds 1.0
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Must not be imported by `import src.api.main`
+DEFERRED_MODULES = [
+    "anthropic",
+    "langgraph",
+    "langchain_core",
+    "chromadb",
+    "pandas",
+    "onnxruntime",
+    "sentence_transformers",
+    "torch",
+]
+
+# httpx is only needed by the test client (not by a uvicorn worker), so it is
+# imported before the clock starts
+CHILD_CODE = """
+import json, sys, time
+import httpx
+start = time.perf_counter()
+import src.api.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(src.api.main.app) as client:
+    client.get("/health").raise_for_status()
+ready = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "ready_seconds": ready - start,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def measure_cold_start() -> dict:
+    """
+    Start a fresh interpreter, import the API and serve one /health request.
+
+    Returns:
+        Dict with import_seconds, ready_seconds and loaded (deferred modules imported)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE % (DEFERRED_MODULES,)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Run cold starts and print a summary; non-zero exit if over budget."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark API cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="Budget for median time to first response")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("API Cold Start Benchmark")
+    print("=" * 60)
+
+    results = [measure_cold_start() for _ in range(args.runs)]
+    import_median = statistics.median(r["import_seconds"] for r in results)
+    ready_median = statistics.median(r["ready_seconds"] for r in results)
+    loaded = sorted({m for r in results for m in r["loaded"]})
+
+    print(f"Runs:                    {args.runs}")
+    print(f"Import (median):         {import_median:.3f}s")
+    print(f"First response (median): {ready_median:.3f}s")
+    print(f"Deferred modules loaded: {', '.join(loaded) if loaded else 'none'}")
+    print()
+
+    failed = False
+    if ready_median > args.max_seconds:
+        print(f"❌ Cold start {ready_median:.3f}s exceeds budget of {args.max_seconds:.3f}s")
+        failed = True
+    if loaded:
+        print(f"❌ Imported at startup: {', '.join(loaded)}")
+        failed = True
+    if not failed:
+        print("✅ Cold start within budget")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
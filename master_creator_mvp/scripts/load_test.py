@@ -0,0 +1,101 @@
+"""
+API Load Test
+
+Starts the API locally (uvicorn subprocess, fake LLM backend, temporary
+SQLite database) and runs concurrent-teacher scenarios against it
+(benchmarks/loadtest.py):
+- lesson_generation: teachers generating lessons
+- worksheet_generation: teachers generating tiered worksheets
+- grading_bursts: batch grading while dashboards receive graded events
+- dashboard_fanout: hundreds of /ws/dashboard/{class_id} subscribers
+- mixed: all of the above at once
+
+Reports p50/p95/p99 latency, throughput, broadcast delivery latency, server
+event-loop lag and memory per scenario. Results are written as JSON; pass
+--baseline to compare p95 latency with an earlier file (exits with status 1
+on a regression).
+
+Usage:
+    python scripts/load_test.py
+    python scripts/load_test.py --quick
+    python scripts/load_test.py --only mixed dashboard --duration 60 --llm-latency-ms 800
+    python scripts/load_test.py --baseline benchmarks/results/load_baseline.json
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks import scenarios  # noqa: E402  (stdlib only; src is imported after configuration)
+
+DEFAULT_OUTPUT = scenarios.PROJECT_ROOT / "benchmarks" / "results" / "load_latest.json"
+
+
+def _ms(value) -> str:
+    return f"{value * 1000:>8.1f}" if value is not None else f"{'-':>8}"
+
+
+def main():
+    """CLI entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local load test of the API and WebSockets (fake LLM backend)")
+    parser.add_argument("--quick", action="store_true", help="Short scenarios with fewer users (smoke run)")
+    parser.add_argument("--only", nargs="+", help="Run scenarios whose name starts with one of these prefixes")
+    parser.add_argument("--duration", type=float, help="Seconds per scenario (overrides the default)")
+    parser.add_argument("--students", type=int, default=200, help="Size of the seeded class")
+    parser.add_argument("--llm-latency-ms", type=float, help="Fake LLM time to first token")
+    parser.add_argument("--llm-ms-per-token", type=float, help="Fake LLM time per output token")
+    parser.add_argument("--port", type=int, help="Server port (default: any free port)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Results JSON path")
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 slowdown vs. baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mc_load_") as workdir:
+        scenarios.configure_environment(Path(workdir), args.llm_latency_ms, args.llm_ms_per_token)
+        from benchmarks import loadtest
+
+        suite = loadtest.default_load_scenarios(quick=args.quick)
+        if args.only:
+            suite = [s for s in suite if any(s.name.startswith(prefix) for prefix in args.only)]
+        if args.duration:
+            for scenario in suite:
+                scenario.duration_s = args.duration
+
+        print(f"Running {len(suite)} load scenarios against a local server ({args.students}-student class)\n")
+        results = loadtest.run_load_suite(suite, Path(workdir), num_students=args.students, port=args.port)
+        report = scenarios.build_report(results)
+
+    print(f"{'scenario':<22} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6} "
+          f"{'ws msgs':>8} {'ws p95':>8} {'lag p99':>8} {'rss MB':>7}")
+    for name, result in results.items():
+        ws, server = result["websocket"], result["server"]
+        print(
+            f"{name:<22} {result['throughput_per_s'] or 0:>7.2f} {_ms(result['p50_s'])} {_ms(result['p95_s'])} "
+            f"{_ms(result['p99_s'])} {result['errors']:>6} {ws['messages']:>8} {_ms(ws['delivery_p95_s'])} "
+            f"{_ms(server['event_loop_lag_p99_s'])} {server['rss_peak_mb'] or 0:>7.1f}"
+        )
+        for workload, stats in result["workloads"].items():
+            print(f"  {workload:<20} {stats['throughput_per_s'] or 0:>7.2f} {_ms(stats['p50_s'])} "
+                  f"{_ms(stats['p95_s'])} {_ms(stats['p99_s'])} {stats['errors']:>6}")
+
+    scenarios.save_report(report, args.output)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        comparisons = scenarios.compare_reports(report, baseline, args.max_regression, metric="p95_s")
+        print(f"\nComparison with {args.baseline} (p95, max regression {args.max_regression:.0%}):")
+        for c in comparisons:
+            flag = "REGRESSED" if c["regressed"] else "ok"
+            print(f"  {c['scenario']:<22} {c['baseline']:.3f}s -> {c['current']:.3f}s  x{c['ratio']:.2f}  {flag}")
+        if any(c["regressed"] for c in comparisons):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Shared API Dependencies
+
+Per-request units of work for the route modules: each request gets one
+pooled database session, committed when the handler succeeds and rolled back
+when it raises, and all of the request's interfaces use it. Routes that run
+engines or graders use a sync Session (engines query it from worker
+threads); the others an AsyncSession when an async driver is installed.
+Interfaces share the process-level Chroma vector store.
+Nothing here is created at import time: route modules are imported when the
+app starts.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import Depends
+
+from ..content_storage.async_interface import AsyncContentStorageInterface
+from ..student_model.async_interface import AsyncStudentModelInterface
+from ..student_model.database import SessionLocal, db_engine, open_request_session
+from ..student_model.interface import StudentModelInterface
+from ..student_model.vector_store import get_shared_vector_store
+
+logger = logging.getLogger("api.dependencies")
+
+# Warm heavy dependencies in a background thread after startup (off by default)
+API_WARM_START = os.getenv("API_WARM_START", "false").lower() == "true"
+
+# Modules deferred out of the import path, loaded by warm_up()
+WARM_MODULES = ("anthropic", "langgraph.graph")
+
+
+# ═══════════════════════════════════════════════════════════
+# PER-REQUEST SESSIONS
+# ═══════════════════════════════════════════════════════════
+
+
+async def _end_session(session, method: str):
+    """Await commit/rollback/close on an AsyncSession, or run it in a thread for a Session."""
+    if hasattr(session, "run_sync"):
+        await getattr(session, method)()
+    else:
+        await asyncio.to_thread(getattr(session, method))
+
+
+@asynccontextmanager
+async def _unit_of_work(session) -> AsyncIterator:
+    """Commit the session after the block, roll it back if the block raises, always close it."""
+    try:
+        yield session
+        await _end_session(session, "commit")
+    except Exception:
+        await _end_session(session, "rollback")
+        raise
+    finally:
+        await _end_session(session, "close")
+
+
+async def get_db_session() -> AsyncIterator:
+    """
+    One database session per request: committed after the handler returns,
+    rolled back if it raises, always closed.
+
+    Yields:
+        AsyncSession (aiosqlite/asyncpg installed) or Session
+    """
+    async with _unit_of_work(open_request_session()) as session:
+        yield session
+
+
+async def get_engine_db_session() -> AsyncIterator:
+    """
+    One sync Session per request for routes that run engines or graders.
+
+    Engines query the Student Model from worker threads, which an
+    AsyncSession can't serve, so these routes build all their interfaces on
+    this Session instead (same boundaries as get_db_session).
+
+    Yields:
+        Session from SessionLocal
+    """
+    async with _unit_of_work(SessionLocal()) as session:
+        yield session
+
+
+async def get_async_student_model(session=Depends(get_db_session)) -> AsyncStudentModelInterface:
+    """Async StudentModelInterface on the request's session."""
+    return AsyncStudentModelInterface(session)
+
+
+async def get_async_content_storage(session=Depends(get_db_session)) -> AsyncContentStorageInterface:
+    """Async ContentStorageInterface on the request's session."""
+    return AsyncContentStorageInterface(session)
+
+
+async def get_student_model(session=Depends(get_engine_db_session)) -> StudentModelInterface:
+    """Sync StudentModelInterface on the request's Session, for engines and graders."""
+    return StudentModelInterface(db_session=session)
+
+
+async def get_engine_content_storage(
+    session=Depends(get_engine_db_session),
+) -> AsyncContentStorageInterface:
+    """Async ContentStorageInterface on the engine route's Session (calls run in worker threads)."""
+    return AsyncContentStorageInterface(session)
+
+
+def close_database():
+    """Close the pooled database connections (on shutdown)."""
+    db_engine.dispose()
+
+
+# ═══════════════════════════════════════════════════════════
+# WARM-UP
+# ═══════════════════════════════════════════════════════════
+
+
+def warm_up():
+    """Import deferred dependencies and open the shared vector store."""
+    for module in WARM_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            logger.warning(f"Warm-up skipped {module} (not installed)")
+
+    try:
+        get_shared_vector_store()
+    except Exception as e:
+        logger.warning(f"Warm-up could not open the vector store: {e}")
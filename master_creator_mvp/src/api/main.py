@@ -12,6 +12,7 @@ Routes:
 - /api/adaptive - Adaptive personalization (Engine 4)
 - /api/feedback - Feedback loop (Engine 6)
 - /health - Health check
+- /metrics - Prometheus metrics (METRICS_ENABLED)
 """
 
 # Load environment variables from .env file first
@@ -20,9 +21,20 @@ load_dotenv()
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+import asyncio
 import logging
 
+from ..utils.metrics import (
+    EVENT_LOOP_MONITOR_INTERVAL_MS,
+    METRICS_ENABLED,
+    PROMETHEUS_CONTENT_TYPE,
+    REGISTRY,
+    monitor_event_loop_lag,
+)
+from ..utils.tracing import TRACING_ENABLED, shutdown_tracing
+from .dependencies import API_WARM_START, close_database, warm_up
+from .middleware import LLMPriorityMiddleware, MetricsMiddleware, TracingMiddleware
 from .routes import lessons, students, assessments, worksheets, pipeline, adaptive
 from .websocket import routes as websocket_routes
 
@@ -34,6 +46,9 @@ logging.basicConfig(
 
 logger = logging.getLogger("master_creator_api")
 
+# Background event-loop lag sampler (started on startup when metrics are on)
+_loop_monitor = None
+
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # FASTAPI APP INITIALIZATION
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -62,6 +77,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Claude calls made by request handlers run in the interactive rate-limit lane
+app.add_middleware(LLMPriorityMiddleware)
+
+# Request span (continues an incoming traceparent)
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# Outermost, so latency includes CORS, tracing and routing
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # ROUTERS
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -88,6 +114,14 @@ async def health_check():
     }
 
 
+if METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint."""
+        return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -96,6 +130,7 @@ async def root():
         "version": "1.0.0",
         "docs": "/api/docs",
         "health": "/health",
+        "metrics": "/metrics" if METRICS_ENABLED else None,
         "endpoints": {
             "lessons": "/api/lessons",
             "students": "/api/students",
@@ -147,11 +182,24 @@ async def startup_event():
     logger.info("Master Creator v3 MVP API starting up...")
     logger.info("API documentation available at /api/docs")
 
+    # Heavy dependencies load on first use; optionally warm them without
+    # holding up startup so the first request doesn't pay for them
+    if API_WARM_START:
+        asyncio.get_running_loop().run_in_executor(None, warm_up)
+
+    global _loop_monitor
+    if METRICS_ENABLED and EVENT_LOOP_MONITOR_INTERVAL_MS > 0:
+        _loop_monitor = asyncio.create_task(monitor_event_loop_lag())
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup resources on shutdown."""
     logger.info("Master Creator v3 MVP API shutting down...")
+    if _loop_monitor is not None:
+        _loop_monitor.cancel()
+    close_database()
+    shutdown_tracing()
 
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
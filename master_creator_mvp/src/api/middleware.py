@@ -0,0 +1,126 @@
+"""
+API Middleware
+
+ASGI middleware shared by the FastAPI app.
+"""
+
+import time
+
+from ..engines.rate_limiter import llm_priority
+from ..utils.metrics import HTTP_REQUEST_DURATION
+from ..utils.tracing import current_trace_id, extract_context, span
+
+
+def route_template(scope) -> str:
+    """
+    Route template for a handled request, e.g. /api/students/students/{student_id}.
+
+    Rebuilt from the full path and matched path params (included routers
+    only know their own prefix-less path).
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+    path = scope.get("path", "")
+    params = scope.get("path_params") or {}
+    if not params:
+        return path
+    names = {str(value): name for name, value in params.items()}
+    return "/".join(f"{{{names[seg]}}}" if seg in names else seg for seg in path.split("/"))
+
+
+class MetricsMiddleware:
+    """
+    Records HTTP latency by route template (/api/students/{student_id}, not
+    the concrete path), so label cardinality stays bounded.
+
+    Plain ASGI rather than BaseHTTPMiddleware: no per-request task or body
+    buffering.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=route_template(scope),
+                status=str(status),
+            )
+
+
+class TracingMiddleware:
+    """
+    Opens a server span per HTTP request, continuing the caller's trace when a
+    W3C traceparent header is present, and returns the trace id in an
+    X-Trace-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        attributes = {"http.method": scope["method"], "http.target": scope.get("path", "")}
+
+        name = f"{scope['method']} {scope.get('path', '')}"
+        with span(name, attributes, context=extract_context(headers), kind="server") as current:
+            trace_id = current_trace_id()
+
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    current.set_attribute("http.status_code", message["status"])
+                    if trace_id:
+                        message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = route_template(scope)
+                current.update_name(f"{scope['method']} {route}")
+                current.set_attribute("http.route", route)
+
+
+class LLMPriorityMiddleware:
+    """
+    Runs Claude calls made while handling a request in the interactive lane,
+    shared fairly per district (X-District-Id header).
+
+    Routes that start bulk work (batch grading, pipelines) lower their own
+    lane with llm_priority().
+    """
+
+    TENANT_HEADER = b"x-district-id"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tenant = dict(scope.get("headers", [])).get(self.TENANT_HEADER, b"").decode("latin-1").strip()
+        with llm_priority("interactive", tenant=tenant or None):
+            await self.app(scope, receive, send)
@@ -4,16 +4,18 @@ Adaptive API Routes
 Endpoints for adaptive personalization (Engine 4) and feedback loop (Engine 6).
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import logging
 
 from ...engines.engine_4_adaptive import AdaptiveEngine
 from ...engines.engine_6_feedback import FeedbackLoop
-from ...content_storage.interface import ContentStorageInterface
-from ...student_model.interface import StudentModelInterface
 from ...api.websocket import manager
+from ...content_storage.async_interface import AsyncContentStorageInterface
+from ...student_model.interface import StudentModelInterface
+from ..dependencies import get_async_content_storage, get_engine_content_storage, get_student_model
 
 logger = logging.getLogger("api.adaptive")
 
@@ -45,7 +47,11 @@ class FeedbackRequest(BaseModel):
 
 
 @router.post("/plan")
-async def generate_adaptive_plan(request: AdaptivePlanRequest):
+async def generate_adaptive_plan(
+    request: AdaptivePlanRequest,
+    storage: AsyncContentStorageInterface = Depends(get_engine_content_storage),
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Generate class-wide adaptive learning plan.
 
@@ -63,8 +69,9 @@ async def generate_adaptive_plan(request: AdaptivePlanRequest):
     try:
         logger.info(f"Generating adaptive plan for class {request.class_id}")
 
-        engine = AdaptiveEngine()
-        plan = engine.generate_class_plan(
+        engine = AdaptiveEngine(student_model=student_model)
+        plan = await asyncio.to_thread(
+            engine.generate_class_plan,
             class_id=request.class_id,
             concept_ids=request.concept_ids,
         )
@@ -73,14 +80,13 @@ async def generate_adaptive_plan(request: AdaptivePlanRequest):
 
         # Save to database
         plan_data = plan.model_dump()
-        with ContentStorageInterface() as storage:
-            # Save for each student in the plan
-            for student_path in plan_data.get("student_paths", []):
-                storage.save_adaptive_plan(
-                    plan_data=plan_data,
-                    student_id=student_path.get("student_id"),
-                    cost_summary=cost_summary
-                )
+        # Save for each student in the plan
+        for student_path in plan_data.get("student_paths", []):
+            await storage.save_adaptive_plan(
+                plan_data=plan_data,
+                student_id=student_path.get("student_id"),
+                cost_summary=cost_summary
+            )
 
         logger.info(f"Adaptive plan generated: {plan.plan_id} | Cost: ${cost_summary['total_cost']:.4f}")
 
@@ -110,7 +116,11 @@ async def generate_adaptive_plan(request: AdaptivePlanRequest):
 
 
 @router.post("/students/{student_id}/path")
-async def generate_student_path(student_id: str, concept_ids: List[str]):
+async def generate_student_path(
+    student_id: str,
+    concept_ids: List[str],
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Generate personalized learning path for one student.
 
@@ -127,8 +137,9 @@ async def generate_student_path(student_id: str, concept_ids: List[str]):
     try:
         logger.info(f"Generating learning path for student {student_id}")
 
-        engine = AdaptiveEngine()
-        path = engine.generate_student_path(
+        engine = AdaptiveEngine(student_model=student_model)
+        path = await asyncio.to_thread(
+            engine.generate_student_path,
             student_id=student_id,
             concept_ids=concept_ids,
         )
@@ -137,16 +148,15 @@ async def generate_student_path(student_id: str, concept_ids: List[str]):
 
         # Broadcast recommendation generated event via WebSocket
         try:
-            with StudentModelInterface() as sm:
-                student = sm.get_student(student_id)
-                if student:
-                    class_id = student.class_id
-                    await manager.broadcast_recommendation_generated(
-                        class_id=class_id,
-                        student_id=student_id,
-                        recommendations=path.model_dump()
-                    )
-                    logger.info(f"Broadcasted recommendations for student {student_id}")
+            student = await asyncio.to_thread(student_model.get_student_profile, student_id)
+            if student:
+                class_id = student.class_id
+                await manager.broadcast_recommendation_generated(
+                    class_id=class_id,
+                    student_id=student_id,
+                    recommendations=path.model_dump()
+                )
+                logger.info(f"Broadcasted recommendations for student {student_id}")
         except Exception as ws_error:
             logger.warning(f"Failed to broadcast recommendation event: {str(ws_error)}")
 
@@ -161,7 +171,10 @@ async def generate_student_path(student_id: str, concept_ids: List[str]):
 
 
 @router.get("/plans/{plan_id}")
-async def get_adaptive_plan(plan_id: str):
+async def get_adaptive_plan(
+    plan_id: str,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
     """
     Get adaptive plan by ID.
 
@@ -171,8 +184,7 @@ async def get_adaptive_plan(plan_id: str):
         Adaptive plan if found
     """
     try:
-        with ContentStorageInterface() as storage:
-            plan_data = storage.get_adaptive_plan(plan_id)
+        plan_data = await storage.get_adaptive_plan(plan_id)
 
         if not plan_data:
             raise HTTPException(
@@ -198,7 +210,11 @@ async def get_adaptive_plan(plan_id: str):
 
 
 @router.post("/feedback")
-async def generate_feedback_report(request: FeedbackRequest):
+async def generate_feedback_report(
+    request: FeedbackRequest,
+    storage: AsyncContentStorageInterface = Depends(get_engine_content_storage),
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Generate feedback report for engine performance.
 
@@ -216,19 +232,19 @@ async def generate_feedback_report(request: FeedbackRequest):
     try:
         logger.info(f"Generating feedback for {request.engine_name}")
 
-        engine = FeedbackLoop()
-        report = engine.generate_feedback(
+        engine = FeedbackLoop(student_model=student_model)
+        report = await asyncio.to_thread(
+            engine.generate_feedback,
             engine_name=request.engine_name,
             timeframe_days=request.timeframe_days,
         )
 
         # Save to database
         report_data = report.model_dump()
-        with ContentStorageInterface() as storage:
-            storage.save_feedback_report(
-                report_data=report_data,
-                cost_summary={"total_cost": report_data.get("total_cost", 0.0), "input_tokens": 0, "output_tokens": 0}
-            )
+        await storage.save_feedback_report(
+            report_data=report_data,
+            cost_summary={"total_cost": report_data.get("total_cost", 0.0), "input_tokens": 0, "output_tokens": 0}
+        )
 
         logger.info(
             f"Feedback generated: {report.feedback_id} | "
@@ -247,7 +263,10 @@ async def generate_feedback_report(request: FeedbackRequest):
 
 
 @router.get("/feedback/{feedback_id}")
-async def get_feedback_report(feedback_id: str):
+async def get_feedback_report(
+    feedback_id: str,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
     """
     Get feedback report by ID.
 
@@ -257,8 +276,7 @@ async def get_feedback_report(feedback_id: str):
         Feedback report if found
     """
     try:
-        with ContentStorageInterface() as storage:
-            report_data = storage.get_feedback_report(feedback_id)
+        report_data = await storage.get_feedback_report(feedback_id)
 
         if not report_data:
             raise HTTPException(
@@ -4,23 +4,24 @@ Assessments API Routes
 Endpoints for assessment grading and scoring.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional, Dict
+import asyncio
 import logging
 
+from ...engines.rate_limiter import llm_priority
 from ...grader.constructed_response import AssessmentGrader, AssessmentQuestion, StudentSubmission
+from ...content_storage.async_interface import AsyncContentStorageInterface
+from ...student_model.async_interface import AsyncStudentModelInterface
 from ...student_model.interface import StudentModelInterface
-from ...content_storage.interface import ContentStorageInterface
 from ...api.websocket import manager
+from ..dependencies import get_async_student_model, get_engine_content_storage, get_student_model
 
 logger = logging.getLogger("api.assessments")
 
 router = APIRouter()
 
-# Shared instances
-student_model = StudentModelInterface()
-
 
 # ═══════════════════════════════════════════════════════════
 # REQUEST/RESPONSE MODELS
@@ -43,7 +44,11 @@ class SubmitAssessmentRequest(BaseModel):
 
 
 @router.post("/submit")
-async def submit_assessment(request: SubmitAssessmentRequest):
+async def submit_assessment(
+    request: SubmitAssessmentRequest,
+    storage: AsyncContentStorageInterface = Depends(get_engine_content_storage),
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Submit and grade assessment.
 
@@ -92,21 +97,25 @@ async def submit_assessment(request: SubmitAssessmentRequest):
 
         # Grade assessment
         grader = AssessmentGrader(student_model=student_model)
-        graded = grader.grade_submission(
+        graded = await asyncio.to_thread(
+            grader.grade_submission,
             questions=questions,
             submission=submission,
-            update_mastery=request.update_mastery,
+            update_mastery=False,
         )
 
         # Save to database
         graded_data = graded.model_dump()
-        with ContentStorageInterface() as storage:
-            storage.save_graded_assessment(
-                graded_data=graded_data,
-                assessment_id=request.assessment_id,
-                student_id=request.student_id,
-                cost_summary={"total_cost": graded.cost, "input_tokens": 0, "output_tokens": 0}
-            )
+        await storage.save_graded_assessment(
+            graded_data=graded_data,
+            assessment_id=request.assessment_id,
+            student_id=request.student_id,
+            cost_summary={"total_cost": graded.cost, "input_tokens": 0, "output_tokens": 0}
+        )
+
+        # Mastery only changes once the graded assessment is saved
+        if request.update_mastery:
+            await asyncio.to_thread(grader.apply_mastery_updates, graded, questions)
 
         logger.info(
             f"Assessment graded: {graded.grading_id} | "
@@ -117,22 +126,21 @@ async def submit_assessment(request: SubmitAssessmentRequest):
         # Broadcast assessment graded event via WebSocket
         try:
             # Get student's class ID for broadcasting
-            with StudentModelInterface() as sm:
-                student = sm.get_student(request.student_id)
-                if student:
-                    class_id = student.class_id
-                    await manager.broadcast_assessment_graded(
-                        class_id=class_id,
-                        student_id=request.student_id,
-                        assessment_data={
-                            "assessment_id": request.assessment_id,
-                            "grading_id": graded.grading_id,
-                            "score_percentage": graded.score_percentage,
-                            "total_points": graded.total_points_earned,
-                            "graded_at": graded.graded_at
-                        }
-                    )
-                    logger.info(f"Broadcasted assessment graded event for student {request.student_id}")
+            student = await asyncio.to_thread(student_model.get_student_profile, request.student_id)
+            if student:
+                class_id = student.class_id
+                await manager.broadcast_assessment_graded(
+                    class_id=class_id,
+                    student_id=request.student_id,
+                    assessment_data={
+                        "assessment_id": request.assessment_id,
+                        "grading_id": graded.grading_id,
+                        "score_percentage": graded.score_percentage,
+                        "total_points": graded.total_points_earned,
+                        "graded_at": graded.graded_at
+                    }
+                )
+                logger.info(f"Broadcasted assessment graded event for student {request.student_id}")
         except Exception as ws_error:
             # Log but don't fail the request if WebSocket broadcast fails
             logger.warning(f"Failed to broadcast assessment graded event: {str(ws_error)}")
@@ -148,7 +156,11 @@ async def submit_assessment(request: SubmitAssessmentRequest):
 
 
 @router.get("/{assessment_id}/results/{student_id}")
-async def get_assessment_results(assessment_id: str, student_id: str):
+async def get_assessment_results(
+    assessment_id: str,
+    student_id: str,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Get graded assessment results.
 
@@ -159,8 +171,7 @@ async def get_assessment_results(assessment_id: str, student_id: str):
     """
     try:
         # Query Student Model for assessment history
-        with StudentModelInterface() as sm:
-            assessments = sm.get_assessment_history(student_id, limit=100)
+        assessments = await sm.get_assessment_history(student_id, limit=100)
 
         # Find matching assessment
         matching_assessment = None
@@ -196,7 +207,11 @@ async def get_assessment_results(assessment_id: str, student_id: str):
 
 
 @router.get("/students/{student_id}/history")
-async def get_student_assessment_history(student_id: str, limit: int = 10):
+async def get_student_assessment_history(
+    student_id: str,
+    limit: int = 10,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Get student assessment history.
 
@@ -206,8 +221,7 @@ async def get_student_assessment_history(student_id: str, limit: int = 10):
         List of graded assessments for student
     """
     try:
-        with StudentModelInterface() as sm:
-            assessments = sm.get_assessment_history(student_id, limit=limit)
+        assessments = await sm.get_assessment_history(student_id, limit=limit)
 
         return {
             "status": "success",
@@ -235,6 +249,8 @@ async def batch_grade_assessments(
     assessment_id: str,
     questions: List[Dict],
     submissions: List[Dict],
+    storage: AsyncContentStorageInterface = Depends(get_engine_content_storage),
+    student_model: StudentModelInterface = Depends(get_student_model),
 ):
     """
     Grade multiple student submissions for the same assessment.
@@ -276,41 +292,45 @@ async def batch_grade_assessments(
                 submitted_at=datetime.utcnow().isoformat(),
             )
 
-            graded = grader.grade_submission(
-                questions=question_objs,
-                submission=submission,
-                update_mastery=True,
-            )
+            # Batch rate-limit lane: interactive Claude calls go first
+            with llm_priority("batch"):
+                graded = await asyncio.to_thread(
+                    grader.grade_submission,
+                    questions=question_objs,
+                    submission=submission,
+                    update_mastery=False,
+                )
 
-            # Save to database
+            # Save to database, then update mastery
             graded_data = graded.model_dump()
-            with ContentStorageInterface() as storage:
-                storage.save_graded_assessment(
-                    graded_data=graded_data,
-                    assessment_id=assessment_id,
-                    student_id=sub["student_id"],
-                    cost_summary={"total_cost": graded.cost, "input_tokens": 0, "output_tokens": 0}
-                )
+            await storage.save_graded_assessment(
+                graded_data=graded_data,
+                assessment_id=assessment_id,
+                student_id=sub["student_id"],
+                cost_summary={"total_cost": graded.cost, "input_tokens": 0, "output_tokens": 0}
+            )
+            await asyncio.to_thread(grader.apply_mastery_updates, graded, question_objs)
 
             graded_results.append(graded.model_dump())
 
             # Broadcast assessment graded event via WebSocket
             try:
-                with StudentModelInterface() as sm:
-                    student = sm.get_student(sub["student_id"])
-                    if student:
-                        class_id = student.class_id
-                        await manager.broadcast_assessment_graded(
-                            class_id=class_id,
-                            student_id=sub["student_id"],
-                            assessment_data={
-                                "assessment_id": assessment_id,
-                                "grading_id": graded.grading_id,
-                                "score_percentage": graded.score_percentage,
-                                "total_points": graded.total_points_earned,
-                                "graded_at": graded.graded_at
-                            }
-                        )
+                student = await asyncio.to_thread(
+                    student_model.get_student_profile, sub["student_id"]
+                )
+                if student:
+                    class_id = student.class_id
+                    await manager.broadcast_assessment_graded(
+                        class_id=class_id,
+                        student_id=sub["student_id"],
+                        assessment_data={
+                            "assessment_id": assessment_id,
+                            "grading_id": graded.grading_id,
+                            "score_percentage": graded.score_percentage,
+                            "total_points": graded.total_points_earned,
+                            "graded_at": graded.graded_at
+                        }
+                    )
             except Exception as ws_error:
                 logger.warning(f"Failed to broadcast batch graded event for student {sub['student_id']}: {str(ws_error)}")
 
@@ -4,14 +4,17 @@ Lessons API Routes
 Endpoints for lesson and unit plan generation (Engine 0, 1).
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import logging
 
 from ...engines.engine_0_unit_planner import UnitPlanDesigner
 from ...engines.engine_1_lesson_architect import LessonArchitect
-from ...content_storage.interface import ContentStorageInterface
+from ...content_storage.async_interface import AsyncContentStorageInterface
+from ...student_model.interface import StudentModelInterface
+from ..dependencies import get_async_content_storage, get_engine_content_storage, get_student_model
 
 logger = logging.getLogger("api.lessons")
 
@@ -32,6 +35,7 @@ class UnitPlanRequest(BaseModel):
     num_lessons: int
     standards: Optional[List[str]] = None
     class_id: Optional[str] = None
+    force_fresh: bool = False  # Skip reuse of stored unit plans
 
 
 class LessonRequest(BaseModel):
@@ -43,6 +47,7 @@ class LessonRequest(BaseModel):
     duration_minutes: int = 45
     standards: Optional[List[str]] = None
     class_id: Optional[str] = None
+    force_fresh: bool = False  # Skip reuse of stored lessons
 
 
 # ═══════════════════════════════════════════════════════════
@@ -51,7 +56,11 @@ class LessonRequest(BaseModel):
 
 
 @router.post("/units")
-async def generate_unit_plan(request: UnitPlanRequest):
+async def generate_unit_plan(
+    request: UnitPlanRequest,
+    storage: AsyncContentStorageInterface = Depends(get_engine_content_storage),
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Generate multi-lesson unit plan using UbD framework.
 
@@ -64,34 +73,39 @@ async def generate_unit_plan(request: UnitPlanRequest):
         "subject": "Science",
         "num_lessons": 8,
         "standards": ["NGSS-HS-LS2-1"],
-        "class_id": "class_bio_101"
+        "class_id": "class_bio_101",
+        "force_fresh": false
     }
 
+    A stored unit plan matching the request is returned (or adapted) instead
+    of generating from scratch unless force_fresh is set.
+
     Returns:
         Complete unit plan with lessons, assessments, and resources
     """
     try:
         logger.info(f"Generating unit plan: {request.unit_title}")
 
-        engine = UnitPlanDesigner()
-        unit_plan = engine.generate(
+        engine = UnitPlanDesigner(student_model=student_model)
+        unit_plan = await asyncio.to_thread(
+            engine.generate,
             unit_title=request.unit_title,
             grade_level=request.grade_level,
             subject=request.subject,
             num_lessons=request.num_lessons,
             standards=request.standards,
             class_id=request.class_id,
+            force_fresh=request.force_fresh,
         )
 
         cost_summary = engine.get_cost_summary()
 
         # Save to database
-        with ContentStorageInterface() as storage:
-            storage.save_unit_plan(
-                unit_data=unit_plan.model_dump(),
-                cost_summary=cost_summary,
-                class_id=request.class_id
-            )
+        await storage.save_unit_plan(
+            unit_data=unit_plan.model_dump(),
+            cost_summary=cost_summary,
+            class_id=request.class_id
+        )
 
         logger.info(f"Unit plan generated: {unit_plan.unit_id} | Cost: ${cost_summary['total_cost']:.4f}")
 
@@ -107,7 +121,11 @@ async def generate_unit_plan(request: UnitPlanRequest):
 
 
 @router.post("/lessons")
-async def generate_lesson(request: LessonRequest):
+async def generate_lesson(
+    request: LessonRequest,
+    storage: AsyncContentStorageInterface = Depends(get_engine_content_storage),
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Generate 10-part lesson blueprint.
 
@@ -120,34 +138,39 @@ async def generate_lesson(request: LessonRequest):
         "subject": "Science",
         "duration_minutes": 45,
         "standards": ["NGSS-HS-LS1-5"],
-        "class_id": "class_bio_101"
+        "class_id": "class_bio_101",
+        "force_fresh": false
     }
 
+    A stored lesson matching the request is returned (or adapted) instead of
+    generating from scratch unless force_fresh is set.
+
     Returns:
         Complete lesson blueprint with 10 sections
     """
     try:
         logger.info(f"Generating lesson: {request.topic}")
 
-        engine = LessonArchitect()
-        lesson = engine.generate(
+        engine = LessonArchitect(student_model=student_model)
+        lesson = await asyncio.to_thread(
+            engine.generate,
             topic=request.topic,
             grade_level=request.grade_level,
             subject=request.subject,
             duration_minutes=request.duration_minutes,
             standards=request.standards,
             class_id=request.class_id,
+            force_fresh=request.force_fresh,
         )
 
         cost_summary = engine.get_cost_summary()
 
         # Save to database
-        with ContentStorageInterface() as storage:
-            storage.save_lesson(
-                lesson_data=lesson.model_dump(),
-                cost_summary=cost_summary,
-                class_id=request.class_id
-            )
+        await storage.save_lesson(
+            lesson_data=lesson.model_dump(),
+            cost_summary=cost_summary,
+            class_id=request.class_id
+        )
 
         logger.info(f"Lesson generated: {lesson.lesson_id} | Cost: ${cost_summary['total_cost']:.4f}")
 
@@ -163,7 +186,10 @@ async def generate_lesson(request: LessonRequest):
 
 
 @router.get("/lessons/{lesson_id}")
-async def get_lesson(lesson_id: str):
+async def get_lesson(
+    lesson_id: str,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
     """
     Get lesson by ID.
 
@@ -173,8 +199,7 @@ async def get_lesson(lesson_id: str):
         Lesson blueprint if found
     """
     try:
-        with ContentStorageInterface() as storage:
-            lesson_data = storage.get_lesson(lesson_id)
+        lesson_data = await storage.get_lesson(lesson_id)
 
         if not lesson_data:
             raise HTTPException(
@@ -195,7 +220,7 @@ async def get_lesson(lesson_id: str):
 
 
 @router.get("/units/{unit_id}")
-async def get_unit(unit_id: str):
+async def get_unit(unit_id: str, storage: AsyncContentStorageInterface = Depends(get_async_content_storage)):
     """
     Get unit plan by ID.
 
@@ -205,8 +230,7 @@ async def get_unit(unit_id: str):
         Unit plan if found
     """
     try:
-        with ContentStorageInterface() as storage:
-            unit_data = storage.get_unit_plan(unit_id)
+        unit_data = await storage.get_unit_plan(unit_id)
 
         if not unit_data:
             raise HTTPException(
@@ -4,15 +4,22 @@ Pipeline API Routes
 Endpoints for full pipeline orchestration.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 import logging
 import asyncio
 
-from ...orchestration.langgraph_pipeline import run_async_pipeline, run_sync_pipeline
-from ...orchestration.pipeline import run_pipeline
-from ...content_storage.interface import ContentStorageInterface
+from ...orchestration.langgraph_pipeline import (
+    resume_async_pipeline,
+    run_async_pipeline,
+    run_sync_pipeline,
+)
+from ...orchestration.pipeline import PipelineInput, run_multi_class_pipeline, run_pipeline
+from ...utils.tracing import capture_context, current_trace_id, span
+from ..websocket.connection_manager import manager
+from ...content_storage.async_interface import AsyncContentStorageInterface
+from ..dependencies import get_async_content_storage
 
 logger = logging.getLogger("api.pipeline")
 
@@ -49,6 +56,31 @@ class PipelineRequest(BaseModel):
     run_async: bool = False  # If True, run in background
 
 
+class MultiClassPipelineRequest(BaseModel):
+    """Request to run the core pipeline for several sections of a course."""
+
+    lesson_topic: str
+    grade_level: str
+    subject: str
+    class_ids: List[str]
+    concept_ids: List[str]
+    duration_minutes: int = 45
+    standards: Optional[List[str]] = None
+
+
+class ResumeRequest(BaseModel):
+    """Request to resume a checkpointed LangGraph pipeline run."""
+
+    from_stage: Optional[str] = None  # Default: the stage that failed or was interrupted
+
+
+class RegenerateRequest(BaseModel):
+    """Request to regenerate one stage (or worksheet tiers) of a checkpointed run."""
+
+    stage: str = "worksheet_designer"
+    tiers: Optional[List[str]] = None  # Worksheet tiers to regenerate (others are kept)
+
+
 # ═══════════════════════════════════════════════════════════
 # ENDPOINTS
 # ═══════════════════════════════════════════════════════════
@@ -87,39 +119,57 @@ async def run_complete_pipeline(request: PipelineRequest, background_tasks: Back
             # Run in background
             pipeline_id = f"pipeline_{len(pipeline_results)}"
 
+            # Background tasks run after the response; parent their spans on this request
+            trace_context = capture_context()
+
+            async def publish_progress(event: dict):
+                await manager.broadcast_to_type("pipeline", pipeline_id, {**event, "job_id": pipeline_id})
+
             async def run_background_pipeline():
-                if request.use_langgraph:
-                    result = await run_async_pipeline(
-                        lesson_topic=request.lesson_topic,
-                        grade_level=request.grade_level,
-                        subject=request.subject,
-                        class_id=request.class_id,
-                        concept_ids=request.concept_ids,
-                        duration_minutes=request.duration_minutes,
-                        standards=request.standards,
-                        generate_unit=request.generate_unit,
-                        num_lessons_in_unit=request.num_lessons_in_unit,
-                        generate_adaptive_plan=request.generate_adaptive_plan,
-                        run_feedback_loop=request.run_feedback_loop,
-                    )
-                else:
-                    result = run_pipeline(
-                        lesson_topic=request.lesson_topic,
-                        grade_level=request.grade_level,
-                        subject=request.subject,
-                        class_id=request.class_id,
-                        concept_ids=request.concept_ids,
-                        duration_minutes=request.duration_minutes,
-                        standards=request.standards,
-                    )
-
-                pipeline_results[pipeline_id] = result
+                with span("pipeline.background_job", {"pipeline.job_id": pipeline_id}, context=trace_context):
+                    if request.use_langgraph:
+                        result = await run_async_pipeline(
+                            lesson_topic=request.lesson_topic,
+                            grade_level=request.grade_level,
+                            subject=request.subject,
+                            class_id=request.class_id,
+                            concept_ids=request.concept_ids,
+                            duration_minutes=request.duration_minutes,
+                            standards=request.standards,
+                            generate_unit=request.generate_unit,
+                            num_lessons_in_unit=request.num_lessons_in_unit,
+                            generate_adaptive_plan=request.generate_adaptive_plan,
+                            run_feedback_loop=request.run_feedback_loop,
+                            on_progress=publish_progress,
+                        )
+                    else:
+                        result = run_pipeline(
+                            lesson_topic=request.lesson_topic,
+                            grade_level=request.grade_level,
+                            subject=request.subject,
+                            class_id=request.class_id,
+                            concept_ids=request.concept_ids,
+                            duration_minutes=request.duration_minutes,
+                            standards=request.standards,
+                        )
+                        await publish_progress({
+                            "type": "pipeline_progress",
+                            "pipeline_id": result.pipeline_id,
+                            "stage": "complete",
+                            "execution_status": result.status,
+                            "errors": len(result.errors),
+                            "trace_id": result.trace_id,
+                            "timestamp": result.completed_at,
+                        })
+
+                    pipeline_results[pipeline_id] = result
 
             background_tasks.add_task(run_background_pipeline)
 
             return {
                 "status": "processing",
                 "pipeline_id": pipeline_id,
+                "trace_id": current_trace_id(),
                 "message": "Pipeline running in background. Use GET /api/pipeline/status/{pipeline_id} to check progress."
             }
 
@@ -190,12 +240,15 @@ async def get_pipeline_status(pipeline_id: str):
     # Check if LangGraph result (dict) or synchronous result (object)
     if isinstance(result, dict):
         status = result.get("execution_status", "completed")
+        trace_id = result.get("trace_id")
     else:
         status = result.status
+        trace_id = result.trace_id
 
     return {
         "status": status,
         "pipeline_id": pipeline_id,
+        "trace_id": trace_id,
         "result": result if isinstance(result, dict) else result.model_dump(),
     }
 
@@ -238,8 +291,57 @@ async def run_core_pipeline(request: PipelineRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/run-multi-class")
+async def run_multi_class(request: MultiClassPipelineRequest):
+    """
+    Run the core pipeline for several sections of a course.
+
+    POST /api/pipeline/run-multi-class
+
+    The lesson, diagnostic items and tier question sets are generated once;
+    each class gets its own tier assignment, roster mapping and IEP
+    modifications, in parallel.
+
+    Returns:
+        Multi-class results with one pipeline result per class
+    """
+    try:
+        logger.info(
+            f"Running multi-class pipeline: {request.lesson_topic} "
+            f"({len(request.class_ids)} classes)"
+        )
+
+        inputs = [
+            PipelineInput(
+                lesson_topic=request.lesson_topic,
+                grade_level=request.grade_level,
+                subject=request.subject,
+                class_id=class_id,
+                concept_ids=request.concept_ids,
+                duration_minutes=request.duration_minutes,
+                standards=request.standards,
+            )
+            for class_id in request.class_ids
+        ]
+        result = await asyncio.to_thread(run_multi_class_pipeline, inputs)
+
+        logger.info(f"Multi-class pipeline complete: {result.status}")
+
+        return {
+            "status": "success",
+            "pipeline_result": result.model_dump(),
+        }
+
+    except Exception as e:
+        logger.error(f"Error running multi-class pipeline: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/results/{pipeline_id}")
-async def get_pipeline_results(pipeline_id: str):
+async def get_pipeline_results(
+    pipeline_id: str,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
     """
     Get complete pipeline results by ID.
 
@@ -249,8 +351,7 @@ async def get_pipeline_results(pipeline_id: str):
         Full pipeline results if found
     """
     try:
-        with ContentStorageInterface() as storage:
-            pipeline_status = storage.get_pipeline_status(pipeline_id)
+        pipeline_status = await storage.get_pipeline_status(pipeline_id)
 
         if not pipeline_status:
             # Check in-memory results for async pipelines
@@ -276,3 +377,107 @@ async def get_pipeline_results(pipeline_id: str):
     except Exception as e:
         logger.error(f"Error retrieving pipeline results: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _resume(
+    pipeline_id: str,
+    storage: AsyncContentStorageInterface,
+    from_stage: Optional[str] = None,
+    regenerate_tiers: Optional[List[str]] = None,
+) -> Dict:
+    if not await storage.list_pipeline_checkpoints(pipeline_id):
+        raise HTTPException(status_code=404, detail=f"No checkpoints for pipeline {pipeline_id}")
+
+    try:
+        result = await resume_async_pipeline(
+            pipeline_id,
+            from_stage=from_stage,
+            regenerate_tiers=regenerate_tiers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"Resumed pipeline complete: {pipeline_id} | Status: {result['execution_status']}")
+    return {
+        "status": "success",
+        "pipeline_result": result,
+    }
+
+
+@router.post("/{pipeline_id}/resume")
+async def resume_pipeline(
+    pipeline_id: str,
+    request: ResumeRequest,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
+    """
+    Resume a LangGraph pipeline run from its stage checkpoints.
+
+    POST /api/pipeline/{pipeline_id}/resume
+
+    Request body:
+    {
+        "from_stage": "iep_specialist"
+    }
+
+    Only from_stage and the stages that depend on it are rerun; other
+    stages' checkpointed outputs are reused.
+
+    Returns:
+        Final pipeline state
+    """
+    return await _resume(pipeline_id, storage, from_stage=request.from_stage)
+
+
+@router.post("/{pipeline_id}/regenerate")
+async def regenerate_pipeline_stage(
+    pipeline_id: str,
+    request: RegenerateRequest,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
+    """
+    Regenerate one stage, or single worksheet tiers, of a checkpointed run.
+
+    POST /api/pipeline/{pipeline_id}/regenerate
+
+    Request body:
+    {
+        "stage": "worksheet_designer",
+        "tiers": ["tier_3"]
+    }
+
+    Stages that depend on the regenerated one run again on its new output.
+
+    Returns:
+        Final pipeline state
+    """
+    return await _resume(
+        pipeline_id,
+        storage,
+        from_stage=request.stage,
+        regenerate_tiers=request.tiers,
+    )
+
+
+@router.get("/{pipeline_id}/checkpoints")
+async def get_pipeline_checkpoints(
+    pipeline_id: str,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
+    """
+    List a run's stage checkpoints.
+
+    GET /api/pipeline/{pipeline_id}/checkpoints
+
+    Returns:
+        Checkpoints (stage, status, time), oldest first
+    """
+    checkpoints = await storage.list_pipeline_checkpoints(pipeline_id)
+    if not checkpoints:
+        raise HTTPException(status_code=404, detail=f"No checkpoints for pipeline {pipeline_id}")
+
+    return {
+        "status": "success",
+        "pipeline_id": pipeline_id,
+        "checkpoints": checkpoints,
+    }
@@ -4,13 +4,14 @@ Students API Routes
 Endpoints for student management and Student Model operations.
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 import logging
-import io
-import csv
 
+from ..dependencies import get_async_student_model, get_student_model
+from ...student_model.async_interface import AsyncStudentModelInterface
 from ...student_model.interface import StudentModelInterface
 from ...student_model.schemas import (
     StudentProfile,
@@ -24,9 +25,6 @@ logger = logging.getLogger("api.students")
 
 router = APIRouter()
 
-# Shared Student Model instance
-student_model = StudentModelInterface()
-
 
 # ═══════════════════════════════════════════════════════════
 # REQUEST/RESPONSE MODELS
@@ -58,7 +56,7 @@ class UpdateIEPRequest(BaseModel):
 
 
 @router.get("/classes/{class_id}/roster")
-async def get_class_roster(class_id: str):
+async def get_class_roster(class_id: str, sm: AsyncStudentModelInterface = Depends(get_async_student_model)):
     """
     Get class roster.
 
@@ -68,7 +66,7 @@ async def get_class_roster(class_id: str):
         Class roster with total students and class name
     """
     try:
-        roster = student_model.get_class_roster(class_id)
+        roster = await sm.get_class_roster(class_id)
 
         return {
             "status": "success",
@@ -81,7 +79,10 @@ async def get_class_roster(class_id: str):
 
 
 @router.get("/classes/{class_id}/students")
-async def get_class_students(class_id: str):
+async def get_class_students(
+    class_id: str,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Get all students in a class.
 
@@ -91,7 +92,7 @@ async def get_class_students(class_id: str):
         List of student profiles
     """
     try:
-        students = student_model.get_class_students(class_id)
+        students = await sm.get_class_students(class_id)
 
         return {
             "status": "success",
@@ -105,7 +106,10 @@ async def get_class_students(class_id: str):
 
 
 @router.get("/students/{student_id}")
-async def get_student_profile(student_id: str):
+async def get_student_profile(
+    student_id: str,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Get student profile by ID.
 
@@ -115,7 +119,7 @@ async def get_student_profile(student_id: str):
         Student profile
     """
     try:
-        profile = student_model.get_student_profile(student_id)
+        profile = await sm.get_student_profile(student_id)
 
         if not profile:
             raise HTTPException(status_code=404, detail=f"Student {student_id} not found")
@@ -133,7 +137,10 @@ async def get_student_profile(student_id: str):
 
 
 @router.post("/students")
-async def create_student(request: CreateStudentRequest):
+async def create_student(
+    request: CreateStudentRequest,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Create new student profile.
 
@@ -161,7 +168,7 @@ async def create_student(request: CreateStudentRequest):
             reading_level=ReadingLevel(request.reading_level) if request.reading_level else None,
         )
 
-        profile = student_model.create_student_profile(profile_data)
+        profile = await sm.create_student_profile(profile_data)
 
         logger.info(f"Student created: {profile.student_id}")
 
@@ -176,48 +183,69 @@ async def create_student(request: CreateStudentRequest):
 
 
 @router.post("/classes/{class_id}/bulk-import")
-async def bulk_import_students(class_id: str, file: UploadFile = File(...)):
+async def bulk_import_students(
+    class_id: str,
+    file: UploadFile = File(...),
+    file_format: Optional[str] = None,
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
-    Bulk import students from CSV.
+    Bulk import students from CSV or NDJSON (district SIS sync).
 
-    POST /api/students/classes/{class_id}/bulk-import
+    POST /api/students/classes/{class_id}/bulk-import?file_format=csv
 
     CSV format:
-    student_name,grade_level,has_iep,reading_level
-    Alex Chen,9,false,grade_level
-    Maria Gonzalez,9,true,below_grade_level
+    student_id,student_name,grade_level,iep_status,primary_disability,reading_level,learning_preferences,accommodations
+    S1001,Alex Chen,9,No,,Proficient,Visual;Kinesthetic,
+    S1002,Maria Gonzalez,9,Yes,ADHD,Basic,Auditory,Extended Time;Movement Breaks
+
+    NDJSON: one JSON object per line with the same fields.
+    Format defaults to NDJSON for .ndjson/.jsonl uploads, CSV otherwise.
 
     Returns:
-        Import results with success/failure counts
+        Import results with success/failure counts and per-row errors
     """
     try:
-        # Read CSV file
-        contents = await file.read()
-        csv_text = contents.decode("utf-8")
-        csv_reader = csv.DictReader(io.StringIO(csv_text))
-
-        result = student_model.bulk_import_students(
-            csv_data=csv_text,
-            class_id=class_id,
+        if file_format is None:
+            file_format = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+        def log_progress(progress):
+            logger.info(
+                f"Bulk import {class_id}: {progress.rows_processed} rows processed, "
+                f"{progress.successful_imports} imported, {progress.failed_imports} failed"
+            )
+
+        # Parse the upload from its spooled file in chunks (never read whole);
+        # run in a worker thread so a large import doesn't block the event loop
+        result = await run_in_threadpool(
+            student_model.import_students_stream,
+            file.file,
+            class_id,
+            fmt=file_format,
+            on_progress=log_progress,
         )
 
-        logger.info(
-            f"Bulk import complete: {result.successful_imports} successful, "
-            f"{result.failed_imports} failed"
-        )
+        failed_imports = len(result.failed_rows)
+        logger.info(f"Bulk import complete: {result.successful_imports} successful, {failed_imports} failed")
 
         return {
-            "status": "success" if result.failed_imports == 0 else "partial_success",
+            "status": "success" if failed_imports == 0 else "partial_success",
             "result": result.model_dump(),
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error bulk importing students: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/students/{student_id}/mastery")
-async def get_student_mastery(student_id: str, concept_ids: Optional[str] = None):
+async def get_student_mastery(
+    student_id: str,
+    concept_ids: Optional[str] = None,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Get student mastery data.
 
@@ -233,7 +261,7 @@ async def get_student_mastery(student_id: str, concept_ids: Optional[str] = None
         # Parse concept_ids
         concept_list = concept_ids.split(",") if concept_ids else None
 
-        mastery_records = student_model.retrieve_concept_mastery(
+        mastery_records = await sm.retrieve_concept_mastery(
             student_id=student_id,
             concept_ids=concept_list,
         )
@@ -250,7 +278,7 @@ async def get_student_mastery(student_id: str, concept_ids: Optional[str] = None
 
 
 @router.get("/students/{student_id}/iep")
-async def get_student_iep(student_id: str):
+async def get_student_iep(student_id: str, sm: AsyncStudentModelInterface = Depends(get_async_student_model)):
     """
     Get student IEP accommodations.
 
@@ -260,7 +288,7 @@ async def get_student_iep(student_id: str):
         IEP data if student has IEP
     """
     try:
-        iep_data = student_model.get_iep_accommodations(student_id)
+        iep_data = await sm.get_iep_accommodations(student_id)
 
         if not iep_data:
             raise HTTPException(status_code=404, detail=f"No IEP found for student {student_id}")
@@ -278,7 +306,11 @@ async def get_student_iep(student_id: str):
 
 
 @router.put("/students/{student_id}/iep")
-async def update_student_iep(student_id: str, request: UpdateIEPRequest):
+async def update_student_iep(
+    student_id: str,
+    request: UpdateIEPRequest,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Update student IEP accommodations.
 
@@ -306,7 +338,7 @@ async def update_student_iep(student_id: str, request: UpdateIEPRequest):
             review_date=request.review_date,
         )
 
-        iep_data = student_model.update_iep_accommodations(student_id, update_data)
+        iep_data = await sm.update_iep_accommodations(student_id, update_data)
 
         logger.info(f"IEP updated for student {student_id}")
 
@@ -321,7 +353,7 @@ async def update_student_iep(student_id: str, request: UpdateIEPRequest):
 
 
 @router.get("/classes/{class_id}/iep-students")
-async def get_iep_students(class_id: str):
+async def get_iep_students(class_id: str, sm: AsyncStudentModelInterface = Depends(get_async_student_model)):
     """
     Get all students with IEPs in a class.
 
@@ -331,7 +363,7 @@ async def get_iep_students(class_id: str):
         List of students with IEPs
     """
     try:
-        students = student_model.get_students_with_ieps(class_id)
+        students = await sm.get_students_with_ieps(class_id)
 
         return {
             "status": "success",
@@ -345,7 +377,11 @@ async def get_iep_students(class_id: str):
 
 
 @router.get("/classes/{class_id}/mastery/{concept_id}")
-async def get_class_mastery_distribution(class_id: str, concept_id: str):
+async def get_class_mastery_distribution(
+    class_id: str,
+    concept_id: str,
+    sm: AsyncStudentModelInterface = Depends(get_async_student_model),
+):
     """
     Get class-wide mastery distribution for a concept.
 
@@ -355,7 +391,7 @@ async def get_class_mastery_distribution(class_id: str, concept_id: str):
         Mastery distribution with average, tiers, etc.
     """
     try:
-        distribution = student_model.get_class_mastery_distribution(
+        distribution = await sm.get_class_mastery_distribution(
             class_id=class_id,
             concept_id=concept_id,
         )
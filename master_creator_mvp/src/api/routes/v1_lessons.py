@@ -6,16 +6,18 @@ Generates 10-part lesson blueprints with UDL principles and standards alignment.
 This file serves as the TEMPLATE for implementing all other engine endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from datetime import datetime
+import asyncio
 import uuid
 import logging
 
 # Import shared components
 from ...engines.engine_1_lesson_architect import LessonArchitect, LessonBlueprint
 from ...student_model.interface import StudentModelInterface
+from ..dependencies import get_student_model
 
 router = APIRouter(prefix="/api/v1/lesson", tags=["Engine 1: Lesson Architect"])
 logger = logging.getLogger("api.v1.lessons")
@@ -33,6 +35,7 @@ class LessonGenerateRequest(BaseModel):
     standards: List[str] = Field(default=[], description="State/national standards codes")
     duration_minutes: int = Field(default=45, ge=30, le=90, description="Lesson duration")
     class_id: Optional[str] = Field(default=None, description="Class ID for Student Model context")
+    force_fresh: bool = Field(default=False, description="Generate a new lesson even if a stored one matches")
 
 
 class LessonResponse(BaseModel):
@@ -48,7 +51,8 @@ class LessonResponse(BaseModel):
 @router.post("/generate", response_model=LessonResponse)
 async def generate_lesson(
     request: LessonGenerateRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    student_model: StudentModelInterface = Depends(get_student_model),
 ):
     """
     Generate a complete lesson blueprint using Engine 1.
@@ -73,30 +77,31 @@ async def generate_lesson(
         # Step 1: Query Student Model for class data (if class_id provided)
         class_context = None
         if request.class_id:
-            with StudentModelInterface() as student_model:
-                class_roster = student_model.get_class_roster(request.class_id)
-                if class_roster:
-                    class_context = {
-                        "class_id": class_roster.class_id,
-                        "class_name": class_roster.class_name,
-                        "total_students": class_roster.total_students,
-                        "students_with_ieps": class_roster.students_with_ieps,
-                        "grade_level": class_roster.grade_level,
-                        "subject": class_roster.subject,
-                    }
-                    logger.info(f"Loaded class context: {class_roster.class_name} ({class_roster.total_students} students)")
+            class_roster = await asyncio.to_thread(student_model.get_class_roster, request.class_id)
+            if class_roster:
+                class_context = {
+                    "class_id": class_roster.class_id,
+                    "class_name": class_roster.class_name,
+                    "total_students": class_roster.total_students,
+                    "students_with_ieps": class_roster.students_with_ieps,
+                    "grade_level": class_roster.grade_level,
+                    "subject": class_roster.subject,
+                }
+                logger.info(f"Loaded class context: {class_roster.class_name} ({class_roster.total_students} students)")
 
         # Step 2: Execute Engine 1 workflow
         logger.info(f"Generating lesson: {request.topic} | Grade {request.grade_level} | {request.subject}")
 
-        engine = LessonArchitect()
-        lesson_blueprint = engine.generate(
+        engine = LessonArchitect(student_model=student_model)
+        lesson_blueprint = await asyncio.to_thread(
+            engine.generate,
             topic=request.topic,
             grade_level=request.grade_level,
             subject=request.subject,
             duration_minutes=request.duration_minutes,
             standards=request.standards,
             class_id=request.class_id,
+            force_fresh=request.force_fresh,
         )
 
         cost_summary = engine.get_cost_summary()
@@ -4,14 +4,17 @@ Worksheets API Routes
 Endpoints for worksheet generation (Engine 2, 3).
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional, Dict
+import asyncio
 import logging
 
 from ...engines.engine_2_worksheet_designer import WorksheetDesigner
 from ...engines.engine_3_iep_specialist import IEPSpecialist
-from ...content_storage.interface import ContentStorageInterface
+from ...content_storage.async_interface import AsyncContentStorageInterface
+from ...student_model.interface import StudentModelInterface
+from ..dependencies import get_async_content_storage, get_engine_content_storage, get_student_model
 
 logger = logging.getLogger("api.worksheets")
 
@@ -42,7 +45,11 @@ class WorksheetRequest(BaseModel):
 
 
 @router.post("/generate")
-async def generate_worksheets(request: WorksheetRequest):
+async def generate_worksheets(
+    request: WorksheetRequest,
+    storage: AsyncContentStorageInterface = Depends(get_engine_content_storage),
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Generate 3-tier differentiated worksheets.
 
@@ -68,8 +75,9 @@ async def generate_worksheets(request: WorksheetRequest):
     try:
         logger.info(f"Generating worksheets for: {request.lesson_topic}")
 
-        engine = WorksheetDesigner()
-        worksheets = engine.generate(
+        engine = WorksheetDesigner(student_model=student_model)
+        worksheets = await asyncio.to_thread(
+            engine.generate,
             lesson_topic=request.lesson_topic,
             learning_objective=request.learning_objective,
             grade_level=request.grade_level,
@@ -84,28 +92,27 @@ async def generate_worksheets(request: WorksheetRequest):
 
         # Save each tier to database separately
         worksheet_data = worksheets.model_dump()
-        with ContentStorageInterface() as storage:
-            # Save tier 1
-            storage.save_worksheet(
-                worksheet_data={"tier_1": worksheet_data["tier_1"], **{k: v for k, v in worksheet_data.items() if k not in ["tier_1", "tier_2", "tier_3"]}},
-                lesson_id=request.lesson_topic,  # Note: should be lesson_id if available
-                tier_level="tier_1",
-                cost_summary={"total_cost": cost_summary.get("total_cost", 0.0) / 3, "input_tokens": 0, "output_tokens": 0}
-            )
-            # Save tier 2
-            storage.save_worksheet(
-                worksheet_data={"tier_2": worksheet_data["tier_2"], **{k: v for k, v in worksheet_data.items() if k not in ["tier_1", "tier_2", "tier_3"]}},
-                lesson_id=request.lesson_topic,
-                tier_level="tier_2",
-                cost_summary={"total_cost": cost_summary.get("total_cost", 0.0) / 3, "input_tokens": 0, "output_tokens": 0}
-            )
-            # Save tier 3
-            storage.save_worksheet(
-                worksheet_data={"tier_3": worksheet_data["tier_3"], **{k: v for k, v in worksheet_data.items() if k not in ["tier_1", "tier_2", "tier_3"]}},
-                lesson_id=request.lesson_topic,
-                tier_level="tier_3",
-                cost_summary={"total_cost": cost_summary.get("total_cost", 0.0) / 3, "input_tokens": 0, "output_tokens": 0}
-            )
+        # Save tier 1
+        await storage.save_worksheet(
+            worksheet_data={"tier_1": worksheet_data["tier_1"], **{k: v for k, v in worksheet_data.items() if k not in ["tier_1", "tier_2", "tier_3"]}},
+            lesson_id=request.lesson_topic,  # Note: should be lesson_id if available
+            tier_level="tier_1",
+            cost_summary={"total_cost": cost_summary.get("total_cost", 0.0) / 3, "input_tokens": 0, "output_tokens": 0}
+        )
+        # Save tier 2
+        await storage.save_worksheet(
+            worksheet_data={"tier_2": worksheet_data["tier_2"], **{k: v for k, v in worksheet_data.items() if k not in ["tier_1", "tier_2", "tier_3"]}},
+            lesson_id=request.lesson_topic,
+            tier_level="tier_2",
+            cost_summary={"total_cost": cost_summary.get("total_cost", 0.0) / 3, "input_tokens": 0, "output_tokens": 0}
+        )
+        # Save tier 3
+        await storage.save_worksheet(
+            worksheet_data={"tier_3": worksheet_data["tier_3"], **{k: v for k, v in worksheet_data.items() if k not in ["tier_1", "tier_2", "tier_3"]}},
+            lesson_id=request.lesson_topic,
+            tier_level="tier_3",
+            cost_summary={"total_cost": cost_summary.get("total_cost", 0.0) / 3, "input_tokens": 0, "output_tokens": 0}
+        )
 
         logger.info(f"Worksheets generated: {worksheets.worksheet_id} | Cost: ${cost_summary['total_cost']:.4f}")
 
@@ -121,7 +128,10 @@ async def generate_worksheets(request: WorksheetRequest):
 
 
 @router.post("/apply-iep")
-async def apply_iep_accommodations(worksheet_set: Dict):
+async def apply_iep_accommodations(
+    worksheet_set: Dict,
+    student_model: StudentModelInterface = Depends(get_student_model),
+):
     """
     Apply IEP accommodations to worksheets.
 
@@ -145,8 +155,8 @@ async def apply_iep_accommodations(worksheet_set: Dict):
 
         worksheet_obj = WorksheetSet(**worksheet_set)
 
-        engine = IEPSpecialist()
-        modified_worksheets = engine.apply_accommodations(worksheet_obj)
+        engine = IEPSpecialist(student_model=student_model)
+        modified_worksheets = await asyncio.to_thread(engine.apply_accommodations, worksheet_obj)
 
         cost_summary = engine.get_cost_summary()
 
@@ -167,7 +177,10 @@ async def apply_iep_accommodations(worksheet_set: Dict):
 
 
 @router.get("/{worksheet_id}")
-async def get_worksheet(worksheet_id: str):
+async def get_worksheet(
+    worksheet_id: str,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
     """
     Get worksheet by ID.
 
@@ -177,8 +190,7 @@ async def get_worksheet(worksheet_id: str):
         Worksheet set if found
     """
     try:
-        with ContentStorageInterface() as storage:
-            worksheet_data = storage.get_worksheet(worksheet_id)
+        worksheet_data = await storage.get_worksheet(worksheet_id)
 
         if not worksheet_data:
             raise HTTPException(
@@ -199,7 +211,10 @@ async def get_worksheet(worksheet_id: str):
 
 
 @router.get("/{worksheet_id}/compliance-report")
-async def get_compliance_report(worksheet_id: str):
+async def get_compliance_report(
+    worksheet_id: str,
+    storage: AsyncContentStorageInterface = Depends(get_async_content_storage),
+):
     """
     Get FERPA compliance report for worksheet.
 
@@ -209,8 +224,7 @@ async def get_compliance_report(worksheet_id: str):
         Compliance report showing all IEP accommodations applied
     """
     try:
-        with ContentStorageInterface() as storage:
-            worksheet_data = storage.get_worksheet(worksheet_id)
+        worksheet_data = await storage.get_worksheet(worksheet_id)
 
         if not worksheet_data:
             raise HTTPException(
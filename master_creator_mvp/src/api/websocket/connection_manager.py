@@ -7,9 +7,13 @@ Supports multiple connection types: dashboard, pipeline, student updates.
 
 import json
 import logging
+import time
 from typing import Dict, List, Set
 from fastapi import WebSocket
 
+from ...utils.metrics import REGISTRY, WEBSOCKET_BROADCAST_DURATION, WEBSOCKET_QUEUE_DEPTH
+from ...utils.tracing import span
+
 logger = logging.getLogger("websocket.manager")
 
 
@@ -126,12 +130,31 @@ class ConnectionManager:
         # Track failed connections
         failed_connections = []
 
-        for connection in connections:
+        # Queue depth counts sends not yet completed across concurrent broadcasts
+        start = time.perf_counter()
+        pending = len(connections)
+        WEBSOCKET_QUEUE_DEPTH.inc(pending)
+
+        attributes = {
+            "websocket.connection_type": connection_type,
+            "websocket.resource_id": resource_id,
+            "websocket.connections": len(connections),
+            "message.type": message.get("type"),
+        }
+        with span("websocket.broadcast", attributes) as broadcast_span:
             try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                failed_connections.append(connection)
+                for connection in connections:
+                    try:
+                        await connection.send_json(message)
+                    except Exception as e:
+                        logger.error(f"Error broadcasting to connection: {e}")
+                        failed_connections.append(connection)
+                    pending -= 1
+                    WEBSOCKET_QUEUE_DEPTH.dec()
+            finally:
+                WEBSOCKET_QUEUE_DEPTH.dec(pending)  # Sends skipped by cancellation
+                WEBSOCKET_BROADCAST_DURATION.observe(time.perf_counter() - start, connection_type=connection_type)
+                broadcast_span.set_attribute("websocket.failed", len(failed_connections))
 
         # Remove failed connections
         for connection in failed_connections:
@@ -249,3 +272,11 @@ class ConnectionManager:
 
 # Global connection manager instance
 manager = ConnectionManager()
+
+# Open connections per type, read at scrape time
+REGISTRY.gauge(
+    "websocket_connections",
+    "Open WebSocket connections",
+    ("connection_type",),
+    callback=lambda: {(t,): manager.get_connection_count(t) for t in list(manager.active_connections)},
+)
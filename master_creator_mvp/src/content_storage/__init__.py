@@ -14,10 +14,12 @@ from .models import (
     FeedbackReportModel,
     GradedAssessmentModel,
     PipelineExecutionModel,
+    PipelineCheckpointModel,
     create_content_tables,
 )
 
 from .interface import ContentStorageInterface
+from .async_interface import AsyncContentStorageInterface
 
 __all__ = [
     "UnitPlanModel",
@@ -29,6 +31,8 @@ __all__ = [
     "FeedbackReportModel",
     "GradedAssessmentModel",
     "PipelineExecutionModel",
+    "PipelineCheckpointModel",
     "ContentStorageInterface",
+    "AsyncContentStorageInterface",
     "create_content_tables",
 ]
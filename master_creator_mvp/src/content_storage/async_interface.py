@@ -0,0 +1,22 @@
+"""
+Async Content Storage Interface
+
+ContentStorageInterface with awaitable methods, for async route handlers
+(see student_model.async_interface for how calls are run).
+
+Usage:
+    async with AsyncContentStorageInterface() as storage:
+        lesson_id = await storage.save_lesson(lesson_data, cost_summary)
+        lesson = await storage.get_lesson(lesson_id)
+"""
+
+from ..student_model.async_interface import AsyncInterface, async_methods
+from .interface import ContentStorageInterface
+
+
+@async_methods(ContentStorageInterface)
+class AsyncContentStorageInterface(AsyncInterface):
+    """ContentStorageInterface with awaitable methods."""
+
+    def _bind(self, sync_session) -> ContentStorageInterface:
+        return ContentStorageInterface(session=sync_session)
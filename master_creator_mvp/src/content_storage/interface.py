@@ -16,6 +16,8 @@ import logging
 
 from sqlalchemy.orm import Session
 from ..student_model.database import get_session_maker
+from ..utils.tracing import trace_methods
+from .reuse import LESSON, UNIT_PLAN, index_content
 from .models import (
     UnitPlanModel,
     LessonModel,
@@ -26,11 +28,13 @@ from .models import (
     FeedbackReportModel,
     GradedAssessmentModel,
     PipelineExecutionModel,
+    PipelineCheckpointModel,
 )
 
 logger = logging.getLogger("content_storage")
 
 
+@trace_methods("content_storage")
 class ContentStorageInterface:
     """
     Context manager interface for content storage operations.
@@ -102,6 +106,9 @@ class ContentStorageInterface:
         self.session.add(unit)
         self.session.commit()
         logger.info(f"Saved unit plan: {unit.unit_id}")
+
+        # Make it findable for reuse by later generation requests
+        index_content(UNIT_PLAN, unit_data, class_id)
         return unit.unit_id
 
     def get_unit_plan(self, unit_id: str) -> Optional[Dict]:
@@ -191,6 +198,9 @@ class ContentStorageInterface:
         self.session.add(lesson)
         self.session.commit()
         logger.info(f"Saved lesson: {lesson.lesson_id}")
+
+        # Make it findable for reuse by later generation requests
+        index_content(LESSON, lesson_data, class_id)
         return lesson.lesson_id
 
     def get_lesson(self, lesson_id: str) -> Optional[Dict]:
@@ -446,15 +456,15 @@ class ContentStorageInterface:
         student_id: str,
         cost_summary: Dict
     ) -> str:
-        """Save graded assessment to database."""
+        """Save graded assessment (a GradedAssessment dump) to database."""
         graded = GradedAssessmentModel(
-            graded_id=graded_data["graded_id"],
+            graded_id=graded_data["grading_id"],
             assessment_id=assessment_id,
             student_id=student_id,
             content=graded_data,
-            raw_score=graded_data.get("raw_score", 0.0),
-            max_score=graded_data.get("max_score", 100.0),
-            percentage=graded_data.get("percentage", 0.0),
+            raw_score=graded_data.get("total_points_earned", 0.0),
+            max_score=graded_data.get("total_points_possible", 100.0),
+            percentage=graded_data.get("score_percentage", 0.0),
             strengths=graded_data.get("strengths", []),
             weaknesses=graded_data.get("weaknesses", []),
             recommendations=graded_data.get("recommendations", []),
@@ -540,3 +550,61 @@ class ContentStorageInterface:
                 "errors": pipeline.errors,
             }
         return None
+
+    # ═══════════════════════════════════════════════════════════
+    # PIPELINE CHECKPOINTS
+    # ═══════════════════════════════════════════════════════════
+
+    def save_pipeline_checkpoint(self, pipeline_id: str, stage: str, state: Dict) -> int:
+        """
+        Save pipeline state after a completed stage.
+
+        Args:
+            pipeline_id: Pipeline ID
+            stage: Stage that completed
+            state: State update of the stage (JSON-safe; the full input state
+                for the run's first checkpoint)
+
+        Returns:
+            checkpoint_id of saved checkpoint
+        """
+        checkpoint = PipelineCheckpointModel(pipeline_id=pipeline_id, stage=stage, state=state)
+
+        self.session.add(checkpoint)
+        self.session.commit()
+        logger.info(f"Saved pipeline checkpoint: {pipeline_id} after {stage}")
+        return checkpoint.checkpoint_id
+
+    def list_pipeline_checkpoints(
+        self,
+        pipeline_id: str,
+        include_state: bool = False
+    ) -> List[Dict]:
+        """
+        List a pipeline's checkpoints, oldest first.
+
+        Args:
+            pipeline_id: Pipeline ID
+            include_state: Include each checkpoint's saved state
+
+        Returns:
+            List of dicts with checkpoint_id, stage, current_stage and created_at
+        """
+        query = (
+            self.session.query(PipelineCheckpointModel)
+            .filter_by(pipeline_id=pipeline_id)
+            .order_by(PipelineCheckpointModel.checkpoint_id)
+        )
+
+        checkpoints = []
+        for c in query.all():
+            checkpoint = {
+                "checkpoint_id": c.checkpoint_id,
+                "stage": c.stage,
+                "current_stage": c.state.get("current_stage"),
+                "created_at": c.created_at.isoformat(),
+            }
+            if include_state:
+                checkpoint["state"] = c.state
+            checkpoints.append(checkpoint)
+        return checkpoints
@@ -293,6 +293,36 @@ class PipelineExecutionModel(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class PipelineCheckpointModel(Base):
+    """Pipeline state saved after each completed LangGraph stage, for resuming runs."""
+
+    __tablename__ = "pipeline_checkpoints"
+
+    checkpoint_id = Column(Integer, primary_key=True, autoincrement=True)
+    pipeline_id = Column(String(50), nullable=False, index=True)
+    stage = Column(String(50), nullable=False)  # Node that completed ("initialization" = input state)
+
+    # Full PipelineState after the stage (JSON-safe)
+    state = Column(JSON, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class LLMInflightCallModel(Base):
+    """Lease rows coalescing identical LLM calls across API workers (see engines/single_flight.py)."""
+
+    __tablename__ = "llm_inflight_calls"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of the normalized request
+    status = Column(String(20), nullable=False)  # "running", "complete"
+    owner = Column(String(100), nullable=False)  # host:pid of the worker calling Claude
+    response = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
 # ═══════════════════════════════════════════════════════════
 # UTILITY FUNCTIONS
 # ═══════════════════════════════════════════════════════════
@@ -309,5 +339,7 @@ def create_content_tables(engine):
         FeedbackReportModel.__table__,
         GradedAssessmentModel.__table__,
         PipelineExecutionModel.__table__,
+        PipelineCheckpointModel.__table__,
+        LLMInflightCallModel.__table__,
     ])
     print("✅ All content storage tables created successfully!")
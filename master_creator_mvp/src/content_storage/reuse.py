@@ -0,0 +1,301 @@
+"""
+Semantic reuse of stored lessons and unit plans.
+
+Saved lessons (Engine 1) and unit plans (Engine 0) are embedded into the
+vector store's content_vectors collection (topic + learning objectives,
+with grade, subject, standards and length as metadata). Before generating,
+the engines ask find_reusable() for a stored match:
+
+- reuse: same grade, subject, standards and length, topic similarity at or
+  above CONTENT_REUSE_THRESHOLD, and neither the request nor the stored
+  item is tailored to a class. The stored blueprint is returned without
+  calling Claude.
+- adapt: similar topic, but the standards, length or class context differ.
+  The stored blueprint goes into the prompt as a starting point.
+- otherwise the engine generates from scratch.
+
+Engines take force_fresh=True to skip the lookup. Lookups and indexing
+never fail a request: vector store errors are logged and treated as no match.
+"""
+
+import logging
+import os
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("content_storage.reuse")
+
+# Look up and index stored content for reuse
+CONTENT_REUSE_ENABLED = os.getenv("CONTENT_REUSE", "true").lower() == "true"
+
+# Minimum cosine similarity between requested and stored topics
+CONTENT_REUSE_THRESHOLD = float(os.getenv("CONTENT_REUSE_THRESHOLD", "0.92"))
+
+# Stored items compared per lookup (nearest by topic + objectives)
+CONTENT_REUSE_CANDIDATES = int(os.getenv("CONTENT_REUSE_CANDIDATES", "5"))
+
+LESSON = "lesson"
+UNIT_PLAN = "unit_plan"
+
+
+class ReuseMatch:
+    """A stored lesson or unit plan matching a generation request."""
+
+    def __init__(self, content_id: str, similarity: float, decision: str, reason: str, content: Dict):
+        """
+        Initialize match.
+
+        Args:
+            content_id: Stored lesson_id or unit_id
+            similarity: Cosine similarity of the topics
+            decision: "reuse" or "adapt"
+            reason: Why the stored content can't be reused as-is (adapt only)
+            content: Stored blueprint (model_dump of the engine's output)
+        """
+        self.content_id = content_id
+        self.similarity = similarity
+        self.decision = decision
+        self.reason = reason
+        self.content = content
+
+
+# ═══════════════════════════════════════════════════════════
+# INDEXING
+# ═══════════════════════════════════════════════════════════
+
+
+def _key(value) -> str:
+    return " ".join(str(value or "").split()).lower()
+
+
+def _standards_key(standards: Optional[List[str]]) -> str:
+    return ",".join(sorted({_key(s) for s in standards or [] if _key(s)}))
+
+
+def _topic(content_type: str, data: Dict) -> str:
+    return data.get("unit_title", "") if content_type == UNIT_PLAN else data.get("topic", "")
+
+
+def _size(content_type: str, data: Dict) -> int:
+    if content_type == UNIT_PLAN:
+        return int(data.get("total_lessons") or data.get("num_lessons") or 0)
+    return int(data.get("duration_minutes") or 0)
+
+
+def build_reuse_text(content_type: str, data: Dict) -> str:
+    """
+    Build the document embedded for stored content: topic + objectives.
+
+    Args:
+        content_type: LESSON or UNIT_PLAN
+        data: Lesson blueprint or unit plan (model_dump)
+
+    Returns:
+        Text for the content_vectors collection
+    """
+    if content_type == UNIT_PLAN:
+        objectives = list(data.get("enduring_understandings", []))
+        for lesson in data.get("lessons", []):
+            objectives.extend(lesson.get("learning_objectives", []))
+    else:
+        objectives = [
+            section.get("content", "")
+            for section in data.get("sections", [])
+            if "objective" in section.get("section_name", "").lower()
+        ]
+
+    return "\n".join([_topic(content_type, data)] + [o for o in objectives if o])
+
+
+def build_reuse_metadata(content_type: str, data: Dict, class_id: Optional[str] = None) -> Dict:
+    """
+    Build the metadata stored with a content vector (filters for lookups).
+
+    Args:
+        content_type: LESSON or UNIT_PLAN
+        data: Lesson blueprint or unit plan (model_dump)
+        class_id: Class the content was generated for, if any
+
+    Returns:
+        Flat metadata dict (Chroma only stores scalar values)
+    """
+    return {
+        "content_type": content_type,
+        "topic": _topic(content_type, data),
+        "grade_level": _key(data.get("grade_level")),
+        "subject": _key(data.get("subject")),
+        "standards": _standards_key(data.get("standards")),
+        "size": _size(content_type, data),
+        "class_specific": bool(class_id or data.get("class_context")),
+    }
+
+
+def index_content(content_type: str, data: Dict, class_id: Optional[str] = None, vector_store=None) -> bool:
+    """
+    Add saved content to the reuse index.
+
+    Reused copies (reused_from set) aren't indexed again.
+
+    Args:
+        content_type: LESSON or UNIT_PLAN
+        data: Lesson blueprint or unit plan (model_dump)
+        class_id: Class the content was generated for, if any
+        vector_store: StudentVectorStore (the shared store if None)
+
+    Returns:
+        True if the content was queued for indexing
+    """
+    if not CONTENT_REUSE_ENABLED or data.get("reused_from"):
+        return False
+
+    content_id = data.get("unit_id") if content_type == UNIT_PLAN else data.get("lesson_id")
+    try:
+        store = vector_store if vector_store is not None else _shared_store()
+        if store.client is None:
+            return False
+        store.add_content(
+            content_id=content_id,
+            content_text=build_reuse_text(content_type, data),
+            metadata=build_reuse_metadata(content_type, data, class_id),
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"Could not index {content_type} {content_id} for reuse: {e}")
+        return False
+
+
+# ═══════════════════════════════════════════════════════════
+# LOOKUP
+# ═══════════════════════════════════════════════════════════
+
+
+def find_reusable(
+    content_type: str,
+    topic: str,
+    grade_level: str,
+    subject: str,
+    standards: Optional[List[str]],
+    size: int,
+    class_specific: bool = False,
+    vector_store=None,
+    load: Optional[Callable[[str], Optional[Dict]]] = None,
+) -> Optional[ReuseMatch]:
+    """
+    Find stored content to reuse or adapt instead of generating.
+
+    Candidates are the nearest stored items (by topic + objectives) with the
+    same content type, grade and subject; each is scored by the cosine
+    similarity of its topic to the requested one. Among candidates at or
+    above the threshold, reusable ones win over adaptable ones, then higher
+    similarity wins.
+
+    Args:
+        content_type: LESSON or UNIT_PLAN
+        topic: Requested topic (unit title for unit plans)
+        grade_level: Requested grade level
+        subject: Requested subject
+        standards: Requested standards
+        size: Requested duration_minutes (lessons) or number of lessons (units)
+        class_specific: Whether the request has class context to tailor for
+        vector_store: StudentVectorStore (the shared store if None)
+        load: content_id -> stored blueprint (ContentStorageInterface if None)
+
+    Returns:
+        ReuseMatch, or None to generate from scratch
+    """
+    if not CONTENT_REUSE_ENABLED:
+        return None
+
+    match = None
+    try:
+        store = vector_store if vector_store is not None else _shared_store()
+        match = _best_match(store, content_type, topic, grade_level, subject, standards, size, class_specific)
+        if match is not None:
+            match.content = (load or _loader(content_type))(match.content_id)
+            if not match.content:
+                match = None
+    except Exception as e:
+        logger.warning(f"Content reuse lookup failed, generating: {e}")
+        match = None
+
+    from ..utils.metrics import CONTENT_REUSE_DECISIONS
+
+    CONTENT_REUSE_DECISIONS.inc(content_type=content_type, decision=match.decision if match else "generate")
+    return match
+
+
+def _best_match(store, content_type, topic, grade_level, subject, standards, size, class_specific):
+    if store.client is None or store.embedder is None:
+        return None
+
+    candidates = store.search_similar_content(
+        topic,
+        n_results=CONTENT_REUSE_CANDIDATES,
+        metadata_filter={
+            "$and": [
+                {"content_type": content_type},
+                {"grade_level": _key(grade_level)},
+                {"subject": _key(subject)},
+            ]
+        },
+    )
+    if not candidates:
+        return None
+
+    similarities = _topic_similarities(store, topic, [c["metadata"].get("topic", "") for c in candidates])
+    requested_standards = _standards_key(standards)
+
+    best = None
+    for candidate, similarity in zip(candidates, similarities):
+        if similarity < CONTENT_REUSE_THRESHOLD:
+            continue
+        meta = candidate["metadata"]
+        differences = []
+        if meta.get("standards", "") != requested_standards:
+            differences.append("standards")
+        if int(meta.get("size", 0)) != int(size):
+            differences.append("duration" if content_type == LESSON else "number of lessons")
+        if class_specific or meta.get("class_specific"):
+            differences.append("class context")
+
+        match = ReuseMatch(
+            content_id=candidate["content_id"],
+            similarity=similarity,
+            decision="adapt" if differences else "reuse",
+            reason=", ".join(differences),
+            content={},
+        )
+        if best is None or (match.decision == "reuse", similarity) > (best.decision == "reuse", best.similarity):
+            best = match
+
+    return best
+
+
+def _topic_similarities(store, topic: str, candidate_topics: List[str]) -> List[float]:
+    """Cosine similarity of the requested topic to each candidate's topic."""
+    import numpy as np
+
+    vectors = np.asarray(store.embedder([topic] + candidate_topics), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+    vectors = vectors / norms[:, None]
+    return [float(s) for s in vectors[1:] @ vectors[0]]
+
+
+def _loader(content_type: str) -> Callable[[str], Optional[Dict]]:
+    """Read stored blueprints through the active unit of work (or a new session)."""
+    from ..student_model.database import current_session
+    from .interface import ContentStorageInterface
+
+    def load(content_id: str) -> Optional[Dict]:
+        with ContentStorageInterface(current_session()) as storage:
+            if content_type == UNIT_PLAN:
+                return storage.get_unit_plan(content_id)
+            return storage.get_lesson(content_id)
+
+    return load
+
+
+def _shared_store():
+    from ..student_model.vector_store import get_shared_vector_store
+
+    return get_shared_vector_store()
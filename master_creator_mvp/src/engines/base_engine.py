@@ -7,17 +7,42 @@ Provides common functionality:
 - Logging and audit trails
 - Cost tracking
 - Error handling
+- Coalescing of identical concurrent Claude calls (single-flight)
+- Process-wide rate limiting with priority lanes
+- Retries, hedging, circuit breakers and stage deadlines for Claude calls
+- Structured (tool-use) output validated against Pydantic models
+- Per-task model routing and adaptive max_tokens
+- Message Batches execution for offline pipelines (batch_mode)
 """
 
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-import anthropic
-from anthropic import Anthropic
+from pydantic import BaseModel
 
+from ..content_storage.reuse import ReuseMatch, find_reusable
 from ..student_model.interface import StudentModelInterface
+from ..student_model.snapshot import ClassSnapshot
+from ..utils.metrics import (
+    LLM_COALESCED_CALLS,
+    LLM_COST,
+    LLM_OUTPUT_TRUNCATED,
+    LLM_REQUEST_DURATION,
+    LLM_TIME_TO_FIRST_TOKEN,
+    LLM_TOKENS,
+)
+from ..utils.tracing import span
+from .llm_backends import create_llm_client
+from .message_batches import BATCH_PRICE_FACTOR, current_batch
+from .model_routing import MAX_TOKENS_CEILING, Route, is_truncated, record_routed_call, request_cost, route
+from .rate_limiter import dispatch_llm_call
+from .resilience import call_with_resilience
+from .single_flight import SINGLE_FLIGHT_ENABLED, get_single_flight, request_key
+from .structured_output import StructuredOutput, response_text
 
 
 class BaseEngine(ABC):
@@ -35,6 +60,7 @@ class BaseEngine(ABC):
         self,
         student_model: Optional[StudentModelInterface] = None,
         anthropic_api_key: Optional[str] = None,
+        llm_client=None,
     ):
         """
         Initialize engine.
@@ -42,30 +68,33 @@ class BaseEngine(ABC):
         Args:
             student_model: StudentModelInterface instance (creates new if None)
             anthropic_api_key: Anthropic API key (uses env var if None)
+            llm_client: LLM client (uses the LLM_BACKEND transport if None)
         """
         # Student Model access
         self.student_model = student_model or StudentModelInterface()
 
-        # Claude API client
-        api_key = anthropic_api_key or os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment")
-
-        self.client = Anthropic(api_key=api_key)
+        # Claude API client (Anthropic SDK, or the local fake for benchmarks)
+        self.client = llm_client or create_llm_client(self.__class__.__name__, api_key=anthropic_api_key)
 
         # Configuration
         self.model = os.getenv("LLM_MODEL", "claude-sonnet-4-5-20250929")
         self.max_tokens = int(os.getenv("LLM_MAX_TOKENS", "4096"))
         self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+        # Streamed calls report time-to-first-token; the full response is still returned
+        self.stream_responses = os.getenv("LLM_STREAMING", "false").lower() == "true"
 
-        # Cost tracking
+        # Cost tracking (hedged requests may finish concurrently; both are billed)
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_cost = 0.0
+        self._usage_lock = threading.Lock()
 
         # Audit log
         self.audit_log = []
 
+        # Per-class snapshot shared across engines in a pipeline run
+        self.class_snapshot: Optional[ClassSnapshot] = None
+
     @abstractmethod
     def generate(self, **kwargs) -> Dict:
         """
@@ -85,49 +114,317 @@ class BaseEngine(ABC):
         user_prompt: str,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
+        tool: Optional[Dict] = None,
+        call_route: Optional[Route] = None,
+        model: Optional[str] = None,
     ) -> str:
         """
         Call Claude API with prompt caching support.
 
+        Identical concurrent calls (same normalized prompt and parameters)
+        share one upstream request; only the caller that made it is charged
+        its tokens and cost.
+
         Args:
             system_prompt: System instructions
             user_prompt: User query
             max_tokens: Override default max_tokens
             temperature: Override default temperature
+            tool: Tool definition Claude must call (its input is returned as JSON)
+            call_route: Model and max_tokens from _route() (default model and max_tokens if None)
+            model: Override the model (when not routed)
+
+        Returns:
+            Claude's response text (the tool input JSON if tool is given)
+        """
+        request = {
+            "model": call_route.model if call_route else (model or self.model),
+            "max_tokens": max_tokens or (call_route.max_tokens if call_route else self.max_tokens),
+            "temperature": temperature or self.temperature,
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": user_prompt}],
+        }
+        if tool is not None:
+            request["tools"] = [tool]
+            request["tool_choice"] = {"type": "tool", "name": tool["name"]}
+        if not SINGLE_FLIGHT_ENABLED:
+            return self._request_claude(request, call_route)
+
+        text, coalesced = get_single_flight().do(
+            request_key(request), lambda: self._request_claude(request, call_route)
+        )
+        if coalesced:
+            LLM_COALESCED_CALLS.inc(engine=self.__class__.__name__, scope=coalesced)
+            self._log_decision(f"Claude API call coalesced with an identical in-flight call ({coalesced})")
+        return text
+
+    def _request_claude(self, request: Dict, call_route: Optional[Route] = None) -> str:
+        """
+        Make one upstream Claude call under the resilience policy (retries,
+        hedging, circuit breaker, stage deadline) and the rate-limit scheduler.
+
+        A routed response cut off at its adaptive max_tokens is requested
+        again at LLM_MAX_TOKENS. Under batch_mode() the response comes from
+        a message batch instead (see message_batches).
+
+        Args:
+            request: messages.create keyword arguments
+            call_route: Route the request was built from (if routed)
 
         Returns:
             Claude's response text
+
+        Raises:
+            CircuitOpenError: If the model's circuit is open
+            LLMDeadlineExceeded: If the pipeline stage deadline has passed
+            LLMQueueTimeout: If the call waited too long for rate-limit capacity
+            BatchPending: Under batch_mode(), if the request's batch result isn't available yet
         """
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens or self.max_tokens,
-                temperature=temperature or self.temperature,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}],
+        engine_name = self.__class__.__name__
+        start = time.perf_counter()
+
+        def send(request):
+            batch = current_batch()
+            if batch is not None:
+                response, first = batch.response_for(request)
+                self._record_usage(response, request["model"], batched=True, metered=first)
+                return response
+            return call_with_resilience(
+                lambda timeout: dispatch_llm_call(request, lambda: self._send_claude(request, timeout), engine_name),
+                engine=engine_name,
+                model=request["model"],
             )
 
-            # Track usage
-            usage = response.usage
+        response = send(request)
+        if call_route is not None:
+            if is_truncated(response) and request["max_tokens"] < MAX_TOKENS_CEILING:
+                LLM_OUTPUT_TRUNCATED.inc(task=call_route.task, model=call_route.model)
+                self._log_decision(
+                    f"{call_route.task} output hit max_tokens={request['max_tokens']}, "
+                    f"retrying with {MAX_TOKENS_CEILING}",
+                    level="warning",
+                )
+                response = send({**request, "max_tokens": MAX_TOKENS_CEILING})
+            # Batch results are replayed on resume and have no call latency
+            if current_batch() is None:
+                record_routed_call(call_route, engine_name, response, time.perf_counter() - start)
+        return response_text(response)
+
+    def _send_claude(self, request: Dict, timeout: Optional[float] = None):
+        """
+        Send one request to Claude, recording usage, cost and latency.
+
+        Args:
+            request: messages.create keyword arguments
+            timeout: Request timeout in seconds (client default if None)
+
+        Returns:
+            Message from messages.create (or the final streamed message)
+        """
+        import anthropic  # Cached after the first call
+
+        engine_name = self.__class__.__name__
+        model = request["model"]
+        start = time.perf_counter()
+        status = "error"
+
+        with span(
+            "llm.call",
+            {"llm.engine": engine_name, "llm.model": model, "llm.streaming": self.stream_responses},
+            kind="client",
+        ) as llm_span:
+            try:
+                options = {"timeout": timeout} if timeout is not None else {}
+                if self.stream_responses:
+                    response = self._stream_claude(request, start, options)
+                else:
+                    response = self.client.messages.create(**request, **options)
+                status = "success"
+
+                usage = response.usage
+                llm_span.set_attributes(
+                    {"llm.input_tokens": usage.input_tokens, "llm.output_tokens": usage.output_tokens}
+                )
+                self._record_usage(response, model)
+
+                return response
+
+            except anthropic.APIError as e:
+                self._log_decision(f"Claude API error: {str(e)}", level="error")
+                raise
+
+            finally:
+                LLM_REQUEST_DURATION.observe(
+                    time.perf_counter() - start, engine=engine_name, model=model, status=status
+                )
+
+    def _record_usage(self, response, model: str, batched: bool = False, metered: bool = True):
+        """
+        Track a response's tokens and cost.
+
+        Args:
+            response: Message (real-time or from a message batch)
+            model: Model the request was sent to
+            batched: Response came from a message batch (billed at BATCH_PRICE_FACTOR)
+            metered: Count it in the process metrics (False for a replayed batch result)
+        """
+        engine_name = self.__class__.__name__
+        usage = response.usage
+
+        # Calculate cost (approximate - list prices of the routed model)
+        call_cost = request_cost(model, usage.input_tokens, usage.output_tokens)
+        if batched:
+            call_cost *= BATCH_PRICE_FACTOR
+        with self._usage_lock:
             self.total_input_tokens += usage.input_tokens
             self.total_output_tokens += usage.output_tokens
+            self.total_cost += call_cost
 
-            # Calculate cost (approximate - adjust based on actual pricing)
-            input_cost = (usage.input_tokens / 1_000_000) * 3.0  # $3/million input tokens
-            output_cost = (usage.output_tokens / 1_000_000) * 15.0  # $15/million output tokens
-            request_cost = input_cost + output_cost
-            self.total_cost += request_cost
+        if metered:
+            LLM_TOKENS.inc(usage.input_tokens, engine=engine_name, model=model, direction="input")
+            LLM_TOKENS.inc(usage.output_tokens, engine=engine_name, model=model, direction="output")
+            LLM_COST.inc(call_cost, engine=engine_name, model=model)
 
-            # Log
-            self._log_decision(
-                f"Claude API call: {usage.input_tokens} in, {usage.output_tokens} out, ${request_cost:.4f}"
-            )
+        # Log
+        source = "Claude batch result" if batched else "Claude API call"
+        self._log_decision(
+            f"{source} ({model}): {usage.input_tokens} in, {usage.output_tokens} out, ${call_cost:.4f}"
+        )
+
+    def _call_claude_structured(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        output: StructuredOutput,
+        max_tokens: Optional[int] = None,
+        task: Optional[str] = None,
+        items: int = 1,
+    ) -> BaseModel:
+        """
+        Call Claude for structured output, repairing invalid fragments.
 
-            return response.content[0].text
+        Args:
+            system_prompt: System instructions
+            user_prompt: User query
+            output: Tool and schema for the response
+            max_tokens: Override default max_tokens
+            task: Routing task (see model_routing.TASKS; default model if None)
+            items: Requested item count, for sizing max_tokens
+
+        Returns:
+            Validated instance of output.model
 
-        except anthropic.APIError as e:
-            self._log_decision(f"Claude API error: {str(e)}", level="error")
-            raise
+        Raises:
+            StructuredOutputError: If the output is still invalid after repairs
+        """
+        call_route = self._route(task, items) if task else None
+        text = self._call_claude(
+            system_prompt, user_prompt, max_tokens=max_tokens, tool=output.tool, call_route=call_route
+        )
+        # Repairs use the routed model; fragments are small and aren't part of the output history
+        model = call_route.model if call_route else None
+        result, repaired = output.parse(
+            text,
+            user_prompt,
+            call=lambda prompt, tool: self._call_claude(
+                system_prompt, prompt, max_tokens=max_tokens, tool=tool, model=model
+            ),
+            engine=self.__class__.__name__,
+        )
+        if repaired:
+            self._log_decision(f"Repaired invalid {output.tool_name} output: {', '.join(repaired)}", level="warning")
+        return result
+
+    def _route(self, task: str, items: int = 1) -> Route:
+        """
+        Choose the model and max_tokens for a task (see model_routing).
+
+        Args:
+            task: Task name (e.g., "lesson", "diagnostic", "worksheet_tier3")
+            items: Requested item count (questions, lessons, sections)
+
+        Returns:
+            Route
+        """
+        call_route = route(task, items)
+        self._log_decision(
+            f"Routing {task} ({call_route.items} items) to {call_route.model}, "
+            f"max_tokens={call_route.max_tokens} ({call_route.source})",
+            metadata={"task": task, "model": call_route.model, "max_tokens": call_route.max_tokens},
+        )
+        return call_route
+
+    def _stream_claude(self, request: Dict, start: float, options: Optional[Dict] = None):
+        """
+        Make a streamed Claude call, recording time to first token.
+
+        Args:
+            request: messages.create keyword arguments
+            start: perf_counter() when the call was started
+            options: Request options (timeout)
+
+        Returns:
+            Final Message (same shape as messages.create)
+        """
+        with self.client.messages.stream(**request, **(options or {})) as stream:
+            for _ in stream.text_stream:
+                LLM_TIME_TO_FIRST_TOKEN.observe(
+                    time.perf_counter() - start, engine=self.__class__.__name__, model=request["model"]
+                )
+                break
+            return stream.get_final_message()
+
+    def set_class_snapshot(self, snapshot: Optional[ClassSnapshot]):
+        """
+        Attach a precomputed class snapshot (built once per pipeline run).
+
+        Args:
+            snapshot: ClassSnapshot from StudentModelInterface.get_class_snapshot()
+        """
+        self.class_snapshot = snapshot
+
+    def _get_class_snapshot(self, class_id: str, concept_ids: Optional[List[str]] = None) -> Optional[ClassSnapshot]:
+        """
+        Get class snapshot, preferring the one attached by the pipeline.
+
+        Args:
+            class_id: Class identifier
+            concept_ids: Concepts that must have mastery loaded (optional)
+
+        Returns:
+            ClassSnapshot or None if class not found
+        """
+        snapshot = self.class_snapshot
+        if snapshot is not None and snapshot.class_id == class_id:
+            if not concept_ids or all(snapshot.has_concept(c) for c in concept_ids):
+                return snapshot
+
+        return self.student_model.get_class_snapshot(class_id, concept_ids)
+
+    def _find_reusable(self, content_type: str, force_fresh: bool = False, **request) -> Optional[ReuseMatch]:
+        """
+        Look for stored content to reuse or adapt before generating.
+
+        Args:
+            content_type: "lesson" or "unit_plan"
+            force_fresh: Skip the lookup and always generate
+            **request: find_reusable() arguments (topic, grade_level, subject, ...)
+
+        Returns:
+            ReuseMatch or None to generate from scratch
+        """
+        if force_fresh:
+            self._log_decision("Fresh generation requested, skipping reuse lookup")
+            return None
+
+        match = find_reusable(content_type, **request)
+        if match is not None:
+            self._log_decision(
+                f"Stored {content_type} {match.content_id} matches (similarity {match.similarity:.3f}): "
+                + ("reusing as-is" if match.decision == "reuse" else f"adapting (different {match.reason})"),
+                metadata={"reuse_decision": match.decision, "source_id": match.content_id},
+            )
+        return match
 
     def _log_decision(self, message: str, level: str = "info", metadata: Optional[Dict] = None):
         """
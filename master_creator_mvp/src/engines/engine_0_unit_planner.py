@@ -33,6 +33,7 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 from .base_engine import BaseEngine
+from .structured_output import StructuredOutput, output_model
 
 
 # ═══════════════════════════════════════════════════════════
@@ -82,6 +83,22 @@ class UnitPlan(BaseModel):
     # Metadata
     generated_at: str
     cost: float
+    reused_from: Optional[str] = None  # Stored unit plan returned instead of generating
+
+
+# Claude fills in the UbD stages and lessons; ids, title and metadata are added by the engine
+UNIT_PLAN_OUTPUT = StructuredOutput(
+    "record_unit_plan",
+    output_model(
+        "UnitPlanContent",
+        UnitPlan,
+        exclude=(
+            "unit_id", "unit_title", "grade_level", "subject", "total_lessons", "generated_at", "cost",
+            "reused_from",
+        ),
+    ),
+    "Record the complete UbD unit plan",
+)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -105,10 +122,14 @@ class UnitPlanDesigner(BaseEngine):
         num_lessons: int,
         standards: Optional[List[str]] = None,
         class_id: Optional[str] = None,
+        force_fresh: bool = False,
     ) -> UnitPlan:
         """
         Generate complete unit plan.
 
+        A stored unit plan with a matching title is returned as-is, or
+        adapted, instead of generating from scratch (see content_storage.reuse).
+
         Args:
             unit_title: Unit title (e.g., "Ecosystems and Biodiversity")
             grade_level: Grade level
@@ -116,6 +137,7 @@ class UnitPlanDesigner(BaseEngine):
             num_lessons: Number of lessons in unit (typically 5-15)
             standards: Standards addressed
             class_id: Optional class ID for context
+            force_fresh: Skip the reuse lookup and always call Claude
 
         Returns:
             UnitPlan with multi-lesson sequence
@@ -131,6 +153,20 @@ class UnitPlanDesigner(BaseEngine):
         if class_id:
             class_context = self._get_class_context(class_id)
 
+        # Reuse or adapt a stored unit plan with the same title
+        match = self._find_reusable(
+            "unit_plan",
+            force_fresh=force_fresh,
+            topic=unit_title,
+            grade_level=grade_level,
+            subject=subject,
+            standards=standards,
+            size=num_lessons,
+            class_specific=bool(class_context),
+        )
+        if match is not None and match.decision == "reuse":
+            return UnitPlan(**{**match.content, "unit_id": unit_id, "cost": 0.0, "reused_from": match.content_id})
+
         # Generate unit plan via Claude
         unit_data = self._generate_unit_plan(
             unit_title=unit_title,
@@ -139,6 +175,7 @@ class UnitPlanDesigner(BaseEngine):
             num_lessons=num_lessons,
             standards=standards,
             class_context=class_context,
+            reference_unit=match.content if match is not None else None,
         )
 
         # Build UnitPlan object
@@ -148,12 +185,12 @@ class UnitPlanDesigner(BaseEngine):
             grade_level=grade_level,
             subject=subject,
             total_lessons=num_lessons,
-            total_duration_days=unit_data.get("total_duration_days", num_lessons * 2),
+            total_duration_days=unit_data["total_duration_days"],
             enduring_understandings=unit_data["enduring_understandings"],
             essential_questions=unit_data["essential_questions"],
             key_knowledge=unit_data["key_knowledge"],
             key_skills=unit_data["key_skills"],
-            standards=standards or unit_data.get("standards", []),
+            standards=standards or unit_data["standards"],
             summative_assessments=unit_data["summative_assessments"],
             formative_assessments=unit_data["formative_assessments"],
             performance_tasks=unit_data["performance_tasks"],
@@ -178,6 +215,7 @@ class UnitPlanDesigner(BaseEngine):
         num_lessons: int,
         standards: Optional[List[str]],
         class_context: Optional[Dict],
+        reference_unit: Optional[Dict] = None,
     ) -> Dict:
         """
         Generate unit plan via Claude API.
@@ -189,9 +227,13 @@ class UnitPlanDesigner(BaseEngine):
             num_lessons: Number of lessons
             standards: Standards
             class_context: Class context from Student Model
+            reference_unit: Stored unit plan to adapt (optional)
 
         Returns:
-            Dict with unit plan data
+            Dict with unit plan data (validated against UNIT_PLAN_OUTPUT)
+
+        Raises:
+            StructuredOutputError: If Claude's output is still invalid after repairs
         """
         system_prompt = """You are an expert curriculum designer specializing in Understanding by Design (UbD).
 
@@ -214,7 +256,7 @@ UbD Framework (Backward Design):
    - WHERETO elements for engagement and effectiveness
    - Lesson-by-lesson progression
 
-Respond ONLY with valid JSON in this exact format:
+Record the unit plan by calling the record_unit_plan tool, for example:
 
 {
   "total_duration_days": 10,
@@ -289,6 +331,19 @@ Respond ONLY with valid JSON in this exact format:
 - Total Students: {class_context.get('total_students', 'Unknown')}
 - Students with IEPs: {class_context.get('students_with_ieps', 'Unknown')}
 - Reading Levels: {class_context.get('reading_level_distribution', 'Mixed')}
+"""
+
+        if reference_unit:
+            reference = {
+                k: v
+                for k, v in reference_unit.items()
+                if k not in ("unit_id", "generated_at", "cost", "reused_from")
+            }
+            user_prompt += f"""
+**Existing Unit Plan to Adapt:**
+A stored unit plan with a closely matching title is below. Adapt it rather than starting over: keep what fits, and change what the title, standards, number of lessons or class context above require.
+
+{json.dumps(reference, indent=2)}
 """
 
         user_prompt += """
@@ -300,61 +355,14 @@ Create a comprehensive unit plan that:
 5. Provides 2-3 enduring understandings
 6. Provides 3-5 essential questions
 
-Respond ONLY with the JSON object. No additional text."""
+Record the unit plan with the record_unit_plan tool."""
 
         self._log_decision("Calling Claude API for unit plan generation")
-        response_text = self._call_claude(system_prompt, user_prompt)
-
-        # Parse response
-        unit_data = self._parse_unit_response(response_text)
-
-        return unit_data
+        unit_data = self._call_claude_structured(
+            system_prompt, user_prompt, UNIT_PLAN_OUTPUT, task="unit_plan", items=num_lessons
+        )
 
-    def _parse_unit_response(self, response_text: str) -> Dict:
-        """Parse Claude's JSON response."""
-        try:
-            data = json.loads(response_text)
-            return data
-        except json.JSONDecodeError:
-            self._log_decision("JSON parse error, attempting extraction", level="warning")
-
-            # Try to extract JSON
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-
-            if json_match:
-                try:
-                    data = json.loads(json_match.group(0))
-                    return data
-                except:
-                    pass
-
-            # Fallback
-            self._log_decision("Could not parse unit response", level="error")
-            return {
-                "total_duration_days": 10,
-                "enduring_understandings": ["Error generating unit plan"],
-                "essential_questions": ["Please try again"],
-                "key_knowledge": [],
-                "key_skills": [],
-                "standards": [],
-                "summative_assessments": [],
-                "formative_assessments": [],
-                "performance_tasks": [],
-                "lessons": [
-                    {
-                        "lesson_number": 1,
-                        "lesson_title": "Error",
-                        "duration_minutes": 45,
-                        "learning_objectives": ["Error"],
-                        "key_concepts": [],
-                        "activities": [],
-                        "assessment_type": "formative",
-                    }
-                ],
-                "differentiation_strategies": [],
-                "resources": [],
-            }
+        return unit_data.model_dump()
 
     def _get_class_context(self, class_id: str) -> Dict:
         """
@@ -367,23 +375,12 @@ Respond ONLY with the JSON object. No additional text."""
             Dict with class context
         """
         try:
-            roster = self.student_model.get_class_roster(class_id)
-            students = self.student_model.get_class_students(class_id)
-
-            # Count IEP students
-            students_with_ieps = sum(1 for s in students if s.has_iep)
-
-            # Get reading level distribution
-            reading_levels = {}
-            for student in students:
-                level = student.reading_level.value if student.reading_level else "unknown"
-                reading_levels[level] = reading_levels.get(level, 0) + 1
-
-            return {
-                "total_students": roster.total_students,
-                "students_with_ieps": students_with_ieps,
-                "reading_level_distribution": reading_levels,
-            }
+            snapshot = self._get_class_snapshot(class_id)
+            if not snapshot:
+                self._log_decision(f"Class {class_id} not found", level="warning")
+                return {}
+
+            return snapshot.to_class_context()
         except Exception as e:
             self._log_decision(f"Could not fetch class context: {str(e)}", level="warning")
             return {}
@@ -22,11 +22,13 @@ Queries Student Model for:
 """
 
 import json
+from datetime import datetime
 from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
 from .base_engine import BaseEngine
+from .structured_output import StructuredOutput, output_model
 
 
 # ═══════════════════════════════════════════════════════════
@@ -72,6 +74,22 @@ class LessonBlueprint(BaseModel):
     class_context: Optional[Dict] = None  # Student Model data if class_id provided
     research_citations: List[str] = []
     generated_at: str
+    reused_from: Optional[str] = None  # Stored lesson returned instead of generating
+
+
+# Claude fills in the sections and citations; request fields and ids are added by the engine
+LESSON_OUTPUT = StructuredOutput(
+    "record_lesson",
+    output_model(
+        "LessonContent",
+        LessonBlueprint,
+        exclude=(
+            "lesson_id", "topic", "grade_level", "subject", "duration_minutes", "standards",
+            "class_context", "generated_at", "reused_from",
+        ),
+    ),
+    "Record the complete 10-section lesson plan",
+)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -95,10 +113,14 @@ class LessonArchitect(BaseEngine):
         duration_minutes: int = 45,
         standards: Optional[List[str]] = None,
         class_id: Optional[str] = None,
+        force_fresh: bool = False,
     ) -> LessonBlueprint:
         """
         Generate a complete 10-part lesson blueprint.
 
+        A stored lesson on a matching topic is returned as-is, or adapted,
+        instead of generating from scratch (see content_storage.reuse).
+
         Args:
             topic: Lesson topic (e.g., "Photosynthesis Process")
             grade_level: Grade level ("9", "10", "11", "12")
@@ -106,6 +128,7 @@ class LessonArchitect(BaseEngine):
             duration_minutes: Lesson duration (default 45)
             standards: List of standards (NGSS, CCSS, etc.)
             class_id: Optional class ID to query Student Model
+            force_fresh: Skip the reuse lookup and always call Claude
 
         Returns:
             LessonBlueprint with all 10 sections
@@ -130,6 +153,20 @@ class LessonArchitect(BaseEngine):
                 self._log_decision(f"Class {class_id} not found, proceeding without class context", level="warning")
                 class_context = None  # Set to None so it's not used in prompts
 
+        # Step 1.5: Reuse or adapt a stored lesson on the same topic
+        match = self._find_reusable(
+            "lesson",
+            force_fresh=force_fresh,
+            topic=topic,
+            grade_level=grade_level,
+            subject=subject,
+            standards=standards,
+            size=duration_minutes,
+            class_specific=class_context is not None,
+        )
+        if match is not None and match.decision == "reuse":
+            return LessonBlueprint(**{**match.content, "lesson_id": lesson_id, "reused_from": match.content_id})
+
         # Step 2: Build prompt for Claude
         system_prompt = self._build_system_prompt()
         user_prompt = self._build_user_prompt(
@@ -139,48 +176,16 @@ class LessonArchitect(BaseEngine):
             duration_minutes=duration_minutes,
             standards=standards or [],
             class_context=class_context,
+            reference_lesson=match.content if match is not None else None,
         )
 
-        # Step 3: Call Claude API
+        # Step 3: Call Claude API (tool-use output validated against LessonContent)
         self._log_decision("Calling Claude API for lesson generation")
-        response_text = self._call_claude(system_prompt, user_prompt)
-
-        # DEBUG: Log the raw response
-        print("\n" + "="*80)
-        print("CLAUDE RESPONSE (first 1000 chars):")
-        print("="*80)
-        print(response_text[:1000])
-        print("="*80 + "\n")
-
-        # Step 4: Parse response into structured format
-        lesson_data = self._parse_lesson_response(response_text)
-
-        # DEBUG: Log parsed data
-        print("\n" + "="*80)
-        print("PARSED LESSON DATA:")
-        print("="*80)
-        print(f"Keys in lesson_data: {list(lesson_data.keys())}")
-        print("="*80 + "\n")
-
-        # Step 4.5: Validate that we have sections
-        if "sections" not in lesson_data:
-            error_msg = f"Claude response missing 'sections' key. Response preview: {str(lesson_data)[:500]}"
-            self._log_decision(error_msg, level="error")
-            raise ValueError(f"Invalid lesson response format: missing 'sections' key. This usually means the Claude API call failed or returned an unexpected format.")
-
-        # Step 5: Build LessonBlueprint
-        sections = []
-        for idx, section_data in enumerate(lesson_data["sections"], start=1):
-            sections.append(
-                LessonSection(
-                    section_number=idx,
-                    section_name=section_data["name"],
-                    duration_minutes=section_data.get("duration"),
-                    content=section_data["content"],
-                    teacher_notes=section_data.get("notes"),
-                )
-            )
+        content = self._call_claude_structured(
+            system_prompt, user_prompt, LESSON_OUTPUT, task="lesson", items=10
+        )
 
+        # Step 4: Build LessonBlueprint
         blueprint = LessonBlueprint(
             lesson_id=lesson_id,
             topic=topic,
@@ -188,10 +193,13 @@ class LessonArchitect(BaseEngine):
             subject=subject,
             duration_minutes=duration_minutes,
             standards=standards or [],
-            sections=sections,
+            sections=[
+                section.model_copy(update={"section_number": idx})
+                for idx, section in enumerate(content.sections, start=1)
+            ],
             class_context=class_context,
-            research_citations=lesson_data.get("citations", []),
-            generated_at=lesson_data.get("timestamp", ""),
+            research_citations=content.research_citations,
+            generated_at=datetime.utcnow().isoformat(),
         )
 
         self._log_decision(f"Lesson generated successfully: {lesson_id}")
@@ -210,33 +218,14 @@ class LessonArchitect(BaseEngine):
         Returns:
             Dict with class context (student count, IEPs, reading levels)
         """
-        # Get class roster summary
-        roster = self.student_model.get_class_roster(class_id)
+        # Shared per-class snapshot (roster, IEPs, reading levels)
+        snapshot = self._get_class_snapshot(class_id)
 
-        if not roster:
+        if not snapshot:
             self._log_decision(f"Class {class_id} not found", level="warning")
             return {"error": "Class not found"}
 
-        # Get detailed student profiles
-        students = self.student_model.get_class_students(class_id)
-
-        # Aggregate reading levels
-        reading_level_counts = {}
-        for student in students:
-            level = student.reading_level.value
-            reading_level_counts[level] = reading_level_counts.get(level, 0) + 1
-
-        # Get students with IEPs (detailed)
-        iep_students = [s for s in students if s.has_iep]
-
-        return {
-            "class_id": class_id,
-            "class_name": roster.class_name,
-            "total_students": roster.total_students,
-            "students_with_ieps": roster.students_with_ieps,
-            "reading_level_distribution": reading_level_counts,
-            "iep_accommodations_needed": len(iep_students) > 0,
-        }
+        return snapshot.to_class_context()
 
     def _build_system_prompt(self) -> str:
         """Build system prompt for Claude."""
@@ -249,21 +238,10 @@ Your task is to create comprehensive, standards-aligned lesson plans that:
 - Provide differentiation strategies
 - Reference educational research when appropriate
 
-You must respond ONLY with valid JSON in this exact format:
-
-{
-  "sections": [
-    {
-      "name": "Opening / Hook",
-      "duration": 5,
-      "content": "Detailed description of the opening activity...",
-      "notes": "Teacher notes and tips..."
-    },
-    ... (10 sections total)
-  ],
-  "citations": ["Module X: Research citation...", ...],
-  "timestamp": "2024-11-13T12:00:00Z"
-}
+Record the lesson plan by calling the record_lesson tool: one entry in
+"sections" per section (section_number, section_name, duration_minutes,
+content, teacher_notes), and research citations ("Module X: ...") in
+"research_citations".
 
 The 10 required sections are:
 1. Opening / Hook
@@ -287,8 +265,9 @@ Be specific, practical, and teacher-friendly. Avoid jargon."""
         duration_minutes: int,
         standards: List[str],
         class_context: Optional[Dict],
+        reference_lesson: Optional[Dict] = None,
     ) -> str:
-        """Build user prompt with all context."""
+        """Build user prompt with all context (and a stored lesson to adapt, if any)."""
         prompt = f"""Create a {duration_minutes}-minute lesson plan for:
 
 **Topic:** {topic}
@@ -311,10 +290,19 @@ Be specific, practical, and teacher-friendly. Avoid jargon."""
 - IEP Accommodations Needed: {'Yes' if class_context['iep_accommodations_needed'] else 'No'}
 
 Please consider this class composition when designing differentiation strategies.
+"""
+
+        if reference_lesson:
+            reference = {"topic": reference_lesson.get("topic"), "sections": reference_lesson.get("sections", [])}
+            prompt += f"""
+**Existing Lesson to Adapt:**
+A stored lesson on a closely matching topic is below. Adapt it rather than starting over: keep what fits, and change what the topic, standards, duration or class context above require.
+
+{json.dumps(reference, indent=2)}
 """
 
         prompt += """
-Generate a complete 10-section lesson plan in JSON format as specified in the system prompt.
+Generate a complete 10-section lesson plan as specified in the system prompt.
 
 Ensure the lesson:
 1. Has an engaging hook that connects to students' lives
@@ -326,70 +314,10 @@ Ensure the lesson:
 7. Lists all necessary materials
 8. Has a meaningful closure that reinforces learning
 
-Respond ONLY with the JSON object. No additional text."""
+Record the lesson plan with the record_lesson tool."""
 
         return prompt
 
-    def _parse_lesson_response(self, response_text: str) -> Dict:
-        """
-        Parse Claude's JSON response.
-
-        Args:
-            response_text: Claude's response (should be JSON)
-
-        Returns:
-            Dict with parsed lesson data
-        """
-        import re
-
-        # Try different extraction methods in order
-
-        # Method 1: Direct JSON parse
-        try:
-            lesson_data = json.loads(response_text)
-            return lesson_data
-        except json.JSONDecodeError:
-            pass
-
-        # Method 2: Extract from markdown code blocks (```json ... ```)
-        try:
-            self._log_decision("Attempting to extract JSON from markdown", level="info")
-            json_block_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_text, re.DOTALL)
-            if json_block_match:
-                lesson_data = json.loads(json_block_match.group(1))
-                self._log_decision("Successfully extracted JSON from markdown block", level="info")
-                return lesson_data
-        except (json.JSONDecodeError, AttributeError) as e:
-            self._log_decision(f"Markdown extraction failed: {e}", level="warning")
-
-        # Method 3: Find first complete JSON object
-        try:
-            self._log_decision("Attempting regex JSON extraction", level="info")
-            json_match = re.search(r'\{(?:[^{}]|(?:\{[^{}]*\}))*\}', response_text, re.DOTALL)
-            if json_match:
-                lesson_data = json.loads(json_match.group(0))
-                self._log_decision("Successfully extracted JSON via regex", level="info")
-                return lesson_data
-        except (json.JSONDecodeError, AttributeError) as e:
-            self._log_decision(f"Regex extraction failed: {e}", level="warning")
-
-        # Fallback: Return error structure with response preview
-        self._log_decision("Could not parse lesson response - all methods failed", level="error")
-        self._log_decision(f"Response preview: {response_text[:200]}...", level="error")
-
-        return {
-            "sections": [
-                {
-                    "name": "Error",
-                    "duration": None,
-                    "content": "Failed to parse lesson response. Please try again.",
-                    "notes": response_text[:1000],  # Increased from 500 to see more
-                }
-            ],
-            "citations": [],
-            "timestamp": "",
-        }
-
 
 # ═══════════════════════════════════════════════════════════
 # CONVENIENCE FUNCTIONS
@@ -22,7 +22,6 @@ Differentiation Strategies:
 - Response length expectations
 """
 
-import json
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -30,7 +29,12 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 from .base_engine import BaseEngine
+from .structured_output import StructuredOutput, output_model
 from ..student_model.schemas import TierLevel, StudentProfile
+from ..student_model.snapshot import ClassSnapshot
+
+# Questions per tier when the caller doesn't specify counts
+DEFAULT_QUESTIONS_PER_TIER = {"tier_1": 5, "tier_2": 4, "tier_3": 3}
 
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -86,6 +90,13 @@ class WorksheetSet(BaseModel):
     cost: float
 
 
+QUESTIONS_OUTPUT = StructuredOutput(
+    "record_worksheet_questions",
+    output_model("WorksheetQuestionSet", questions=(List[WorksheetQuestion], ...)),
+    "Record the worksheet questions for one tier",
+)
+
+
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # ENGINE 2: WORKSHEET DESIGNER
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -109,6 +120,9 @@ class WorksheetDesigner(BaseEngine):
         diagnostic_results: Dict,  # From Engine 5
         standards: Optional[List[str]] = None,
         num_questions_per_tier: Dict[str, int] = None,
+        previous: Optional[WorksheetSet] = None,
+        regenerate_tiers: Optional[List[str]] = None,
+        shared_questions: Optional[Dict[str, List[WorksheetQuestion]]] = None,
     ) -> WorksheetSet:
         """
         Generate 3-tier differentiated worksheets.
@@ -123,6 +137,12 @@ class WorksheetDesigner(BaseEngine):
             standards: List of standards addressed
             num_questions_per_tier: Dict specifying question counts per tier
                                    (default: {"tier_1": 5, "tier_2": 4, "tier_3": 3})
+            previous: Earlier worksheet set for the same lesson and diagnostic
+            regenerate_tiers: With previous, the tiers to generate new questions for;
+                              the other tiers keep previous's questions
+            shared_questions: Question sets per tier from generate_tier_questions(),
+                              shared by several classes; only the roster is
+                              mapped here (no Claude calls)
 
         Returns:
             WorksheetSet with 3 differentiated worksheets
@@ -135,14 +155,12 @@ class WorksheetDesigner(BaseEngine):
 
         # Default question counts
         if num_questions_per_tier is None:
-            num_questions_per_tier = {
-                "tier_1": 5,
-                "tier_2": 4,
-                "tier_3": 3,
-            }
+            num_questions_per_tier = DEFAULT_QUESTIONS_PER_TIER
 
-        # Step 1: Get class information
-        roster = self.student_model.get_class_roster(class_id)
+        # Step 1: Get class information (shared snapshot: roster + IEPs)
+        snapshot = self._get_class_snapshot(class_id)
+        if not snapshot:
+            raise ValueError(f"Class {class_id} not found")
 
         # Step 2: Organize students by tier (from diagnostic results)
         tier_assignments = self._organize_students_by_tier(
@@ -151,48 +169,47 @@ class WorksheetDesigner(BaseEngine):
 
         # Step 3: Get student profiles for each tier
         tier_1_students = self._get_student_roster(
-            tier_assignments["tier_1"], class_id
+            tier_assignments["tier_1"], class_id, snapshot
         )
         tier_2_students = self._get_student_roster(
-            tier_assignments["tier_2"], class_id
+            tier_assignments["tier_2"], class_id, snapshot
         )
         tier_3_students = self._get_student_roster(
-            tier_assignments["tier_3"], class_id
-        )
-
-        # Step 4: Generate questions for each tier via Claude
-        tier_1_questions = self._generate_tier_questions(
-            tier_level="tier_1",
-            learning_objective=learning_objective,
-            lesson_topic=lesson_topic,
-            grade_level=grade_level,
-            subject=subject,
-            num_questions=num_questions_per_tier["tier_1"],
-            student_profiles=tier_1_students,
-            standards=standards,
+            tier_assignments["tier_3"], class_id, snapshot
         )
 
-        tier_2_questions = self._generate_tier_questions(
-            tier_level="tier_2",
-            learning_objective=learning_objective,
-            lesson_topic=lesson_topic,
-            grade_level=grade_level,
-            subject=subject,
-            num_questions=num_questions_per_tier["tier_2"],
-            student_profiles=tier_2_students,
-            standards=standards,
-        )
+        # Step 4: Generate questions for each tier via Claude (or keep a
+        # previous set's questions for tiers not being regenerated)
+        tier_questions = {}
+        partial = previous is not None and regenerate_tiers is not None
+        if shared_questions is not None:
+            self._log_decision("Using shared tier question sets; mapping class roster only")
+        for tier_level, student_profiles in (
+            ("tier_1", tier_1_students),
+            ("tier_2", tier_2_students),
+            ("tier_3", tier_3_students),
+        ):
+            if shared_questions is not None:
+                tier_questions[tier_level] = shared_questions[tier_level]
+                continue
+            if partial and tier_level not in regenerate_tiers:
+                tier_questions[tier_level] = getattr(previous, tier_level).questions
+                self._log_decision(f"Keeping {tier_level} questions from {previous.worksheet_id}")
+                continue
 
-        tier_3_questions = self._generate_tier_questions(
-            tier_level="tier_3",
-            learning_objective=learning_objective,
-            lesson_topic=lesson_topic,
-            grade_level=grade_level,
-            subject=subject,
-            num_questions=num_questions_per_tier["tier_3"],
-            student_profiles=tier_3_students,
-            standards=standards,
-        )
+            tier_questions[tier_level] = self._generate_tier_questions(
+                tier_level=tier_level,
+                learning_objective=learning_objective,
+                lesson_topic=lesson_topic,
+                grade_level=grade_level,
+                subject=subject,
+                num_questions=num_questions_per_tier[tier_level],
+                student_profiles=student_profiles,
+                standards=standards,
+            )
+        tier_1_questions = tier_questions["tier_1"]
+        tier_2_questions = tier_questions["tier_2"]
+        tier_3_questions = tier_questions["tier_3"]
 
         # Step 5: Build TierWorksheet objects
         tier_1_ws = TierWorksheet(
@@ -232,8 +249,8 @@ class WorksheetDesigner(BaseEngine):
             grade_level=grade_level,
             subject=subject,
             class_id=class_id,
-            class_name=roster.class_name,
-            total_students=roster.total_students,
+            class_name=snapshot.class_name,
+            total_students=snapshot.total_students,
             learning_objective=learning_objective,
             tier_1=tier_1_ws,
             tier_2=tier_2_ws,
@@ -287,6 +304,7 @@ class WorksheetDesigner(BaseEngine):
         self,
         student_ids: List[str],
         class_id: str,
+        snapshot: Optional[ClassSnapshot] = None,
     ) -> List[Dict]:
         """
         Get student roster with IEP and mastery info.
@@ -294,6 +312,7 @@ class WorksheetDesigner(BaseEngine):
         Args:
             student_ids: List of student IDs
             class_id: Class identifier
+            snapshot: Class snapshot (falls back to Student Model lookups if None)
 
         Returns:
             List of dicts with student info
@@ -301,7 +320,9 @@ class WorksheetDesigner(BaseEngine):
         roster = []
 
         for student_id in student_ids:
-            profile = self.student_model.get_student_profile(student_id)
+            profile = snapshot.get_profile(student_id) if snapshot else None
+            if profile is None:
+                profile = self.student_model.get_student_profile(student_id)
 
             if not profile:
                 continue
@@ -314,10 +335,13 @@ class WorksheetDesigner(BaseEngine):
 
             # Add IEP accommodations if applicable
             if profile.has_iep:
-                iep_data = self.student_model.get_iep_accommodations(student_id)
+                if snapshot and snapshot.has_student(student_id):
+                    iep_data = snapshot.get_iep(student_id)
+                else:
+                    iep_data = self.student_model.get_iep_accommodations(student_id)
                 if iep_data:
                     student_dict["iep_accommodations"] = [
-                        acc["type"] for acc in iep_data.accommodations
+                        acc.accommodation_type.value for acc in iep_data.accommodations if acc.enabled
                     ]
                     student_dict["primary_disability"] = iep_data.primary_disability.value
 
@@ -325,6 +349,47 @@ class WorksheetDesigner(BaseEngine):
 
         return roster
 
+    def generate_tier_questions(
+        self,
+        lesson_topic: str,
+        learning_objective: str,
+        grade_level: str,
+        subject: str,
+        standards: Optional[List[str]] = None,
+        num_questions_per_tier: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, List[WorksheetQuestion]]:
+        """
+        Generate each tier's questions without a class roster.
+
+        The question sets depend only on the lesson, so sections of a course
+        share them (passed to generate() as shared_questions).
+
+        Args:
+            lesson_topic: Lesson topic
+            learning_objective: Main learning objective (same for all tiers)
+            grade_level: Grade level
+            subject: Subject area
+            standards: List of standards addressed
+            num_questions_per_tier: Question counts per tier (default DEFAULT_QUESTIONS_PER_TIER)
+
+        Returns:
+            Dict of tier level to questions
+        """
+        num_questions_per_tier = num_questions_per_tier or DEFAULT_QUESTIONS_PER_TIER
+        return {
+            tier_level: self._generate_tier_questions(
+                tier_level=tier_level,
+                learning_objective=learning_objective,
+                lesson_topic=lesson_topic,
+                grade_level=grade_level,
+                subject=subject,
+                num_questions=num_questions_per_tier[tier_level],
+                student_profiles=None,
+                standards=standards,
+            )
+            for tier_level in ("tier_1", "tier_2", "tier_3")
+        }
+
     def _generate_tier_questions(
         self,
         tier_level: str,
@@ -333,7 +398,7 @@ class WorksheetDesigner(BaseEngine):
         grade_level: str,
         subject: str,
         num_questions: int,
-        student_profiles: List[Dict],
+        student_profiles: Optional[List[Dict]],
         standards: Optional[List[str]],
     ) -> List[WorksheetQuestion]:
         """
@@ -346,11 +411,14 @@ class WorksheetDesigner(BaseEngine):
             grade_level: Grade level
             subject: Subject
             num_questions: Number of questions to generate
-            student_profiles: Student roster for this tier
+            student_profiles: Student roster for this tier (None: no class context)
             standards: Standards addressed
 
         Returns:
             List of WorksheetQuestion objects
+
+        Raises:
+            StructuredOutputError: If Claude's output is still invalid after repairs
         """
         # Build tier-specific scaffolding guidance
         if tier_level == "tier_1":
@@ -390,7 +458,7 @@ Your task is to generate {num_questions} questions for {tier_level.upper()} stud
 
 CRITICAL: All tiers target the SAME learning objective but with DIFFERENT scaffolding levels.
 
-Respond ONLY with valid JSON in this exact format:
+Record the questions by calling the record_worksheet_questions tool, for example:
 
 {{
   "questions": [
@@ -421,83 +489,37 @@ Question types to use:
 **Topic:** {lesson_topic}
 **Grade Level:** {grade_level}
 **Subject:** {subject}
-**Students in this tier:** {len(student_profiles)}
 """
+        if student_profiles is not None:
+            user_prompt += f"**Students in this tier:** {len(student_profiles)}\n"
 
         if standards:
             user_prompt += f"\n**Standards:**\n{chr(10).join(f'- {s}' for s in standards)}\n"
 
         # Add IEP context if applicable
-        iep_count = sum(1 for s in student_profiles if s.get("has_iep", False))
+        iep_count = sum(1 for s in student_profiles or [] if s.get("has_iep", False))
         if iep_count > 0:
             user_prompt += f"\n**Note:** {iep_count} students have IEPs (accommodations will be applied by Engine 3)\n"
 
         user_prompt += """
-Generate the questions in JSON format. Ensure:
+Generate the questions. Ensure:
 1. Questions align with the learning objective
 2. Scaffolding is appropriate for the tier level
 3. Question types match tier expectations
 4. Include answer key and rubrics
 
-Respond ONLY with the JSON object."""
+Record the questions with the record_worksheet_questions tool."""
 
         self._log_decision(f"Calling Claude API for {tier_level} questions")
-        response_text = self._call_claude(system_prompt, user_prompt)
-
-        # Parse response
-        questions_data = self._parse_questions_response(response_text)
-
-        # Convert to WorksheetQuestion objects
-        questions = []
-        for q in questions_data["questions"]:
-            questions.append(
-                WorksheetQuestion(
-                    number=q["number"],
-                    question_type=q["question_type"],
-                    question_text=q["question_text"],
-                    scaffolding=q.get("scaffolding", []),
-                    correct_answer=q.get("correct_answer"),
-                    rubric=q.get("rubric"),
-                    standards=q.get("standards"),
-                )
-            )
+        # Tier 3 items (fill-in-blank, matching) are short enough for the fast model
+        task = "worksheet_tier3" if tier_level == "tier_3" else "worksheet"
+        questions = self._call_claude_structured(
+            system_prompt, user_prompt, QUESTIONS_OUTPUT, task=task, items=num_questions
+        ).questions
 
         self._log_decision(f"Generated {len(questions)} questions for {tier_level}")
         return questions
 
-    def _parse_questions_response(self, response_text: str) -> Dict:
-        """Parse Claude's JSON response."""
-        try:
-            data = json.loads(response_text)
-            return data
-        except json.JSONDecodeError:
-            self._log_decision("JSON parse error, attempting extraction", level="warning")
-
-            # Try to extract JSON
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-
-            if json_match:
-                try:
-                    data = json.loads(json_match.group(0))
-                    return data
-                except:
-                    pass
-
-            # Fallback
-            self._log_decision("Could not parse questions response", level="error")
-            return {
-                "questions": [
-                    {
-                        "number": 1,
-                        "question_type": "error",
-                        "question_text": "Error generating questions. Please try again.",
-                        "scaffolding": [],
-                        "correct_answer": "N/A",
-                    }
-                ]
-            }
-
     def _get_iep_summary(self, students: List[Dict]) -> Optional[str]:
         """
         Generate IEP summary for a tier.
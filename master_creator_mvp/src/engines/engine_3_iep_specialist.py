@@ -39,6 +39,7 @@ from pydantic import BaseModel
 from .base_engine import BaseEngine
 from .engine_2_worksheet_designer import WorksheetSet, TierWorksheet, WorksheetQuestion
 from ..student_model.schemas import AccommodationType, IEPData
+from ..student_model.snapshot import ClassSnapshot
 
 
 # ═══════════════════════════════════════════════════════════
@@ -94,6 +95,18 @@ class IEPSpecialist(BaseEngine):
     Ensures legal compliance with IDEA and Section 504 requirements.
     """
 
+    def generate(self, worksheet_set: WorksheetSet, **kwargs) -> ModifiedWorksheetSet:
+        """
+        Main generation method (see apply_accommodations).
+
+        Args:
+            worksheet_set: Original worksheet set from Engine 2
+
+        Returns:
+            ModifiedWorksheetSet with accommodations applied
+        """
+        return self.apply_accommodations(worksheet_set)
+
     def apply_accommodations(
         self,
         worksheet_set: WorksheetSet,
@@ -116,10 +129,14 @@ class IEPSpecialist(BaseEngine):
 
         accommodations_log = []
 
+        # Shared class snapshot: IEP data for every student, loaded once
+        snapshot = self._get_class_snapshot(worksheet_set.class_id)
+
         # Step 1: Apply accommodations to Tier 1
         tier_1_modified, tier_1_accommodations = self._apply_tier_accommodations(
             tier_worksheet=worksheet_set.tier_1,
             class_id=worksheet_set.class_id,
+            snapshot=snapshot,
         )
         accommodations_log.extend(tier_1_accommodations)
 
@@ -127,6 +144,7 @@ class IEPSpecialist(BaseEngine):
         tier_2_modified, tier_2_accommodations = self._apply_tier_accommodations(
             tier_worksheet=worksheet_set.tier_2,
             class_id=worksheet_set.class_id,
+            snapshot=snapshot,
         )
         accommodations_log.extend(tier_2_accommodations)
 
@@ -134,6 +152,7 @@ class IEPSpecialist(BaseEngine):
         tier_3_modified, tier_3_accommodations = self._apply_tier_accommodations(
             tier_worksheet=worksheet_set.tier_3,
             class_id=worksheet_set.class_id,
+            snapshot=snapshot,
         )
         accommodations_log.extend(tier_3_accommodations)
 
@@ -173,6 +192,7 @@ class IEPSpecialist(BaseEngine):
         self,
         tier_worksheet: TierWorksheet,
         class_id: str,
+        snapshot: Optional[ClassSnapshot] = None,
     ) -> tuple[TierWorksheet, List[AccommodationApplication]]:
         """
         Apply accommodations to a single tier.
@@ -180,6 +200,7 @@ class IEPSpecialist(BaseEngine):
         Args:
             tier_worksheet: Original tier worksheet
             class_id: Class identifier
+            snapshot: Class snapshot (falls back to Student Model lookups if None)
 
         Returns:
             (Modified TierWorksheet, List of accommodation applications)
@@ -196,7 +217,7 @@ class IEPSpecialist(BaseEngine):
 
         # Collect all accommodations needed for this tier
         tier_accommodations = self._collect_tier_accommodations(
-            iep_students, class_id
+            iep_students, class_id, snapshot
         )
 
         # Apply accommodations to questions
@@ -209,19 +230,19 @@ class IEPSpecialist(BaseEngine):
 
         # Log accommodations applied
         for student in iep_students:
-            iep_data = self.student_model.get_iep_accommodations(
-                student["student_id"]
-            )
+            iep_data = self._get_student_iep(student["student_id"], snapshot)
 
             if iep_data:
                 for acc in iep_data.accommodations:
+                    if not acc.enabled:
+                        continue
                     accommodations_log.append(
                         AccommodationApplication(
                             student_id=student["student_id"],
                             student_name=student["name"],
-                            accommodation_type=AccommodationType(acc["type"]),
+                            accommodation_type=acc.accommodation_type,
                             modification_description=self._get_modification_description(
-                                AccommodationType(acc["type"])
+                                acc.accommodation_type
                             ),
                             applied_at=datetime.utcnow().isoformat(),
                         )
@@ -244,6 +265,7 @@ class IEPSpecialist(BaseEngine):
         self,
         iep_students: List[Dict],
         class_id: str,
+        snapshot: Optional[ClassSnapshot] = None,
     ) -> Dict[str, int]:
         """
         Collect all accommodations needed for a tier.
@@ -251,6 +273,7 @@ class IEPSpecialist(BaseEngine):
         Args:
             iep_students: List of IEP student dicts
             class_id: Class identifier
+            snapshot: Class snapshot (falls back to Student Model lookups if None)
 
         Returns:
             Dict mapping accommodation type to count
@@ -258,19 +281,39 @@ class IEPSpecialist(BaseEngine):
         accommodation_counts = {}
 
         for student in iep_students:
-            iep_data = self.student_model.get_iep_accommodations(
-                student["student_id"]
-            )
+            iep_data = self._get_student_iep(student["student_id"], snapshot)
 
             if iep_data:
                 for acc in iep_data.accommodations:
-                    acc_type = acc["type"]
+                    if not acc.enabled:
+                        continue
+                    acc_type = acc.accommodation_type.value
                     accommodation_counts[acc_type] = (
                         accommodation_counts.get(acc_type, 0) + 1
                     )
 
         return accommodation_counts
 
+    def _get_student_iep(
+        self,
+        student_id: str,
+        snapshot: Optional[ClassSnapshot] = None,
+    ) -> Optional[IEPData]:
+        """
+        Get IEP data from the class snapshot, or the Student Model if not in it.
+
+        Args:
+            student_id: Student identifier
+            snapshot: Class snapshot
+
+        Returns:
+            IEPData or None if no IEP
+        """
+        if snapshot and snapshot.has_student(student_id):
+            return snapshot.get_iep(student_id)
+
+        return self.student_model.get_iep_accommodations(student_id)
+
     def _modify_question(
         self,
         question: WorksheetQuestion,
@@ -27,10 +27,12 @@ import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import numpy as np
 from pydantic import BaseModel
 
 from .base_engine import BaseEngine
-from ..student_model.schemas import StudentProfile, ConceptMastery
+from ..student_model.mastery_matrix import MasteryMatrix
+from ..student_model.schemas import StudentProfile
 
 
 # ═══════════════════════════════════════════════════════════
@@ -115,6 +117,19 @@ class AdaptiveEngine(BaseEngine):
     for optimal challenge and engagement.
     """
 
+    def generate(self, class_id: str, concept_ids: List[str], **kwargs) -> ClassAdaptivePlan:
+        """
+        Main generation method (see generate_class_plan).
+
+        Args:
+            class_id: Class identifier
+            concept_ids: Concepts to analyze
+
+        Returns:
+            ClassAdaptivePlan
+        """
+        return self.generate_class_plan(class_id, concept_ids)
+
     def generate_student_path(
         self,
         student_id: str,
@@ -130,8 +145,6 @@ class AdaptiveEngine(BaseEngine):
         Returns:
             LearningPath with personalized recommendations
         """
-        path_id = f"path_{uuid.uuid4().hex[:12]}"
-
         self._log_decision(f"Generating learning path for student {student_id}")
 
         # Get student profile
@@ -139,83 +152,30 @@ class AdaptiveEngine(BaseEngine):
         if not profile:
             raise ValueError(f"Student {student_id} not found")
 
-        # Get mastery data
+        # Get mastery data as a single-row matrix
         mastery_records = self.student_model.retrieve_concept_mastery(
             student_id=student_id,
             concept_ids=concept_ids,
         )
-
-        # Categorize concepts by mastery
-        mastered = []
-        developing = []
-        struggling = []
-        overall_mastery_sum = 0.0
-
-        for record in mastery_records:
-            mastery = record.mastery_probability
-            overall_mastery_sum += mastery
-
-            if mastery >= 0.75:
-                mastered.append(record.concept_id)
-            elif mastery >= 0.45:
-                developing.append(record.concept_id)
-            else:
-                struggling.append(record.concept_id)
-
-        overall_mastery = overall_mastery_sum / len(mastery_records) if mastery_records else 0.5
-
-        # Generate recommendations (prioritize ZPD concepts)
-        recommendations = self._generate_recommendations(
-            student_id=student_id,
-            mastery_records=mastery_records,
-            profile=profile,
-        )
-
-        # Find similar students
-        similar_students = self._find_similar_students(
-            student_id=student_id,
-            n_results=5,
+        matrix = MasteryMatrix.from_records(
+            [student_id],
+            concept_ids,
+            ((r.student_id, r.concept_id, r.mastery_probability) for r in mastery_records),
         )
 
-        # Determine suggested group
-        if overall_mastery >= 0.75:
-            suggested_group = "advanced"
-            extension_concepts = self._get_extension_concepts(concept_ids, mastery_records)
-        elif overall_mastery >= 0.45:
-            suggested_group = "on_track"
-            extension_concepts = []
-        else:
-            suggested_group = "needs_support"
-            extension_concepts = []
-
-        # Identify concepts to review
-        review_concepts = [c for c in developing if len(developing) > 3][:3]
+        groups = self._group_lookup(matrix)
 
-        # Build learning path
-        path = LearningPath(
-            student_id=student_id,
-            student_name=profile.student_name,
-            path_id=path_id,
-            overall_mastery=round(overall_mastery, 3),
-            mastered_concepts=mastered,
-            developing_concepts=developing,
-            struggling_concepts=struggling,
-            next_concepts=recommendations,
-            review_concepts=review_concepts,
-            extension_concepts=extension_concepts,
-            similar_students=similar_students,
-            suggested_group=suggested_group,
-            generated_at=datetime.utcnow().isoformat(),
-        )
-
-        self._log_decision(
-            f"Learning path generated: {path_id} | "
-            f"Overall mastery: {overall_mastery:.2f} | "
-            f"Group: {suggested_group}"
+        return self._build_learning_path(
+            profile=profile,
+            matrix=matrix,
+            row=0,
+            tiers=matrix.tiers()[0],
+            zpd=matrix.zpd_mask()[0],
+            overall_mastery=float(matrix.student_means()[0]),
+            suggested_group=groups[student_id],
+            similar_students=self._find_similar_students(student_id=student_id, n_results=5),
         )
 
-        return path
-
     def generate_class_plan(
         self,
         class_id: str,
@@ -224,6 +184,11 @@ class AdaptiveEngine(BaseEngine):
         """
         Generate adaptive plan for entire class.
 
+        Loads the class once (roster + mastery) into a MasteryMatrix and
+        derives tiers, ZPD, groups and class-wide stats with vectorized ops.
+        Similar-student lookups run as one batched k-NN over the class, so
+        per-student path construction is in-memory only.
+
         Args:
             class_id: Class identifier
             concept_ids: Concepts to analyze
@@ -235,8 +200,21 @@ class AdaptiveEngine(BaseEngine):
 
         self._log_decision(f"Generating adaptive plan for class {class_id}")
 
-        # Get all students
-        students = self.student_model.get_class_students(class_id)
+        # Get all students and their mastery (shared class snapshot)
+        snapshot = self._get_class_snapshot(class_id, concept_ids)
+        students = snapshot.students if snapshot else []
+        matrix = (
+            MasteryMatrix.from_snapshot(snapshot, concept_ids)
+            if snapshot
+            else MasteryMatrix([], concept_ids)
+        )
+
+        # Vectorized analytics over the whole class
+        tiers = matrix.tiers()
+        zpd = matrix.zpd_mask()
+        overall = matrix.student_means()
+        groups = self._group_lookup(matrix)
+        similar = self._find_similar_students_batch(matrix.student_ids, n_results=5)
 
         # Generate individual paths
         student_paths = []
@@ -244,11 +222,17 @@ class AdaptiveEngine(BaseEngine):
         on_track_group = []
         support_group = []
 
-        for student in students:
+        for row, student in enumerate(students):
             try:
-                path = self.generate_student_path(
-                    student_id=student.student_id,
-                    concept_ids=concept_ids,
+                path = self._build_learning_path(
+                    profile=student,
+                    matrix=matrix,
+                    row=row,
+                    tiers=tiers[row],
+                    zpd=zpd[row],
+                    overall_mastery=float(overall[row]),
+                    suggested_group=groups[student.student_id],
+                    similar_students=similar.get(student.student_id, []),
                 )
                 student_paths.append(path)
 
@@ -264,7 +248,7 @@ class AdaptiveEngine(BaseEngine):
                 self._log_decision(f"Error generating path for {student.student_id}: {str(e)}", level="warning")
 
         # Analyze class-wide mastery
-        class_mastery = self._analyze_class_mastery(class_id, concept_ids)
+        class_mastery = self._analyze_class_mastery(matrix)
 
         # Determine concepts to reteach (low class mastery)
         concepts_to_reteach = [
@@ -277,7 +261,7 @@ class AdaptiveEngine(BaseEngine):
         ]
 
         # Generate flexible grouping suggestions
-        flexible_grouping = self._generate_flexible_grouping(student_paths, concept_ids)
+        flexible_grouping = self._generate_flexible_grouping(matrix, zpd, student_paths)
 
         # Build class plan
         plan = ClassAdaptivePlan(
@@ -304,30 +288,123 @@ class AdaptiveEngine(BaseEngine):
 
         return plan
 
-    def _generate_recommendations(
+    def _build_learning_path(
         self,
-        student_id: str,
-        mastery_records: List[ConceptMastery],
         profile: StudentProfile,
+        matrix: MasteryMatrix,
+        row: int,
+        tiers: np.ndarray,
+        zpd: np.ndarray,
+        overall_mastery: float,
+        suggested_group: str,
+        similar_students: List[str],
+    ) -> LearningPath:
+        """
+        Build a learning path from one matrix row.
+
+        Args:
+            profile: Student profile
+            matrix: Mastery matrix containing the student
+            row: Student's row index in the matrix
+            tiers: Tier codes for the row (0 = no data)
+            zpd: ZPD mask for the row
+            overall_mastery: Student's mean mastery
+            suggested_group: "advanced", "on_track" or "needs_support"
+            similar_students: Students with similar learning profiles
+
+        Returns:
+            LearningPath
+        """
+        path_id = f"path_{uuid.uuid4().hex[:12]}"
+        student_id = profile.student_id
+        concept_ids = matrix.concept_ids
+
+        # Categorize concepts by mastery tier
+        mastered = [concept_ids[j] for j in np.flatnonzero(tiers == 1)]
+        developing = [concept_ids[j] for j in np.flatnonzero(tiers == 2)]
+        struggling = [concept_ids[j] for j in np.flatnonzero(tiers == 3)]
+
+        # Generate recommendations (prioritize ZPD concepts)
+        recommendations = self._generate_recommendations(
+            matrix=matrix,
+            row=row,
+            zpd=zpd,
+        )
+
+        # Extension concepts for advanced students
+        if suggested_group == "advanced":
+            extension_concepts = self._get_extension_concepts(mastered)
+        else:
+            extension_concepts = []
+
+        # Identify concepts to review
+        review_concepts = [c for c in developing if len(developing) > 3][:3]
+
+        # Build learning path
+        path = LearningPath(
+            student_id=student_id,
+            student_name=profile.student_name,
+            path_id=path_id,
+            overall_mastery=round(overall_mastery, 3),
+            mastered_concepts=mastered,
+            developing_concepts=developing,
+            struggling_concepts=struggling,
+            next_concepts=recommendations,
+            review_concepts=review_concepts,
+            extension_concepts=extension_concepts,
+            similar_students=similar_students,
+            suggested_group=suggested_group,
+            generated_at=datetime.utcnow().isoformat(),
+        )
+
+        self._log_decision(
+            f"Learning path generated: {path_id} | "
+            f"Overall mastery: {overall_mastery:.2f} | "
+            f"Group: {suggested_group}"
+        )
+
+        return path
+
+    def _group_lookup(self, matrix: MasteryMatrix) -> Dict[str, str]:
+        """
+        Map each student to a group by mean mastery (≥75% advanced, ≥45% on track).
+
+        Args:
+            matrix: Mastery matrix
+
+        Returns:
+            Dict mapping student_id to group name
+        """
+        return {
+            student_id: group
+            for group, student_ids in matrix.partition().items()
+            for student_id in student_ids
+        }
+
+    def _generate_recommendations(
+        self,
+        matrix: MasteryMatrix,
+        row: int,
+        zpd: np.ndarray,
     ) -> List[ConceptRecommendation]:
         """
         Generate prioritized concept recommendations.
 
         Args:
-            student_id: Student identifier
-            mastery_records: Mastery data
-            profile: Student profile
+            matrix: Mastery matrix
+            row: Student's row index
+            zpd: ZPD mask for the row (40-60% mastery = optimal challenge)
 
         Returns:
             List of ConceptRecommendation objects
         """
         recommendations = []
+        values = matrix.values[row]
 
-        for record in mastery_records:
-            mastery = record.mastery_probability
-
-            # Determine if in ZPD (40-60% mastery = optimal challenge)
-            in_zpd = 0.40 <= mastery <= 0.60
+        for j in np.flatnonzero(~np.isnan(values)):
+            concept_id = matrix.concept_ids[j]
+            mastery = float(values[j])
+            in_zpd = bool(zpd[j])
 
             # Determine priority
             if in_zpd:
@@ -372,8 +449,8 @@ class AdaptiveEngine(BaseEngine):
 
             recommendations.append(
                 ConceptRecommendation(
-                    concept_id=record.concept_id,
-                    concept_name=record.concept_id.replace("_", " ").title(),
+                    concept_id=concept_id,
+                    concept_name=concept_id.replace("_", " ").title(),
                     current_mastery=round(mastery, 3),
                     target_mastery=target_mastery,
                     in_zpd=in_zpd,
@@ -410,93 +487,104 @@ class AdaptiveEngine(BaseEngine):
                 student_id=student_id,
                 n_results=n_results,
             )
-            return similar
+            return [s["student_id"] if isinstance(s, dict) else s for s in similar or []]
         except Exception as e:
             self._log_decision(f"Could not find similar students: {str(e)}", level="warning")
             return []
 
+    def _find_similar_students_batch(
+        self,
+        student_ids: List[str],
+        n_results: int = 5,
+    ) -> Dict[str, List[str]]:
+        """
+        Find similar students for a whole class in one vector store call.
+
+        Args:
+            student_ids: Class roster
+            n_results: Similar students per student
+
+        Returns:
+            Dict mapping student_id to similar student IDs (within the class)
+        """
+        try:
+            similar = self.student_model.vector_store.find_similar_students_batch(
+                student_ids=student_ids,
+                n_results=n_results,
+            )
+            return {
+                sid: [s["student_id"] for s in neighbors]
+                for sid, neighbors in (similar or {}).items()
+            }
+        except Exception as e:
+            self._log_decision(f"Could not find similar students: {str(e)}", level="warning")
+            return {}
+
     def _get_extension_concepts(
         self,
-        concept_ids: List[str],
-        mastery_records: List[ConceptMastery],
+        mastered_concepts: List[str],
     ) -> List[str]:
         """
         Get extension concepts for advanced students.
 
         Args:
-            concept_ids: All concept IDs
-            mastery_records: Student's mastery records
+            mastered_concepts: Concept IDs the student has mastered (≥75%)
 
         Returns:
             List of extension concept IDs
         """
         # For now, return conceptual extensions
         # In production, this would query a concept graph
-        mastered_ids = {r.concept_id for r in mastery_records if r.mastery_probability >= 0.75}
-
-        # Simple heuristic: suggest related advanced concepts
-        extensions = []
-        for cid in concept_ids:
-            if cid in mastered_ids:
-                # Suggest advanced version
-                extensions.append(f"{cid}_advanced")
-
-        return extensions[:3]
+        return [f"{cid}_advanced" for cid in mastered_concepts][:3]
 
     def _analyze_class_mastery(
         self,
-        class_id: str,
-        concept_ids: List[str],
+        matrix: MasteryMatrix,
     ) -> Dict[str, float]:
         """
         Analyze average mastery per concept across class.
 
         Args:
-            class_id: Class identifier
-            concept_ids: Concepts to analyze
+            matrix: Class mastery matrix
 
         Returns:
-            Dict mapping concept_id to average mastery
+            Dict mapping concept_id to average mastery (0.5 if no data)
         """
+        means = matrix.concept_means()
         class_mastery = {}
 
-        for concept_id in concept_ids:
-            try:
-                distribution = self.student_model.get_class_mastery_distribution(
-                    class_id=class_id,
-                    concept_id=concept_id,
-                )
-                class_mastery[concept_id] = distribution.average_mastery
-            except Exception as e:
-                self._log_decision(f"Could not get mastery for {concept_id}: {str(e)}", level="warning")
+        for concept_id, mean in zip(matrix.concept_ids, means):
+            if np.isnan(mean):
+                self._log_decision(f"No mastery data for {concept_id}", level="warning")
                 class_mastery[concept_id] = 0.5
+            else:
+                class_mastery[concept_id] = float(mean)
 
         return class_mastery
 
     def _generate_flexible_grouping(
         self,
+        matrix: MasteryMatrix,
+        zpd: np.ndarray,
         student_paths: List[LearningPath],
-        concept_ids: List[str],
     ) -> List[Dict]:
         """
         Generate flexible grouping suggestions.
 
         Args:
-            student_paths: All student learning paths
-            concept_ids: Concepts
+            matrix: Class mastery matrix
+            zpd: ZPD mask for the matrix
+            student_paths: Generated learning paths (students without a path are excluded)
 
         Returns:
             List of grouping suggestions
         """
         groupings = []
+        has_path = np.isin(matrix.student_ids, [p.student_id for p in student_paths])
 
         # Group by ZPD for each concept
-        for concept_id in concept_ids[:3]:  # Top 3 concepts
-            zpd_group = []
-            for path in student_paths:
-                for rec in path.next_concepts:
-                    if rec.concept_id == concept_id and rec.in_zpd:
-                        zpd_group.append(path.student_id)
+        for j, concept_id in enumerate(matrix.concept_ids[:3]):  # Top 3 concepts
+            zpd_group = matrix.ids_where(zpd[:, j] & has_path)
 
             if len(zpd_group) >= 3:
                 groupings.append({
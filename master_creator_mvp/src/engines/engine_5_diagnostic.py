@@ -25,7 +25,6 @@ P(L_t | correct) = (P(L_t) * (1 - p_slip)) / (P(L_t) * (1 - p_slip) + (1 - P(L_t
 P(L_t | incorrect) = (P(L_t) * p_slip) / (P(L_t) * p_slip + (1 - P(L_t)) * (1 - p_guess))
 """
 
-import json
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -33,7 +32,9 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 from .base_engine import BaseEngine
+from .structured_output import StructuredOutput, output_model
 from ..student_model.schemas import TierLevel, ConceptMastery, PredictionLog
+from ..student_model.snapshot import ClassSnapshot
 
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -82,6 +83,13 @@ class DiagnosticResults(BaseModel):
     cost: float
 
 
+QUESTIONS_OUTPUT = StructuredOutput(
+    "record_diagnostic_questions",
+    output_model("DiagnosticQuestionSet", questions=(List[DiagnosticQuestion], ...)),
+    "Record the diagnostic questions",
+)
+
+
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # BAYESIAN KNOWLEDGE TRACING
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -245,6 +253,8 @@ class DiagnosticEngine(BaseEngine):
         num_questions_per_concept: int = 3,
         grade_level: str = "9",
         subject: str = "Science",
+        student_estimates: Optional[List[StudentMasteryEstimate]] = None,
+        questions: Optional[List[DiagnosticQuestion]] = None,
     ) -> DiagnosticResults:
         """
         Generate diagnostic assessment and estimate student mastery.
@@ -256,6 +266,10 @@ class DiagnosticEngine(BaseEngine):
             num_questions_per_concept: Questions per concept (default 3)
             grade_level: Grade level for question generation
             subject: Subject area
+            student_estimates: Mastery estimates from estimate_class_mastery()
+                (estimated here if None)
+            questions: Items from generate_questions(), shared by several
+                classes (generated here if None)
 
         Returns:
             DiagnosticResults with questions and mastery estimates
@@ -267,35 +281,23 @@ class DiagnosticEngine(BaseEngine):
         )
 
         # Step 1: Generate diagnostic questions via Claude
-        questions = self._generate_questions(
-            lesson_objectives=lesson_objectives,
-            concept_ids=concept_ids,
-            num_questions_per_concept=num_questions_per_concept,
-            grade_level=grade_level,
-            subject=subject,
-        )
-
-        # Step 2: Get student roster
-        students = self.student_model.get_class_students(class_id)
-        self._log_decision(f"Retrieved {len(students)} students from Student Model")
-
-        # Step 3: Estimate mastery for each student-concept pair
-        student_estimates = []
+        if questions is None:
+            questions = self._generate_questions(
+                lesson_objectives=lesson_objectives,
+                concept_ids=concept_ids,
+                num_questions_per_concept=num_questions_per_concept,
+                grade_level=grade_level,
+                subject=subject,
+            )
+        else:
+            self._log_decision(f"Using {len(questions)} shared diagnostic questions")
 
-        for student in students:
-            for concept_id in concept_ids:
-                estimate = self._estimate_student_mastery(
-                    student_id=student.student_id,
-                    concept_id=concept_id,
-                )
-                student_estimates.append(estimate)
+        # Steps 2-3: Estimate mastery for each student-concept pair
+        if student_estimates is None:
+            student_estimates = self.estimate_class_mastery(class_id, concept_ids)
 
         # Step 4: Calculate tier distribution
-        tier_counts = {
-            "tier_1": sum(1 for e in student_estimates if e.recommended_tier == TierLevel.TIER_1),
-            "tier_2": sum(1 for e in student_estimates if e.recommended_tier == TierLevel.TIER_2),
-            "tier_3": sum(1 for e in student_estimates if e.recommended_tier == TierLevel.TIER_3),
-        }
+        tier_counts = self.tier_distribution(student_estimates)
 
         # Step 5: Log predictions for Engine 6
         self._log_predictions(diagnostic_id, student_estimates)
@@ -319,6 +321,84 @@ class DiagnosticEngine(BaseEngine):
 
         return results
 
+    def generate_questions(
+        self,
+        lesson_objectives: List[str],
+        concept_ids: List[str],
+        num_questions_per_concept: int = 3,
+        grade_level: str = "9",
+        subject: str = "Science",
+    ) -> List[DiagnosticQuestion]:
+        """
+        Generate diagnostic items without estimating any class's mastery.
+
+        The items depend only on the lesson and concepts, so sections of a
+        course share them (passed to generate() as questions).
+
+        Args:
+            lesson_objectives: Learning objectives from Engine 1
+            concept_ids: Concept IDs to assess
+            num_questions_per_concept: Questions per concept (default 3)
+            grade_level: Grade level for question generation
+            subject: Subject area
+
+        Returns:
+            List of DiagnosticQuestion objects
+        """
+        return self._generate_questions(
+            lesson_objectives=lesson_objectives,
+            concept_ids=concept_ids,
+            num_questions_per_concept=num_questions_per_concept,
+            grade_level=grade_level,
+            subject=subject,
+        )
+
+    def estimate_class_mastery(
+        self,
+        class_id: str,
+        concept_ids: List[str],
+    ) -> List[StudentMasteryEstimate]:
+        """
+        Estimate mastery for every student-concept pair of a class.
+
+        Needs no Claude call, so the pipeline runs it before (and alongside)
+        question generation.
+
+        Args:
+            class_id: Class identifier
+            concept_ids: Concept IDs to estimate
+
+        Returns:
+            StudentMasteryEstimate per student and concept
+        """
+        # Step 2: Get student roster and mastery (shared class snapshot)
+        snapshot = self._get_class_snapshot(class_id, concept_ids)
+        students = snapshot.students if snapshot else []
+        self._log_decision(f"Retrieved {len(students)} students from Student Model")
+
+        # Step 3: Estimate mastery for each student-concept pair
+        student_estimates = []
+
+        for student in students:
+            for concept_id in concept_ids:
+                estimate = self._estimate_student_mastery(
+                    student_id=student.student_id,
+                    concept_id=concept_id,
+                    snapshot=snapshot,
+                )
+                student_estimates.append(estimate)
+
+        return student_estimates
+
+    @staticmethod
+    def tier_distribution(student_estimates: List[StudentMasteryEstimate]) -> Dict[str, int]:
+        """Count mastery estimates per recommended tier."""
+        return {
+            "tier_1": sum(1 for e in student_estimates if e.recommended_tier == TierLevel.TIER_1),
+            "tier_2": sum(1 for e in student_estimates if e.recommended_tier == TierLevel.TIER_2),
+            "tier_3": sum(1 for e in student_estimates if e.recommended_tier == TierLevel.TIER_3),
+        }
+
     def _generate_questions(
         self,
         lesson_objectives: List[str],
@@ -339,6 +419,9 @@ class DiagnosticEngine(BaseEngine):
 
         Returns:
             List of diagnostic questions
+
+        Raises:
+            StructuredOutputError: If Claude's output is still invalid after repairs
         """
         system_prompt = """You are an expert assessment designer for K-12 education.
 
@@ -351,7 +434,7 @@ Requirements:
 - Provide clear correct answers and explanations
 - Be age-appropriate and accessible
 
-Respond ONLY with valid JSON in this exact format:
+Record the questions by calling the record_diagnostic_questions tool, for example:
 
 {
   "questions": [
@@ -386,74 +469,25 @@ Respond ONLY with valid JSON in this exact format:
 - Vary question types for engagement
 - Ensure questions test understanding, not just recall
 
-Respond ONLY with the JSON object. No additional text."""
+Record the questions with the record_diagnostic_questions tool."""
 
         self._log_decision("Calling Claude API for question generation")
-        response_text = self._call_claude(system_prompt, user_prompt)
-
-        # Parse response
-        questions_data = self._parse_questions_response(response_text)
-
-        # Convert to DiagnosticQuestion objects
-        questions = []
-        for q in questions_data["questions"]:
-            questions.append(
-                DiagnosticQuestion(
-                    question_id=q["question_id"],
-                    question_text=q["question_text"],
-                    question_type=q["question_type"],
-                    concept_id=q["concept_id"],
-                    difficulty_level=q["difficulty_level"],
-                    correct_answer=q["correct_answer"],
-                    options=q.get("options"),
-                    rubric=q.get("rubric"),
-                    explanation=q.get("explanation"),
-                )
-            )
+        questions = self._call_claude_structured(
+            system_prompt,
+            user_prompt,
+            QUESTIONS_OUTPUT,
+            task="diagnostic",
+            items=len(concept_ids) * num_questions_per_concept,
+        ).questions
 
         self._log_decision(f"Generated {len(questions)} diagnostic questions")
         return questions
 
-    def _parse_questions_response(self, response_text: str) -> Dict:
-        """Parse Claude's JSON response for questions."""
-        try:
-            data = json.loads(response_text)
-            return data
-        except json.JSONDecodeError:
-            self._log_decision("JSON parse error, attempting extraction", level="warning")
-
-            # Try to extract JSON
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-
-            if json_match:
-                try:
-                    data = json.loads(json_match.group(0))
-                    return data
-                except:
-                    pass
-
-            # Fallback
-            self._log_decision("Could not parse questions response", level="error")
-            return {
-                "questions": [
-                    {
-                        "question_id": "error_q1",
-                        "question_text": "Error generating questions. Please try again.",
-                        "question_type": "multiple_choice",
-                        "concept_id": "unknown",
-                        "difficulty_level": "medium",
-                        "correct_answer": "A",
-                        "options": ["A) Error", "B) Error", "C) Error", "D) Error"],
-                        "explanation": response_text[:200],
-                    }
-                ]
-            }
-
     def _estimate_student_mastery(
         self,
         student_id: str,
         concept_id: str,
+        snapshot: Optional[ClassSnapshot] = None,
     ) -> StudentMasteryEstimate:
         """
         Estimate mastery for one student-concept pair using BKT.
@@ -461,15 +495,20 @@ Respond ONLY with the JSON object. No additional text."""
         Args:
             student_id: Student identifier
             concept_id: Concept identifier
+            snapshot: Class snapshot with preloaded mastery (queries Student Model if None)
 
         Returns:
             StudentMasteryEstimate with BKT parameters
         """
-        # Query Student Model for existing mastery data
-        mastery_records = self.student_model.retrieve_concept_mastery(
-            student_id=student_id,
-            concept_ids=[concept_id],
-        )
+        # Existing mastery data from snapshot, else query Student Model
+        if snapshot and snapshot.has_student(student_id) and snapshot.has_concept(concept_id):
+            mastery = snapshot.get_mastery(student_id, concept_id)
+            mastery_records = [mastery] if mastery else []
+        else:
+            mastery_records = self.student_model.retrieve_concept_mastery(
+                student_id=student_id,
+                concept_ids=[concept_id],
+            )
 
         if mastery_records and len(mastery_records) > 0:
             # Existing mastery data
@@ -0,0 +1,532 @@
+"""
+Pluggable LLM transports for BaseEngine and RubricGradingEngine.
+
+Engines talk to the LLM through a client with the Anthropic SDK shape
+(`client.messages.create(**request)` / `client.messages.stream(**request)`),
+selected by LLM_BACKEND:
+
+- anthropic: the Anthropic SDK (default)
+- fake: local, deterministic client returning schema-valid canned JSON for
+  each engine (as the input of a tool_use block when the request forces a
+  tool), with configurable latency and token distributions. Used for
+  benchmarks and tests; no API key or network needed. Also serves
+  `client.messages.batches` as a local stand-in batch server.
+
+The fake's latency and token counts are drawn from a RNG seeded with
+FAKE_LLM_SEED and the request content, so the same request always gets the
+same response, latency and usage regardless of call order or concurrency.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+# Backend configuration from environment
+LLM_BACKEND = os.getenv("LLM_BACKEND", "anthropic")
+
+# Fake backend: latency = FAKE_LLM_LATENCY_MS (+/- jitter) to the first token,
+# then FAKE_LLM_MS_PER_OUTPUT_TOKEN per generated token
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+FAKE_LLM_LATENCY_JITTER_MS = float(os.getenv("FAKE_LLM_LATENCY_JITTER_MS", "0"))
+FAKE_LLM_MS_PER_OUTPUT_TOKEN = float(os.getenv("FAKE_LLM_MS_PER_OUTPUT_TOKEN", "0"))
+# Reported output tokens: mean/stddev of a normal distribution (0 = ~4 chars per token of the response)
+FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "0"))
+FAKE_LLM_OUTPUT_TOKENS_JITTER = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS_JITTER", "0"))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+# Fake message batches: seconds from create() until the batch has ended
+FAKE_LLM_BATCH_SECONDS = float(os.getenv("FAKE_LLM_BATCH_SECONDS", "0"))
+
+BACKENDS = ("anthropic", "fake")
+
+CHARS_PER_TOKEN = 4
+
+
+# ═══════════════════════════════════════════════════════════
+# RESPONSE TYPES (Anthropic Message shape)
+# ═══════════════════════════════════════════════════════════
+
+
+@dataclass
+class FakeUsage:
+    input_tokens: int
+    output_tokens: int
+
+
+@dataclass
+class FakeTextBlock:
+    text: str
+    type: str = "text"
+
+
+@dataclass
+class FakeToolUseBlock:
+    name: str
+    input: Dict
+    id: str = field(default_factory=lambda: f"toolu_fake_{uuid.uuid4().hex[:16]}")
+    type: str = "tool_use"
+
+
+@dataclass
+class FakeMessage:
+    content: List[Union[FakeTextBlock, FakeToolUseBlock]]
+    usage: FakeUsage
+    model: str
+    id: str = field(default_factory=lambda: f"msg_fake_{uuid.uuid4().hex[:16]}")
+    role: str = "assistant"
+    stop_reason: str = "end_turn"
+
+
+@dataclass
+class FakeBatchRequestCounts:
+    processing: int = 0
+    succeeded: int = 0
+    errored: int = 0
+    canceled: int = 0
+    expired: int = 0
+
+
+@dataclass
+class FakeMessageBatch:
+    id: str
+    processing_status: str  # "in_progress", "canceling" or "ended"
+    request_counts: FakeBatchRequestCounts
+    type: str = "message_batch"
+
+
+@dataclass
+class FakeBatchResult:
+    type: str  # "succeeded", "errored", "canceled" or "expired"
+    message: Optional[FakeMessage] = None
+    error: Optional[Dict] = None
+
+
+@dataclass
+class FakeBatchResultEntry:
+    custom_id: str
+    result: FakeBatchResult
+
+
+# ═══════════════════════════════════════════════════════════
+# CANNED RESPONSES (one builder per engine)
+# ═══════════════════════════════════════════════════════════
+
+
+def _match(pattern: str, text: str, default: str) -> str:
+    match = re.search(pattern, text)
+    return match.group(1).strip() if match else default
+
+
+def _bullets_after(heading: str, text: str) -> List[str]:
+    """'- item' lines following a **heading** line."""
+    lines = text.split(heading, 1)[1].splitlines()[1:] if heading in text else []
+    items = []
+    for line in lines:
+        if not line.startswith("- "):
+            break
+        items.append(line[2:].strip())
+    return items
+
+
+def _unit_plan_response(system: str, user: str, rng: random.Random) -> Dict:
+    num_lessons = int(_match(r"Create a (\d+)-lesson unit plan", user, "5"))
+    title = _match(r"\*\*Unit Title:\*\*\s*(.+)", user, "Unit")
+    return {
+        "total_duration_days": num_lessons * 2,
+        "enduring_understandings": [f"{title} connects to systems students see every day."],
+        "essential_questions": [f"Why does {title} matter?", f"How can we model {title}?"],
+        "key_knowledge": [f"{title} vocabulary", f"{title} processes"],
+        "key_skills": ["Analyzing data", "Creating models"],
+        "standards": [],
+        "summative_assessments": [f"{title} unit project"],
+        "formative_assessments": ["Daily exit tickets", "Concept maps"],
+        "performance_tasks": [f"Design a model of {title}"],
+        "lessons": [
+            {
+                "lesson_number": n,
+                "lesson_title": f"{title}: Part {n}",
+                "duration_minutes": 45,
+                "learning_objectives": [f"Explain part {n} of {title}"],
+                "key_concepts": [f"{title} concept {n}"],
+                "activities": ["Warm-up discussion", "Small group investigation", "Exit ticket"],
+                "assessment_type": "summative" if n == num_lessons else "formative",
+            }
+            for n in range(1, num_lessons + 1)
+        ],
+        "differentiation_strategies": ["Tiered activities based on readiness", "Flexible grouping"],
+        "resources": ["Textbook chapter", "Lab materials"],
+    }
+
+
+LESSON_SECTIONS = [
+    ("Opening / Hook", 5),
+    ("Learning Objectives", 2),
+    ("Standards Alignment", 1),
+    ("Direct Instruction", 10),
+    ("Guided Practice", 8),
+    ("Independent Practice", 8),
+    ("Assessment", 5),
+    ("Differentiation Strategies", 2),
+    ("Materials & Resources", 1),
+    ("Closure", 3),
+]
+
+
+def _lesson_response(system: str, user: str, rng: random.Random) -> Dict:
+    topic = _match(r"\*\*Topic:\*\*\s*(.+)", user, "the lesson topic")
+    return {
+        "sections": [
+            {
+                "section_number": number,
+                "section_name": name,
+                "duration_minutes": minutes,
+                "content": f"Students will be able to explain {topic}." if name == "Learning Objectives"
+                else f"{name} activity for {topic}.",
+                "teacher_notes": f"Teacher notes for {name.lower()}.",
+            }
+            for number, (name, minutes) in enumerate(LESSON_SECTIONS, start=1)
+        ],
+        "research_citations": ["Module 1: Understanding by Design (Wiggins & McTighe)"],
+    }
+
+
+def _diagnostic_response(system: str, user: str, rng: random.Random) -> Dict:
+    per_concept = int(_match(r"Create (\d+) diagnostic questions", user, "3"))
+    concepts = _bullets_after("**Concepts to Assess:**", user) or ["concept"]
+    difficulties = ["easy", "medium", "hard"]
+    questions = []
+    for concept_id in concepts:
+        for n in range(per_concept):
+            difficulty = difficulties[n % len(difficulties)]
+            questions.append({
+                "question_id": f"q{n + 1}_{concept_id}_{difficulty}",
+                "question_text": f"Which statement about {concept_id} is correct? ({n + 1})",
+                "question_type": "multiple_choice",
+                "concept_id": concept_id,
+                "difficulty_level": difficulty,
+                "correct_answer": rng.choice("ABCD"),
+                "options": ["A) First", "B) Second", "C) Third", "D) Fourth"],
+                "explanation": f"Checks understanding of {concept_id}.",
+            })
+    return {"questions": questions}
+
+
+def _worksheet_response(system: str, user: str, rng: random.Random) -> Dict:
+    num_questions = int(_match(r"Create (\d+) differentiated questions", user, "5"))
+    tier = _match(r"differentiated questions for (\w+)", user, "TIER_2").lower()
+    question_type = {"tier_1": "constructed_response", "tier_3": "fill_in_blank"}.get(tier, "short_answer")
+    topic = _match(r"\*\*Topic:\*\*\s*(.+)", user, "the topic")
+    return {
+        "questions": [
+            {
+                "number": n,
+                "question_type": question_type,
+                "question_text": f"{tier.upper()} question {n} about {topic}.",
+                "scaffolding": [] if tier == "tier_1" else ["Word bank provided", "Sentence starter"],
+                "correct_answer": f"Answer {n}",
+                "rubric": "2 points: complete and accurate; 1 point: partial; 0 points: missing",
+                "standards": None,
+            }
+            for n in range(1, num_questions + 1)
+        ]
+    }
+
+
+def _grading_response(system: str, user: str, rng: random.Random) -> Dict:
+    criteria = re.findall(r"^\d+\. (.+) \(([\d.]+) points\)$", user, re.MULTILINE) or [("Overall", "4")]
+    scores = []
+    for name, possible in criteria:
+        possible = float(possible)
+        earned = round(rng.uniform(0.4, 1.0) * possible * 2) / 2  # Half-point steps
+        scores.append({
+            "criterion_name": name,
+            "points_earned": earned,
+            "points_possible": possible,
+            "level_achieved": "Proficient" if earned >= 0.75 * possible else "Developing",
+            "feedback": f"{name}: {earned:g} of {possible:g} points.",
+        })
+    return {
+        "criterion_scores": scores,
+        "overall_feedback": "The response addresses the question with supporting detail.",
+        "strengths": ["Clear explanation"],
+        "areas_for_improvement": ["Add a specific example"],
+    }
+
+
+# Engine class name -> builder(system_prompt, user_prompt, rng) -> JSON-serializable dict
+CANNED_RESPONSES: Dict[str, Callable[[str, str, random.Random], Dict]] = {
+    "UnitPlanDesigner": _unit_plan_response,
+    "LessonArchitect": _lesson_response,
+    "DiagnosticEngine": _diagnostic_response,
+    "WorksheetDesigner": _worksheet_response,
+    "RubricGradingEngine": _grading_response,
+}
+
+# Output tool -> engine answering it (a message batch mixes engines' requests)
+TOOL_ENGINES: Dict[str, str] = {
+    "record_unit_plan": "UnitPlanDesigner",
+    "record_lesson": "LessonArchitect",
+    "record_diagnostic_questions": "DiagnosticEngine",
+    "record_worksheet_questions": "WorksheetDesigner",
+    "record_grade": "RubricGradingEngine",
+}
+
+
+# ═══════════════════════════════════════════════════════════
+# FAKE CLIENT
+# ═══════════════════════════════════════════════════════════
+
+
+def _content_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+class _FakeStream:
+    """messages.stream() context manager: first token after the latency, then per-token pacing."""
+
+    def __init__(self, message: FakeMessage, first_token_seconds: float, seconds_per_token: float):
+        self._message = message
+        self._first_token_seconds = first_token_seconds
+        self._seconds_per_token = seconds_per_token
+        self._consumed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        # Tool input is streamed as input_json_delta events, not text
+        text = getattr(self._message.content[0], "text", "")
+        if not text:
+            time.sleep(self._first_token_seconds + self._seconds_per_token * self._message.usage.output_tokens)
+            self._consumed = True
+            return
+        step = max(1, len(text) // max(1, self._message.usage.output_tokens))
+        time.sleep(self._first_token_seconds)
+        for start in range(0, len(text), step):
+            if start:
+                time.sleep(self._seconds_per_token)
+            yield text[start:start + step]
+        self._consumed = True
+
+    def get_final_message(self) -> FakeMessage:
+        if not self._consumed:
+            for _ in self.text_stream:
+                pass
+        return self._message
+
+
+class FakeMessageBatches:
+    """
+    The `client.messages.batches` resource of FakeLLMClient: a local batch server.
+
+    Requests are answered at create(); the batch reports "in_progress" until
+    FAKE_LLM_BATCH_SECONDS have passed. Each request is answered by the engine
+    owning its output tool (TOOL_ENGINES), else the client's engine.
+    """
+
+    def __init__(self, client: "FakeLLMClient", batch_seconds: float = FAKE_LLM_BATCH_SECONDS):
+        self._client = client
+        self.batch_seconds = batch_seconds
+        self._batches: Dict[str, Dict] = {}
+
+    def create(self, requests: List[Dict]) -> FakeMessageBatch:
+        results = []
+        for entry in requests:
+            params = entry["params"]
+            tools = params.get("tools") or []
+            tool = (params.get("tool_choice") or {}).get("name") or (tools[0]["name"] if tools else None)
+            message, _, _ = self._client._respond(params, engine=TOOL_ENGINES.get(tool))
+            results.append(FakeBatchResultEntry(entry["custom_id"], FakeBatchResult("succeeded", message=message)))
+
+        batch_id = f"msgbatch_fake_{uuid.uuid4().hex[:16]}"
+        self._batches[batch_id] = {
+            "results": results,
+            "ends_at": time.monotonic() + self.batch_seconds,
+            "canceled": False,
+        }
+        return self.retrieve(batch_id)
+
+    def _ended(self, batch: Dict) -> bool:
+        return batch["canceled"] or time.monotonic() >= batch["ends_at"]
+
+    def retrieve(self, batch_id: str) -> FakeMessageBatch:
+        batch = self._batches[batch_id]
+        counts = FakeBatchRequestCounts()
+        if not self._ended(batch):
+            counts.processing = len(batch["results"])
+            return FakeMessageBatch(batch_id, "in_progress", counts)
+        for entry in batch["results"]:
+            setattr(counts, entry.result.type, getattr(counts, entry.result.type) + 1)
+        return FakeMessageBatch(batch_id, "ended", counts)
+
+    def cancel(self, batch_id: str) -> FakeMessageBatch:
+        batch = self._batches[batch_id]
+        if not self._ended(batch):
+            batch["canceled"] = True
+            for entry in batch["results"]:
+                entry.result = FakeBatchResult("canceled")
+        return self.retrieve(batch_id)
+
+    def results(self, batch_id: str) -> Iterator[FakeBatchResultEntry]:
+        batch = self._batches[batch_id]
+        if not self._ended(batch):
+            raise ValueError(f"Message batch {batch_id} is still processing")
+        return iter(list(batch["results"]))
+
+
+class FakeMessages:
+    """The `client.messages` resource of FakeLLMClient."""
+
+    def __init__(self, client: "FakeLLMClient"):
+        self._client = client
+        self.batches = FakeMessageBatches(client)
+
+    def create(self, **request) -> FakeMessage:
+        message, first_token_seconds, seconds_per_token = self._client._respond(request)
+        time.sleep(first_token_seconds + seconds_per_token * message.usage.output_tokens)
+        return message
+
+    def stream(self, **request) -> _FakeStream:
+        return _FakeStream(*self._client._respond(request))
+
+
+class FakeLLMClient:
+    """
+    Deterministic stand-in for the Anthropic client.
+
+    Returns canned JSON matching the calling engine's response schema
+    (CANNED_RESPONSES), sized to the prompt (question counts, concepts,
+    rubric criteria), with simulated latency and token usage.
+    """
+
+    total_calls = 0  # Across all instances (benchmarks report calls per run)
+
+    def __init__(
+        self,
+        engine: str,
+        latency_ms: float = FAKE_LLM_LATENCY_MS,
+        latency_jitter_ms: float = FAKE_LLM_LATENCY_JITTER_MS,
+        ms_per_output_token: float = FAKE_LLM_MS_PER_OUTPUT_TOKEN,
+        output_tokens: int = FAKE_LLM_OUTPUT_TOKENS,
+        output_tokens_jitter: int = FAKE_LLM_OUTPUT_TOKENS_JITTER,
+        seed: int = FAKE_LLM_SEED,
+    ):
+        """
+        Initialize fake client.
+
+        Args:
+            engine: Calling engine class name (selects the canned response)
+            latency_ms: Mean time to first token
+            latency_jitter_ms: Standard deviation of time to first token
+            ms_per_output_token: Generation time per output token
+            output_tokens: Mean reported output tokens (0 = derived from response length)
+            output_tokens_jitter: Standard deviation of reported output tokens
+            seed: RNG seed (combined with each request's content)
+        """
+        self.engine = engine
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.ms_per_output_token = ms_per_output_token
+        self.output_tokens = output_tokens
+        self.output_tokens_jitter = output_tokens_jitter
+        self.seed = seed
+        self.call_count = 0
+        self.messages = FakeMessages(self)
+
+    def _respond(self, request: Dict, engine: Optional[str] = None):
+        """
+        Build the response for a request; returns (message, first-token seconds, seconds per token).
+
+        Args:
+            request: messages.create keyword arguments
+            engine: Engine whose canned response answers the request (default: the client's)
+        """
+        engine = engine or self.engine
+        system = request.get("system") or ""
+        system = system if isinstance(system, str) else _content_text(system)
+        user = "\n".join(_content_text(m.get("content", "")) for m in request.get("messages", []))
+
+        digest = hashlib.sha256(f"{engine}\0{system}\0{user}".encode()).hexdigest()
+        rng = random.Random(f"{self.seed}:{digest}")
+
+        builder = CANNED_RESPONSES.get(engine)
+        data = builder(system, user, rng) if builder else {}
+        text = json.dumps(data)
+
+        output_tokens = max(1, len(text) // CHARS_PER_TOKEN)
+        if self.output_tokens:
+            output_tokens = max(1, round(rng.gauss(self.output_tokens, self.output_tokens_jitter)))
+        # Responses longer than max_tokens are cut off there, as upstream
+        max_tokens = request.get("max_tokens") or output_tokens
+        stop_reason = "max_tokens" if output_tokens > max_tokens else "end_turn"
+        output_tokens = min(output_tokens, max_tokens)
+        input_tokens = max(1, (len(system) + len(user)) // CHARS_PER_TOKEN)
+
+        first_token_ms = max(0.0, rng.gauss(self.latency_ms, self.latency_jitter_ms))
+        self.call_count += 1
+        FakeLLMClient.total_calls += 1
+
+        tools = request.get("tools") or []
+        if tools:
+            tool = (request.get("tool_choice") or {}).get("name") or tools[0]["name"]
+            content = [FakeToolUseBlock(name=tool, input=data)]
+        else:
+            content = [FakeTextBlock(text=text)]
+
+        message = FakeMessage(
+            content=content,
+            usage=FakeUsage(input_tokens=input_tokens, output_tokens=output_tokens),
+            model=request.get("model", "fake"),
+            stop_reason=stop_reason,
+        )
+        return message, first_token_ms / 1000, self.ms_per_output_token / 1000
+
+
+# ═══════════════════════════════════════════════════════════
+# FACTORY
+# ═══════════════════════════════════════════════════════════
+
+
+def create_llm_client(engine: str, api_key: Optional[str] = None, backend: Optional[str] = None, **kwargs):
+    """
+    Create the configured LLM client for an engine.
+
+    Args:
+        engine: Calling engine class name
+        api_key: Anthropic API key (uses ANTHROPIC_API_KEY env var if None)
+        backend: Backend name (default: LLM_BACKEND env var)
+        **kwargs: Fake client options (latency_ms, seed, ...)
+
+    Returns:
+        Client with the Anthropic SDK `messages` interface
+
+    Raises:
+        ValueError: If the backend is unknown, or the Anthropic API key is missing
+    """
+    backend = (backend or LLM_BACKEND).lower()
+
+    if backend == "fake":
+        return FakeLLMClient(engine, **kwargs)
+
+    if backend == "anthropic":
+        api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY not found in environment")
+
+        # anthropic takes ~1.5s to import; defer it until an engine is built
+        from anthropic import Anthropic
+
+        return Anthropic(api_key=api_key)
+
+    raise ValueError(f"Unknown LLM backend '{backend}' (expected one of {BACKENDS})")
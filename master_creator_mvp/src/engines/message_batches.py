@@ -0,0 +1,210 @@
+"""
+Message Batches execution for offline (nightly) generation.
+
+Inside batch_mode(), engines don't call Claude in real time. Each call is
+answered from the collector's batch results; a call without a result is
+registered as pending and unwinds the engine with BatchPending. The caller
+(orchestration.batch_pipeline) then:
+1. submits every pending request of the round as one message batch
+   (custom_id = request_key(), so identical prompts are sent once),
+2. polls until the batch has ended and stores the results,
+3. re-runs the suspended work, which now finds its responses.
+
+Batched calls are billed at LLM_BATCH_PRICE_FACTOR of list price (the
+Batches API discount). Requests that errored, expired or were canceled
+are sent again in the next round, up to LLM_BATCH_MAX_ATTEMPTS; after
+that the engine call raises BatchRequestFailed.
+
+Real-time traffic (API requests, grading) never enters batch mode.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from ..utils.metrics import LLM_BATCH_REQUESTS, LLM_BATCH_WAIT
+from .single_flight import request_key
+
+logger = logging.getLogger("engines.message_batches")
+
+# Batch price as a fraction of list price
+BATCH_PRICE_FACTOR = float(os.getenv("LLM_BATCH_PRICE_FACTOR", "0.5"))
+
+# Seconds between batch status polls
+BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))
+
+# Give up on (and cancel) a batch still processing after this long
+BATCH_TIMEOUT_SECONDS = float(os.getenv("LLM_BATCH_TIMEOUT_SECONDS", str(24 * 3600)))
+
+# Requests per submitted batch (API limit: 100,000)
+BATCH_MAX_REQUESTS = int(os.getenv("LLM_BATCH_MAX_REQUESTS", "10000"))
+
+# Submissions per request before an errored/expired result is final
+BATCH_MAX_ATTEMPTS = int(os.getenv("LLM_BATCH_MAX_ATTEMPTS", "2"))
+
+
+class BatchPending(BaseException):
+    """
+    An engine call is waiting for a batch result.
+
+    A control-flow signal, not an error: it derives from BaseException (like
+    GeneratorExit) so the engines' and pipeline nodes' `except Exception`
+    handlers let it unwind to the batch driver.
+    """
+
+
+class BatchRequestFailed(RuntimeError):
+    """The batch had no successful result for a request after all attempts."""
+
+
+class BatchCollector:
+    """Batch results and pending requests shared by all work in one batch run."""
+
+    def __init__(self, max_attempts: int = BATCH_MAX_ATTEMPTS):
+        """
+        Initialize collector.
+
+        Args:
+            max_attempts: Submissions per request before its error is final
+        """
+        self.max_attempts = max_attempts
+        self.results: Dict[str, object] = {}
+        self.errors: Dict[str, str] = {}
+        self.attempts: Dict[str, int] = {}
+        self.batches: List[str] = []
+        self._delivered: Set[str] = set()
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def response_for(self, request: Dict) -> Tuple[object, bool]:
+        """
+        The batch result for a request.
+
+        Work resumed after a batch replays the calls it made before, so a
+        result is usually read several times; only the first read is new.
+
+        Args:
+            request: messages.create keyword arguments
+
+        Returns:
+            (Message from the batch, whether this is its first delivery)
+
+        Raises:
+            BatchPending: If the request has no result yet (it is queued for the next batch)
+            BatchRequestFailed: If the request failed in every attempt
+        """
+        key = request_key(request)
+        with self._lock:
+            if key in self.results:
+                first = key not in self._delivered
+                self._delivered.add(key)
+                return self.results[key], first
+            if key in self.errors:
+                raise BatchRequestFailed(self.errors[key])
+            self._pending.setdefault(key, request)
+        raise BatchPending(key)
+
+    def pending(self) -> int:
+        """Number of requests waiting for the next batch."""
+        with self._lock:
+            return len(self._pending)
+
+    def submit(
+        self,
+        client,
+        poll_seconds: float = BATCH_POLL_SECONDS,
+        timeout: float = BATCH_TIMEOUT_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> int:
+        """
+        Send the pending requests as message batches and wait for their results.
+
+        Args:
+            client: Client with `messages.batches` (Anthropic SDK or the fake backend)
+            poll_seconds: Seconds between status polls
+            timeout: Seconds before unfinished batches are canceled
+            sleep: Sleep function (tests pass a no-op)
+
+        Returns:
+            Number of requests submitted
+
+        Raises:
+            TimeoutError: If a batch is still processing after timeout
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        keys = list(pending)
+        batch_ids = []
+        for start in range(0, len(keys), BATCH_MAX_REQUESTS):
+            chunk = keys[start:start + BATCH_MAX_REQUESTS]
+            batch = client.messages.batches.create(
+                requests=[{"custom_id": key, "params": pending[key]} for key in chunk]
+            )
+            batch_ids.append(batch.id)
+            logger.info(f"Submitted message batch {batch.id} ({len(chunk)} requests)")
+        self.batches.extend(batch_ids)
+
+        started = time.monotonic()
+        for batch_id in batch_ids:
+            self._wait(client, batch_id, started, poll_seconds, timeout, sleep)
+            self._collect(client, batch_id)
+        LLM_BATCH_WAIT.observe(time.monotonic() - started)
+        return len(keys)
+
+    def _wait(self, client, batch_id: str, started: float, poll_seconds: float, timeout: float, sleep):
+        while client.messages.batches.retrieve(batch_id).processing_status != "ended":
+            if time.monotonic() - started > timeout:
+                client.messages.batches.cancel(batch_id)
+                raise TimeoutError(f"Message batch {batch_id} still processing after {timeout:.0f}s")
+            sleep(poll_seconds)
+
+    def _collect(self, client, batch_id: str):
+        for entry in client.messages.batches.results(batch_id):
+            result = entry.result
+            LLM_BATCH_REQUESTS.inc(outcome=result.type)
+            with self._lock:
+                if result.type == "succeeded":
+                    self.results[entry.custom_id] = result.message
+                    continue
+                attempts = self.attempts[entry.custom_id] = self.attempts.get(entry.custom_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    error = getattr(result, "error", None)
+                    self.errors[entry.custom_id] = f"Batch request {result.type}" + (f": {error}" if error else "")
+            # Otherwise the engine re-registers the request in the next round
+
+
+# ═══════════════════════════════════════════════════════════
+# BATCH MODE CONTEXT
+# ═══════════════════════════════════════════════════════════
+
+_current_batch: ContextVar[Optional[BatchCollector]] = ContextVar("llm_batch", default=None)
+
+
+@contextmanager
+def batch_mode(collector: BatchCollector) -> Iterator[BatchCollector]:
+    """
+    Answer engine calls in this context from message batches.
+
+    Args:
+        collector: Results and pending requests of the batch run
+
+    Yields:
+        The collector
+    """
+    token = _current_batch.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_batch.reset(token)
+
+
+def current_batch() -> Optional[BatchCollector]:
+    """The active batch collector, or None for real-time calls."""
+    return _current_batch.get()
@@ -0,0 +1,277 @@
+"""
+Per-task model routing and adaptive max_tokens for Claude calls.
+
+Each engine call names its task ("lesson", "diagnostic", "worksheet_tier3",
+"grade_short", ...). The task picks the model:
+- fast (LLM_MODEL_FAST): short structured tasks - diagnostic items, Tier 3
+  worksheets, rubric scoring of short answers
+- large (LLM_MODEL): lesson and unit design, Tier 1/2 worksheets, long answers
+LLM_MODEL_ROUTES overrides single tasks ("diagnostic=large,grade=<model id>").
+
+max_tokens is sized to the requested item count (questions, lessons,
+sections, rubric criteria): the task's p95 output tokens per item over recent
+calls times the item count, plus headroom, capped at LLM_MAX_TOKENS. Until a
+task has LLM_OUTPUT_TOKENS_MIN_SAMPLES calls, a per-task prior is used. A
+response cut off at the routed limit is re-requested at the cap.
+
+Each routed call is logged (logger "engines.model_routing") with its model,
+max_tokens, output tokens, latency and cost, and counted in
+llm_routed_calls_total, llm_routed_call_duration_seconds,
+llm_cost_dollars_total and llm_output_truncated_total.
+"""
+
+import logging
+import math
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Tuple
+
+from ..utils.metrics import LLM_ROUTED_CALL_DURATION, LLM_ROUTED_CALLS
+
+logger = logging.getLogger("engines.model_routing")
+
+# Large model (lesson and unit design; the default for unrouted calls)
+MODEL_LARGE = os.getenv("LLM_MODEL", "claude-sonnet-4-5-20250929")
+
+# Fast, cheap model for short structured tasks
+MODEL_FAST = os.getenv("LLM_MODEL_FAST", "claude-haiku-4-5-20251001")
+
+# Route tasks to models (false = every call uses LLM_MODEL)
+ROUTING_ENABLED = os.getenv("LLM_MODEL_ROUTING", "true").lower() == "true"
+
+# Per-task overrides: "task=fast|large|<model id>,..."
+MODEL_ROUTES = os.getenv("LLM_MODEL_ROUTES", "")
+
+# Size max_tokens from item counts and output history (false = LLM_MAX_TOKENS)
+ADAPTIVE_MAX_TOKENS = os.getenv("LLM_ADAPTIVE_MAX_TOKENS", "true").lower() == "true"
+
+# Upper bound for every call
+MAX_TOKENS_CEILING = int(os.getenv("LLM_MAX_TOKENS", "4096"))
+
+# Lower bound for routed calls
+MAX_TOKENS_FLOOR = int(os.getenv("LLM_MAX_TOKENS_FLOOR", "512"))
+
+# Output-tokens-per-item percentile used for sizing, and the margin on top of it
+OUTPUT_TOKENS_PERCENTILE = float(os.getenv("LLM_OUTPUT_TOKENS_PERCENTILE", "95"))
+OUTPUT_TOKENS_HEADROOM = float(os.getenv("LLM_OUTPUT_TOKENS_HEADROOM", "1.25"))
+
+# Calls per task before history replaces the prior
+OUTPUT_TOKENS_MIN_SAMPLES = int(os.getenv("LLM_OUTPUT_TOKENS_MIN_SAMPLES", "20"))
+
+# Recent calls kept per task
+OUTPUT_TOKENS_WINDOW = 200
+
+# Short answers (characters) are scored by the fast model
+SHORT_ANSWER_CHARS = int(os.getenv("LLM_SHORT_ANSWER_CHARS", "600"))
+
+# $ per million (input, output) tokens, matched by model id prefix
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "claude-opus-4": (15.0, 75.0),
+    "claude-sonnet-4": (3.0, 15.0),
+    "claude-haiku-4": (1.0, 5.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+}
+DEFAULT_PRICING = (3.0, 15.0)
+
+
+@dataclass(frozen=True)
+class Task:
+    """Routing defaults for one kind of call."""
+
+    tier: str  # "fast" or "large"
+    tokens_per_item: int  # Prior output tokens per requested item
+    base_tokens: int = 200  # Prior fixed output (wrapper fields, summaries)
+
+
+TASKS: Dict[str, Task] = {
+    "unit_plan": Task("large", tokens_per_item=250, base_tokens=800),
+    "lesson": Task("large", tokens_per_item=300, base_tokens=300),
+    "diagnostic": Task("fast", tokens_per_item=150),
+    "worksheet": Task("large", tokens_per_item=200),
+    "worksheet_tier3": Task("fast", tokens_per_item=150),
+    "grade": Task("large", tokens_per_item=150, base_tokens=300),
+    "grade_short": Task("fast", tokens_per_item=100, base_tokens=200),
+}
+
+
+@dataclass(frozen=True)
+class Route:
+    """Model and max_tokens chosen for one call."""
+
+    task: str
+    model: str
+    max_tokens: int
+    items: int
+    source: str  # "prior", "history", or "fixed" (adaptive sizing off)
+
+
+def _overrides() -> Dict[str, str]:
+    routes = {}
+    for entry in MODEL_ROUTES.split(","):
+        task, sep, target = entry.partition("=")
+        if sep and task.strip() and target.strip():
+            routes[task.strip()] = target.strip()
+    return routes
+
+
+def model_for(task: str) -> str:
+    """
+    Model for a task.
+
+    Args:
+        task: Task name (TASKS key; unknown tasks use the large model)
+
+    Returns:
+        Model id
+    """
+    if not ROUTING_ENABLED:
+        return MODEL_LARGE
+    target = _overrides().get(task) or (TASKS[task].tier if task in TASKS else "large")
+    return {"fast": MODEL_FAST, "large": MODEL_LARGE}.get(target, target)
+
+
+def model_pricing(model: str) -> Tuple[float, float]:
+    """$ per million (input, output) tokens for a model id."""
+    for prefix, pricing in MODEL_PRICING.items():
+        if model.startswith(prefix):
+            return pricing
+    return DEFAULT_PRICING
+
+
+def request_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """
+    Dollar cost of one call.
+
+    Args:
+        model: Model id
+        input_tokens: Input tokens
+        output_tokens: Output tokens
+
+    Returns:
+        Cost in dollars
+    """
+    input_price, output_price = model_pricing(model)
+    return (input_tokens / 1_000_000) * input_price + (output_tokens / 1_000_000) * output_price
+
+
+# ═══════════════════════════════════════════════════════════
+# OUTPUT LENGTH HISTORY
+# ═══════════════════════════════════════════════════════════
+
+
+class OutputLengths:
+    """Recent output tokens per requested item, per task."""
+
+    def __init__(self, window: int = OUTPUT_TOKENS_WINDOW):
+        """
+        Initialize history.
+
+        Args:
+            window: Calls kept per task
+        """
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, task: str, output_tokens: int, items: int):
+        """Record a complete (not truncated) response."""
+        with self._lock:
+            samples = self._samples.setdefault(task, deque(maxlen=self.window))
+            samples.append(output_tokens / max(1, items))
+
+    def per_item(self, task: str, percentile: float = OUTPUT_TOKENS_PERCENTILE) -> Tuple[Optional[float], int]:
+        """
+        Output tokens per item at a percentile.
+
+        Returns:
+            (tokens per item or None without samples, sample count)
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(task, ()))
+        if not samples:
+            return None, 0
+        index = min(len(samples) - 1, math.ceil(percentile / 100 * len(samples)) - 1)
+        return samples[max(0, index)], len(samples)
+
+
+_output_lengths = OutputLengths()
+
+
+def get_output_lengths() -> OutputLengths:
+    """Get the process-level output length history."""
+    return _output_lengths
+
+
+def max_tokens_for(task: str, items: int = 1, lengths: Optional[OutputLengths] = None) -> Tuple[int, str]:
+    """
+    max_tokens for a call producing items items.
+
+    Args:
+        task: Task name
+        items: Requested item count (questions, lessons, sections, criteria)
+        lengths: Output history (process-level if None)
+
+    Returns:
+        (max_tokens, source): source is "history", "prior" or "fixed"
+    """
+    if not ADAPTIVE_MAX_TOKENS or task not in TASKS:
+        return MAX_TOKENS_CEILING, "fixed"
+
+    items = max(1, items)
+    per_item, samples = (lengths or _output_lengths).per_item(task)
+    if per_item is not None and samples >= OUTPUT_TOKENS_MIN_SAMPLES:
+        estimate, source = per_item * items, "history"
+    else:
+        prior = TASKS[task]
+        estimate, source = prior.base_tokens + prior.tokens_per_item * items, "prior"
+
+    max_tokens = int(math.ceil(estimate * OUTPUT_TOKENS_HEADROOM))
+    return max(MAX_TOKENS_FLOOR, min(MAX_TOKENS_CEILING, max_tokens)), source
+
+
+def route(task: str, items: int = 1, lengths: Optional[OutputLengths] = None) -> Route:
+    """
+    Route one call.
+
+    Args:
+        task: Task name (see TASKS)
+        items: Requested item count
+        lengths: Output history (process-level if None)
+
+    Returns:
+        Route
+    """
+    max_tokens, source = max_tokens_for(task, items, lengths)
+    return Route(task=task, model=model_for(task), max_tokens=max_tokens, items=max(1, items), source=source)
+
+
+def is_truncated(response) -> bool:
+    """Whether a response stopped at max_tokens."""
+    return getattr(response, "stop_reason", None) == "max_tokens"
+
+
+def record_routed_call(route: Route, engine: str, response, seconds: float, lengths: Optional[OutputLengths] = None):
+    """
+    Record a routed call's outcome: output history, metrics and the routing log.
+
+    Args:
+        route: Route the call was made with
+        engine: Engine class name
+        response: Final Message
+        seconds: Call latency (including retries and a truncation re-request)
+        lengths: Output history (process-level if None)
+    """
+    input_tokens, output_tokens = response.usage.input_tokens, response.usage.output_tokens
+    if not is_truncated(response):
+        (lengths or _output_lengths).record(route.task, output_tokens, route.items)
+
+    LLM_ROUTED_CALLS.inc(engine=engine, task=route.task, model=route.model)
+    LLM_ROUTED_CALL_DURATION.observe(seconds, task=route.task, model=route.model)
+    cost = request_cost(route.model, input_tokens, output_tokens)
+    logger.info(
+        f"{engine} {route.task} -> {route.model}: {route.items} items, max_tokens={route.max_tokens} ({route.source}), "
+        f"{input_tokens} in / {output_tokens} out, {seconds * 1000:.0f} ms, ${cost:.4f}"
+        + (" (truncated)" if is_truncated(response) else "")
+    )
@@ -0,0 +1,426 @@
+"""
+Process-wide rate limiting and scheduling for Claude calls.
+
+Every upstream call (BaseEngine engines and the rubric grader) goes through
+one LLMScheduler, so a batch-grading job can't use up the org's rate limit
+and starve interactive lesson generation:
+- Token buckets on requests/min and tokens/min. Tokens are estimated before
+  dispatch (prompt characters / 4 + max_tokens) and settled against the
+  response's actual usage.
+- Priority lanes: interactive > pipeline > batch > precompute. Only the
+  highest-priority waiter may take capacity, and lanes below interactive
+  leave LLM_RATE_LIMIT_INTERACTIVE_RESERVE of the token bucket free.
+- Fair sharing within a lane: the tenant (district) with the fewest tokens
+  granted goes next, so one district's bulk job doesn't block another's.
+- A 429 pauses all dispatch for the response's retry-after, then the call
+  is requeued (up to LLM_RATE_LIMIT_MAX_RETRIES times).
+
+The lane and tenant come from the caller's context (llm_priority()): HTTP
+requests run as interactive for the X-District-Id tenant, pipelines as
+pipeline, batch grading as batch and offline (nightly) batch-pipeline
+runs as precompute.
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..utils.metrics import LLM_QUEUE_WAIT, LLM_RATE_LIMITED
+
+logger = logging.getLogger("engines.rate_limiter")
+
+# Schedule Claude calls through the process-wide rate limiter
+RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT", "true").lower() == "true"
+
+# Org limits (set these from the Anthropic console for the deployment's tier)
+RATE_LIMIT_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "4000"))
+RATE_LIMIT_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "2000000"))
+
+# Fraction of the token bucket only interactive calls may use
+RATE_LIMIT_INTERACTIVE_RESERVE = float(os.getenv("LLM_RATE_LIMIT_INTERACTIVE_RESERVE", "0.1"))
+
+# Longest a call waits in the queue before failing with LLMQueueTimeout
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT_SECONDS", "300"))
+
+# 429 responses requeued before the error is raised
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("LLM_RATE_LIMIT_MAX_RETRIES", "3"))
+
+# Lane for calls made outside any llm_priority() context
+DEFAULT_PRIORITY = os.getenv("LLM_DEFAULT_PRIORITY", "pipeline")
+
+PRIORITIES = ("interactive", "pipeline", "batch", "precompute")  # Highest first
+DEFAULT_TENANT = "default"
+CHARS_PER_TOKEN = 4
+
+
+class LLMQueueTimeout(TimeoutError):
+    """A call waited longer than LLM_RATE_LIMIT_MAX_WAIT_SECONDS for capacity."""
+
+
+# ═══════════════════════════════════════════════════════════
+# CALLER CONTEXT
+# ═══════════════════════════════════════════════════════════
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default=DEFAULT_PRIORITY)
+_tenant: ContextVar[str] = ContextVar("llm_tenant", default=DEFAULT_TENANT)
+
+
+@contextmanager
+def llm_priority(priority: Optional[str] = None, tenant: Optional[str] = None) -> Iterator[None]:
+    """
+    Run Claude calls in this block in a priority lane, for a tenant.
+
+    Args:
+        priority: One of PRIORITIES (unchanged if None)
+        tenant: District / tenant id for fair sharing (unchanged if None)
+
+    Raises:
+        ValueError: If priority is not a known lane
+    """
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority '{priority}' (expected one of {PRIORITIES})")
+
+    priority_token = _priority.set(priority) if priority is not None else None
+    tenant_token = _tenant.set(tenant) if tenant else None
+    try:
+        yield
+    finally:
+        if tenant_token is not None:
+            _tenant.reset(tenant_token)
+        if priority_token is not None:
+            _priority.reset(priority_token)
+
+
+def current_priority() -> str:
+    """Priority lane of the current context."""
+    return _priority.get()
+
+
+def current_tenant() -> str:
+    """Tenant of the current context."""
+    return _tenant.get()
+
+
+# ═══════════════════════════════════════════════════════════
+# ESTIMATES AND RETRY-AFTER
+# ═══════════════════════════════════════════════════════════
+
+
+def estimate_tokens(request: Dict) -> int:
+    """
+    Estimate the tokens a messages.create request will use.
+
+    Args:
+        request: messages.create keyword arguments
+
+    Returns:
+        Prompt tokens (~4 characters each, tools included) plus max_tokens
+    """
+    chars = len(json.dumps(request.get("system", ""))) + len(json.dumps(request.get("messages", [])))
+    if request.get("tools"):
+        chars += len(json.dumps(request["tools"]))
+    return chars // CHARS_PER_TOKEN + int(request.get("max_tokens") or 0)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether an upstream error is a 429 (anthropic.RateLimitError)."""
+    return getattr(error, "status_code", None) == 429
+
+
+def retry_after_seconds(error: BaseException, attempt: int = 0) -> float:
+    """
+    Delay requested by a 429 response.
+
+    Args:
+        error: The rate-limit error (anthropic.RateLimitError)
+        attempt: Retry number, for the fallback backoff
+
+    Returns:
+        retry-after-ms / retry-after (seconds or HTTP date) from the response
+        headers, else exponential backoff (1s, 2s, 4s, ... up to 60s)
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+
+    return float(min(60, 2 ** attempt))
+
+
+# ═══════════════════════════════════════════════════════════
+# SCHEDULER
+# ═══════════════════════════════════════════════════════════
+
+
+class TokenBucket:
+    """Bucket of per-minute capacity, refilled continuously."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        """Seconds until amount is available (after refill())."""
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+
+class Grant:
+    """Capacity taken for one call (settled against actual usage)."""
+
+    def __init__(self, tokens: int, priority: str, tenant: str, waited: float):
+        self.tokens = tokens
+        self.priority = priority
+        self.tenant = tenant
+        self.waited = waited
+
+
+class _Waiter:
+    def __init__(self, tokens: int, priority: str, tenant: str, seq: int, enqueued: float):
+        self.tokens = tokens
+        self.priority = priority
+        self.tenant = tenant
+        self.seq = seq
+        self.enqueued = enqueued
+
+
+class LLMScheduler:
+    """Rate limiter with priority lanes and per-tenant fair sharing."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = RATE_LIMIT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = RATE_LIMIT_TOKENS_PER_MINUTE,
+        interactive_reserve: float = RATE_LIMIT_INTERACTIVE_RESERVE,
+        max_wait: float = RATE_LIMIT_MAX_WAIT_SECONDS,
+        max_retries: int = RATE_LIMIT_MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            requests_per_minute: Request limit
+            tokens_per_minute: Token limit (input + output)
+            interactive_reserve: Fraction of the token bucket kept for interactive calls
+            max_wait: Seconds a call may wait before LLMQueueTimeout
+            max_retries: 429 responses requeued per call
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.clock = clock
+        now = clock()
+        self.requests = TokenBucket(requests_per_minute, now)
+        self.tokens = TokenBucket(tokens_per_minute, now)
+        self.interactive_reserve = interactive_reserve
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._waiting: List[_Waiter] = []
+        self._served: Dict[Tuple[str, str], float] = {}  # (lane, tenant) -> tokens granted while the lane is busy
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+    def acquire(self, tokens: int, priority: Optional[str] = None, tenant: Optional[str] = None) -> Grant:
+        """
+        Wait for capacity for one call.
+
+        Args:
+            tokens: Estimated tokens (estimate_tokens())
+            priority: Lane (the context's llm_priority() if None)
+            tenant: Tenant (the context's tenant if None)
+
+        Returns:
+            Grant to settle() once the response's usage is known
+
+        Raises:
+            LLMQueueTimeout: If capacity wasn't available within max_wait
+            LLMDeadlineExceeded: If the stage deadline (llm_deadline()) passed first
+        """
+        # Imported here: resilience imports this module
+        from .resilience import LLMDeadlineExceeded, remaining_time
+
+        priority = priority or current_priority()
+        tenant = tenant or current_tenant()
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority '{priority}' (expected one of {PRIORITIES})")
+
+        tokens = int(min(max(1, tokens), self.tokens.capacity))
+        waiter = _Waiter(tokens, priority, tenant, next(self._seq), self.clock())
+        deadline = waiter.enqueued + self.max_wait
+        left = remaining_time()
+        stage_deadline = None if left is None else waiter.enqueued + left
+
+        with self._cond:
+            self._waiting.append(waiter)
+            try:
+                while True:
+                    now = self.clock()
+                    delay = self._delay(waiter, now)
+                    if delay == 0:
+                        self.requests.level -= 1
+                        self.tokens.level -= tokens
+                        key = (priority, tenant)
+                        self._served[key] = self._served.get(key, 0) + tokens
+                        break
+                    if stage_deadline is not None and now >= stage_deadline:
+                        raise LLMDeadlineExceeded(
+                            f"Stage deadline passed in the rate-limit queue ({priority} lane)"
+                        )
+                    if now >= deadline:
+                        raise LLMQueueTimeout(
+                            f"LLM call waited {now - waiter.enqueued:.0f}s for rate-limit capacity ({priority} lane)"
+                        )
+                    until = deadline if stage_deadline is None else min(deadline, stage_deadline)
+                    self._cond.wait(min(delay, until - now) if delay is not None else until - now)
+            finally:
+                self._waiting.remove(waiter)
+                if not any(w.priority == priority for w in self._waiting):
+                    for key in [k for k in self._served if k[0] == priority]:
+                        del self._served[key]
+                self._cond.notify_all()
+
+        waited = self.clock() - waiter.enqueued
+        LLM_QUEUE_WAIT.observe(waited, priority=priority)
+        return Grant(tokens, priority, tenant, waited)
+
+    def settle(self, grant: Grant, actual_tokens: int):
+        """
+        Correct the token bucket once a call's actual usage is known.
+
+        Args:
+            grant: Grant from acquire()
+            actual_tokens: Input + output tokens used (0 if the call was rejected)
+        """
+        with self._cond:
+            self.tokens.refill(self.clock())
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + grant.tokens - actual_tokens)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Hold all dispatch for seconds (a 429's retry-after)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def dispatch(self, request: Dict, send: Callable[[], object], engine: str):
+        """
+        Make one Claude call through the scheduler.
+
+        Args:
+            request: messages.create keyword arguments (for the token estimate)
+            send: Makes the call and returns the Message
+            engine: Calling engine name (metrics)
+
+        Returns:
+            The Message returned by send
+
+        Raises:
+            LLMQueueTimeout: If the call waited too long for capacity
+            Whatever send raised (429s only after max_retries requeues)
+        """
+        estimate = estimate_tokens(request)
+
+        for attempt in range(self.max_retries + 1):
+            grant = self.acquire(estimate)
+            used = 0  # Failed and rejected calls give their estimate back
+            try:
+                response = send()
+                usage = getattr(response, "usage", None)
+                # Without usage the estimate stands
+                used = usage.input_tokens + usage.output_tokens if usage is not None else grant.tokens
+                return response
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                delay = retry_after_seconds(e, attempt)
+                LLM_RATE_LIMITED.inc(engine=engine)
+                logger.warning(f"{engine} rate limited (429), pausing LLM dispatch for {delay:.1f}s")
+                self.pause(delay)
+                if attempt == self.max_retries:
+                    raise
+            finally:
+                self.settle(grant, used)
+
+    def _delay(self, waiter: _Waiter, now: float) -> Optional[float]:
+        """Seconds until waiter may dispatch (0 = now); None while another waiter is ahead of it."""
+        if self._head() is not waiter:
+            return None
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        needed = waiter.tokens
+        if waiter.priority != PRIORITIES[0]:
+            needed += self.interactive_reserve * self.tokens.capacity
+        return max(self.requests.seconds_until(1), self.tokens.seconds_until(needed))
+
+    def _head(self) -> _Waiter:
+        """Next waiter: highest lane, then the tenant served least, then arrival order."""
+        return min(
+            self._waiting,
+            key=lambda w: (PRIORITIES.index(w.priority), self._served.get((w.priority, w.tenant), 0), w.seq),
+        )
+
+
+# ═══════════════════════════════════════════════════════════
+# PROCESS-LEVEL SCHEDULER
+# ═══════════════════════════════════════════════════════════
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Get the process-level scheduler.
+
+    Returns:
+        LLMScheduler configured from the LLM_* rate-limit settings
+    """
+    global _scheduler
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+
+    return _scheduler
+
+
+def dispatch_llm_call(request: Dict, send: Callable[[], object], engine: str):
+    """
+    Make a Claude call through the process-level scheduler (directly if LLM_RATE_LIMIT=false).
+
+    Args:
+        request: messages.create keyword arguments
+        send: Makes the call and returns the Message
+        engine: Calling engine name
+
+    Returns:
+        The Message returned by send
+    """
+    if not RATE_LIMIT_ENABLED:
+        return send()
+    return get_llm_scheduler().dispatch(request, send, engine)
@@ -0,0 +1,437 @@
+"""
+Resilience policy for Claude calls: retries, hedging, circuit breakers and
+stage deadlines.
+
+Each upstream call (BaseEngine and the rubric grader) runs as:
+
+    circuit breaker -> retries -> hedging -> rate-limit scheduler -> Claude
+
+- Retries: retryable errors (5xx incl. 529 overloaded, 408/409, connection
+  errors and timeouts) are retried with exponential backoff and jitter
+  (tenacity), up to LLM_RETRY_MAX_ATTEMPTS. 429s are retried by the rate
+  limiter instead, which also pauses other callers.
+- Hedging: once an engine/model has LLM_HEDGE_MIN_SAMPLES latencies, a call
+  still running after their p95 (at least LLM_HEDGE_MIN_DELAY_SECONDS) gets
+  a duplicate request; the first response wins. Hedges are limited to
+  LLM_HEDGE_BUDGET of calls.
+- Circuit breakers (per model): LLM_CIRCUIT_FAILURE_THRESHOLD consecutive
+  retryable failures open the circuit, and calls fail fast with
+  CircuitOpenError for LLM_CIRCUIT_RESET_SECONDS; then one probe call is
+  let through and its outcome closes or reopens the circuit.
+- Stage deadlines: pipeline stages run under llm_deadline(); attempts get
+  the remaining time as their request timeout, queueing for rate-limit
+  capacity stops at it, and no retry or hedge starts after it has passed
+  (LLMDeadlineExceeded).
+"""
+
+import collections
+import contextvars
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple, TypeVar
+
+from ..utils.metrics import (
+    LLM_CIRCUIT_REJECTIONS,
+    LLM_CIRCUIT_STATE,
+    LLM_DEADLINE_EXCEEDED,
+    LLM_HEDGED_CALLS,
+    LLM_RETRIES,
+)
+from .rate_limiter import LLMQueueTimeout
+
+logger = logging.getLogger("engines.resilience")
+
+# Retries of retryable upstream errors (attempts include the first call)
+RETRY_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "20"))
+
+# Hedged duplicate requests for tail latency
+HEDGE_ENABLED = os.getenv("LLM_HEDGE", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "2"))
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.05"))  # Hedges per call
+
+# Per-model circuit breakers
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# Default deadline for one pipeline stage's Claude calls (0 = none)
+STAGE_TIMEOUT_SECONDS = float(os.getenv("LLM_STAGE_TIMEOUT_SECONDS", "600"))
+
+RETRYABLE_STATUS = {408, 409, 500, 502, 503, 504, 529}
+LATENCY_WINDOW = 200  # Recent latencies kept per engine/model for the hedge delay
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """The model's circuit is open: the upstream is degraded, failing fast."""
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The stage deadline passed before the call could be (re)tried."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an upstream error is transient and worth retrying.
+
+    Args:
+        error: Exception raised by the client
+
+    Returns:
+        True for 5xx (incl. 529 overloaded), 408/409, connection errors and timeouts
+    """
+    if isinstance(error, (LLMQueueTimeout, LLMDeadlineExceeded, CircuitOpenError)):
+        return False
+
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+
+    anthropic = sys.modules.get("anthropic")  # Only anthropic's own errors need the SDK loaded
+    return anthropic is not None and isinstance(error, anthropic.APIConnectionError)
+
+
+def _reason(error: BaseException) -> str:
+    status = getattr(error, "status_code", None)
+    return str(status) if status is not None else type(error).__name__
+
+
+# ═══════════════════════════════════════════════════════════
+# STAGE DEADLINES
+# ═══════════════════════════════════════════════════════════
+
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def llm_deadline(seconds: Optional[float] = STAGE_TIMEOUT_SECONDS) -> Iterator[None]:
+    """
+    Bound the Claude calls in this block (a pipeline stage) by a deadline.
+
+    Usable as a decorator. Nested deadlines keep the earlier one.
+
+    Args:
+        seconds: Time allowed from now (no deadline if 0 or None)
+    """
+    if not seconds:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline (None without one)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+# ═══════════════════════════════════════════════════════════
+# CIRCUIT BREAKERS
+# ═══════════════════════════════════════════════════════════
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize breaker.
+
+        Args:
+            name: Model name (metrics label)
+            failure_threshold: Consecutive retryable failures that open the circuit
+            reset_seconds: Time open before a probe call is allowed
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Admit a call, or fail fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or its probe is in flight)
+        """
+        with self._lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_seconds:
+                self._set_state(HALF_OPEN)
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+
+        LLM_CIRCUIT_REJECTIONS.inc(model=self.name)
+        raise CircuitOpenError(f"Circuit for {self.name} is open after {self.failures} consecutive failures")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"Opening circuit for {self.name} after {self.failures} consecutive failures")
+                self.opened_at = self.clock()
+                self._set_state(OPEN)
+
+    def release(self):
+        """The call ended without telling us about upstream health (e.g. a 400)."""
+        with self._lock:
+            self._probing = False
+
+    def _set_state(self, state: str):
+        self.state = state
+        LLM_CIRCUIT_STATE.set(_STATE_VALUES[state], model=self.name)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """
+    Get the process-level circuit breaker for a model.
+
+    Args:
+        model: Model name
+
+    Returns:
+        CircuitBreaker
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(model)
+        return breaker
+
+
+# ═══════════════════════════════════════════════════════════
+# HEDGING
+# ═══════════════════════════════════════════════════════════
+
+
+class HedgePolicy:
+    """Hedge delay from recent latencies, and a budget of hedges per call."""
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        min_delay: float = HEDGE_MIN_DELAY_SECONDS,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        budget: float = HEDGE_BUDGET,
+    ):
+        """
+        Initialize policy.
+
+        Args:
+            percentile: Latency percentile after which a call is hedged
+            min_delay: Lower bound on the hedge delay
+            min_samples: Latencies needed before hedging an engine/model
+            budget: Hedges allowed per call (credit accrues per call, up to 10 hedges)
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.budget = budget
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, engine: str, model: str, seconds: float):
+        with self._lock:
+            window = self._latencies.get((engine, model))
+            if window is None:
+                window = self._latencies[(engine, model)] = collections.deque(maxlen=LATENCY_WINDOW)
+            window.append(seconds)
+
+    def delay(self, engine: str, model: str) -> Optional[float]:
+        """Seconds to wait before hedging (None until enough latencies are known); accrues budget."""
+        with self._lock:
+            self._credit = min(10.0, self._credit + self.budget)
+            window = self._latencies.get((engine, model))
+            if window is None or len(window) < self.min_samples:
+                return None
+            ordered = sorted(window)
+        index = min(len(ordered) - 1, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return max(self.min_delay, ordered[index])
+
+    def take(self) -> bool:
+        """Spend one hedge from the budget."""
+        with self._lock:
+            if self._credit < 1:
+                return False
+            self._credit -= 1
+            return True
+
+
+_hedge_policy = HedgePolicy()
+
+
+def _in_thread(fn: Callable[[], T]) -> "Future[T]":
+    """Run fn in a daemon thread (in a copy of the caller's context) and return its future."""
+    future: "Future[T]" = Future()
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            future.set_result(context.run(fn))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _hedged(send: Callable[[], T], engine: str, model: str, policy: HedgePolicy) -> T:
+    """Make the call, adding a duplicate if it runs past the hedge delay."""
+    start = time.perf_counter()
+    delay = policy.delay(engine, model) if HEDGE_ENABLED else None
+    left = remaining_time()
+    if delay is None or (left is not None and left <= delay):
+        result = send()
+        policy.record(engine, model, time.perf_counter() - start)
+        return result
+
+    primary = _in_thread(send)
+    done, _ = wait([primary], timeout=delay)
+    if done or not policy.take():
+        result = primary.result()
+        policy.record(engine, model, time.perf_counter() - start)
+        return result
+
+    LLM_HEDGED_CALLS.inc(engine=engine, outcome="launched")
+    hedge = _in_thread(send)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    LLM_HEDGED_CALLS.inc(engine=engine, outcome="won")
+                policy.record(engine, model, time.perf_counter() - start)
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+# ═══════════════════════════════════════════════════════════
+# RESILIENT CALL
+# ═══════════════════════════════════════════════════════════
+
+
+def call_with_resilience(
+    send: Callable[[Optional[float]], T],
+    engine: str,
+    model: str,
+    max_attempts: int = RETRY_MAX_ATTEMPTS,
+    policy: Optional[HedgePolicy] = None,
+) -> T:
+    """
+    Make a Claude call under the retry, hedging, circuit-breaker and deadline policy.
+
+    Args:
+        send: Makes one request, given its timeout in seconds (None = client default)
+        engine: Calling engine name (metrics)
+        model: Model name (circuit breaker, hedge latencies)
+        max_attempts: Attempts including the first call
+        policy: Hedge policy (the process-level one if None)
+
+    Returns:
+        What send returned
+
+    Raises:
+        CircuitOpenError: If the model's circuit is open
+        LLMDeadlineExceeded: If the stage deadline passed before an attempt
+        The last upstream error once retries are exhausted (non-retryable errors immediately)
+    """
+    from tenacity import Retrying, retry_if_exception, stop_after_attempt, stop_any, wait_exponential_jitter
+
+    breaker = get_circuit_breaker(model)
+    policy = policy or _hedge_policy
+    backoff = wait_exponential_jitter(initial=RETRY_BASE_SECONDS, max=RETRY_MAX_SECONDS)
+
+    def attempt() -> T:
+        left = remaining_time()
+        if left is not None and left <= 0:
+            LLM_DEADLINE_EXCEEDED.inc(engine=engine)
+            raise LLMDeadlineExceeded(f"{engine} stage deadline passed before the Claude call")
+
+        breaker.before_call()
+        try:
+            # Hedges start later than the first request: each gets the time left when it's sent
+            result = _hedged(lambda: send(remaining_time()), engine, model, policy)
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+    def past_deadline(retry_state) -> bool:
+        left = remaining_time()
+        return left is not None and left <= 0
+
+    def wait_within_deadline(retry_state) -> float:
+        left = remaining_time()
+        seconds = backoff(retry_state)
+        return seconds if left is None else max(0.0, min(seconds, left))
+
+    def before_sleep(retry_state):
+        error = retry_state.outcome.exception()
+        LLM_RETRIES.inc(engine=engine, reason=_reason(error))
+        logger.warning(f"{engine} Claude call failed ({_reason(error)}), retry {retry_state.attempt_number}")
+
+    retrying = Retrying(
+        stop=stop_any(stop_after_attempt(max_attempts), past_deadline),
+        wait=wait_within_deadline,
+        retry=retry_if_exception(is_retryable),
+        before_sleep=before_sleep,
+        reraise=True,
+    )
+    return retrying(attempt)
@@ -0,0 +1,355 @@
+"""
+Single-flight coalescing for identical LLM calls.
+
+When several requests make the same Claude call at the same time (a grade
+team generating the same lesson), one call goes upstream and the others wait
+for its result:
+- In-process: concurrent callers with the same key share one call
+  (threads wait on the leader's result, or its exception).
+- Across workers (LLM_SINGLE_FLIGHT_SHARED=true): the in-process leader
+  also takes a lease row in the llm_inflight_calls table; leaders in other
+  workers poll that row for the response instead of calling Claude.
+
+Followers wait no longer than their own stage deadline (remaining_time()).
+A leader's error that only concerns its caller (its stage deadline, its
+rate-limit queue wait, the circuit it saw open, its batch) isn't shared:
+followers retry the call instead.
+
+Keys hash the normalized request (model, sampling parameters, whitespace-
+normalized prompts, output tools), so only calls that would send the same
+prompt coalesce.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from .rate_limiter import LLMQueueTimeout
+from .resilience import CircuitOpenError, LLMDeadlineExceeded, remaining_time
+
+logger = logging.getLogger("engines.single_flight")
+
+# Coalesce identical concurrent calls within this process
+SINGLE_FLIGHT_ENABLED = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+
+# Also coalesce across API workers through the database
+SINGLE_FLIGHT_SHARED = os.getenv("LLM_SINGLE_FLIGHT_SHARED", "false").lower() == "true"
+
+# A worker's lease on a key expires after this long (covers crashed workers)
+SINGLE_FLIGHT_LEASE_SECONDS = float(os.getenv("LLM_SINGLE_FLIGHT_LEASE_SECONDS", "300"))
+
+# How often other workers poll a leased key
+SINGLE_FLIGHT_POLL_MS = float(os.getenv("LLM_SINGLE_FLIGHT_POLL_MS", "250"))
+
+# Completed responses stay readable this long, for workers between polls
+SINGLE_FLIGHT_RESULT_TTL_SECONDS = float(os.getenv("LLM_SINGLE_FLIGHT_RESULT_TTL_SECONDS", "10"))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def request_key(request: Dict) -> str:
+    """
+    Hash of a messages.create request, normalized for coalescing.
+
+    Args:
+        request: messages.create keyword arguments
+
+    Returns:
+        SHA-256 hex digest
+    """
+    normalized = {
+        "model": request.get("model"),
+        "max_tokens": request.get("max_tokens"),
+        "temperature": request.get("temperature"),
+        "system": _normalize(request.get("system", "")),
+        "messages": [
+            {"role": m.get("role"), "content": _normalize(m.get("content", ""))} for m in request.get("messages", [])
+        ],
+        "tools": request.get("tools"),
+        "tool_choice": request.get("tool_choice"),
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _caller_specific(error: BaseException) -> bool:
+    """Whether the leader's error concerns only its own caller (followers retry)."""
+    from .message_batches import BatchPending
+
+    return isinstance(error, (LLMDeadlineExceeded, LLMQueueTimeout, CircuitOpenError, BatchPending))
+
+
+def _check_deadline(what: str) -> Optional[float]:
+    """Seconds left before the caller's deadline (None without one); raises once it has passed."""
+    left = remaining_time()
+    if left is not None and left <= 0:
+        raise LLMDeadlineExceeded(f"Stage deadline passed while waiting for {what}")
+    return left
+
+
+# ═══════════════════════════════════════════════════════════
+# IN-PROCESS
+# ═══════════════════════════════════════════════════════════
+
+
+class _Call:
+    """One in-flight call: followers wait on done for its result or error."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self, shared: Optional["DatabaseFlights"] = None):
+        """
+        Initialize group.
+
+        Args:
+            shared: Cross-worker lease store (in-process only if None)
+        """
+        self.shared = shared
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], str]) -> Tuple[str, Optional[str]]:
+        """
+        Run fn, or wait for the identical call already in flight.
+
+        Args:
+            key: Request key (request_key())
+            fn: Makes the upstream call and returns its text
+
+        Returns:
+            (result, coalesced): coalesced is None when this caller ran fn,
+            "process" or "database" when it shared another call's result
+
+        Raises:
+            LLMDeadlineExceeded: If the caller's deadline passed while following
+            Whatever fn raised, for the leader and its in-process followers
+            (followers call again after errors specific to the leader's caller)
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+
+            if leader:
+                return self._lead(key, call, fn)
+
+            waiting = "an identical in-flight call"
+            if not call.done.wait(_check_deadline(waiting)):
+                raise LLMDeadlineExceeded(f"Stage deadline passed while waiting for {waiting}")
+            if call.error is None:
+                return call.result, "process"
+            if not _caller_specific(call.error):
+                raise call.error
+            logger.debug(f"Single-flight leader failed ({type(call.error).__name__}), retrying")
+
+    def _lead(self, key: str, call: _Call, fn: Callable[[], str]) -> Tuple[str, Optional[str]]:
+        """Run fn as the key's leader and publish its outcome to followers."""
+        coalesced = None
+        try:
+            if self.shared is not None:
+                call.result, coalesced = self.shared.run(key, fn)
+            else:
+                call.result = fn()
+            return call.result, coalesced
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Number of keys currently being called."""
+        with self._lock:
+            return len(self._calls)
+
+
+# ═══════════════════════════════════════════════════════════
+# ACROSS WORKERS (DATABASE LEASES)
+# ═══════════════════════════════════════════════════════════
+
+
+class DatabaseFlights:
+    """
+    Cross-worker coalescing through lease rows (llm_inflight_calls).
+
+    The first worker to insert a key's row calls Claude and stores the
+    response; others poll the row. Failed calls delete their row and expired
+    leases can be taken over, so waiting workers retry instead of hanging.
+    Database errors (e.g. the table doesn't exist) fall back to calling fn.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        lease_seconds: float = SINGLE_FLIGHT_LEASE_SECONDS,
+        poll_interval: float = SINGLE_FLIGHT_POLL_MS / 1000,
+        result_ttl: float = SINGLE_FLIGHT_RESULT_TTL_SECONDS,
+    ):
+        """
+        Initialize lease store.
+
+        Args:
+            session_factory: Session factory (the process-wide SessionLocal if None)
+            lease_seconds: Lease duration before other workers may take over
+            poll_interval: Seconds between polls of another worker's lease
+            result_ttl: Seconds a completed response stays readable
+        """
+        if session_factory is None:
+            from ..student_model.database import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+
+    def run(self, key: str, fn: Callable[[], str]) -> Tuple[str, Optional[str]]:
+        """
+        Call fn under the key's lease, or return another worker's response.
+
+        Args:
+            key: Request key
+            fn: Makes the upstream call and returns its text
+
+        Returns:
+            (result, coalesced): coalesced is "database" when another worker's
+            response was used, otherwise None
+        """
+        from sqlalchemy.exc import SQLAlchemyError
+
+        try:
+            response = self._claim_or_wait(key)
+        except SQLAlchemyError as e:
+            logger.warning(f"Shared single-flight unavailable, calling directly: {e}")
+            return fn(), None
+
+        if response is not None:
+            return response, "database"
+
+        try:
+            result = fn()
+        except BaseException:
+            self._release(key)
+            raise
+        self._complete(key, result)
+        return result, None
+
+    def _claim_or_wait(self, key: str) -> Optional[str]:
+        """
+        Take the key's lease (returns None) or wait for the holder's response.
+
+        Raises:
+            LLMDeadlineExceeded: If the caller's deadline passed while waiting
+        """
+        while True:
+            if self._claim(key):
+                return None
+            with self.session_factory() as session:
+                row = session.get(self._model(), key)
+                if row is not None and row.status == "complete":
+                    return row.response
+            left = _check_deadline("another worker's identical call")
+            time.sleep(self.poll_interval if left is None else min(self.poll_interval, left))
+
+    def _claim(self, key: str) -> bool:
+        from sqlalchemy.exc import IntegrityError
+
+        model = self._model()
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            # Expired rows are finished results or leases of crashed workers
+            session.query(model).filter(model.key == key, model.expires_at < now).delete()
+            session.add(
+                model(
+                    key=key,
+                    status="running",
+                    owner=WORKER_ID,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.lease_seconds),
+                )
+            )
+            try:
+                session.commit()
+                return True
+            except IntegrityError:
+                session.rollback()
+                return False
+
+    def _complete(self, key: str, response: str):
+        from sqlalchemy.exc import SQLAlchemyError
+
+        model = self._model()
+        try:
+            with self.session_factory() as session:
+                session.query(model).filter(model.key == key, model.owner == WORKER_ID).update(
+                    {
+                        "status": "complete",
+                        "response": response,
+                        "expires_at": datetime.utcnow() + timedelta(seconds=self.result_ttl),
+                    }
+                )
+                session.commit()
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not publish single-flight result: {e}")
+
+    def _release(self, key: str):
+        from sqlalchemy.exc import SQLAlchemyError
+
+        model = self._model()
+        try:
+            with self.session_factory() as session:
+                session.query(model).filter(model.key == key, model.owner == WORKER_ID).delete()
+                session.commit()
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not release single-flight lease: {e}")
+
+    @staticmethod
+    def _model():
+        from ..content_storage.models import LLMInflightCallModel
+
+        return LLMInflightCallModel
+
+
+# ═══════════════════════════════════════════════════════════
+# PROCESS-LEVEL GROUP
+# ═══════════════════════════════════════════════════════════
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the process-level single-flight group.
+
+    Returns:
+        SingleFlight (with database leases if LLM_SINGLE_FLIGHT_SHARED=true)
+    """
+    global _single_flight
+
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(DatabaseFlights() if SINGLE_FLIGHT_SHARED else None)
+
+    return _single_flight
@@ -0,0 +1,299 @@
+"""
+Structured (tool-use) output for LLM-backed engines.
+
+Engines ask Claude to return their output as the input of a forced tool
+call whose JSON schema is derived from the engine's Pydantic models, so the
+response is already JSON and is validated field by field instead of being
+reparsed out of free text.
+
+When validation still fails (a required field missing, a wrong type, a
+truncated item), only the invalid fragment is sent back for repair: e.g.
+`questions[3]` is regenerated against the schema for one question and
+spliced into the otherwise valid response. After
+LLM_STRUCTURED_MAX_REPAIRS rounds the call fails with StructuredOutputError
+instead of returning placeholder content.
+
+Outcomes are counted in llm_structured_outputs_total{engine,outcome}
+(valid / repaired / failed), which gives the parse-failure rate.
+"""
+
+import copy
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError, create_model
+
+from ..utils.metrics import LLM_STRUCTURED_OUTPUTS
+
+# Repair rounds before giving up on an invalid response
+STRUCTURED_MAX_REPAIRS = int(os.getenv("LLM_STRUCTURED_MAX_REPAIRS", "2"))
+
+# More invalid items than this in one list are repaired as the whole list
+STRUCTURED_MAX_FRAGMENTS = int(os.getenv("LLM_STRUCTURED_MAX_FRAGMENTS", "3"))
+
+REPAIR_TOOL_NAME = "repair_output"
+
+Path = Tuple[Any, ...]
+
+
+class StructuredOutputError(ValueError):
+    """Claude's output still didn't match the schema after repairs."""
+
+
+# ═══════════════════════════════════════════════════════════
+# SCHEMAS
+# ═══════════════════════════════════════════════════════════
+
+
+def output_model(name: str, model: Optional[Type[BaseModel]] = None, exclude=(), **fields) -> Type[BaseModel]:
+    """
+    Derive the model Claude fills in from an engine's output model.
+
+    Args:
+        name: Model name
+        model: Output model whose fields to copy (optional)
+        exclude: Fields of model the engine fills in itself (ids, timestamps, cost)
+        **fields: Extra fields as (annotation, default) pairs
+
+    Returns:
+        Pydantic model class
+    """
+    copied = {}
+    if model is not None:
+        copied = {
+            field_name: (info.annotation, info)
+            for field_name, info in model.model_fields.items()
+            if field_name not in exclude
+        }
+    return create_model(name, **copied, **fields)
+
+
+def json_schema(model: Type[BaseModel]) -> Dict:
+    """
+    JSON schema of a model with $refs inlined (self-contained tool input_schema).
+
+    Args:
+        model: Pydantic model class
+
+    Returns:
+        JSON schema dict
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if ref is not None:
+                return inline(copy.deepcopy(defs[ref.rsplit("/", 1)[-1]]))
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(item) for item in node]
+        return node
+
+    return inline(schema)
+
+
+def response_text(message) -> str:
+    """
+    Text of a Messages API response: the tool input as JSON if Claude called a tool.
+
+    Args:
+        message: Message from messages.create / stream.get_final_message
+
+    Returns:
+        Response text
+    """
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use":
+            return json.dumps(block.input)
+    return message.content[0].text
+
+
+# ═══════════════════════════════════════════════════════════
+# STRUCTURED OUTPUT
+# ═══════════════════════════════════════════════════════════
+
+
+class StructuredOutput:
+    """A forced tool whose input is an engine's output, with fragment repair."""
+
+    def __init__(
+        self,
+        tool_name: str,
+        model: Type[BaseModel],
+        description: str,
+        max_repairs: int = STRUCTURED_MAX_REPAIRS,
+    ):
+        """
+        Initialize output.
+
+        Args:
+            tool_name: Tool Claude is asked to call (e.g., "record_lesson")
+            model: Pydantic model of the tool input (see output_model())
+            description: Tool description
+            max_repairs: Repair rounds before raising StructuredOutputError
+        """
+        self.tool_name = tool_name
+        self.model = model
+        self.schema = json_schema(model)
+        self.max_repairs = max_repairs
+        self.tool = {"name": tool_name, "description": description, "input_schema": self.schema}
+
+    def parse(
+        self,
+        text: str,
+        request_prompt: str,
+        call: Callable[[str, Dict], str],
+        engine: str,
+    ) -> Tuple[BaseModel, List[str]]:
+        """
+        Validate a response, repairing invalid fragments through call.
+
+        Args:
+            text: Response text (tool input JSON)
+            request_prompt: The original user prompt (context for repairs)
+            call: (user_prompt, tool) -> response text; makes one repair call
+            engine: Engine name for the metric
+
+        Returns:
+            (validated model instance, paths of repaired fragments)
+
+        Raises:
+            StructuredOutputError: If the response is still invalid after max_repairs rounds
+        """
+        data = _loads(text)
+        repaired: List[str] = []
+
+        for round_number in range(self.max_repairs + 1):
+            try:
+                result = self.model.model_validate(data)
+            except ValidationError as e:
+                errors = e.errors()
+            else:
+                LLM_STRUCTURED_OUTPUTS.inc(engine=engine, outcome="repaired" if repaired else "valid")
+                return result, repaired
+
+            if round_number == self.max_repairs:
+                break
+            for path, fragment_errors in _fragments(errors).items():
+                data = self._repair(data, path, fragment_errors, request_prompt, call)
+                repaired.append(format_path(path))
+
+        LLM_STRUCTURED_OUTPUTS.inc(engine=engine, outcome="failed")
+        raise StructuredOutputError(
+            f"{self.tool_name} output invalid after {self.max_repairs} repair rounds: "
+            + "; ".join(f"{format_path(tuple(err['loc']))}: {err['msg']}" for err in errors[:5])
+        )
+
+    def _repair(self, data: Any, path: Path, errors: List[Dict], request_prompt: str, call) -> Any:
+        """Ask Claude for a valid replacement of the fragment at path and splice it in."""
+        schema = _schema_at(self.schema, path)
+        tool = {
+            "name": REPAIR_TOOL_NAME,
+            "description": f"Record a corrected replacement for {format_path(path)} of the {self.tool_name} output",
+            "input_schema": {"type": "object", "properties": {"value": schema}, "required": ["value"]},
+        }
+        problems = "\n".join(
+            f"- {format_path(tuple(err['loc'])) or 'output'}: {err['msg']}" for err in errors
+        )
+        prompt = f"""{request_prompt}
+
+---
+
+Part of your {self.tool_name} output for the request above is invalid.
+
+**Location:** {format_path(path) or 'the whole output'}
+**Current value:**
+{json.dumps(_get(data, path), indent=2, default=str)}
+
+**Problems:**
+{problems}
+
+Call the {REPAIR_TOOL_NAME} tool with a corrected replacement for just this part."""
+
+        replacement = _loads(call(prompt, tool))
+        if not isinstance(replacement, dict) or "value" not in replacement:
+            return data
+        return _set(data, path, replacement["value"])
+
+
+# ═══════════════════════════════════════════════════════════
+# FRAGMENTS
+# ═══════════════════════════════════════════════════════════
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return None
+
+
+def format_path(path: Path) -> str:
+    """("questions", 3, "options") -> "questions[3].options"."""
+    out = ""
+    for part in path:
+        out += f"[{part}]" if isinstance(part, int) else (f".{part}" if out else str(part))
+    return out
+
+
+def _fragment_path(loc: Path) -> Path:
+    """Smallest repairable unit containing an error: the list item, else the top-level field."""
+    for i, part in enumerate(loc):
+        if isinstance(part, int):
+            return tuple(loc[: i + 1])
+    return tuple(loc[:1])
+
+
+def _fragments(errors: List[Dict]) -> Dict[Path, List[Dict]]:
+    """Group validation errors by fragment; many bad items in one list repair the whole list."""
+    grouped: Dict[Path, List[Dict]] = {}
+    for err in errors:
+        grouped.setdefault(_fragment_path(tuple(err["loc"])), []).append(err)
+
+    per_list: Dict[Path, int] = {}
+    for path in grouped:
+        if path and isinstance(path[-1], int):
+            per_list[path[:-1]] = per_list.get(path[:-1], 0) + 1
+
+    merged: Dict[Path, List[Dict]] = {}
+    for path, errs in grouped.items():
+        if path and isinstance(path[-1], int) and per_list[path[:-1]] > STRUCTURED_MAX_FRAGMENTS:
+            path = path[:-1]
+        merged.setdefault(path, []).extend(errs)
+
+    # A repaired root replaces everything else
+    if () in merged:
+        return {(): [err for errs in merged.values() for err in errs]}
+    return merged
+
+
+def _schema_at(schema: Dict, path: Path) -> Dict:
+    for part in path:
+        if isinstance(part, int):
+            schema = schema.get("items", {})
+        else:
+            schema = schema.get("properties", {}).get(part, {})
+    return schema
+
+
+def _get(data: Any, path: Path) -> Any:
+    for part in path:
+        try:
+            data = data[part]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return data
+
+
+def _set(data: Any, path: Path, value: Any) -> Any:
+    if not path:
+        return value
+    parent = _get(data, path[:-1])
+    try:
+        parent[path[-1]] = value
+    except (KeyError, IndexError, TypeError):
+        pass
+    return data
@@ -190,6 +190,20 @@ class AssessmentGrader:
 
         return graded
 
+    def apply_mastery_updates(self, graded: GradedAssessment, questions: List[AssessmentQuestion]):
+        """
+        Update Student Model mastery from an assessment graded with update_mastery=False.
+
+        Lets callers store the graded assessment first, so mastery only
+        changes for assessments that were saved.
+
+        Args:
+            graded: Graded assessment
+            questions: Its assessment questions
+        """
+        if self.student_model:
+            self._update_student_mastery(graded, {q.question_id: q for q in questions})
+
     def _grade_mc_questions(
         self,
         mc_questions: List[AssessmentQuestion],
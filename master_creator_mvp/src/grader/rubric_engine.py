@@ -9,12 +9,26 @@ Rubric Types:
 - Single-point (meets/doesn't meet standard)
 """
 
-import json
 from typing import Dict, List, Optional
 from pydantic import BaseModel
-import os
-
-from anthropic import Anthropic
+import threading
+import time
+
+from ..utils.metrics import LLM_COST, LLM_OUTPUT_TRUNCATED, LLM_REQUEST_DURATION, LLM_TOKENS
+from ..utils.tracing import span
+from ..engines.llm_backends import create_llm_client
+from ..engines.model_routing import (
+    MAX_TOKENS_CEILING,
+    SHORT_ANSWER_CHARS,
+    Route,
+    is_truncated,
+    model_pricing,
+    record_routed_call,
+    route,
+)
+from ..engines.rate_limiter import dispatch_llm_call, llm_priority
+from ..engines.resilience import call_with_resilience
+from ..engines.structured_output import StructuredOutput, output_model, response_text
 
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -80,6 +94,18 @@ class ConstructedResponseGrade(BaseModel):
     areas_for_improvement: List[str]
 
 
+# Claude scores the criteria; totals are computed from the criterion scores
+GRADE_OUTPUT = StructuredOutput(
+    "record_grade",
+    output_model(
+        "GradeContent",
+        ConstructedResponseGrade,
+        exclude=("question_id", "student_id", "total_points_earned", "total_points_possible", "score_percentage"),
+    ),
+    "Record the rubric scores and feedback for the student response",
+)
+
+
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # RUBRIC GRADING ENGINE
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -92,23 +118,23 @@ class RubricGradingEngine:
     Provides detailed, criterion-based feedback.
     """
 
-    def __init__(self, anthropic_api_key: Optional[str] = None):
+    def __init__(self, anthropic_api_key: Optional[str] = None, llm_client=None):
         """
         Initialize grading engine.
 
         Args:
             anthropic_api_key: Anthropic API key (or from env)
+            llm_client: LLM client (uses the LLM_BACKEND transport if None)
         """
-        api_key = anthropic_api_key or os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY not provided")
-
-        self.client = Anthropic(api_key=api_key)
+        self.client = llm_client or create_llm_client(self.__class__.__name__, api_key=anthropic_api_key)
         self.model = "claude-sonnet-4-5-20250929"
 
         # Cost tracking
         self.total_input_tokens = 0
         self.total_output_tokens = 0
+        self.input_cost = 0.0
+        self.output_cost = 0.0
+        self._usage_lock = threading.Lock()  # Hedged requests may finish concurrently
 
     def grade_response(
         self,
@@ -126,6 +152,9 @@ class RubricGradingEngine:
 
         Returns:
             ConstructedResponseGrade with detailed feedback
+
+        Raises:
+            StructuredOutputError: If Claude's output is still invalid after repairs
         """
         # Build grading prompt
         system_prompt = self._build_system_prompt(rubric)
@@ -133,25 +162,33 @@ class RubricGradingEngine:
             question_text, student_response.response_text, rubric
         )
 
-        # Call Claude
-        response_text = self._call_claude(system_prompt, user_prompt)
-
-        # Parse response
-        grade_data = self._parse_grading_response(response_text, rubric)
+        # Short answers are scored by the fast model (see model_routing)
+        task = "grade_short" if len(student_response.response_text) <= SHORT_ANSWER_CHARS else "grade"
+        call_route = route(task, len(rubric.criteria))
+
+        # Call Claude (tool-use output validated against GradeContent)
+        text = self._call_claude(system_prompt, user_prompt, tool=GRADE_OUTPUT.tool, call_route=call_route)
+        grade_data, _ = GRADE_OUTPUT.parse(
+            text,
+            user_prompt,
+            call=lambda prompt, tool: self._call_claude(system_prompt, prompt, tool=tool, model=call_route.model),
+            engine=self.__class__.__name__,
+        )
+        total_points_earned = round(sum(cs.points_earned for cs in grade_data.criterion_scores), 2)
 
         # Build grade object
         grade = ConstructedResponseGrade(
             question_id=student_response.question_id,
             student_id=student_response.student_id,
-            total_points_earned=grade_data["total_points_earned"],
+            total_points_earned=total_points_earned,
             total_points_possible=rubric.total_points,
             score_percentage=round(
-                (grade_data["total_points_earned"] / rubric.total_points * 100), 2
+                (total_points_earned / rubric.total_points * 100), 2
             ),
-            criterion_scores=grade_data["criterion_scores"],
-            overall_feedback=grade_data["overall_feedback"],
-            strengths=grade_data["strengths"],
-            areas_for_improvement=grade_data["areas_for_improvement"],
+            criterion_scores=grade_data.criterion_scores,
+            overall_feedback=grade_data.overall_feedback,
+            strengths=grade_data.strengths,
+            areas_for_improvement=grade_data.areas_for_improvement,
         )
 
         return grade
@@ -175,12 +212,14 @@ class RubricGradingEngine:
         """
         grades = []
 
-        for response in student_responses:
-            try:
-                grade = self.grade_response(question_text, response, rubric)
-                grades.append(grade)
-            except Exception as e:
-                print(f"Error grading response from {response.student_id}: {str(e)}")
+        # Batch lane: interactive requests go first when the rate limit is tight
+        with llm_priority("batch"):
+            for response in student_responses:
+                try:
+                    grade = self.grade_response(question_text, response, rubric)
+                    grades.append(grade)
+                except Exception as e:
+                    print(f"Error grading response from {response.student_id}: {str(e)}")
 
         return grades
 
@@ -199,7 +238,7 @@ Be:
 - Specific about strengths and areas for improvement
 - Aligned with rubric criteria
 
-Respond ONLY with valid JSON in this exact format:
+Record the grade by calling the record_grade tool, for example:
 
 {{
   "criterion_scores": [
@@ -253,93 +292,103 @@ Respond ONLY with valid JSON in this exact format:
         prompt += """
 Score each criterion and provide specific, constructive feedback.
 
-Respond ONLY with the JSON object. No additional text."""
+Record the grade with the record_grade tool."""
 
         return prompt
 
-    def _call_claude(self, system_prompt: str, user_prompt: str) -> str:
-        """Call Claude API for grading."""
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=2000,
-            system=system_prompt,
-            messages=[
+    def _call_claude(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool: Optional[Dict] = None,
+        call_route: Optional[Route] = None,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        Call Claude API for grading (forcing tool, if given; its input is returned as JSON).
+
+        A routed call uses the route's model and max_tokens, and is requested
+        again at LLM_MAX_TOKENS if the response is cut off.
+        """
+        request = {
+            "model": call_route.model if call_route else (model or self.model),
+            "max_tokens": call_route.max_tokens if call_route else 2000,
+            "system": system_prompt,
+            "messages": [
                 {
                     "role": "user",
                     "content": user_prompt,
                 }
             ],
-        )
-
-        # Track tokens
-        self.total_input_tokens += response.usage.input_tokens
-        self.total_output_tokens += response.usage.output_tokens
-
-        return response.content[0].text
-
-    def _parse_grading_response(self, response_text: str, rubric: Rubric) -> Dict:
-        """Parse Claude's grading response."""
-        try:
-            data = json.loads(response_text)
-
-            # Calculate total points
-            total_points_earned = sum(
-                cs["points_earned"] for cs in data["criterion_scores"]
+        }
+        if tool:
+            request["tools"] = [tool]
+            request["tool_choice"] = {"type": "tool", "name": tool["name"]}
+
+        engine_name = self.__class__.__name__
+        start = time.perf_counter()
+
+        def send(request):
+            return call_with_resilience(
+                lambda timeout: dispatch_llm_call(request, lambda: self._send_claude(request, timeout), engine_name),
+                engine=engine_name,
+                model=request["model"],
             )
 
-            # Build criterion scores
-            criterion_scores = []
-            for cs in data["criterion_scores"]:
-                criterion_scores.append(
-                    CriterionScore(
-                        criterion_name=cs["criterion_name"],
-                        points_earned=cs["points_earned"],
-                        points_possible=cs["points_possible"],
-                        level_achieved=cs["level_achieved"],
-                        feedback=cs["feedback"],
-                    )
+        response = send(request)
+        if call_route is not None:
+            if is_truncated(response) and request["max_tokens"] < MAX_TOKENS_CEILING:
+                LLM_OUTPUT_TRUNCATED.inc(task=call_route.task, model=call_route.model)
+                response = send({**request, "max_tokens": MAX_TOKENS_CEILING})
+            record_routed_call(call_route, engine_name, response, time.perf_counter() - start)
+        return response_text(response)
+
+    def _send_claude(self, request: Dict, timeout: Optional[float] = None):
+        """Send one grading request to Claude (timeout in seconds), recording latency, tokens and cost."""
+        engine_name = self.__class__.__name__
+        model = request["model"]
+        start = time.perf_counter()
+        status = "error"
+        with span("llm.call", {"llm.engine": engine_name, "llm.model": model}, kind="client") as llm_span:
+            try:
+                options = {"timeout": timeout} if timeout is not None else {}
+                response = self.client.messages.create(**request, **options)
+                status = "success"
+            finally:
+                LLM_REQUEST_DURATION.observe(
+                    time.perf_counter() - start, engine=engine_name, model=model, status=status
                 )
+            llm_span.set_attributes(
+                {"llm.input_tokens": response.usage.input_tokens, "llm.output_tokens": response.usage.output_tokens}
+            )
 
-            return {
-                "total_points_earned": round(total_points_earned, 2),
-                "criterion_scores": criterion_scores,
-                "overall_feedback": data["overall_feedback"],
-                "strengths": data["strengths"],
-                "areas_for_improvement": data["areas_for_improvement"],
-            }
-
-        except json.JSONDecodeError:
-            # Fallback if JSON parsing fails
-            return {
-                "total_points_earned": 0.0,
-                "criterion_scores": [
-                    CriterionScore(
-                        criterion_name=c.criterion_name,
-                        points_earned=0.0,
-                        points_possible=c.points_possible,
-                        level_achieved="Error",
-                        feedback="Error parsing grading response",
-                    )
-                    for c in rubric.criteria
-                ],
-                "overall_feedback": "Error grading response. Please try again.",
-                "strengths": [],
-                "areas_for_improvement": ["Error occurred during grading"],
-            }
+        # Track tokens and cost (list prices of the routed model)
+        usage = response.usage
+        input_price, output_price = model_pricing(model)
+        with self._usage_lock:
+            self.total_input_tokens += usage.input_tokens
+            self.total_output_tokens += usage.output_tokens
+            self.input_cost += (usage.input_tokens / 1_000_000) * input_price
+            self.output_cost += (usage.output_tokens / 1_000_000) * output_price
+        LLM_TOKENS.inc(usage.input_tokens, engine=engine_name, model=model, direction="input")
+        LLM_TOKENS.inc(usage.output_tokens, engine=engine_name, model=model, direction="output")
+        LLM_COST.inc(
+            (usage.input_tokens * input_price + usage.output_tokens * output_price) / 1_000_000,
+            engine=engine_name,
+            model=model,
+        )
+
+        return response
 
     def get_cost_summary(self) -> Dict:
         """Get cost summary for grading operations."""
-        # Claude Sonnet 4.5 pricing: ~$3/M input, ~$15/M output
-        input_cost = (self.total_input_tokens / 1_000_000) * 3.0
-        output_cost = (self.total_output_tokens / 1_000_000) * 15.0
-        total_cost = input_cost + output_cost
-
+        # Accumulated per call at the list prices of each call's model
         return {
             "input_tokens": self.total_input_tokens,
             "output_tokens": self.total_output_tokens,
-            "input_cost": round(input_cost, 4),
-            "output_cost": round(output_cost, 4),
-            "total_cost": round(total_cost, 4),
+            "input_cost": round(self.input_cost, 4),
+            "output_cost": round(self.output_cost, 4),
+            "total_cost": round(self.input_cost + self.output_cost, 4),
         }
 
 
@@ -0,0 +1,171 @@
+"""
+Offline (nightly) pipeline runs through the Message Batches API.
+
+Runs the LangGraph pipeline for many lessons at once, sending every Claude
+call as part of a message batch (half price, no real-time rate limits)
+instead of one real-time request at a time:
+
+1. Each run executes until an engine needs a Claude response it doesn't
+   have; BatchPending unwinds it, and the graph checkpoint keeps it at
+   that node.
+2. The pending requests of all runs are submitted as one batch, which is
+   polled until it has ended.
+3. Each run resumes at its suspended node, which now gets its responses
+   from the batch results and continues to the next call.
+
+A round is one batch: runs take one round per sequential Claude call on
+their critical path (lesson, each worksheet tier, repairs); calls of
+parallel branches (unit plan, diagnostic) share rounds with it. Within a
+round, the branches that finished keep their output and only the
+suspended ones run again. Calls made in real time anyway go through the
+rate limiter's precompute lane, below batch grading, so real-time
+traffic (API requests, grading) is unaffected. Completed stages are also
+checkpointed to the database, so a failed run can be finished in real time
+with resume_sync_pipeline().
+
+Usage:
+    python -m src.orchestration.batch_pipeline runs.json
+where runs.json is a list of run_sync_pipeline() keyword arguments.
+"""
+
+import logging
+import os
+import time
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+from .langgraph_pipeline import create_master_creator_graph, save_checkpoint
+from .state_management import PipelineState, add_error, finalize_pipeline, initialize_pipeline_state
+from ..engines.llm_backends import create_llm_client
+from ..engines.message_batches import (
+    BATCH_POLL_SECONDS,
+    BATCH_TIMEOUT_SECONDS,
+    BatchCollector,
+    BatchPending,
+    batch_mode,
+)
+from ..engines.rate_limiter import llm_priority
+from ..student_model import schemas
+from ..student_model.database import session_scope
+from ..utils.tracing import span
+
+logger = logging.getLogger("orchestration.batch_pipeline")
+
+# Batches per batch run before unfinished pipelines are failed
+BATCH_MAX_ROUNDS = int(os.getenv("LLM_BATCH_MAX_ROUNDS", "20"))
+
+
+def _checkpointer():
+    """In-memory checkpointer that restores the Student Model enums kept in pipeline state."""
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    enums = [
+        (schemas.__name__, name)
+        for name, value in vars(schemas).items()
+        if isinstance(value, type) and issubclass(value, Enum)
+    ]
+    return InMemorySaver(serde=JsonPlusSerializer(allowed_msgpack_modules=enums))
+
+
+def run_batch_pipelines(
+    runs: List[Dict],
+    client=None,
+    poll_seconds: float = BATCH_POLL_SECONDS,
+    timeout: float = BATCH_TIMEOUT_SECONDS,
+    max_rounds: int = BATCH_MAX_ROUNDS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> List[PipelineState]:
+    """
+    Run pipelines with their Claude calls sent as message batches.
+
+    Args:
+        runs: Keyword arguments of initialize_pipeline_state() per pipeline
+        client: Client with `messages.batches` (default: the configured LLM backend)
+        poll_seconds: Seconds between batch status polls
+        timeout: Seconds before an unfinished batch is canceled
+        max_rounds: Batches before unfinished pipelines are marked failed
+        sleep: Sleep function between polls (tests pass a no-op)
+
+    Returns:
+        Final PipelineState per run, in order
+
+    Raises:
+        TimeoutError: If a batch is still processing after timeout
+    """
+    client = client or create_llm_client("MessageBatches")
+    graph = create_master_creator_graph(checkpointer=_checkpointer())
+    collector = BatchCollector()
+
+    states = [initialize_pipeline_state(**run) for run in runs]
+    configs = [{"configurable": {"thread_id": state["pipeline_id"]}} for state in states]
+    # The first round starts each graph; later rounds resume it from its checkpoint
+    inputs: List[Optional[PipelineState]] = list(states)
+    finished: Dict[int, PipelineState] = {}
+
+    with span("pipeline.batch_run", {"pipeline.kind": "batch", "pipeline.count": len(states)}) as run_span, \
+            llm_priority("precompute"):
+        with session_scope():
+            for state in states:
+                save_checkpoint(state["pipeline_id"], "initialization", state)
+
+        for round_number in range(1, max_rounds + 1):
+            for index, config in enumerate(configs):
+                if index in finished:
+                    continue
+                # Completed nodes commit their own writes, also when the run suspends
+                with batch_mode(collector):
+                    try:
+                        finished[index] = graph.invoke(inputs[index], config)
+                    except BatchPending:
+                        inputs[index] = None
+
+            if len(finished) == len(states):
+                break
+            submitted = collector.submit(client, poll_seconds=poll_seconds, timeout=timeout, sleep=sleep)
+            logger.info(
+                f"Batch round {round_number}: {submitted} requests for "
+                f"{len(states) - len(finished)} unfinished pipelines"
+            )
+
+        for index, config in enumerate(configs):
+            if index not in finished:
+                state = graph.get_state(config).values
+                add_error(state, f"Batch run did not finish within {max_rounds} rounds")
+                finished[index] = finalize_pipeline(state, success=False)
+
+        run_span.set_attribute("pipeline.batches", len(collector.batches))
+
+    logger.info(
+        f"Batch run complete: {len(states)} pipelines, {len(collector.batches)} batches, "
+        f"{len(collector.results)} requests"
+    )
+    return [finished[index] for index in range(len(states))]
+
+
+# ═══════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.orchestration.batch_pipeline <runs.json>")
+        sys.exit(1)
+
+    with open(sys.argv[1]) as f:
+        final_states = run_batch_pipelines(json.load(f))
+
+    for final_state in final_states:
+        print(
+            f"{final_state['pipeline_id']}: {final_state['execution_status']} "
+            f"(${final_state['total_cost']:.4f}, {len(final_state['errors'])} errors)"
+        )
@@ -6,30 +6,43 @@ Implements stateful, asynchronous pipeline execution using LangGraph.
 Features:
 - Conditional routing (skip optional engines)
 - Error handling with retry logic
-- Parallel execution where possible
-- State persistence across nodes
+- Parallel execution: the graph is a DAG, so independent stages run
+  concurrently and a run takes as long as its critical path
+  (class snapshot -> lesson -> worksheets -> IEP):
+
+      class_snapshot ─┬─ lesson_architect ─┬─ worksheet_designer ── iep_specialist ─┐
+                      │                    └─ diagnostic ──────────────────────────┤
+                      ├─ unit_plan (optional) ─────────────────────────────────────┤
+                      └─ adaptive_plan (optional) ─────────────────────────────────┼─ finalize
+      feedback_loop (optional) ────────────────────────────────────────────────────┘
+- State persistence across nodes, checkpointed to the database after each
+  completed stage (resume_sync_pipeline / resume_async_pipeline restart a
+  run from any stage, or regenerate single worksheet tiers)
 - Observable execution flow
 """
 
+import asyncio
+import functools
+import importlib.util
 import logging
-from typing import Literal, Optional
+import os
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Literal, Optional, Union
 from datetime import datetime
 import warnings
 
-# Make langgraph optional
-try:
-    from langgraph.graph import StateGraph, END
-    LANGGRAPH_AVAILABLE = True
-except ImportError:
-    LANGGRAPH_AVAILABLE = False
-    StateGraph = None
-    END = None
+# Make langgraph optional; it is imported when a graph is built (importing it
+# pulls in langchain_core, which would otherwise slow every API cold start)
+LANGGRAPH_AVAILABLE = importlib.util.find_spec("langgraph") is not None
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+if not LANGGRAPH_AVAILABLE:
     warnings.warn(
         "langgraph not available. Advanced pipeline features will be disabled. "
         "Install langgraph for full functionality: pip install langgraph"
     )
 
 from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
 
 from .state_management import (
     PipelineState,
@@ -41,15 +54,157 @@ from .state_management import (
     finalize_pipeline,
     should_retry,
     increment_retry,
+    copy_state,
+    state_update,
+    apply_update,
 )
 
 from ..engines.engine_0_unit_planner import UnitPlanDesigner
 from ..engines.engine_1_lesson_architect import LessonArchitect
-from ..engines.engine_5_diagnostic import DiagnosticEngine
-from ..engines.engine_2_worksheet_designer import WorksheetDesigner
+from ..engines.engine_5_diagnostic import DiagnosticEngine, StudentMasteryEstimate
+from ..engines.engine_2_worksheet_designer import WorksheetDesigner, WorksheetSet
 from ..engines.engine_3_iep_specialist import IEPSpecialist
 from ..engines.engine_4_adaptive import AdaptiveEngine
 from ..engines.engine_6_feedback import FeedbackLoop
+from ..engines.rate_limiter import llm_priority
+from ..engines.resilience import llm_deadline
+from ..content_storage.interface import ContentStorageInterface
+from ..student_model.database import current_session, session_scope
+from ..student_model.snapshot import ClassSnapshot
+from ..utils.metrics import PIPELINE_CHECKPOINTS, PIPELINE_RESUMES, timed_stage
+from ..utils.tracing import current_trace_id, span, traced
+
+# Save pipeline state to the database after each completed stage
+CHECKPOINTS_ENABLED = os.getenv("PIPELINE_CHECKPOINTS", "true").lower() == "true"
+
+# Graph stages in dependency order ("initialization" checkpoints the input state)
+STAGES = [
+    "initialization",
+    "class_snapshot",
+    "unit_plan",
+    "lesson_architect",
+    "diagnostic",
+    "worksheet_designer",
+    "iep_specialist",
+    "adaptive_plan",
+    "feedback_loop",
+    "finalize",
+]
+
+# Stages that use each stage's output (the graph's edges, before finalize)
+DOWNSTREAM = {
+    "class_snapshot": ["unit_plan", "lesson_architect", "adaptive_plan"],
+    "lesson_architect": ["diagnostic", "worksheet_designer"],
+    "worksheet_designer": ["iep_specialist"],
+}
+
+# Stages whose failure leaves nothing for Engine 3 to adapt
+CORE_STAGES = ("class_snapshot", "lesson_architect", "worksheet_designer")
+
+TIERS = ("tier_1", "tier_2", "tier_3")
+
+
+# ═══════════════════════════════════════════════════════════
+# SHARED CLASS SNAPSHOT
+# ═══════════════════════════════════════════════════════════
+
+
+def attach_class_snapshot(engine, state: PipelineState) -> None:
+    """
+    Hand the run's class snapshot to an engine.
+
+    The snapshot (roster, IEPs, mastery) is built once by the class_snapshot
+    node and stored in state, so every downstream node reuses it instead of
+    re-querying the Student Model. Without one (class not found, or the
+    node failed) engines query the Student Model themselves.
+
+    Args:
+        engine: Engine instance (BaseEngine subclass)
+        state: Pipeline state
+    """
+    snapshot_data = state.get("class_snapshot")
+    if snapshot_data:
+        engine.set_class_snapshot(ClassSnapshot.model_validate(snapshot_data))
+
+
+# ═══════════════════════════════════════════════════════════
+# STAGE CHECKPOINTS
+# ═══════════════════════════════════════════════════════════
+
+
+def save_checkpoint(pipeline_id: str, stage: str, update: Dict) -> None:
+    """
+    Save what a completed stage added to the run's state.
+
+    Joins the active unit of work (committing it, so the stage's writes are
+    durable too). A failed save is logged; the run continues without it.
+
+    Args:
+        pipeline_id: Pipeline ID
+        stage: Completed stage (STAGES entry)
+        update: The stage's state update (the full input state for "initialization")
+    """
+    if not CHECKPOINTS_ENABLED:
+        return
+
+    try:
+        with ContentStorageInterface(current_session()) as storage:
+            try:
+                storage.save_pipeline_checkpoint(pipeline_id, stage, to_jsonable_python(update))
+            except Exception:
+                storage.session.rollback()
+                raise
+        PIPELINE_CHECKPOINTS.inc(stage=stage, status="success")
+    except Exception as e:
+        PIPELINE_CHECKPOINTS.inc(stage=stage, status="error")
+        logging.getLogger("langgraph.checkpoints").warning(
+            f"Could not checkpoint {pipeline_id} after {stage}: {str(e)}"
+        )
+
+
+# ═══════════════════════════════════════════════════════════
+# GRAPH NODE WRAPPER
+# ═══════════════════════════════════════════════════════════
+
+
+def graph_node(stage: str) -> Callable:
+    """
+    Decorator making a node body safe to run in a parallel branch.
+
+    The body works on its own copy of the state, in its own unit of work
+    (concurrent branches run in separate threads, and a Session can't be
+    shared between them). The node returns only what the body changed,
+    which the state's reducers merge with other branches' updates, and
+    checkpoints that update unless the stage failed.
+
+    The node's `afunc` attribute is its coroutine version for ainvoke():
+    it runs the body in a worker thread, so async branches overlap too.
+
+    Args:
+        stage: Node name (STAGES entry)
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(fn: Callable[[PipelineState], PipelineState]) -> Callable:
+        @functools.wraps(fn)
+        def node(state: PipelineState) -> Dict:
+            work = copy_state(state)
+            with session_scope():
+                fn(work)
+                update = state_update(state, work)
+                if stage not in update.get("failed_stages", []):
+                    save_checkpoint(state["pipeline_id"], stage, update)
+            return update
+
+        async def afunc(state: PipelineState) -> Dict:
+            return await asyncio.to_thread(node, state)
+
+        node.afunc = afunc
+        return node
+
+    return decorator
 
 
 # ═══════════════════════════════════════════════════════════
@@ -57,6 +212,52 @@ from ..engines.engine_6_feedback import FeedbackLoop
 # ═══════════════════════════════════════════════════════════
 
 
+@graph_node("class_snapshot")
+@traced("langgraph.class_snapshot")
+@timed_stage("langgraph", "class_snapshot")
+def class_snapshot_node(state: PipelineState) -> PipelineState:
+    """
+    Node: Class Snapshot + Engine 5 mastery estimation
+
+    Loads roster, IEPs and mastery once for every downstream node, and
+    estimates each student's mastery and tier (no Claude call), so the
+    worksheets don't wait for the diagnostic questions.
+    """
+    logger = logging.getLogger("langgraph.class_snapshot")
+    state["current_stage"] = "class_snapshot"
+
+    try:
+        logger.info("Building class snapshot and mastery estimates")
+
+        engine = DiagnosticEngine()
+        snapshot = engine.student_model.get_class_snapshot(
+            state["class_id"], state.get("concept_ids")
+        )
+        if snapshot:
+            state["class_snapshot"] = snapshot.model_dump()
+            engine.set_class_snapshot(snapshot)
+        else:
+            add_warning(state, f"Class {state['class_id']} not found in Student Model")
+
+        estimates = engine.estimate_class_mastery(state["class_id"], state["concept_ids"])
+        state["mastery_estimates"] = [estimate.model_dump() for estimate in estimates]
+        state["tier_distribution"] = engine.tier_distribution(estimates)
+
+        mark_stage_complete(state, "class_snapshot", success=True)
+        logger.info(f"Class snapshot complete: {len(estimates)} mastery estimates")
+
+    except Exception as e:
+        logger.error(f"Class snapshot failed: {str(e)}", exc_info=True)
+        add_error(state, f"Class snapshot failed: {str(e)}")
+        mark_stage_complete(state, "class_snapshot", success=False)
+
+    return state
+
+
+@graph_node("unit_plan")
+@traced("langgraph.unit_plan")
+@timed_stage("langgraph", "unit_plan")
+@llm_deadline()
 def unit_plan_node(state: PipelineState) -> PipelineState:
     """
     Node: Engine 0 - Unit Plan Designer
@@ -70,6 +271,7 @@ def unit_plan_node(state: PipelineState) -> PipelineState:
         logger.info(f"Running Engine 0: Unit Plan Designer")
 
         engine = UnitPlanDesigner()
+        attach_class_snapshot(engine, state)
         unit_plan = engine.generate(
             unit_title=state["lesson_topic"],
             grade_level=state["grade_level"],
@@ -104,6 +306,10 @@ def unit_plan_node(state: PipelineState) -> PipelineState:
     return state
 
 
+@graph_node("lesson_architect")
+@traced("langgraph.lesson_architect")
+@timed_stage("langgraph", "lesson_architect")
+@llm_deadline()
 def lesson_architect_node(state: PipelineState) -> PipelineState:
     """
     Node: Engine 1 - Lesson Architect
@@ -117,6 +323,7 @@ def lesson_architect_node(state: PipelineState) -> PipelineState:
         logger.info("Running Engine 1: Lesson Architect")
 
         engine = LessonArchitect()
+        attach_class_snapshot(engine, state)
         lesson = engine.generate(
             topic=state["lesson_topic"],
             grade_level=state["grade_level"],
@@ -158,6 +365,10 @@ def lesson_architect_node(state: PipelineState) -> PipelineState:
     return state
 
 
+@graph_node("diagnostic")
+@traced("langgraph.diagnostic")
+@timed_stage("langgraph", "diagnostic")
+@llm_deadline()
 def diagnostic_node(state: PipelineState) -> PipelineState:
     """
     Node: Engine 5 - Diagnostic Engine
@@ -171,10 +382,16 @@ def diagnostic_node(state: PipelineState) -> PipelineState:
         logger.info("Running Engine 5: Diagnostic Engine")
 
         engine = DiagnosticEngine()
+        attach_class_snapshot(engine, state)
 
         # Get learning objectives from lesson
         learning_objectives = state.get("learning_objectives", [state["lesson_topic"]])
 
+        # Mastery was estimated by the class_snapshot node; only questions are generated here
+        student_estimates = None
+        if state.get("mastery_estimates") is not None:
+            student_estimates = [StudentMasteryEstimate(**e) for e in state["mastery_estimates"]]
+
         diagnostic = engine.generate(
             lesson_objectives=learning_objectives,
             concept_ids=state["concept_ids"],
@@ -182,12 +399,12 @@ def diagnostic_node(state: PipelineState) -> PipelineState:
             num_questions_per_concept=state["num_questions_per_concept"],
             grade_level=state["grade_level"],
             subject=state["subject"],
+            student_estimates=student_estimates,
         )
 
         # Store in state
         state["diagnostic"] = diagnostic.model_dump()
         state["diagnostic_id"] = diagnostic.diagnostic_id
-        state["tier_distribution"] = diagnostic.tier_distribution
 
         # Update cost
         cost_summary = engine.get_cost_summary()
@@ -210,6 +427,10 @@ def diagnostic_node(state: PipelineState) -> PipelineState:
     return state
 
 
+@graph_node("worksheet_designer")
+@traced("langgraph.worksheet_designer")
+@timed_stage("langgraph", "worksheet_designer")
+@llm_deadline()
 def worksheet_designer_node(state: PipelineState) -> PipelineState:
     """
     Node: Engine 2 - Worksheet Designer
@@ -223,15 +444,16 @@ def worksheet_designer_node(state: PipelineState) -> PipelineState:
         logger.info("Running Engine 2: Worksheet Designer")
 
         engine = WorksheetDesigner()
+        attach_class_snapshot(engine, state)
 
         # Get learning objective from lesson
         learning_objective = state["lesson_topic"]
         if state.get("learning_objectives"):
             learning_objective = state["learning_objectives"][0][:200]
 
-        # Prepare diagnostic results
+        # Prepare diagnostic results (mastery estimates; the diagnostic questions
+        # are generated alongside in a parallel branch)
         diagnostic_dict = {
-            "diagnostic_id": state["diagnostic_id"],
             "student_estimates": [
                 {
                     "student_id": est["student_id"],
@@ -239,10 +461,15 @@ def worksheet_designer_node(state: PipelineState) -> PipelineState:
                     "mastery_probability": est["mastery_probability"],
                     "recommended_tier": est["recommended_tier"],
                 }
-                for est in state["diagnostic"]["student_estimates"]
+                for est in state["mastery_estimates"] or []
             ],
         }
 
+        # Regenerating single tiers keeps the other tiers of the earlier set
+        previous = None
+        if state.get("regenerate_tiers") and state.get("worksheets"):
+            previous = WorksheetSet(**state["worksheets"])
+
         worksheets = engine.generate(
             lesson_topic=state["lesson_topic"],
             learning_objective=learning_objective,
@@ -252,11 +479,14 @@ def worksheet_designer_node(state: PipelineState) -> PipelineState:
             diagnostic_results=diagnostic_dict,
             standards=state.get("standards"),
             num_questions_per_tier=state.get("num_questions_per_tier"),
+            previous=previous,
+            regenerate_tiers=state.get("regenerate_tiers") if previous else None,
         )
 
         # Store in state
         state["worksheets"] = worksheets.model_dump()
         state["worksheet_id"] = worksheets.worksheet_id
+        state["regenerate_tiers"] = None
 
         # Update cost
         cost_summary = engine.get_cost_summary()
@@ -279,6 +509,9 @@ def worksheet_designer_node(state: PipelineState) -> PipelineState:
     return state
 
 
+@graph_node("iep_specialist")
+@traced("langgraph.iep_specialist")
+@timed_stage("langgraph", "iep_specialist")
 def iep_specialist_node(state: PipelineState) -> PipelineState:
     """
     Node: Engine 3 - IEP Specialist
@@ -292,6 +525,7 @@ def iep_specialist_node(state: PipelineState) -> PipelineState:
         logger.info("Running Engine 3: IEP Specialist")
 
         engine = IEPSpecialist()
+        attach_class_snapshot(engine, state)
 
         # Reconstruct WorksheetSet from state
         from ..engines.engine_2_worksheet_designer import WorksheetSet
@@ -326,6 +560,9 @@ def iep_specialist_node(state: PipelineState) -> PipelineState:
     return state
 
 
+@graph_node("adaptive_plan")
+@traced("langgraph.adaptive_plan")
+@timed_stage("langgraph", "adaptive_plan")
 def adaptive_plan_node(state: PipelineState) -> PipelineState:
     """
     Node: Engine 4 - Adaptive Personalization
@@ -339,6 +576,7 @@ def adaptive_plan_node(state: PipelineState) -> PipelineState:
         logger.info("Running Engine 4: Adaptive Personalization")
 
         engine = AdaptiveEngine()
+        attach_class_snapshot(engine, state)
 
         adaptive_plan = engine.generate_class_plan(
             class_id=state["class_id"],
@@ -370,6 +608,9 @@ def adaptive_plan_node(state: PipelineState) -> PipelineState:
     return state
 
 
+@graph_node("feedback_loop")
+@traced("langgraph.feedback_loop")
+@timed_stage("langgraph", "feedback_loop")
 def feedback_loop_node(state: PipelineState) -> PipelineState:
     """
     Node: Engine 6 - Feedback Loop
@@ -407,6 +648,9 @@ def feedback_loop_node(state: PipelineState) -> PipelineState:
     return state
 
 
+@graph_node("finalize")
+@traced("langgraph.finalize")
+@timed_stage("langgraph", "finalize")
 def finalize_node(state: PipelineState) -> PipelineState:
     """
     Node: Finalize Pipeline
@@ -433,87 +677,119 @@ def finalize_node(state: PipelineState) -> PipelineState:
 # ═══════════════════════════════════════════════════════════
 
 
-def should_run_unit_plan(state: PipelineState) -> Literal["unit_plan", "lesson_architect"]:
-    """Route: Check if Unit Plan should be generated."""
-    if state.get("skip_unit_plan", True):
-        return "lesson_architect"
-    else:
-        return "unit_plan"
-
-
-def should_run_adaptive(state: PipelineState) -> Literal["adaptive_plan", "feedback_check"]:
-    """Route: Check if Adaptive Plan should be generated."""
-    # Only run if no errors occurred in core pipeline
-    if state.get("skip_adaptive_plan", True) or state["errors"]:
-        return "feedback_check"
-    else:
-        return "adaptive_plan"
+def route_entry(state: PipelineState) -> Union[str, List[str]]:
+    """Route: Resumed runs start at their resume stages, new runs at the snapshot (+ feedback)."""
+    if state.get("resume_from"):
+        return list(state["resume_from"])
+    if state.get("skip_feedback_loop", True):
+        return ["class_snapshot"]
+    return ["class_snapshot", "feedback_loop"]
 
 
-def should_run_feedback(state: PipelineState) -> Literal["feedback_loop", "finalize"]:
-    """Route: Check if Feedback Loop should run."""
-    if state.get("skip_feedback_loop", True) or state["errors"]:
-        return "finalize"
-    else:
-        return "feedback_loop"
+def fan_out_stages(state: PipelineState) -> List[str]:
+    """Route: Branches that start once the class snapshot is built (optional ones if requested)."""
+    stages = ["lesson_architect"]
+    if not state.get("skip_unit_plan", True):
+        stages.append("unit_plan")
+    if not state.get("skip_adaptive_plan", True):
+        stages.append("adaptive_plan")
+    return stages
 
 
 def check_core_pipeline_success(state: PipelineState) -> Literal["iep_specialist", "finalize"]:
     """Route: Check if core pipeline succeeded."""
-    # If diagnostic or worksheet failed, skip IEP and finalize
-    if state["errors"]:
+    # If the snapshot, lesson or worksheets failed, skip IEP and finalize
+    if set(state.get("failed_stages", [])) & set(CORE_STAGES):
         return "finalize"
     else:
         return "iep_specialist"
 
 
+def rerun_stages(stage: str) -> List[str]:
+    """
+    Stages a run resumed at a stage executes again.
+
+    Args:
+        stage: Stage to resume at (STAGES entry)
+
+    Returns:
+        The stage, every stage downstream of it, and finalize
+    """
+    stages = [stage]
+    for current in stages:
+        stages.extend(later for later in DOWNSTREAM.get(current, []) if later not in stages)
+    if "finalize" not in stages:
+        stages.append("finalize")
+    return stages
+
+
 # ═══════════════════════════════════════════════════════════
 # GRAPH CONSTRUCTION
 # ═══════════════════════════════════════════════════════════
 
 
-def create_master_creator_graph() -> StateGraph:
+def create_master_creator_graph(checkpointer=None) -> "StateGraph":
     """
     Create LangGraph state graph for Master Creator v3 pipeline.
 
+    Independent stages fan out into parallel branches; finalize is deferred
+    until every branch has finished. Nodes run in worker threads under
+    invoke() and as coroutines (in worker threads) under ainvoke().
+
+    Args:
+        checkpointer: LangGraph checkpointer; with one, runs are keyed by the
+            config's thread_id and an interrupted run resumes at the nodes
+            that didn't finish
+
     Returns:
         Compiled StateGraph ready for execution
     """
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.graph import StateGraph, END
+
     # Initialize graph with state
     graph = StateGraph(PipelineState)
 
-    # Add nodes (each engine)
-    graph.add_node("unit_plan", unit_plan_node)
-    graph.add_node("lesson_architect", lesson_architect_node)
-    graph.add_node("diagnostic", diagnostic_node)
-    graph.add_node("worksheet_designer", worksheet_designer_node)
-    graph.add_node("iep_specialist", iep_specialist_node)
-    graph.add_node("adaptive_plan", adaptive_plan_node)
-    graph.add_node("feedback_loop", feedback_loop_node)
-    graph.add_node("finalize", finalize_node)
+    # Add nodes (each engine), with sync and async versions
+    nodes = {
+        "class_snapshot": class_snapshot_node,
+        "unit_plan": unit_plan_node,
+        "lesson_architect": lesson_architect_node,
+        "diagnostic": diagnostic_node,
+        "worksheet_designer": worksheet_designer_node,
+        "iep_specialist": iep_specialist_node,
+        "adaptive_plan": adaptive_plan_node,
+        "feedback_loop": feedback_loop_node,
+    }
+    for stage, node in nodes.items():
+        graph.add_node(stage, RunnableLambda(node, afunc=node.afunc, name=stage))
+    # Finalize joins all branches: it waits until no other node is pending
+    graph.add_node(
+        "finalize",
+        RunnableLambda(finalize_node, afunc=finalize_node.afunc, name="finalize"),
+        defer=True,
+    )
 
     # ───────────────────────────────────────────────────────
     # EDGES: Define execution flow
     # ───────────────────────────────────────────────────────
 
-    # Entry point: Conditional - Unit Plan or Lesson Architect?
-    graph.set_conditional_entry_point(
-        should_run_unit_plan,
-        {
-            "unit_plan": "unit_plan",
-            "lesson_architect": "lesson_architect",
-        },
-    )
+    # Entry point: Class snapshot (+ Feedback Loop, which needs nothing from
+    # the run), or any stage when resuming from a checkpoint
+    graph.set_conditional_entry_point(route_entry, STAGES[1:])
 
-    # Unit Plan → Lesson Architect
-    graph.add_edge("unit_plan", "lesson_architect")
+    # Class snapshot → Lesson Architect ∥ Unit Plan ∥ Adaptive Plan
+    graph.add_conditional_edges(
+        "class_snapshot",
+        fan_out_stages,
+        ["lesson_architect", "unit_plan", "adaptive_plan"],
+    )
 
-    # Lesson Architect → Diagnostic (always)
+    # Lesson Architect → Worksheet Designer ∥ Diagnostic (both need the
+    # objectives; worksheets use the snapshot's mastery estimates)
+    graph.add_edge("lesson_architect", "worksheet_designer")
     graph.add_edge("lesson_architect", "diagnostic")
 
-    # Diagnostic → Worksheet Designer (always)
-    graph.add_edge("diagnostic", "worksheet_designer")
-
     # Worksheet Designer → Conditional check
     graph.add_conditional_edges(
         "worksheet_designer",
@@ -524,34 +800,13 @@ def create_master_creator_graph() -> StateGraph:
         },
     )
 
-    # IEP Specialist → Adaptive Plan check
-    graph.add_conditional_edges(
-        "iep_specialist",
-        should_run_adaptive,
-        {
-            "adaptive_plan": "adaptive_plan",
-            "feedback_check": "feedback_loop",  # Placeholder name
-        },
-    )
-
-    # Adaptive Plan → Feedback Loop check
-    graph.add_conditional_edges(
-        "adaptive_plan",
-        should_run_feedback,
-        {
-            "feedback_loop": "feedback_loop",
-            "finalize": "finalize",
-        },
-    )
-
-    # Feedback Loop → Finalize (always)
-    graph.add_edge("feedback_loop", "finalize")
-
-    # Finalize → END
+    # Branch ends → Finalize → END
+    for stage in ("iep_specialist", "diagnostic", "unit_plan", "adaptive_plan", "feedback_loop"):
+        graph.add_edge(stage, "finalize")
     graph.add_edge("finalize", END)
 
     # Compile graph
-    compiled_graph = graph.compile()
+    compiled_graph = graph.compile(checkpointer=checkpointer)
 
     return compiled_graph
 
@@ -561,6 +816,27 @@ def create_master_creator_graph() -> StateGraph:
 # ═══════════════════════════════════════════════════════════
 
 
+def progress_event(state: PipelineState) -> dict:
+    """
+    Build a pipeline_progress WebSocket event from the current state.
+
+    Args:
+        state: Pipeline state after a stage
+
+    Returns:
+        Event dict carrying the stage, status and trace id
+    """
+    return {
+        "type": "pipeline_progress",
+        "pipeline_id": state.get("pipeline_id"),
+        "stage": state.get("current_stage"),
+        "execution_status": state.get("execution_status"),
+        "errors": len(state.get("errors", [])),
+        "trace_id": state.get("trace_id"),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
 async def run_async_pipeline(
     lesson_topic: str,
     grade_level: str,
@@ -573,6 +849,7 @@ async def run_async_pipeline(
     num_lessons_in_unit: Optional[int] = None,
     generate_adaptive_plan: bool = False,
     run_feedback_loop: bool = False,
+    on_progress: Optional[Callable[[dict], Awaitable[None]]] = None,
 ) -> PipelineState:
     """
     Run Master Creator v3 pipeline asynchronously with LangGraph.
@@ -589,30 +866,46 @@ async def run_async_pipeline(
         num_lessons_in_unit: Number of lessons in unit
         generate_adaptive_plan: Generate adaptive plan
         run_feedback_loop: Run feedback loop
+        on_progress: Awaited with a pipeline_progress event after each stage
 
     Returns:
         Final PipelineState with all results
     """
-    # Initialize state
-    initial_state = initialize_pipeline_state(
-        lesson_topic=lesson_topic,
-        grade_level=grade_level,
-        subject=subject,
-        class_id=class_id,
-        concept_ids=concept_ids,
-        duration_minutes=duration_minutes,
-        standards=standards,
-        generate_unit=generate_unit,
-        num_lessons_in_unit=num_lessons_in_unit,
-        generate_adaptive_plan=generate_adaptive_plan,
-        run_feedback_loop=run_feedback_loop,
-    )
+    with span("pipeline.run", {"pipeline.kind": "langgraph", "class_id": class_id}) as run_span:
+        # Initialize state (inside the span, so it records the trace id)
+        initial_state = initialize_pipeline_state(
+            lesson_topic=lesson_topic,
+            grade_level=grade_level,
+            subject=subject,
+            class_id=class_id,
+            concept_ids=concept_ids,
+            duration_minutes=duration_minutes,
+            standards=standards,
+            generate_unit=generate_unit,
+            num_lessons_in_unit=num_lessons_in_unit,
+            generate_adaptive_plan=generate_adaptive_plan,
+            run_feedback_loop=run_feedback_loop,
+        )
+
+        run_span.set_attribute("pipeline.id", initial_state["pipeline_id"])
 
-    # Create graph
-    graph = create_master_creator_graph()
+        # Create graph
+        graph = create_master_creator_graph()
 
-    # Execute graph asynchronously
-    final_state = await graph.ainvoke(initial_state)
+        with session_scope():
+            save_checkpoint(initial_state["pipeline_id"], "initialization", initial_state)
+
+        # Execute graph asynchronously (each node in its own DB session); engines
+        # call Claude in the pipeline rate-limit lane
+        with llm_priority("pipeline"):
+            if on_progress is None:
+                final_state = await graph.ainvoke(initial_state)
+            else:
+                final_state = initial_state
+                async for final_state in graph.astream(initial_state, stream_mode="values"):
+                    await on_progress(progress_event(final_state))
+
+        run_span.set_attribute("pipeline.status", final_state.get("execution_status"))
 
     return final_state
 
@@ -649,26 +942,198 @@ def run_sync_pipeline(
     Returns:
         Final PipelineState with all results
     """
-    # Initialize state
-    initial_state = initialize_pipeline_state(
-        lesson_topic=lesson_topic,
-        grade_level=grade_level,
-        subject=subject,
-        class_id=class_id,
-        concept_ids=concept_ids,
-        duration_minutes=duration_minutes,
-        standards=standards,
-        generate_unit=generate_unit,
-        num_lessons_in_unit=num_lessons_in_unit,
-        generate_adaptive_plan=generate_adaptive_plan,
-        run_feedback_loop=run_feedback_loop,
+    with span("pipeline.run", {"pipeline.kind": "langgraph", "class_id": class_id}):
+        # Initialize state
+        initial_state = initialize_pipeline_state(
+            lesson_topic=lesson_topic,
+            grade_level=grade_level,
+            subject=subject,
+            class_id=class_id,
+            concept_ids=concept_ids,
+            duration_minutes=duration_minutes,
+            standards=standards,
+            generate_unit=generate_unit,
+            num_lessons_in_unit=num_lessons_in_unit,
+            generate_adaptive_plan=generate_adaptive_plan,
+            run_feedback_loop=run_feedback_loop,
+        )
+
+        # Create graph
+        graph = create_master_creator_graph()
+
+        with session_scope():
+            save_checkpoint(initial_state["pipeline_id"], "initialization", initial_state)
+
+        # Execute graph synchronously (parallel branches in worker threads, each
+        # node in its own DB session); engines call Claude in the pipeline
+        # rate-limit lane
+        with llm_priority("pipeline"):
+            final_state = graph.invoke(initial_state)
+
+    return final_state
+
+
+# ═══════════════════════════════════════════════════════════
+# RESUME FROM CHECKPOINTS
+# ═══════════════════════════════════════════════════════════
+
+
+def stage_needed(state: PipelineState, stage: str) -> bool:
+    """Whether a run with this input runs a stage (optional stages only if requested)."""
+    skip_flag = {
+        "unit_plan": "skip_unit_plan",
+        "adaptive_plan": "skip_adaptive_plan",
+        "feedback_loop": "skip_feedback_loop",
+    }.get(stage)
+    return not (skip_flag and state.get(skip_flag, True))
+
+
+def load_resume_state(
+    pipeline_id: str,
+    from_stage: Optional[str] = None,
+    regenerate_tiers: Optional[list[str]] = None,
+) -> PipelineState:
+    """
+    Build the state that restarts a run from its checkpoints.
+
+    The run's input state is merged with the latest update of every
+    checkpointed stage except the resume stages and the stages downstream
+    of them, which run again; other stages' outputs (and their spend) are
+    reused.
+
+    Args:
+        pipeline_id: Pipeline ID of the checkpointed run
+        from_stage: Stage to restart at (default: every stage the run needed
+            that has no checkpoint and isn't downstream of another such
+            stage, i.e. each failed or interrupted branch; finalize if every
+            stage completed)
+        regenerate_tiers: Worksheet tiers to regenerate; the other tiers keep
+            their questions (from_stage defaults to worksheet_designer)
+
+    Returns:
+        PipelineState with resume_from set
+
+    Raises:
+        ValueError: If the stage or a tier is unknown, or there is no checkpoint to resume from
+    """
+    if regenerate_tiers:
+        from_stage = from_stage or "worksheet_designer"
+        if from_stage != "worksheet_designer":
+            raise ValueError("regenerate_tiers requires from_stage='worksheet_designer'")
+        unknown = set(regenerate_tiers) - set(TIERS)
+        if unknown:
+            raise ValueError(f"Unknown tiers: {sorted(unknown)} (expected {TIERS})")
+    if from_stage is not None and from_stage not in STAGES[1:]:
+        raise ValueError(f"Unknown stage '{from_stage}' (expected one of {STAGES[1:]})")
+
+    with ContentStorageInterface(current_session()) as storage:
+        checkpoints = storage.list_pipeline_checkpoints(pipeline_id, include_state=True)
+    # Latest checkpoint per stage, in the order they were saved
+    latest = {checkpoint["stage"]: checkpoint for checkpoint in checkpoints}
+    if "initialization" not in latest:
+        raise ValueError(f"No checkpoint to resume pipeline {pipeline_id} from")
+
+    state = latest.pop("initialization")["state"]
+    if from_stage is not None:
+        resume_from = [from_stage]
+    else:
+        # Fan-out branches are independent: resume each one that didn't finish
+        resume_from = []
+        for stage in STAGES[1:-1]:
+            missing = stage not in latest and stage_needed(state, stage)
+            if missing and not any(stage in rerun_stages(root) for root in resume_from):
+                resume_from.append(stage)
+        resume_from = resume_from or ["finalize"]
+
+    rerun = list(dict.fromkeys(stage for root in resume_from for stage in rerun_stages(root)))
+    for checkpoint in sorted(latest.values(), key=lambda c: c["checkpoint_id"]):
+        if checkpoint["stage"] not in rerun:
+            apply_update(state, checkpoint["state"])
+
+    if regenerate_tiers:
+        if not latest.get("worksheet_designer", {}).get("state", {}).get("worksheets"):
+            raise ValueError(f"Pipeline {pipeline_id} has no worksheets to keep tiers from")
+        state["worksheets"] = latest["worksheet_designer"]["state"]["worksheets"]
+
+    state.update(
+        resume_from=resume_from,
+        regenerate_tiers=list(regenerate_tiers) if regenerate_tiers else None,
+        execution_status="in_progress",
+        completed_at=None,
+        trace_id=current_trace_id(),
+    )
+    logging.getLogger("langgraph.checkpoints").info(
+        f"Resuming {pipeline_id} at {', '.join(resume_from)}, rerunning {', '.join(rerun)}"
     )
+    return state
+
+
+async def resume_async_pipeline(
+    pipeline_id: str,
+    from_stage: Optional[str] = None,
+    regenerate_tiers: Optional[list[str]] = None,
+    on_progress: Optional[Callable[[dict], Awaitable[None]]] = None,
+) -> PipelineState:
+    """
+    Resume a checkpointed run asynchronously (see load_resume_state).
 
-    # Create graph
-    graph = create_master_creator_graph()
+    Args:
+        pipeline_id: Pipeline ID of the checkpointed run
+        from_stage: Stage to restart at (default: every unfinished branch)
+        regenerate_tiers: Worksheet tiers to regenerate (others are kept)
+        on_progress: Awaited with a pipeline_progress event after each stage
 
-    # Execute graph synchronously
-    final_state = graph.invoke(initial_state)
+    Returns:
+        Final PipelineState
+
+    Raises:
+        ValueError: If the run can't be resumed from the stage
+    """
+    with span("pipeline.resume", {"pipeline.kind": "langgraph", "pipeline.id": pipeline_id}):
+        with session_scope():
+            state = load_resume_state(pipeline_id, from_stage, regenerate_tiers)
+        for stage in state["resume_from"]:
+            PIPELINE_RESUMES.inc(stage=stage)
+
+        with llm_priority("pipeline"):
+            graph = create_master_creator_graph()
+            if on_progress is None:
+                final_state = await graph.ainvoke(state)
+            else:
+                final_state = state
+                async for final_state in graph.astream(state, stream_mode="values"):
+                    await on_progress(progress_event(final_state))
+
+    return final_state
+
+
+def resume_sync_pipeline(
+    pipeline_id: str,
+    from_stage: Optional[str] = None,
+    regenerate_tiers: Optional[list[str]] = None,
+) -> PipelineState:
+    """
+    Resume a checkpointed run synchronously (see load_resume_state).
+
+    Args:
+        pipeline_id: Pipeline ID of the checkpointed run
+        from_stage: Stage to restart at (default: every unfinished branch)
+        regenerate_tiers: Worksheet tiers to regenerate (others are kept)
+
+    Returns:
+        Final PipelineState
+
+    Raises:
+        ValueError: If the run can't be resumed from the stage
+    """
+    with span("pipeline.resume", {"pipeline.kind": "langgraph", "pipeline.id": pipeline_id}):
+        with session_scope():
+            state = load_resume_state(pipeline_id, from_stage, regenerate_tiers)
+        for stage in state["resume_from"]:
+            PIPELINE_RESUMES.inc(stage=stage)
+
+        with llm_priority("pipeline"):
+            final_state = create_master_creator_graph().invoke(state)
 
     return final_state
 
@@ -9,18 +9,35 @@ Orchestrates the complete lesson generation pipeline:
 
 This is the synchronous version. For async/LangGraph orchestration,
 see langgraph_pipeline.py (TODO).
+
+Several sections of a course (run_multi_class_pipeline) share the
+class-independent content: the lesson, diagnostic items and tier question
+sets are generated once per (topic, grade, standards, ...) and each
+section only gets its tier assignment, roster mapping and IEP overlay,
+in parallel.
 """
 
+import contextvars
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
 
 from ..engines.engine_1_lesson_architect import LessonArchitect, LessonBlueprint
-from ..engines.engine_5_diagnostic import DiagnosticEngine, DiagnosticResults
-from ..engines.engine_2_worksheet_designer import WorksheetDesigner, WorksheetSet
+from ..engines.engine_5_diagnostic import DiagnosticEngine, DiagnosticQuestion, DiagnosticResults
+from ..engines.engine_2_worksheet_designer import WorksheetDesigner, WorksheetQuestion, WorksheetSet
 from ..engines.engine_3_iep_specialist import IEPSpecialist, ModifiedWorksheetSet
+from ..engines.rate_limiter import llm_priority
+from ..engines.resilience import llm_deadline
+from ..student_model.database import session_scope
+from ..utils.metrics import PIPELINE_STAGE_DURATION, stage_timer
+from ..utils.tracing import current_trace_id, span, traced
+
+# Sections of a multi-class run processed at the same time
+PIPELINE_CLASS_CONCURRENCY = int(os.getenv("PIPELINE_CLASS_CONCURRENCY", "4"))
 
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -71,6 +88,40 @@ class PipelineOutput(BaseModel):
     errors: List[str]
     warnings: List[str]
 
+    # Tracing
+    trace_id: Optional[str] = None
+
+
+class SharedContent(BaseModel):
+    """Class-independent content generated once for several sections."""
+
+    lesson: LessonBlueprint
+    diagnostic_questions: List[DiagnosticQuestion]
+    tier_questions: Dict[str, List[WorksheetQuestion]]
+    cost_breakdown: Dict[str, float]
+
+
+class MultiClassPipelineOutput(BaseModel):
+    """Output from a multi-class pipeline run."""
+
+    status: str  # "success", "partial_failure", "failure"
+    started_at: str
+    completed_at: str
+    total_duration_seconds: float
+
+    # One output per section, in input order (their costs are per-class work only)
+    classes: List[PipelineOutput]
+
+    # Distinct lessons generated for the sections
+    shared_generations: int
+
+    # Cost tracking: shared content once, plus every section's own work
+    shared_cost: float
+    total_cost: float
+
+    # Tracing
+    trace_id: Optional[str] = None
+
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # PIPELINE ORCHESTRATOR
@@ -124,12 +175,103 @@ class MasterCreatorPipeline:
             )
         self.logger = logging.getLogger("MasterCreatorPipeline")
 
-    def run(self, input_params: PipelineInput) -> PipelineOutput:
+    def _attach_class_snapshot(self, input_params: PipelineInput) -> None:
+        """
+        Build the class snapshot once and hand it to every engine.
+
+        Args:
+            input_params: Pipeline input parameters
+        """
+        try:
+            snapshot = self.engine_1.student_model.get_class_snapshot(
+                input_params.class_id, input_params.concept_ids
+            )
+        except Exception as e:
+            # Engines fall back to their own Student Model lookups
+            self.logger.warning(f"Could not build class snapshot: {str(e)}")
+            snapshot = None
+
+        for engine in (self.engine_1, self.engine_5, self.engine_2, self.engine_3):
+            engine.set_class_snapshot(snapshot)
+
+    @staticmethod
+    def _learning_objective(lesson: LessonBlueprint) -> Optional[str]:
+        """Content of the lesson's Learning Objectives section, if any."""
+        for section in lesson.sections:
+            if section.section_name == "Learning Objectives":
+                return section.content
+        return None
+
+    @traced("pipeline.shared_content", {"pipeline.kind": "multi_class"})
+    def generate_shared_content(self, input_params: PipelineInput) -> SharedContent:
+        """
+        Generate the content that doesn't depend on the class.
+
+        The lesson is generated without class context, diagnostic items and
+        tier question sets without a roster, so every section of the course
+        can use them (run(shared=...)).
+
+        Args:
+            input_params: Pipeline input parameters (class_id is not used)
+
+        Returns:
+            SharedContent with lesson, diagnostic items and tier question sets
+
+        Raises:
+            Exception: If an engine fails
+        """
+        with stage_timer("multi_class", "lesson_architect"), llm_deadline():
+            lesson = self.engine_1.generate(
+                topic=input_params.lesson_topic,
+                grade_level=input_params.grade_level,
+                subject=input_params.subject,
+                duration_minutes=input_params.duration_minutes,
+                standards=input_params.standards,
+            )
+        objective = self._learning_objective(lesson)
+
+        with stage_timer("multi_class", "diagnostic"), llm_deadline():
+            diagnostic_questions = self.engine_5.generate_questions(
+                lesson_objectives=[objective] if objective else [input_params.lesson_topic],
+                concept_ids=input_params.concept_ids,
+                num_questions_per_concept=input_params.num_questions_per_concept,
+                grade_level=input_params.grade_level,
+                subject=input_params.subject,
+            )
+
+        with stage_timer("multi_class", "worksheet_designer"), llm_deadline():
+            tier_questions = self.engine_2.generate_tier_questions(
+                lesson_topic=input_params.lesson_topic,
+                learning_objective=objective[:200] if objective else input_params.lesson_topic,
+                grade_level=input_params.grade_level,
+                subject=input_params.subject,
+                standards=input_params.standards,
+                num_questions_per_tier=input_params.num_questions_per_tier,
+            )
+
+        return SharedContent(
+            lesson=lesson,
+            diagnostic_questions=diagnostic_questions,
+            tier_questions=tier_questions,
+            cost_breakdown={
+                "engine_1": self.engine_1.get_cost_summary()["total_cost"],
+                "engine_5": self.engine_5.get_cost_summary()["total_cost"],
+                "engine_2": self.engine_2.get_cost_summary()["total_cost"],
+            },
+        )
+
+    @traced("pipeline.run", {"pipeline.kind": "sync"})
+    def run(
+        self, input_params: PipelineInput, shared: Optional[SharedContent] = None
+    ) -> PipelineOutput:
         """
         Run complete pipeline.
 
         Args:
             input_params: Pipeline input parameters
+            shared: Content from generate_shared_content() for the same lesson;
+                with it, only the class's own work runs (no Claude calls for
+                lesson, diagnostic items or tier questions)
 
         Returns:
             PipelineOutput with results from all engines
@@ -153,6 +295,10 @@ class MasterCreatorPipeline:
 
         self.logger.info(f"Starting pipeline {pipeline_id} for {input_params.lesson_topic}")
 
+        # Materialize class roster/IEP/mastery once, shared by all engines
+        with stage_timer("sync", "class_snapshot"), span("pipeline.class_snapshot", {"pipeline.id": pipeline_id}):
+            self._attach_class_snapshot(input_params)
+
         try:
             # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
             # STAGE 1: LESSON ARCHITECT (Engine 1)
@@ -160,14 +306,22 @@ class MasterCreatorPipeline:
 
             self.logger.info("Stage 1: Generating lesson blueprint (Engine 1)")
 
-            lesson = self.engine_1.generate(
-                topic=input_params.lesson_topic,
-                grade_level=input_params.grade_level,
-                subject=input_params.subject,
-                duration_minutes=input_params.duration_minutes,
-                standards=input_params.standards,
-                class_id=input_params.class_id,
-            )
+            if shared is not None:
+                # Shared lesson; the class only adds its own context
+                snapshot = self.engine_1.class_snapshot
+                lesson = shared.lesson.model_copy(
+                    update={"class_context": snapshot.to_class_context() if snapshot else None}
+                )
+            else:
+                with stage_timer("sync", "lesson_architect"), llm_deadline(), span("pipeline.lesson_architect", {"pipeline.id": pipeline_id}):
+                    lesson = self.engine_1.generate(
+                        topic=input_params.lesson_topic,
+                        grade_level=input_params.grade_level,
+                        subject=input_params.subject,
+                        duration_minutes=input_params.duration_minutes,
+                        standards=input_params.standards,
+                        class_id=input_params.class_id,
+                    )
 
             cost_breakdown["engine_1"] = self.engine_1.get_cost_summary()["total_cost"]
             self.logger.info(
@@ -176,11 +330,8 @@ class MasterCreatorPipeline:
             )
 
             # Extract learning objectives for diagnostic
-            learning_objectives = []
-            for section in lesson.sections:
-                if section.section_name == "Learning Objectives":
-                    learning_objectives.append(section.content)
-                    break
+            objective = self._learning_objective(lesson)
+            learning_objectives = [objective] if objective else []
 
             # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
             # STAGE 2: DIAGNOSTIC ENGINE (Engine 5)
@@ -188,14 +339,16 @@ class MasterCreatorPipeline:
 
             self.logger.info("Stage 2: Running diagnostic assessment (Engine 5)")
 
-            diagnostic = self.engine_5.generate(
-                lesson_objectives=learning_objectives if learning_objectives else [input_params.lesson_topic],
-                concept_ids=input_params.concept_ids,
-                class_id=input_params.class_id,
-                num_questions_per_concept=input_params.num_questions_per_concept,
-                grade_level=input_params.grade_level,
-                subject=input_params.subject,
-            )
+            with stage_timer("sync", "diagnostic"), llm_deadline(), span("pipeline.diagnostic", {"pipeline.id": pipeline_id}):
+                diagnostic = self.engine_5.generate(
+                    lesson_objectives=learning_objectives if learning_objectives else [input_params.lesson_topic],
+                    concept_ids=input_params.concept_ids,
+                    class_id=input_params.class_id,
+                    num_questions_per_concept=input_params.num_questions_per_concept,
+                    grade_level=input_params.grade_level,
+                    subject=input_params.subject,
+                    questions=shared.diagnostic_questions if shared else None,
+                )
 
             cost_breakdown["engine_5"] = self.engine_5.get_cost_summary()["total_cost"]
             self.logger.info(
@@ -224,23 +377,21 @@ class MasterCreatorPipeline:
                 ],
             }
 
-            # Get learning objective from lesson
-            learning_objective = input_params.lesson_topic
-            for section in lesson.sections:
-                if section.section_name == "Learning Objectives":
-                    learning_objective = section.content[:200]  # First 200 chars
-                    break
-
-            worksheets = self.engine_2.generate(
-                lesson_topic=input_params.lesson_topic,
-                learning_objective=learning_objective,
-                grade_level=input_params.grade_level,
-                subject=input_params.subject,
-                class_id=input_params.class_id,
-                diagnostic_results=diagnostic_dict,
-                standards=input_params.standards,
-                num_questions_per_tier=input_params.num_questions_per_tier,
-            )
+            # Get learning objective from lesson (first 200 chars)
+            learning_objective = objective[:200] if objective else input_params.lesson_topic
+
+            with stage_timer("sync", "worksheet_designer"), llm_deadline(), span("pipeline.worksheet_designer", {"pipeline.id": pipeline_id}):
+                worksheets = self.engine_2.generate(
+                    lesson_topic=input_params.lesson_topic,
+                    learning_objective=learning_objective,
+                    grade_level=input_params.grade_level,
+                    subject=input_params.subject,
+                    class_id=input_params.class_id,
+                    diagnostic_results=diagnostic_dict,
+                    standards=input_params.standards,
+                    num_questions_per_tier=input_params.num_questions_per_tier,
+                    shared_questions=shared.tier_questions if shared else None,
+                )
 
             cost_breakdown["engine_2"] = self.engine_2.get_cost_summary()["total_cost"]
             self.logger.info(
@@ -254,9 +405,10 @@ class MasterCreatorPipeline:
 
             self.logger.info("Stage 4: Applying IEP accommodations (Engine 3)")
 
-            modified_worksheets = self.engine_3.apply_accommodations(
-                worksheet_set=worksheets,
-            )
+            with stage_timer("sync", "iep_specialist"), span("pipeline.iep_specialist", {"pipeline.id": pipeline_id}):
+                modified_worksheets = self.engine_3.apply_accommodations(
+                    worksheet_set=worksheets,
+                )
 
             cost_breakdown["engine_3"] = self.engine_3.get_cost_summary()["total_cost"]
             self.logger.info(
@@ -288,6 +440,8 @@ class MasterCreatorPipeline:
         else:
             status = "success"
 
+        PIPELINE_STAGE_DURATION.observe(total_duration, pipeline="sync", stage="total", status=status)
+
         output = PipelineOutput(
             pipeline_id=pipeline_id,
             status=status,
@@ -302,6 +456,7 @@ class MasterCreatorPipeline:
             cost_breakdown=cost_breakdown,
             errors=errors,
             warnings=warnings,
+            trace_id=current_trace_id(),
         )
 
         self.logger.info(
@@ -359,8 +514,6 @@ def run_pipeline(
     Returns:
         PipelineOutput with all results
     """
-    pipeline = MasterCreatorPipeline()
-
     input_params = PipelineInput(
         lesson_topic=lesson_topic,
         grade_level=grade_level,
@@ -371,7 +524,143 @@ def run_pipeline(
         concept_ids=concept_ids,
     )
 
-    return pipeline.run(input_params)
+    # One unit of work for the run: the engines' Student Model share its session
+    with session_scope(), llm_priority("pipeline"):
+        pipeline = MasterCreatorPipeline()
+        return pipeline.run(input_params)
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# MULTI-CLASS RUNS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+def content_key(input_params: PipelineInput) -> Tuple:
+    """Inputs the class-independent content depends on (sections with equal keys share it)."""
+    return (
+        input_params.lesson_topic.strip().lower(),
+        input_params.grade_level,
+        input_params.subject,
+        input_params.duration_minutes,
+        tuple(sorted(input_params.standards or [])),
+        tuple(input_params.concept_ids),
+        input_params.num_questions_per_concept,
+        tuple(sorted((input_params.num_questions_per_tier or {}).items())),
+    )
+
+
+def _generate_shared(input_params: PipelineInput) -> SharedContent:
+    with session_scope(), llm_priority("pipeline"):
+        return MasterCreatorPipeline(enable_logging=False).generate_shared_content(input_params)
+
+
+def _run_class(input_params: PipelineInput, shared: SharedContent) -> PipelineOutput:
+    # Own unit of work per section: sections run in parallel threads
+    with session_scope(), llm_priority("pipeline"):
+        return MasterCreatorPipeline(enable_logging=False).run(input_params, shared=shared)
+
+
+def _failed_output(input_params: PipelineInput, error: str) -> PipelineOutput:
+    """Output for a section whose shared content could not be generated."""
+    import uuid
+
+    now = datetime.utcnow().isoformat()
+    return PipelineOutput(
+        pipeline_id=f"pipeline_{uuid.uuid4().hex[:12]}",
+        status="failure",
+        started_at=now,
+        completed_at=now,
+        total_duration_seconds=0.0,
+        total_cost=0.0,
+        cost_breakdown={},
+        errors=[f"Shared content generation failed: {error}"],
+        warnings=[],
+        trace_id=current_trace_id(),
+    )
+
+
+@traced("pipeline.multi_class_run", {"pipeline.kind": "multi_class"})
+def run_multi_class_pipeline(
+    inputs: List[PipelineInput],
+    max_workers: int = PIPELINE_CLASS_CONCURRENCY,
+) -> MultiClassPipelineOutput:
+    """
+    Run the pipeline for several sections, sharing class-independent content.
+
+    Sections are grouped by content_key(); each group's lesson, diagnostic
+    items and tier question sets are generated once (groups in parallel),
+    then every section's tier assignment, roster mapping and IEP overlay
+    run in parallel. Claude cost and latency scale with the number of
+    distinct lessons, not sections.
+
+    Args:
+        inputs: Pipeline input per section
+        max_workers: Sections (and shared generations) processed at once
+
+    Returns:
+        MultiClassPipelineOutput with one PipelineOutput per section, in order
+    """
+    import time
+
+    start_time = time.time()
+    started_at = datetime.utcnow().isoformat()
+    logger = logging.getLogger("MasterCreatorPipeline")
+
+    groups: Dict[Tuple, List[int]] = {}
+    for index, input_params in enumerate(inputs):
+        groups.setdefault(content_key(input_params), []).append(index)
+    logger.info(f"Multi-class run: {len(inputs)} sections, {len(groups)} distinct lessons")
+
+    def submit(executor, fn, *args):
+        # Each task runs in a copy of this context (trace span, rate-limit lane)
+        return executor.submit(contextvars.copy_context().run, fn, *args)
+
+    outputs: List[Optional[PipelineOutput]] = [None] * len(inputs)
+    shared_cost = 0.0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        shared_futures = {
+            key: submit(executor, _generate_shared, inputs[indexes[0]])
+            for key, indexes in groups.items()
+        }
+        class_futures = {}
+        for key, indexes in groups.items():
+            try:
+                shared = shared_futures[key].result()
+            except Exception as e:
+                logger.error(f"Shared content generation failed: {str(e)}", exc_info=True)
+                for index in indexes:
+                    outputs[index] = _failed_output(inputs[index], str(e))
+                continue
+            shared_cost += sum(shared.cost_breakdown.values())
+            for index in indexes:
+                class_futures[index] = submit(executor, _run_class, inputs[index], shared)
+        for index, future in class_futures.items():
+            outputs[index] = future.result()
+
+    statuses = {output.status for output in outputs}
+    if statuses == {"success"}:
+        status = "success"
+    elif statuses == {"failure"}:
+        status = "failure"
+    else:
+        status = "partial_failure"
+
+    total_duration = time.time() - start_time
+    PIPELINE_STAGE_DURATION.observe(
+        total_duration, pipeline="multi_class", stage="total", status=status
+    )
+
+    return MultiClassPipelineOutput(
+        status=status,
+        started_at=started_at,
+        completed_at=datetime.utcnow().isoformat(),
+        total_duration_seconds=round(total_duration, 2),
+        classes=outputs,
+        shared_generations=len(groups),
+        shared_cost=round(shared_cost, 4),
+        total_cost=round(shared_cost + sum(output.total_cost for output in outputs), 4),
+        trace_id=current_trace_id(),
+    )
 
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -5,11 +5,33 @@ Defines state schemas for the Master Creator v3 pipeline.
 
 State is passed between nodes in the LangGraph execution graph,
 allowing for complex, stateful workflows with conditional routing.
+
+Parallel branches of the graph update the state concurrently: each node
+returns only the keys it changed (state_update), and fields several
+branches write carry a reducer (Annotated) that merges their updates.
 """
 
-from typing import TypedDict, Optional, List, Dict, Any
+import operator
+from typing import Annotated, TypedDict, Optional, List, Dict, Any
 from datetime import datetime
 
+from ..utils.tracing import current_trace_id
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# STATE REDUCERS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+def merge_dicts(left: Optional[Dict], right: Optional[Dict]) -> Dict:
+    """Reducer: Merge dict updates (later entries win)."""
+    return {**(left or {}), **(right or {})}
+
+
+def last_value(left: Any, right: Any) -> Any:
+    """Reducer: Keep the latest write (concurrent writes don't conflict)."""
+    return right
+
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # PIPELINE STATE
@@ -59,14 +81,19 @@ class PipelineState(TypedDict, total=False):
 
     # Pipeline metadata
     pipeline_id: str
-    execution_status: str  # "in_progress", "completed", "failed"
-    current_stage: str  # Current engine being executed
+    execution_status: Annotated[str, last_value]  # "in_progress", "completed", "failed"
+    current_stage: Annotated[str, last_value]  # Latest engine started or finished
     started_at: str
     completed_at: Optional[str]
+    trace_id: Optional[str]  # Trace of the run, for correlating progress events
 
     # Error tracking
-    errors: List[str]
-    warnings: List[str]
+    errors: Annotated[List[str], operator.add]
+    warnings: Annotated[List[str], operator.add]
+    failed_stages: Annotated[List[str], operator.add]
+
+    # Shared Student Model data (ClassSnapshot, built once per run)
+    class_snapshot: Optional[Dict[str, Any]]
 
     # 
     # ENGINE OUTPUTS
@@ -81,7 +108,8 @@ class PipelineState(TypedDict, total=False):
     lesson_id: Optional[str]
     learning_objectives: Optional[List[str]]
 
-    # Engine 5: Diagnostic Results
+    # Engine 5: Mastery estimates (from the class snapshot) and Diagnostic Results
+    mastery_estimates: Optional[List[Dict[str, Any]]]
     diagnostic: Optional[Dict[str, Any]]
     diagnostic_id: Optional[str]
     tier_distribution: Optional[Dict[str, int]]
@@ -107,11 +135,11 @@ class PipelineState(TypedDict, total=False):
     # COST TRACKING
     # 
 
-    total_cost: float
-    cost_breakdown: Dict[str, float]
+    total_cost: Annotated[float, operator.add]
+    cost_breakdown: Annotated[Dict[str, float], merge_dicts]
 
-    # Token usage per engine
-    token_usage: Dict[str, Dict[str, int]]  # {engine_name: {input: X, output: Y}}
+    # Token usage per engine: {engine_name: {input: X, output: Y}}
+    token_usage: Annotated[Dict[str, Dict[str, int]], merge_dicts]
 
     # 
     # CONDITIONAL ROUTING FLAGS
@@ -123,9 +151,13 @@ class PipelineState(TypedDict, total=False):
     skip_feedback_loop: bool
 
     # Retry flags
-    retry_count: Dict[str, int]  # {engine_name: retry_count}
+    retry_count: Annotated[Dict[str, int], merge_dicts]  # {engine_name: retry_count}
     max_retries: int
 
+    # Resume flags (set when a run is resumed from a checkpoint)
+    resume_from: Optional[List[str]]  # Stages the graph starts at (None = from the beginning)
+    regenerate_tiers: Optional[List[str]]  # Worksheet tiers to regenerate (others are kept)
+
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # STATE INITIALIZATION
@@ -190,14 +222,17 @@ def initialize_pipeline_state(
         current_stage="initialization",
         started_at=started_at,
         completed_at=None,
+        trace_id=current_trace_id(),
         errors=[],
         warnings=[],
+        failed_stages=[],
         # Engine outputs (all None initially)
         unit_plan=None,
         unit_plan_id=None,
         lesson=None,
         lesson_id=None,
         learning_objectives=None,
+        mastery_estimates=None,
         diagnostic=None,
         diagnostic_id=None,
         tier_distribution=None,
@@ -220,6 +255,8 @@ def initialize_pipeline_state(
         skip_feedback_loop=not run_feedback_loop,
         retry_count={},
         max_retries=2,
+        resume_from=None,
+        regenerate_tiers=None,
     )
 
 
@@ -270,6 +307,7 @@ def mark_stage_complete(
     else:
         state["current_stage"] = f"{stage_name}_failed"
         state["execution_status"] = "failed"
+        state["failed_stages"].append(stage_name)
 
     return state
 
@@ -304,3 +342,69 @@ def increment_retry(state: PipelineState, engine_name: str) -> PipelineState:
     current_count = state["retry_count"].get(engine_name, 0)
     state["retry_count"][engine_name] = current_count + 1
     return state
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# NODE UPDATES
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+# Fields with a reducer, and the reducer merging their updates
+REDUCERS = {
+    key: hint.__metadata__[0]
+    for key, hint in PipelineState.__annotations__.items()
+    if hasattr(hint, "__metadata__")
+}
+
+
+def copy_state(state: PipelineState) -> PipelineState:
+    """
+    Copy state for a node to work on.
+
+    The node's input shares its lists and dicts with the graph (and with
+    concurrent branches), so the reducer fields, which the state helpers
+    change in place, are copied; other fields are only ever replaced.
+    """
+    work = PipelineState(**state)
+    for key in REDUCERS:
+        if isinstance(work.get(key), (list, dict)):
+            work[key] = work[key].copy()
+    return work
+
+
+def state_update(before: PipelineState, after: PipelineState) -> Dict[str, Any]:
+    """
+    Keys a node changed, as an update for the state's reducers.
+
+    Args:
+        before: State the node received
+        after: The node's copy after it ran (see copy_state)
+
+    Returns:
+        Update: new list entries, changed dict entries, the cost added and
+        any other field that was replaced
+    """
+    update = {}
+    for key, value in after.items():
+        old = before.get(key)
+        if value is old:
+            continue
+        reducer = REDUCERS.get(key)
+        if reducer is operator.add and isinstance(value, list):
+            value = value[len(old or []):]
+        elif reducer is operator.add:
+            value = value - (old or 0)
+        elif reducer is merge_dicts:
+            value = {k: v for k, v in value.items() if (old or {}).get(k) != v}
+        elif value == old:
+            continue
+        if value or reducer is None or reducer is last_value:
+            update[key] = value
+    return update
+
+
+def apply_update(state: PipelineState, update: Dict[str, Any]) -> PipelineState:
+    """Merge a node update into state with the state's reducers."""
+    for key, value in update.items():
+        reducer = REDUCERS.get(key)
+        state[key] = reducer(state[key], value) if reducer and key in state else value
+    return state
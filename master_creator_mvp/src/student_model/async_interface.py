@@ -0,0 +1,148 @@
+"""
+Async counterparts of the data-access interfaces.
+
+AsyncStudentModelInterface has the same methods as StudentModelInterface,
+as coroutines, for use from async route handlers. Each call runs the sync
+method on the interface's session:
+
+- AsyncSession (aiosqlite / asyncpg installed): through
+  AsyncSession.run_sync, so queries await the driver instead of blocking
+  the event loop.
+- Session (no async driver): in a worker thread.
+
+Methods that only touch the Chroma vector store (embedding is CPU-bound)
+run in a worker thread either way; create_student_profile writes its row
+through the session and embeds the student's preferences in a thread.
+
+The query logic stays in the sync interfaces, which engines and the
+pipeline keep using directly.
+"""
+
+import asyncio
+import functools
+import inspect
+from typing import Callable, Optional
+
+from .interface import StudentModelInterface
+from .schemas import StudentProfile, StudentProfileCreate
+from .vector_store import StudentVectorStore
+
+
+def async_methods(sync_cls: type, exclude=()) -> Callable[[type], type]:
+    """
+    Class decorator adding a coroutine for each public method of sync_cls.
+
+    Args:
+        sync_cls: Sync interface class
+        exclude: Method names to leave out
+
+    Returns:
+        Decorator (methods the class defines itself are kept)
+    """
+
+    def decorator(cls: type) -> type:
+        for name, member in vars(sync_cls).items():
+            if name.startswith("_") or name in exclude or name in vars(cls) or not inspect.isfunction(member):
+                continue
+            setattr(cls, name, _async_method(name, member))
+        return cls
+
+    return decorator
+
+
+def _async_method(name: str, fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    async def method(self, *args, **kwargs):
+        return await self._run(name, *args, **kwargs)
+
+    return method
+
+
+class AsyncInterface:
+    """Base for async interfaces: one session, one wrapped sync interface."""
+
+    # Sync methods without database access, run in a worker thread even on an AsyncSession
+    threaded_methods: frozenset = frozenset()
+
+    def __init__(self, session=None):
+        """
+        Initialize interface.
+
+        Args:
+            session: AsyncSession or Session (opens a request session if None)
+        """
+        self._owns_session = session is None
+        if session is None:
+            from .database import open_request_session
+
+            session = open_request_session()
+        self.session = session
+        self.is_async = hasattr(session, "run_sync")
+        self.sync = self._bind(session.sync_session if self.is_async else session)
+
+    def _bind(self, sync_session):
+        """Build the sync interface on the (sync view of the) session."""
+        raise NotImplementedError
+
+    async def _run(self, name: str, *args, **kwargs):
+        method = getattr(self.sync, name)
+        if name in self.threaded_methods:
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return await self._call(method, *args, **kwargs)
+
+    async def _call(self, method: Callable, *args, **kwargs):
+        """Run a sync method that uses the session."""
+        if self.is_async:
+            return await self.session.run_sync(lambda _: method(*args, **kwargs))
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    async def close(self):
+        """Close the session if this interface opened it."""
+        if not self._owns_session:
+            return
+        if self.is_async:
+            await self.session.close()
+        else:
+            await asyncio.to_thread(self.session.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+@async_methods(StudentModelInterface)
+class AsyncStudentModelInterface(AsyncInterface):
+    """StudentModelInterface with awaitable methods (see module docstring)."""
+
+    threaded_methods = frozenset({"get_learning_preferences", "find_similar_students"})
+
+    def __init__(self, session=None, vector_store: Optional[StudentVectorStore] = None):
+        """
+        Initialize interface.
+
+        Args:
+            session: AsyncSession or Session (opens a request session if None)
+            vector_store: Chroma vector store (opened on first use if None)
+        """
+        self._vector_store = vector_store
+        super().__init__(session)
+
+    def _bind(self, sync_session) -> StudentModelInterface:
+        return StudentModelInterface(db_session=sync_session, vector_store=self._vector_store)
+
+    async def create_student_profile(self, student_data: StudentProfileCreate) -> StudentProfile:
+        """
+        Create new student profile (see StudentModelInterface.create_student_profile).
+
+        Args:
+            student_data: Student creation data
+
+        Returns:
+            Created StudentProfile
+        """
+        student_id = await self._call(self.sync._insert_student, student_data)
+        await asyncio.to_thread(self.sync._index_preferences, student_id, student_data)
+        self.sync._invalidate_student(student_id)
+        return await self.get_student_profile(student_id)
@@ -0,0 +1,534 @@
+"""
+Streaming bulk student import for district-scale SIS syncs.
+
+Reads CSV or NDJSON uploads incrementally and imports students in chunks:
+- Column-wise validation per chunk (one enum lookup table per column)
+- Students and IEPs written with executemany, or COPY on PostgreSQL (psycopg2)
+- One transaction per chunk; a chunk that fails is retried row by row so a
+  bad row is reported without aborting the rest of the batch
+- Learning preference texts embedded in large batches (one upsert per batch)
+- Progress callback after every committed chunk
+"""
+
+import csv
+import io
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from enum import Enum
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .database import ClassModel, IEPModel, StudentModel
+from .schemas import (
+    AccommodationType,
+    BulkImportProgress,
+    BulkImportResult,
+    DisabilityCategory,
+    GradeLevel,
+    LearningPreference,
+    ReadingLevel,
+)
+from .vector_store import StudentVectorStore, build_preferences_text
+
+# Import configuration from environment
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+BULK_IMPORT_EMBED_BATCH_SIZE = int(os.getenv("BULK_IMPORT_EMBED_BATCH_SIZE", "512"))
+BULK_IMPORT_USE_COPY = os.getenv("BULK_IMPORT_USE_COPY", "true").lower() == "true"
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+# (row number, parsed record or None, parse error or None)
+RawRecord = Tuple[int, Optional[Dict], Optional[str]]
+
+# Column length limits (match database.py)
+MAX_STUDENT_ID_LENGTH = 50
+MAX_STUDENT_NAME_LENGTH = 100
+
+# IEP review cycle for imported IEPs
+IEP_REVIEW_DAYS = 365
+
+
+# ═══════════════════════════════════════════════════════════
+# PARSING
+# ═══════════════════════════════════════════════════════════
+
+
+def iter_records(stream: IO, fmt: str = "csv") -> Iterator[RawRecord]:
+    """
+    Lazily parse a CSV or NDJSON upload.
+
+    Args:
+        stream: Text or binary file object (binary is decoded as UTF-8)
+        fmt: "csv" or "ndjson"
+
+    Yields:
+        (row_number, record, error) with 1-based data row numbers
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported import format '{fmt}' (expected one of {SUPPORTED_FORMATS})")
+
+    text = stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, row, None
+        return
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON ({e.msg})"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, record, None
+
+
+def _chunked(records: Iterable[RawRecord], size: int) -> Iterator[List[RawRecord]]:
+    """Split a record stream into lists of at most `size` records."""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ═══════════════════════════════════════════════════════════
+# VALIDATION
+# ═══════════════════════════════════════════════════════════
+
+
+def _enum_lookup(enum_cls, aliases: Optional[Dict[str, Enum]] = None) -> Dict[str, Enum]:
+    """Case-insensitive lookup of enum members by value or name."""
+    lookup = {}
+    for member in enum_cls:
+        lookup[member.value.lower()] = member
+        lookup[member.name.lower()] = member
+    lookup.update(aliases or {})
+    return lookup
+
+
+_GRADE_LEVELS = _enum_lookup(GradeLevel)
+_READING_LEVELS = _enum_lookup(
+    ReadingLevel,
+    {
+        # Relative levels used by older SIS exports
+        "below_grade_level": ReadingLevel.BASIC,
+        "grade_level": ReadingLevel.PROFICIENT,
+        "above_grade_level": ReadingLevel.ADVANCED,
+    },
+)
+_DISABILITIES = _enum_lookup(DisabilityCategory, {"learning disability": DisabilityCategory.LEARNING_DISABILITY})
+_PREFERENCES = _enum_lookup(LearningPreference)
+_ACCOMMODATIONS = _enum_lookup(AccommodationType)
+_BOOLEANS = {"yes": True, "y": True, "true": True, "1": True, "no": False, "n": False, "false": False, "0": False}
+
+
+def _column(records: List[Dict], *names: str) -> List:
+    """Values for a column (first header present wins), None when missing or blank."""
+    values = []
+    for record in records:
+        value = None
+        for name in names:
+            candidate = record.get(name)
+            if isinstance(candidate, str):
+                candidate = candidate.strip()
+            if candidate not in (None, ""):
+                value = candidate
+                break
+        values.append(value)
+    return values
+
+
+def _map_column(
+    values: List,
+    lookup: Dict,
+    field: str,
+    row_numbers: List[int],
+    errors: Dict[int, List[str]],
+    default=None,
+    required: bool = False,
+) -> List:
+    """Map a column through a lookup table, recording invalid or missing values."""
+    mapped = []
+    for row_number, value in zip(row_numbers, values):
+        if value is None:
+            if required:
+                errors.setdefault(row_number, []).append(f"{field} is required")
+            mapped.append(default)
+            continue
+        member = value if isinstance(value, bool) and lookup is _BOOLEANS else lookup.get(str(value).lower())
+        if member is None:
+            errors.setdefault(row_number, []).append(f"invalid {field} '{value}'")
+        mapped.append(member)
+    return mapped
+
+
+def _map_list_column(
+    values: List,
+    lookup: Dict,
+    field: str,
+    row_numbers: List[int],
+    errors: Dict[int, List[str]],
+) -> List[List]:
+    """Map a multi-valued column (JSON list or ';'/'|'/','-separated string)."""
+    mapped = []
+    for row_number, value in zip(row_numbers, values):
+        if value is None:
+            mapped.append([])
+            continue
+        items = value if isinstance(value, list) else str(value).replace("|", ";").replace(",", ";").split(";")
+        members = []
+        for item in (str(i).strip() for i in items):
+            if not item:
+                continue
+            member = lookup.get(item.lower())
+            if member is None:
+                errors.setdefault(row_number, []).append(f"invalid {field} '{item}'")
+            elif member not in members:
+                members.append(member)
+        mapped.append(members)
+    return mapped
+
+
+def validate_records(
+    records: List[RawRecord],
+    class_id: str,
+    now: Optional[datetime] = None,
+) -> Tuple[List[Dict], List[Tuple[int, str]]]:
+    """
+    Validate a chunk of raw records column by column.
+
+    Accepted columns: student_name, grade_level, reading_level, iep_status
+    (or has_iep), primary_disability, student_id, learning_preferences,
+    accommodations.
+
+    Args:
+        records: Parsed records from iter_records()
+        class_id: Class to assign students to
+        now: Timestamp for created/updated columns
+
+    Returns:
+        (rows, errors): rows are {"row_number", "student", "iep"} dicts ready
+        for insert; errors are (row_number, message) for rejected records
+    """
+    now = now or datetime.utcnow()
+    errors: Dict[int, List[str]] = {}
+
+    parsed = []
+    for row_number, record, error in records:
+        if error is not None:
+            errors[row_number] = [error]
+        else:
+            parsed.append((row_number, record))
+
+    row_numbers = [row_number for row_number, _ in parsed]
+    dicts = [record for _, record in parsed]
+
+    names = _column(dicts, "student_name", "name")
+    student_ids = _column(dicts, "student_id")
+    grades = _map_column(_column(dicts, "grade_level", "grade"), _GRADE_LEVELS, "grade_level", row_numbers, errors, required=True)
+    reading_levels = _map_column(
+        _column(dicts, "reading_level"), _READING_LEVELS, "reading_level", row_numbers, errors, default=ReadingLevel.PROFICIENT
+    )
+    iep_flags = _map_column(_column(dicts, "iep_status", "has_iep"), _BOOLEANS, "iep_status", row_numbers, errors, default=False)
+    disabilities = _map_column(_column(dicts, "primary_disability"), _DISABILITIES, "primary_disability", row_numbers, errors)
+    preferences = _map_list_column(_column(dicts, "learning_preferences"), _PREFERENCES, "learning_preference", row_numbers, errors)
+    accommodations = _map_list_column(_column(dicts, "accommodations"), _ACCOMMODATIONS, "accommodation", row_numbers, errors)
+
+    for row_number, name, student_id in zip(row_numbers, names, student_ids):
+        if name is None:
+            errors.setdefault(row_number, []).append("student_name is required")
+        elif len(str(name)) > MAX_STUDENT_NAME_LENGTH:
+            errors.setdefault(row_number, []).append(f"student_name longer than {MAX_STUDENT_NAME_LENGTH} characters")
+        if student_id is not None and len(str(student_id)) > MAX_STUDENT_ID_LENGTH:
+            errors.setdefault(row_number, []).append(f"student_id longer than {MAX_STUDENT_ID_LENGTH} characters")
+
+    rows = []
+    for i, row_number in enumerate(row_numbers):
+        if row_number in errors:
+            continue
+
+        student_id = str(student_ids[i]) if student_ids[i] is not None else f"s_{uuid.uuid4().hex[:8]}"
+        has_iep = bool(iep_flags[i])
+        disability = disabilities[i] if has_iep else None
+
+        student = {
+            "student_id": student_id,
+            "student_name": str(names[i]),
+            "grade_level": grades[i],
+            "class_id": class_id,
+            "reading_level": reading_levels[i],
+            "learning_preferences": [p.value for p in preferences[i]],
+            "has_iep": has_iep,
+            "primary_disability": disability,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        # IEP record needs a primary disability (NOT NULL in iep_data)
+        iep = None
+        if has_iep and disability is not None:
+            iep = {
+                "student_id": student_id,
+                "primary_disability": disability,
+                "secondary_disabilities": [],
+                "accommodations": [{"type": a.value, "enabled": True, "settings": {}} for a in accommodations[i]],
+                "modifications": {},
+                "goals": [],
+                "last_reviewed": now,
+                "next_review_due": now + timedelta(days=IEP_REVIEW_DAYS),
+                "created_at": now,
+                "updated_at": now,
+            }
+
+        rows.append({"row_number": row_number, "student": student, "iep": iep})
+
+    flat_errors = [(row_number, "; ".join(messages)) for row_number, messages in errors.items()]
+    return rows, flat_errors
+
+
+# ═══════════════════════════════════════════════════════════
+# IMPORTER
+# ═══════════════════════════════════════════════════════════
+
+
+def _copy_value(value):
+    """Convert a column value for PostgreSQL COPY (CSV format)."""
+    if isinstance(value, Enum):
+        return value.name  # SQLEnum columns store member names
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+class BulkStudentImporter:
+    """
+    Chunked student importer used by StudentModelInterface.
+
+    Each chunk is validated, written and committed on its own, so memory
+    stays bounded by chunk_size regardless of upload size.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        vector_store: Optional[StudentVectorStore] = None,
+        chunk_size: int = BULK_IMPORT_CHUNK_SIZE,
+        embed_batch_size: int = BULK_IMPORT_EMBED_BATCH_SIZE,
+        use_copy: bool = BULK_IMPORT_USE_COPY,
+    ):
+        """
+        Initialize importer.
+
+        Args:
+            db: SQLAlchemy session
+            vector_store: Store for learning preference vectors (None = skip embeddings)
+            chunk_size: Rows per transaction
+            embed_batch_size: Preference texts per embedding upsert
+            use_copy: Use COPY when connected to PostgreSQL via psycopg2
+        """
+        self.db = db
+        self.vector_store = vector_store
+        self.chunk_size = max(1, chunk_size)
+        self.embed_batch_size = max(1, embed_batch_size)
+
+        dialect = db.get_bind().dialect
+        self.use_copy = use_copy and dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+    def import_stream(
+        self,
+        stream: IO,
+        class_id: str,
+        fmt: str = "csv",
+        on_progress: Optional[Callable[[BulkImportProgress], None]] = None,
+    ) -> BulkImportResult:
+        """
+        Import students from a CSV or NDJSON file object.
+
+        Args:
+            stream: Upload file object (text or binary)
+            class_id: Class to assign students to
+            fmt: "csv" or "ndjson"
+            on_progress: Called after each committed chunk
+
+        Returns:
+            BulkImportResult (row numbers are 1-based data rows)
+        """
+        return self.import_records(iter_records(stream, fmt), class_id, on_progress)
+
+    def import_records(
+        self,
+        records: Iterable[RawRecord],
+        class_id: str,
+        on_progress: Optional[Callable[[BulkImportProgress], None]] = None,
+    ) -> BulkImportResult:
+        """
+        Import already-parsed records.
+
+        Args:
+            records: (row_number, record, error) tuples
+            class_id: Class to assign students to
+            on_progress: Called after each committed chunk
+
+        Returns:
+            BulkImportResult with per-row errors
+
+        Raises:
+            ValueError: If the class does not exist
+        """
+        if self.db.query(ClassModel.class_id).filter(ClassModel.class_id == class_id).first() is None:
+            raise ValueError(f"Class {class_id} not found")
+
+        started = time.perf_counter()
+        result = BulkImportResult(total_rows=0, successful_imports=0)
+        progress = BulkImportProgress()
+        pending_embeddings: List[Tuple[str, str, Dict]] = []
+
+        for chunk in _chunked(records, self.chunk_size):
+            rows, errors = validate_records(chunk, class_id)
+            imported, insert_errors = self._insert_chunk(rows)
+            errors.extend(insert_errors)
+
+            result.total_rows += len(chunk)
+            result.successful_imports += len(imported)
+            for row in imported:
+                student = row["student"]
+                result.created_student_ids.append(student["student_id"])
+                if student["learning_preferences"]:
+                    pending_embeddings.append(self._preferences_entry(student))
+            for row_number, message in sorted(errors):
+                result.failed_rows.append(row_number)
+                result.errors.append(f"Row {row_number}: {message}")
+
+            while len(pending_embeddings) >= self.embed_batch_size:
+                batch = pending_embeddings[: self.embed_batch_size]
+                del pending_embeddings[: self.embed_batch_size]
+                progress.students_embedded += self._embed(batch, result)
+
+            progress.rows_processed = result.total_rows
+            progress.successful_imports = result.successful_imports
+            progress.failed_imports = len(result.failed_rows)
+            progress.chunks_committed += 1
+            progress.elapsed_seconds = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(progress.model_copy())
+
+        if pending_embeddings:
+            progress.students_embedded += self._embed(pending_embeddings, result)
+            progress.elapsed_seconds = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(progress.model_copy())
+
+        return result
+
+    # ───────────────────────────────────────────────────────
+    # WRITES
+    # ───────────────────────────────────────────────────────
+
+    def _insert_chunk(self, rows: List[Dict]) -> Tuple[List[Dict], List[Tuple[int, str]]]:
+        """
+        Write one chunk in a single transaction, falling back to per-row
+        transactions if the chunk fails (e.g., a duplicate student_id).
+
+        Returns:
+            (imported rows, (row_number, error) list)
+        """
+        if not rows:
+            return [], []
+
+        try:
+            self._write(rows)
+            self.db.commit()
+            return rows, []
+        except Exception:
+            self.db.rollback()
+
+        imported, errors = [], []
+        for row in rows:
+            try:
+                self._write([row])
+                self.db.commit()
+                imported.append(row)
+            except Exception as e:
+                self.db.rollback()
+                errors.append((row["row_number"], str(getattr(e, "orig", e)).strip().splitlines()[0]))
+        return imported, errors
+
+    def _write(self, rows: List[Dict]) -> None:
+        """Insert student and IEP rows (executemany, or COPY on PostgreSQL)."""
+        students = [row["student"] for row in rows]
+        ieps = [row["iep"] for row in rows if row["iep"] is not None]
+
+        if self.use_copy:
+            self._copy(StudentModel.__table__, students)
+            if ieps:
+                self._copy(IEPModel.__table__, ieps)
+            return
+
+        self.db.execute(insert(StudentModel), students)
+        if ieps:
+            self.db.execute(insert(IEPModel), ieps)
+
+    def _copy(self, table, rows: List[Dict]) -> None:
+        """Stream rows into a table with COPY ... FROM STDIN on the session's connection."""
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([_copy_value(row[column]) for column in columns] for row in rows)
+        buffer.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    # ───────────────────────────────────────────────────────
+    # EMBEDDINGS
+    # ───────────────────────────────────────────────────────
+
+    def _preferences_entry(self, student: Dict) -> Tuple[str, str, Dict]:
+        """Build (student_id, preferences text, metadata) for a new student."""
+        reading_level = student["reading_level"].value
+        return (
+            student["student_id"],
+            build_preferences_text(student["student_name"], student["learning_preferences"], reading_level),
+            {"learning_preferences": student["learning_preferences"], "reading_level": reading_level},
+        )
+
+    def _embed(self, batch: List[Tuple[str, str, Dict]], result: BulkImportResult) -> int:
+        """
+        Upsert one batch of preference texts. Failures are reported in
+        result.errors but do not undo the committed student rows.
+
+        Returns:
+            Number of students embedded
+        """
+        if self.vector_store is None:
+            return 0
+
+        student_ids, texts, metadatas = (list(column) for column in zip(*batch))
+        try:
+            self.vector_store.add_student_preferences_batch(student_ids, texts, metadatas)
+        except Exception as e:
+            result.errors.append(f"Embedding batch of {len(batch)} students failed: {e}")
+            return 0
+        return len(batch)
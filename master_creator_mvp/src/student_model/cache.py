@@ -0,0 +1,139 @@
+"""
+Read-through caching for Student Model lookups.
+
+Two layers sit in front of the database:
+- Identity cache: a plain dict owned by each StudentModelInterface instance.
+  It lives for one request / pipeline run, so repeated lookups of the same
+  student (Engines 2 and 3 fetch the same IEP many times) hit memory.
+- Shared cache: an optional process-level TTL cache shared by all interface
+  instances. Disabled unless STUDENT_CACHE_TTL_SECONDS > 0.
+
+Writes that go through StudentModelInterface invalidate both layers.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Process-level cache configuration (0 disables the shared cache)
+STUDENT_CACHE_TTL_SECONDS = float(os.getenv("STUDENT_CACHE_TTL_SECONDS", "0"))
+STUDENT_CACHE_MAX_ENTRIES = int(os.getenv("STUDENT_CACHE_MAX_ENTRIES", "10000"))
+
+# Sentinel for "not cached" (None is a valid cached value, e.g. no IEP)
+MISSING = object()
+
+
+# ═══════════════════════════════════════════════════════════
+# TTL CACHE
+# ═══════════════════════════════════════════════════════════
+
+
+class TTLCache:
+    """
+    Thread-safe TTL cache with a bounded number of entries.
+
+    Oldest entries are evicted first once max_entries is reached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = STUDENT_CACHE_MAX_ENTRIES):
+        """
+        Initialize cache.
+
+        Args:
+            ttl_seconds: Time-to-live for each entry
+            max_entries: Max entries kept before evicting the oldest
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or MISSING if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value with the cache TTL."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss statistics."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+# ═══════════════════════════════════════════════════════════
+# PROCESS-LEVEL CACHE
+# ═══════════════════════════════════════════════════════════
+
+_shared_cache: Optional[TTLCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[TTLCache]:
+    """
+    Get the process-level TTL cache.
+
+    Returns:
+        Shared TTLCache, or None if STUDENT_CACHE_TTL_SECONDS is 0
+    """
+    global _shared_cache
+
+    if STUDENT_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = TTLCache(ttl_seconds=STUDENT_CACHE_TTL_SECONDS)
+
+    return _shared_cache
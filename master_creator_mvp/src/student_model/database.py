@@ -13,8 +13,12 @@ All engines access student data through StudentModelInterface, which queries the
 """
 
 import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional
+from importlib.util import find_spec
+from typing import Iterator, Optional
 
 from sqlalchemy import (
     JSON,
@@ -29,10 +33,12 @@ from sqlalchemy import (
     Text,
     create_engine,
 )
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import Session, relationship, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
+from ..utils.metrics import DB_POOL_CHECKOUT_WAIT, DB_POOL_TIMEOUTS, instrument_sqlalchemy
 from .schemas import (
     AccommodationType,
     DisabilityCategory,
@@ -50,51 +56,107 @@ DATABASE_URL = os.getenv(
     "DATABASE_URL", "sqlite:///./master_creator.db"  # Default to SQLite for local development
 )
 
+# Connection pool per worker process (size x API workers must fit the server's max_connections)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+# Seconds a checkout waits for a free connection before raising
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # DATABASE CONNECTION
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 
 
-def get_engine(pool_size: int = 20, max_overflow: int = 40):
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool reporting checkout wait time and timeouts."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool reporting checkout wait time and timeouts."""
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[-1] in ("", "/"))
+
+
+def get_engine(pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
     """
     Create SQLAlchemy engine with connection pooling.
 
     Args:
-        pool_size: Number of permanent connections (default 20)
-        max_overflow: Max temporary connections beyond pool_size (default 40)
+        pool_size: Number of permanent connections (default DB_POOL_SIZE)
+        max_overflow: Max temporary connections beyond pool_size (default DB_MAX_OVERFLOW)
 
     Returns:
         SQLAlchemy Engine instance
     """
     # SQLite doesn't support connection pooling the same way as PostgreSQL
-    if DATABASE_URL.startswith("sqlite"):
-        return create_engine(
+    if _is_memory_sqlite(DATABASE_URL):
+        engine = create_engine(
             DATABASE_URL,
             connect_args={"check_same_thread": False},  # Allow multi-threading
             echo=False,  # Set True for SQL logging
         )
+    elif DATABASE_URL.startswith("sqlite"):
+        engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=DB_POOL_TIMEOUT,
+            echo=False,
+        )
     else:
         # PostgreSQL or other databases
-        return create_engine(
+        engine = create_engine(
             DATABASE_URL,
-            poolclass=QueuePool,
+            poolclass=InstrumentedQueuePool,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            pool_timeout=DB_POOL_TIMEOUT,
             pool_pre_ping=True,  # Verify connections before use
             echo=False,  # Set True for SQL logging
         )
 
+    # Query latency histogram (no-op when METRICS_ENABLED=false)
+    instrument_sqlalchemy(engine)
+    return engine
+
 
 def get_session_maker(engine=None):
-    """Create sessionmaker bound to engine."""
+    """
+    Get a sessionmaker.
+
+    Args:
+        engine: Engine to bind (the process-wide engine's SessionLocal if None)
+
+    Returns:
+        sessionmaker
+    """
     if engine is None:
-        engine = get_engine()
+        return SessionLocal
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-# Global session maker (initialized on first import)
-SessionLocal = get_session_maker()
+# Process-wide engine and session factory: one connection pool per worker
+db_engine = get_engine()
+SessionLocal = get_session_maker(db_engine)
 
 
 def get_db():
@@ -106,6 +168,142 @@ def get_db():
         db.close()
 
 
+# Session of the active session_scope() in this context (see StudentModelInterface)
+_current_session: ContextVar[Optional[Session]] = ContextVar("db_unit_of_work", default=None)
+
+
+def current_session() -> Optional[Session]:
+    """Session of the enclosing session_scope(), or None outside one."""
+    return _current_session.get()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Unit of work: one Session, committed on success and rolled back on error.
+
+    Interfaces created inside the block without an explicit session join
+    it, so an engine pipeline run uses one pooled connection and returns it
+    when the block exits.
+
+    Yields:
+        Session
+    """
+    session = SessionLocal()
+    token = _current_session.set(session)
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        _current_session.reset(token)
+        session.close()
+
+
+# Async drivers by dialect: (SQLAlchemy scheme, driver module)
+ASYNC_DRIVERS = {
+    "sqlite": ("sqlite+aiosqlite", "aiosqlite"),
+    "postgresql": ("postgresql+asyncpg", "asyncpg"),
+}
+
+
+def get_async_database_url(url: str = DATABASE_URL) -> Optional[str]:
+    """
+    DATABASE_URL rewritten for its async driver.
+
+    Args:
+        url: Sync database URL
+
+    Returns:
+        Async URL, or None if the dialect has no async driver or it isn't installed
+    """
+    scheme, separator, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "postgres":
+        dialect = "postgresql"
+    driver = ASYNC_DRIVERS.get(dialect)
+    if not separator or driver is None or find_spec(driver[1]) is None:
+        return None
+    return f"{driver[0]}://{rest}"
+
+
+# True when routes can use AsyncSession (aiosqlite/asyncpg installed)
+ASYNC_DB_AVAILABLE = get_async_database_url() is not None
+
+
+def get_async_engine(pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    """
+    Create SQLAlchemy AsyncEngine for DATABASE_URL (aiosqlite or asyncpg).
+
+    Args:
+        pool_size: Number of permanent connections (default DB_POOL_SIZE)
+        max_overflow: Max temporary connections beyond pool_size (default DB_MAX_OVERFLOW)
+
+    Returns:
+        AsyncEngine instance
+
+    Raises:
+        RuntimeError: If no async driver is installed for the database
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = get_async_database_url()
+    if url is None:
+        raise RuntimeError(f"No async driver installed for {DATABASE_URL.split(':', 1)[0]} (install aiosqlite or asyncpg)")
+
+    if _is_memory_sqlite(url):
+        engine = create_async_engine(url, echo=False)
+    else:
+        engine = create_async_engine(
+            url,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=not url.startswith("sqlite"),
+            echo=False,
+        )
+
+    instrument_sqlalchemy(engine.sync_engine)
+    return engine
+
+
+_async_session_maker = None
+
+
+def get_async_session_maker(engine=None):
+    """
+    Create async_sessionmaker bound to engine.
+
+    Objects are not expired on commit: after an AsyncSession commits,
+    attribute refreshes would need an awaited query.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    if engine is None:
+        engine = get_async_engine()
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+def open_request_session():
+    """
+    Open a session for one API request.
+
+    Returns:
+        AsyncSession when an async driver is installed, otherwise a Session
+        from SessionLocal (used from worker threads by the async interfaces)
+    """
+    global _async_session_maker
+
+    if not ASYNC_DB_AVAILABLE:
+        return SessionLocal()
+    if _async_session_maker is None:
+        _async_session_maker = get_async_session_maker()
+    return _async_session_maker()
+
+
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # TABLE MODELS
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -304,10 +502,10 @@ def create_tables(engine=None):
     Create all tables in the database.
 
     Args:
-        engine: SQLAlchemy engine (creates new one if None)
+        engine: SQLAlchemy engine (process-wide engine if None)
     """
     if engine is None:
-        engine = get_engine()
+        engine = db_engine
 
     Base.metadata.create_all(bind=engine)
     print(" All database tables created successfully!")
@@ -318,10 +516,10 @@ def drop_tables(engine=None):
     Drop all tables from the database (USE WITH CAUTION!).
 
     Args:
-        engine: SQLAlchemy engine (creates new one if None)
+        engine: SQLAlchemy engine (process-wide engine if None)
     """
     if engine is None:
-        engine = get_engine()
+        engine = db_engine
 
     Base.metadata.drop_all(bind=engine)
     print("All database tables dropped!")
@@ -332,10 +530,10 @@ def reset_database(engine=None):
     Drop and recreate all tables (DESTROYS ALL DATA!).
 
     Args:
-        engine: SQLAlchemy engine (creates new one if None)
+        engine: SQLAlchemy engine (process-wide engine if None)
     """
     if engine is None:
-        engine = get_engine()
+        engine = db_engine
 
     print("�  Resetting database (this will delete all data)...")
     drop_tables(engine)
@@ -406,7 +604,7 @@ Example:
         sys.exit(1)
 
     command = sys.argv[1]
-    engine = get_engine()
+    engine = db_engine
 
     if command == "init":
         create_tables(engine)
@@ -0,0 +1,317 @@
+"""
+Pluggable embedding backends for StudentVectorStore.
+
+All backends implement all-MiniLM-L6-v2 (mean pooling + L2 normalization,
+384 dimensions), so vectors are interchangeable across backends:
+
+- sentence-transformers: PyTorch reference implementation (default)
+- onnx: ONNX Runtime export of the same model on CPU; no PyTorch import,
+  dynamic padding and length-sorted batches
+- onnx-int8: the ONNX model with dynamically quantized int8 weights
+  (cosine similarity to the fp32 vectors is ~0.99; re-embed collections
+  with `python -m src.student_model.vector_store reembed` for exact matches)
+
+The hashing backend is the exception: deterministic feature-hashed
+bag-of-words vectors with no model, for offline tests and benchmarks
+(not comparable with MiniLM vectors; use a separate Chroma directory).
+
+Models load lazily on first use, so selecting a backend costs nothing at import.
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Optional ONNX Runtime backend (both ship with chromadb); imported when the
+# model loads so selecting a backend does not pay for it at import time
+ONNXRUNTIME_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ("onnxruntime", "tokenizers"))
+
+# Backend configuration from environment
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+EMBEDDING_ONNX_MODEL_DIR = os.getenv("EMBEDDING_ONNX_MODEL_DIR", "")
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DIMENSION = 384
+MAX_TOKENS = 256  # sentence-transformers max_seq_length for this model
+
+BACKENDS = ("sentence-transformers", "onnx", "onnx-int8", "hashing")
+
+
+# ═══════════════════════════════════════════════════════════
+# BACKEND INTERFACE
+# ═══════════════════════════════════════════════════════════
+
+
+class EmbeddingBackend(ABC):
+    """Maps texts to L2-normalized float32 vectors."""
+
+    name = "base"
+    model_name = EMBEDDING_MODEL_NAME
+    dimension = EMBEDDING_DIMENSION
+
+    def __init__(self, batch_size: int = 32):
+        """
+        Initialize backend.
+
+        Args:
+            batch_size: Texts per model forward pass
+        """
+        self.batch_size = max(1, batch_size)
+        self._load_lock = threading.Lock()
+
+    @property
+    def cache_namespace(self) -> str:
+        """Embedding cache namespace (vectors from different backends are cached apart)."""
+        return self.model_name if self.name == "sentence-transformers" else f"{self.model_name}-{self.name}"
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension), rows L2-normalized
+        """
+        pass
+
+    def __call__(self, input: Sequence[str]) -> List[np.ndarray]:
+        """Embedding-function call signature (list in, list of vectors out)."""
+        return list(self.embed(list(input)))
+
+
+# ═══════════════════════════════════════════════════════════
+# SENTENCE-TRANSFORMERS (PyTorch)
+# ═══════════════════════════════════════════════════════════
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Reference backend; imports PyTorch on first embed."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, batch_size: int = 32, device: str = "cpu"):
+        super().__init__(batch_size)
+        self.device = device
+        self._model = None
+
+    def _get_model(self):
+        with self._load_lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(self.model_name, device=self.device)
+            return self._model
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        vectors = self._get_model().encode(
+            list(texts), batch_size=self.batch_size, normalize_embeddings=True, convert_to_numpy=True
+        )
+        return vectors.astype(np.float32)
+
+
+# ═══════════════════════════════════════════════════════════
+# ONNX RUNTIME (CPU, optional int8)
+# ═══════════════════════════════════════════════════════════
+
+
+def default_onnx_model_dir() -> Path:
+    """Directory with model.onnx + tokenizer.json (Chroma's ONNX download location)."""
+    if EMBEDDING_ONNX_MODEL_DIR:
+        return Path(EMBEDDING_ONNX_MODEL_DIR)
+    return Path.home() / ".cache" / "chroma" / "onnx_models" / EMBEDDING_MODEL_NAME / "onnx"
+
+
+def quantize_model(source: Path, target: Path) -> Path:
+    """
+    Write an int8 dynamically-quantized copy of an ONNX model.
+
+    Args:
+        source: fp32 model.onnx
+        target: Output path
+
+    Returns:
+        target
+
+    Raises:
+        RuntimeError: If the onnx package (needed by the quantizer) is missing
+    """
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        raise RuntimeError("int8 quantization requires the onnx package: pip install onnx") from e
+
+    tmp = target.with_suffix(".tmp.onnx")
+    quantize_dynamic(str(source), str(tmp), weight_type=QuantType.QInt8)
+    os.replace(tmp, target)
+    return target
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime.
+
+    Batches are padded to their longest text (not to 256 tokens) and texts
+    are length-sorted first, which matters for short preference texts.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        quantized: bool = False,
+        model_dir: Optional[Path] = None,
+        batch_size: int = 32,
+        threads: int = EMBEDDING_ONNX_THREADS,
+    ):
+        """
+        Initialize backend.
+
+        Args:
+            quantized: Use int8 weights (built from model.onnx on first use)
+            model_dir: Directory with model.onnx + tokenizer.json (default: Chroma's cache)
+            batch_size: Texts per forward pass
+            threads: intra-op threads (0 = ONNX Runtime default)
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("ONNX embedding backend requires onnxruntime and tokenizers")
+
+        super().__init__(batch_size)
+        self.quantized = quantized
+        self.name = "onnx-int8" if quantized else "onnx"
+        self.model_dir = Path(model_dir) if model_dir is not None else default_onnx_model_dir()
+        self.threads = threads
+        self._session = None
+        self._tokenizer = None
+        self._input_names: List[str] = []
+
+    def _load(self):
+        """Load tokenizer and inference session (downloading/quantizing if needed)."""
+        with self._load_lock:
+            if self._session is not None:
+                return
+
+            model_path = self.model_dir / "model.onnx"
+            if not model_path.exists() and EMBEDDING_ONNX_MODEL_DIR == "":
+                # Same files Chroma's default embedding function downloads
+                from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+                ONNXMiniLM_L6_V2()._download_model_if_not_exists()
+            if not model_path.exists():
+                raise FileNotFoundError(f"ONNX model not found: {model_path}")
+
+            if self.quantized:
+                int8_path = self.model_dir / "model.int8.onnx"
+                model_path = int8_path if int8_path.exists() else quantize_model(model_path, int8_path)
+
+            import onnxruntime
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=MAX_TOKENS)
+            tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+            options = onnxruntime.SessionOptions()
+            if self.threads:
+                options.intra_op_num_threads = self.threads
+            session = onnxruntime.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+
+            self._tokenizer = tokenizer
+            self._input_names = [i.name for i in session.get_inputs()]
+            self._session = session
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        self._load()
+
+        # Length-sorted batches keep padding small; results are restored to input order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        output = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start : start + self.batch_size]
+            encoded = self._tokenizer.encode_batch([texts[i] for i in indices])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+            hidden = self._session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, then L2 normalize
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            output[indices] = pooled / np.clip(norms, 1e-12, None)
+
+        return output
+
+
+# ═══════════════════════════════════════════════════════════
+# HASHING (no model; tests and benchmarks)
+# ═══════════════════════════════════════════════════════════
+
+
+class HashingBackend(EmbeddingBackend):
+    """Lowercased word tokens hashed into signed buckets; similar texts share buckets."""
+
+    name = "hashing"
+    model_name = "token-hashing"
+
+    @property
+    def cache_namespace(self) -> str:
+        return self.model_name
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        output = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+                output[row, digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return output / np.clip(norms, 1e-12, None)
+
+
+# ═══════════════════════════════════════════════════════════
+# FACTORY
+# ═══════════════════════════════════════════════════════════
+
+
+def get_embedding_backend(name: Optional[str] = None, **kwargs) -> EmbeddingBackend:
+    """
+    Create the configured embedding backend.
+
+    Args:
+        name: Backend name (default: EMBEDDING_BACKEND env var)
+        **kwargs: Backend constructor options
+
+    Returns:
+        EmbeddingBackend
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or EMBEDDING_BACKEND).lower()
+    if name == "sentence-transformers":
+        return SentenceTransformerBackend(**kwargs)
+    if name == "onnx":
+        return OnnxBackend(quantized=False, **kwargs)
+    if name == "onnx-int8":
+        return OnnxBackend(quantized=True, **kwargs)
+    if name == "hashing":
+        return HashingBackend(**kwargs)
+    raise ValueError(f"Unknown embedding backend '{name}' (expected one of {BACKENDS})")
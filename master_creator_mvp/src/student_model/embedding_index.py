@@ -0,0 +1,322 @@
+"""
+In-process embedding index for similarity lookups.
+
+Keeps a copy of a Chroma collection's embeddings in memory so
+similar-student and related-concept lookups don't round-trip to Chroma.
+
+- Vectors are L2-normalized float32 rows; similarity is cosine and the
+  reported distance is cosine distance (1 - cosine similarity).
+- Small indexes use brute-force top-k (one BLAS matrix multiply per batch).
+- Large indexes use HNSW (hnswlib) when installed. The graph is built on
+  the first query and then updated in place: upserts add items, removals
+  are marked deleted (rebuilt once deleted items outnumber live ones).
+- Batched queries: many ids at once, optionally restricted to a subset
+  (e.g., one class roster).
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Optional approximate nearest-neighbor backend
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    # Brute force works at any size; HNSW only speeds up very large indexes
+    HNSWLIB_AVAILABLE = False
+    hnswlib = None
+
+# Index configuration from environment
+EMBEDDING_INDEX_ENABLED = os.getenv("EMBEDDING_INDEX_ENABLED", "true").lower() == "true"
+EMBEDDING_INDEX_HNSW_THRESHOLD = int(os.getenv("EMBEDDING_INDEX_HNSW_THRESHOLD", "20000"))
+
+# (id, cosine distance)
+Neighbor = Tuple[str, float]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0).astype(np.float32)
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-wise indices and scores of the k largest entries, sorted descending."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+# ═══════════════════════════════════════════════════════════
+# EMBEDDING INDEX
+# ═══════════════════════════════════════════════════════════
+
+
+class EmbeddingIndex:
+    """
+    Thread-safe in-memory cosine index with optional payloads per id.
+
+    Payloads hold whatever the caller wants returned with a hit
+    (e.g., Chroma document + metadata) so lookups need no extra calls.
+    """
+
+    def __init__(self, dim: Optional[int] = None, hnsw_threshold: int = EMBEDDING_INDEX_HNSW_THRESHOLD):
+        """
+        Initialize empty index.
+
+        Args:
+            dim: Embedding dimension (inferred from first upsert if None)
+            hnsw_threshold: Switch to HNSW at this many vectors (if hnswlib installed)
+        """
+        self.dim = dim
+        self.hnsw_threshold = hnsw_threshold
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = np.empty((0, dim or 0), dtype=np.float32)
+        self._payloads: Dict[str, Dict] = {}
+        self._hnsw = None
+        self._hnsw_labels: Dict[str, int] = {}  # id -> HNSW label (labels survive row compaction)
+        self._hnsw_ids: Dict[int, str] = {}  # HNSW label -> id
+        self._hnsw_next_label = 0
+        self._hnsw_deleted = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def uses_hnsw(self) -> bool:
+        return self._hnsw is not None
+
+    # ───────────────────────────────────────────────────────
+    # WRITES
+    # ───────────────────────────────────────────────────────
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        payloads: Optional[Sequence[Dict]] = None,
+    ) -> None:
+        """
+        Add or replace vectors.
+
+        Args:
+            ids: Item identifiers
+            embeddings: One embedding per id
+            payloads: Optional data returned with query hits
+        """
+        if len(ids) == 0:
+            return
+
+        vectors = _normalize(embeddings)
+        with self._lock:
+            if self.dim is None or self._vectors.shape[1] == 0:
+                self.dim = vectors.shape[1]
+                self._vectors = np.empty((0, self.dim), dtype=np.float32)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dim}")
+
+            new_rows = []
+            for position, item_id in enumerate(ids):
+                row = self._rows.get(item_id)
+                if row is None:
+                    self._rows[item_id] = len(self._ids) + len(new_rows)
+                    new_rows.append(position)
+                else:
+                    self._vectors[row] = vectors[position]
+                if payloads is not None:
+                    self._payloads[item_id] = payloads[position]
+
+            if new_rows:
+                self._ids.extend(ids[p] for p in new_rows)
+                self._vectors = np.vstack([self._vectors, vectors[new_rows]])
+
+            if self._hnsw is not None:
+                self._hnsw_add(ids, vectors)
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Remove vectors (unknown ids are ignored)."""
+        with self._lock:
+            drop = {self._rows[i] for i in ids if i in self._rows}
+            if not drop:
+                return
+            keep = [row for row in range(len(self._ids)) if row not in drop]
+            self._ids = [self._ids[row] for row in keep]
+            self._vectors = self._vectors[keep]
+            self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+            for item_id in ids:
+                self._payloads.pop(item_id, None)
+
+            if self._hnsw is not None:
+                for item_id in ids:
+                    label = self._hnsw_labels.pop(item_id, None)
+                    if label is not None:
+                        self._hnsw.mark_deleted(label)
+                        del self._hnsw_ids[label]
+                        self._hnsw_deleted += 1
+                if self._hnsw_deleted > len(self._ids) or len(self._ids) < self.hnsw_threshold:
+                    self._hnsw = None  # Mostly tombstones, or back to brute force
+
+    def clear(self) -> None:
+        """Remove everything."""
+        with self._lock:
+            self._ids = []
+            self._rows = {}
+            self._vectors = np.empty((0, self.dim or 0), dtype=np.float32)
+            self._payloads = {}
+            self._hnsw = None
+            self._hnsw_labels = {}
+            self._hnsw_ids = {}
+
+    # ───────────────────────────────────────────────────────
+    # READS
+    # ───────────────────────────────────────────────────────
+
+    def get_vector(self, item_id: str) -> Optional[np.ndarray]:
+        """Normalized vector for an id (None if not indexed)."""
+        row = self._rows.get(item_id)
+        return None if row is None else self._vectors[row]
+
+    def get_payload(self, item_id: str) -> Dict:
+        """Payload stored for an id (empty dict if none)."""
+        return self._payloads.get(item_id, {})
+
+    def query_vectors(
+        self,
+        vectors: Sequence[Sequence[float]],
+        k: int,
+        exclude: Optional[Sequence[Optional[str]]] = None,
+    ) -> List[List[Neighbor]]:
+        """
+        Top-k neighbors for each query vector over the whole index.
+
+        Args:
+            vectors: Query embeddings
+            k: Neighbors per query
+            exclude: Per-query id to skip (e.g., the query item itself)
+
+        Returns:
+            One list of (id, cosine distance) per query, nearest first
+        """
+        queries = _normalize(vectors)
+        with self._lock:
+            if not self._ids:
+                return [[] for _ in range(len(queries))]
+
+            # Over-fetch by one so an excluded self-match can be dropped
+            fetch = min(k + (1 if exclude is not None else 0), len(self._ids))
+
+            if len(self._ids) >= self.hnsw_threshold and HNSWLIB_AVAILABLE:
+                graph = self._get_hnsw()
+                graph.set_ef(max(64, 2 * fetch))
+                labels, distances = graph.knn_query(queries, k=fetch)
+                indices, scores = labels.astype(np.int64), 1.0 - distances
+                return self._collect(indices, scores, k, exclude, self._hnsw_ids)
+
+            indices, scores = _top_k(queries @ self._vectors.T, fetch)
+            return self._collect(indices, scores, k, exclude, self._ids)
+
+    def query_ids(
+        self,
+        ids: Sequence[str],
+        k: int,
+        within: Optional[Sequence[str]] = None,
+    ) -> Dict[str, List[Neighbor]]:
+        """
+        Top-k neighbors for indexed items, excluding each item itself.
+
+        Args:
+            ids: Query item ids (ids not in the index map to [])
+            k: Neighbors per item
+            within: Restrict candidates to these ids (e.g., a class roster)
+
+        Returns:
+            Dict mapping each id to (id, cosine distance) list, nearest first
+        """
+        results: Dict[str, List[Neighbor]] = {item_id: [] for item_id in ids}
+        with self._lock:
+            present = [item_id for item_id in ids if item_id in self._rows]
+            if not present:
+                return results
+
+            queries = self._vectors[[self._rows[i] for i in present]]
+
+            if within is None:
+                neighbors = self.query_vectors(queries, k, exclude=present)
+            else:
+                candidate_ids = [item_id for item_id in dict.fromkeys(within) if item_id in self._rows]
+                candidates = self._vectors[[self._rows[i] for i in candidate_ids]]
+                fetch = min(k + 1, len(candidate_ids))
+                indices, scores = _top_k(queries @ candidates.T, fetch)
+                neighbors = self._collect(indices, scores, k, present, candidate_ids)
+
+        results.update(zip(present, neighbors))
+        return results
+
+    def _collect(
+        self,
+        indices: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        exclude: Optional[Sequence[Optional[str]]],
+        labels: Union[List[str], Dict[int, str]],
+    ) -> List[List[Neighbor]]:
+        """Turn index/score arrays into (id, distance) lists, dropping excluded ids."""
+        results = []
+        for row in range(indices.shape[0]):
+            skip = exclude[row] if exclude is not None else None
+            hits = []
+            for col, score in zip(indices[row], scores[row]):
+                item_id = labels[int(col)]
+                if item_id == skip:
+                    continue
+                hits.append((item_id, max(0.0, 1.0 - float(score))))
+                if len(hits) == k:
+                    break
+            results.append(hits)
+        return results
+
+    def _get_hnsw(self):
+        """Build the HNSW graph on demand."""
+        if self._hnsw is None:
+            graph = hnswlib.Index(space="cosine", dim=self.dim)
+            graph.init_index(max_elements=len(self._ids), ef_construction=200, M=16)
+            graph.add_items(self._vectors, np.arange(len(self._ids)))
+            self._hnsw = graph
+            self._hnsw_labels = {item_id: label for label, item_id in enumerate(self._ids)}
+            self._hnsw_ids = dict(enumerate(self._ids))
+            self._hnsw_next_label = len(self._ids)
+            self._hnsw_deleted = 0
+        return self._hnsw
+
+    def _hnsw_add(self, ids: Sequence[str], vectors: np.ndarray):
+        """Add or replace items in the built HNSW graph (existing labels are updated in place)."""
+        labels = []
+        for item_id in ids:
+            label = self._hnsw_labels.get(item_id)
+            if label is None:
+                label = self._hnsw_labels[item_id] = self._hnsw_next_label
+                self._hnsw_ids[label] = item_id
+                self._hnsw_next_label += 1
+            labels.append(label)
+
+        needed = self._hnsw_next_label
+        if needed > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(max(needed, 2 * self._hnsw.get_max_elements()))
+        self._hnsw.add_items(vectors, np.asarray(labels))
+
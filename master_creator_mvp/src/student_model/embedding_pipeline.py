@@ -0,0 +1,390 @@
+"""
+Batched embedding pipeline for StudentVectorStore.
+
+- EmbeddingCache: content-hash → vector cache, persisted as a memory-mapped
+  float32 matrix so identical texts are never embedded twice (across runs)
+- CachedEmbedder: wraps an embedding function; dedupes texts, serves cache
+  hits and embeds misses in large batches
+- EmbeddingBatcher: micro-batching write queue that flushes by size or time
+
+Cache files (per model namespace, in EMBEDDING_CACHE_DIR):
+    <namespace>.f32   - float32 matrix, one row per cached text
+    <namespace>.keys  - one content hash per line (line n → row n)
+    <namespace>.json  - dim and capacity
+
+The on-disk cache assumes a single writer process; set EMBEDDING_CACHE_DIR
+to an empty value for a per-process in-memory cache instead.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import warnings
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Pipeline configuration from environment
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./chroma_data/embedding_cache")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_WRITE_BATCHING = os.getenv("EMBEDDING_WRITE_BATCHING", "false").lower() == "true"
+EMBEDDING_WRITE_MAX_BATCH = int(os.getenv("EMBEDDING_WRITE_MAX_BATCH", "256"))
+EMBEDDING_WRITE_MAX_WAIT_MS = int(os.getenv("EMBEDDING_WRITE_MAX_WAIT_MS", "200"))
+
+
+# ═══════════════════════════════════════════════════════════
+# EMBEDDING CACHE
+# ═══════════════════════════════════════════════════════════
+
+
+class EmbeddingCache:
+    """
+    Thread-safe content-hash embedding cache.
+
+    Vectors live in a growable float32 matrix: memory-mapped from disk when
+    `directory` is set, a plain array otherwise.
+    """
+
+    def __init__(self, directory: Optional[str] = None, namespace: str = "default", initial_capacity: int = 1024):
+        """
+        Initialize cache (loads existing entries from disk).
+
+        Args:
+            directory: Cache directory (None = in-memory only)
+            namespace: Embedding model name (vectors from different models never mix)
+            initial_capacity: Rows allocated on first write
+        """
+        self.directory = directory
+        self.namespace = namespace
+        self.initial_capacity = initial_capacity
+        self.dim: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.RLock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in namespace)
+            base = os.path.join(directory, safe_name)
+            self._vectors_path = f"{base}.f32"
+            self._keys_path = f"{base}.keys"
+            self._meta_path = f"{base}.json"
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def key(self, text: str) -> str:
+        """Content hash for a text within this cache's namespace."""
+        return hashlib.blake2b(f"{self.namespace}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            One float32 vector (copy) or None per text
+        """
+        with self._lock:
+            found = []
+            for text in texts:
+                row = self._rows.get(self.key(text))
+                found.append(None if row is None else np.array(self._vectors[row]))
+            hits = sum(v is not None for v in found)
+            self.hits += hits
+            self.misses += len(found) - hits
+            return found
+
+    def put_many(self, texts: Sequence[str], vectors) -> None:
+        """
+        Store vectors for texts (already-cached texts are skipped).
+
+        Args:
+            texts: Embedded texts
+            vectors: One vector per text
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match cache dimension {self.dim}")
+
+            new_keys: Dict[str, int] = {}
+            for position, text in enumerate(texts):
+                key = self.key(text)
+                if key not in self._rows and key not in new_keys:
+                    new_keys[key] = position
+            if not new_keys:
+                return
+
+            start = len(self._rows)
+            self._ensure_capacity(start + len(new_keys))
+            self._vectors[start : start + len(new_keys)] = vectors[list(new_keys.values())]
+
+            if self.directory:
+                # Vectors hit the file before their keys, so a crash never leaves a key without data
+                self._vectors.flush()
+                with open(self._keys_path, "a", encoding="utf-8") as f:
+                    f.write("".join(f"{key}\n" for key in new_keys))
+
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = start + offset
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "persistent": bool(self.directory),
+        }
+
+    # ───────────────────────────────────────────────────────
+    # STORAGE
+    # ───────────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        """Memory-map existing cache files."""
+        if not (os.path.exists(self._meta_path) and os.path.exists(self._vectors_path)):
+            return
+
+        with open(self._meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        capacity = meta["capacity"]
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, encoding="utf-8") as f:
+                for row, line in enumerate(f):
+                    key = line.strip()
+                    if key and row < capacity:
+                        self._rows[key] = row
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """Grow the vector matrix (doubling) to hold at least `rows` rows."""
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+
+        new_capacity = max(rows, capacity * 2, self.initial_capacity)
+
+        if not self.directory:
+            grown = np.zeros((new_capacity, self.dim), dtype=np.float32)
+            if self._vectors is not None:
+                grown[:capacity] = self._vectors
+            self._vectors = grown
+            return
+
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(new_capacity, self.dim))
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "capacity": new_capacity}, f)
+
+
+# Process-wide caches keyed by (directory, namespace)
+_caches: Dict[tuple, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(namespace: str, directory: Optional[str] = EMBEDDING_CACHE_DIR) -> EmbeddingCache:
+    """
+    Get the process-wide embedding cache for a model.
+
+    Args:
+        namespace: Embedding model name
+        directory: Cache directory (empty/None = in-memory)
+
+    Returns:
+        Shared EmbeddingCache
+    """
+    directory = directory or None
+    with _caches_lock:
+        cache = _caches.get((directory, namespace))
+        if cache is None:
+            cache = EmbeddingCache(directory, namespace)
+            _caches[(directory, namespace)] = cache
+        return cache
+
+
+# ═══════════════════════════════════════════════════════════
+# CACHED EMBEDDER
+# ═══════════════════════════════════════════════════════════
+
+
+class CachedEmbedder:
+    """Embedding function wrapper: dedupe → cache lookup → batched embedding of misses."""
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Sequence],
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ):
+        """
+        Initialize embedder.
+
+        Args:
+            embed_fn: Function mapping a list of texts to a list of vectors
+            cache: Embedding cache (None = no caching)
+            batch_size: Texts per embed_fn call
+        """
+        self.embed_fn = embed_fn
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.texts_requested = 0
+        self.texts_embedded = 0
+
+    def __call__(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts (duplicates are embedded once)
+
+        Returns:
+            One vector (list of floats) per input text
+        """
+        self.texts_requested += len(texts)
+        unique = list(dict.fromkeys(texts))
+
+        cached = self.cache.get_many(unique) if self.cache is not None else [None] * len(unique)
+        vectors = {text: vector for text, vector in zip(unique, cached) if vector is not None}
+        missing = [text for text, vector in zip(unique, cached) if vector is None]
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            embedded = np.asarray(self.embed_fn(batch), dtype=np.float32)
+            self.texts_embedded += len(batch)
+            if self.cache is not None:
+                self.cache.put_many(batch, embedded)
+            vectors.update(zip(batch, embedded))
+
+        return [vectors[text].tolist() for text in texts]
+
+    def get_stats(self) -> Dict:
+        """Get embedder statistics (and cache statistics if caching)."""
+        return {
+            "texts_requested": self.texts_requested,
+            "texts_embedded": self.texts_embedded,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+        }
+
+
+# ═══════════════════════════════════════════════════════════
+# MICRO-BATCHING WRITE QUEUE
+# ═══════════════════════════════════════════════════════════
+
+
+class PendingWrite(NamedTuple):
+    """One queued vector store upsert."""
+
+    collection: str
+    item_id: str
+    document: str
+    metadata: Dict
+
+
+class EmbeddingBatcher:
+    """
+    Queue single upserts and hand them to `flush_fn` in batches.
+
+    Flushes when `max_batch` writes are pending or `max_wait_ms` after the
+    first pending write, whichever comes first. Call flush() before reads
+    that must see queued writes.
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[PendingWrite]], None],
+        max_batch: int = EMBEDDING_WRITE_MAX_BATCH,
+        max_wait_ms: int = EMBEDDING_WRITE_MAX_WAIT_MS,
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            flush_fn: Writes one batch (called without the queue lock held)
+            max_batch: Flush at this many pending writes
+            max_wait_ms: Flush this long after the first pending write
+        """
+        self.flush_fn = flush_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches_flushed = 0
+
+        self._pending: List[PendingWrite] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Keeps batches in submission order
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, collection: str, item_id: str, document: str, metadata: Optional[Dict] = None) -> None:
+        """Queue one upsert."""
+        with self._lock:
+            self._pending.append(PendingWrite(collection, item_id, document, metadata or {}))
+            full = len(self._pending) >= self.max_batch
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_wait, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending upserts now."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return
+            try:
+                self.flush_fn(batch)
+            except Exception:
+                # Keep failed writes queued (ahead of newer ones) for the next flush
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+            self.batches_flushed += 1
+
+    def discard(self) -> None:
+        """Drop all pending upserts without writing them."""
+        with self._lock:
+            self._pending = []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def close(self) -> None:
+        """Flush and stop the timer."""
+        self.flush()
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            warnings.warn(f"Embedding batch flush failed: {e}")
@@ -8,13 +8,12 @@ This interface provides a clean abstraction over PostgreSQL + Chroma,
 ensuring consistent data access patterns and performance optimizations.
 """
 
-import statistics
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import IO, Callable, Dict, List, Optional
 
-import pandas as pd
+from pydantic import BaseModel
 from sqlalchemy import and_, func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from .database import (
     AssessmentModel,
@@ -24,11 +23,13 @@ from .database import (
     PredictionModel,
     SessionLocal,
     StudentModel,
+    current_session,
 )
 from .schemas import (
     AccommodationType,
     AdaptiveRecommendation,
     AssessmentRecord,
+    BulkImportProgress,
     BulkImportResult,
     BulkImportRow,
     ClassMasteryDistribution,
@@ -36,6 +37,7 @@ from .schemas import (
     ConceptMastery,
     DisabilityCategory,
     GradeLevel,
+    IEPAccommodation,
     IEPData,
     IEPUpdate,
     LearningPreference,
@@ -46,7 +48,12 @@ from .schemas import (
     StudentProfileCreate,
     TierLevel,
 )
-from .vector_store import StudentVectorStore
+from .bulk_import import BULK_IMPORT_EMBED_BATCH_SIZE, BulkStudentImporter
+from .cache import MISSING, TTLCache, get_shared_cache
+from .mastery_matrix import MasteryMatrix
+from .snapshot import ClassSnapshot
+from .vector_store import StudentVectorStore, build_preferences_text, get_shared_vector_store
+from ..utils.tracing import trace_methods
 
 
 # ═══════════════════════════════════════════════════════════
@@ -54,6 +61,12 @@ from .vector_store import StudentVectorStore
 # ═══════════════════════════════════════════════════════════
 
 
+def _private_copy(value: object) -> object:
+    """Deep copy of a cached model, so callers can't mutate the shared cache entry."""
+    return value.model_copy(deep=True) if isinstance(value, BaseModel) else value
+
+
+@trace_methods("student_model")
 class StudentModelInterface:
     """
     Unified interface for all student data operations.
@@ -68,17 +81,44 @@ class StudentModelInterface:
     - Learning preferences: get preferences, find similar students
     """
 
-    def __init__(self, db_session: Optional[Session] = None, vector_store: Optional[StudentVectorStore] = None):
+    def __init__(
+        self,
+        db_session: Optional[Session] = None,
+        vector_store: Optional[StudentVectorStore] = None,
+        shared_cache: Optional[TTLCache] = None,
+    ):
         """
         Initialize interface.
 
         Args:
-            db_session: SQLAlchemy session (creates new one if None)
-            vector_store: Chroma vector store (creates new one if None)
+            db_session: SQLAlchemy session (joins the active session_scope(), or
+                creates a new one, if None)
+            vector_store: Chroma vector store (process-level shared store if None)
+            shared_cache: Process-level TTL cache (uses STUDENT_CACHE_TTL_SECONDS if None)
         """
-        self.db = db_session if db_session is not None else SessionLocal()
-        self.vector_store = vector_store if vector_store is not None else StudentVectorStore()
+        if db_session is None:
+            db_session = current_session()  # Join the enclosing unit of work
         self._owns_session = db_session is None
+        self.db = db_session if db_session is not None else SessionLocal()
+        self._vector_store = vector_store  # Opened on first use (most requests never touch Chroma)
+
+        # Read-through caches for profiles and IEP data
+        # Identity cache is scoped to this instance (one request / pipeline run)
+        self._identity_cache: Dict[tuple, object] = {}
+        self._shared_cache = shared_cache if shared_cache is not None else get_shared_cache()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    @property
+    def vector_store(self) -> StudentVectorStore:
+        """Chroma vector store (the shared store, opened on first access)."""
+        if self._vector_store is None:
+            self._vector_store = get_shared_vector_store()
+        return self._vector_store
+
+    @vector_store.setter
+    def vector_store(self, vector_store: StudentVectorStore):
+        self._vector_store = vector_store
 
     def close(self):
         """Close database session if we own it."""
@@ -93,6 +133,69 @@ class StudentModelInterface:
         """Context manager cleanup."""
         self.close()
 
+    # ═══════════════════════════════════════════════════════════
+    # READ-THROUGH CACHE
+    # ═══════════════════════════════════════════════════════════
+
+    def _cache_get(self, key: tuple) -> object:
+        """Look up key in identity cache, then shared cache. Returns MISSING on miss."""
+        if key in self._identity_cache:
+            self._cache_hits += 1
+            return self._identity_cache[key]
+
+        if self._shared_cache is not None:
+            value = self._shared_cache.get(key)
+            if value is not MISSING:
+                value = _private_copy(value)  # Shared across requests and threads
+                self._identity_cache[key] = value
+                self._cache_hits += 1
+                return value
+
+        self._cache_misses += 1
+        return MISSING
+
+    def _cache_set(self, key: tuple, value: object) -> None:
+        """Store value in both cache layers."""
+        self._identity_cache[key] = value
+        if self._shared_cache is not None:
+            self._shared_cache.set(key, _private_copy(value))
+
+    def _invalidate_student(self, student_id: str) -> None:
+        """Drop cached profile and IEP data for a student from both cache layers."""
+        for key in (("profile", student_id), ("iep", student_id)):
+            self._identity_cache.pop(key, None)
+            if self._shared_cache is not None:
+                self._shared_cache.invalidate(key)
+
+        # Class snapshots are identity-cache only; drop any that include this student
+        stale = [
+            key
+            for key, value in self._identity_cache.items()
+            if key[0] == "snapshot" and value.has_student(student_id)
+        ]
+        for key in stale:
+            del self._identity_cache[key]
+
+    def clear_cache(self) -> None:
+        """Clear the identity cache (shared cache entries expire by TTL)."""
+        self._identity_cache.clear()
+
+    def get_cache_stats(self) -> Dict:
+        """
+        Get read-through cache statistics.
+
+        Returns:
+            Dict with hits, misses, hit_rate, and shared cache stats (if enabled)
+        """
+        total = self._cache_hits + self._cache_misses
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hit_rate": self._cache_hits / total if total else 0.0,
+            "identity_entries": len(self._identity_cache),
+            "shared": self._shared_cache.get_stats() if self._shared_cache is not None else None,
+        }
+
     # ═══════════════════════════════════════════════════════════
     # STUDENT PROFILES
     # ═══════════════════════════════════════════════════════════
@@ -107,11 +210,23 @@ class StudentModelInterface:
         Returns:
             StudentProfile or None if not found
         """
+        cached = self._cache_get(("profile", student_id))
+        if cached is not MISSING:
+            return cached
+
         student = self.db.query(StudentModel).filter(StudentModel.student_id == student_id).first()
 
         if not student:
+            self._cache_set(("profile", student_id), None)
             return None
 
+        profile = self._build_student_profile(student)
+
+        self._cache_set(("profile", student_id), profile)
+        return profile
+
+    def _build_student_profile(self, student: StudentModel) -> StudentProfile:
+        """Convert a StudentModel row (with loaded iep_data) into a StudentProfile."""
         # Get IEP accommodations if applicable
         accommodations = []
         if student.has_iep and student.iep_data:
@@ -141,6 +256,13 @@ class StudentModelInterface:
         Returns:
             Created StudentProfile
         """
+        student_id = self._insert_student(student_data)
+        self._index_preferences(student_id, student_data)
+        self._invalidate_student(student_id)
+        return self.get_student_profile(student_id)
+
+    def _insert_student(self, student_data: StudentProfileCreate) -> str:
+        """Insert and commit the student row; returns its new student_id."""
         # Generate student_id if not provided
         import uuid
         student_id = f"s_{uuid.uuid4().hex[:8]}"
@@ -160,10 +282,16 @@ class StudentModelInterface:
         self.db.add(student)
         self.db.commit()
         self.db.refresh(student)
+        return student_id
 
-        # Add to vector store for learning preferences
+    def _index_preferences(self, student_id: str, student_data: StudentProfileCreate) -> None:
+        """Embed the student's learning preferences into the vector store (no database access)."""
         if student_data.learning_preferences:
-            prefs_text = f"{student_data.student_name} is a {', '.join([p.value for p in student_data.learning_preferences])} learner with {student_data.reading_level.value} reading level."
+            prefs_text = build_preferences_text(
+                student_data.student_name,
+                [p.value for p in student_data.learning_preferences],
+                student_data.reading_level.value,
+            )
             self.vector_store.add_student_preferences(
                 student_id,
                 prefs_text,
@@ -173,8 +301,6 @@ class StudentModelInterface:
                 },
             )
 
-        return self.get_student_profile(student_id)
-
     def bulk_import_students(self, students_data: List[BulkImportRow], class_id: str) -> BulkImportResult:
         """
         Bulk import students from CSV data (Page 5 UI).
@@ -186,37 +312,54 @@ class StudentModelInterface:
         Returns:
             BulkImportResult with success/failure counts
         """
-        successful = 0
-        failed_rows = []
-        errors = []
-        created_ids = []
-
-        for idx, row in enumerate(students_data):
-            try:
-                profile = StudentProfileCreate(
-                    student_name=row.student_name,
-                    grade_level=row.grade_level,
-                    class_id=class_id,
-                    reading_level=row.reading_level or ReadingLevel.PROFICIENT,
-                    has_iep=row.iep_status,
-                    primary_disability=row.primary_disability if row.iep_status else None,
-                )
+        records = ((idx, row.model_dump(mode="json"), None) for idx, row in enumerate(students_data))
+        result = BulkStudentImporter(self.db, self.vector_store).import_records(records, class_id)
+        self._invalidate_imported(class_id, result.created_student_ids)
+        return result
+
+    def import_students_stream(
+        self,
+        stream: IO,
+        class_id: str,
+        fmt: str = "csv",
+        on_progress: Optional[Callable[[BulkImportProgress], None]] = None,
+        chunk_size: Optional[int] = None,
+    ) -> BulkImportResult:
+        """
+        Stream a CSV or NDJSON roster upload into the database (district SIS sync).
 
-                created_profile = self.create_student_profile(profile)
-                created_ids.append(created_profile.student_id)
-                successful += 1
+        Rows are parsed, validated and inserted in chunks with batched
+        embeddings; invalid rows are reported without aborting the import.
 
-            except Exception as e:
-                failed_rows.append(idx)
-                errors.append(f"Row {idx}: {str(e)}")
+        Args:
+            stream: Upload file object (text or binary)
+            class_id: Class to assign students to
+            fmt: "csv" or "ndjson"
+            on_progress: Called with BulkImportProgress after each chunk
+            chunk_size: Rows per transaction (default BULK_IMPORT_CHUNK_SIZE)
 
-        return BulkImportResult(
-            total_rows=len(students_data),
-            successful_imports=successful,
-            failed_rows=failed_rows,
-            errors=errors,
-            created_student_ids=created_ids,
-        )
+        Returns:
+            BulkImportResult (row numbers are 1-based data rows)
+        """
+        importer = BulkStudentImporter(self.db, self.vector_store)
+        if chunk_size is not None:
+            importer.chunk_size = max(1, chunk_size)
+
+        result = importer.import_stream(stream, class_id, fmt=fmt, on_progress=on_progress)
+        self._invalidate_imported(class_id, result.created_student_ids)
+        return result
+
+    def _invalidate_imported(self, class_id: str, student_ids: List[str]) -> None:
+        """Drop cache entries made stale by an import (negative lookups, class snapshots)."""
+        for student_id in student_ids:
+            for key in (("profile", student_id), ("iep", student_id)):
+                self._identity_cache.pop(key, None)
+                if self._shared_cache is not None:
+                    self._shared_cache.invalidate(key)
+
+        stale = [key for key in self._identity_cache if key[0] == "snapshot" and key[1] == class_id]
+        for key in stale:
+            del self._identity_cache[key]
 
     # ═══════════════════════════════════════════════════════════
     # CLASS ROSTERS
@@ -269,6 +412,81 @@ class StudentModelInterface:
 
         return [self.get_student_profile(s.student_id) for s in students]
 
+    def get_class_snapshot(self, class_id: str, concept_ids: Optional[List[str]] = None) -> Optional[ClassSnapshot]:
+        """
+        Materialize roster, IEP and mastery data for a class in one pass.
+
+        Built once per pipeline run and shared by all engines, replacing
+        per-engine roster lookups and per-student IEP/mastery queries.
+        Uses three queries: class, students (+ IEPs), mastery.
+
+        Args:
+            class_id: Class identifier
+            concept_ids: Concepts to load mastery for (None = all concepts)
+
+        Returns:
+            ClassSnapshot or None if class not found
+        """
+        key = ("snapshot", class_id, tuple(sorted(concept_ids)) if concept_ids is not None else None)
+        cached = self._identity_cache.get(key, MISSING)
+        if cached is not MISSING:
+            self._cache_hits += 1
+            return cached
+        self._cache_misses += 1
+
+        class_obj = self.db.query(ClassModel).filter(ClassModel.class_id == class_id).first()
+
+        if not class_obj:
+            return None
+
+        students = (
+            self.db.query(StudentModel)
+            .options(selectinload(StudentModel.iep_data))
+            .filter(StudentModel.class_id == class_id)
+            .order_by(StudentModel.student_id)
+            .all()
+        )
+
+        mastery_query = (
+            self.db.query(MasteryModel)
+            .join(StudentModel, MasteryModel.student_id == StudentModel.student_id)
+            .filter(StudentModel.class_id == class_id)
+        )
+        if concept_ids is not None:
+            mastery_query = mastery_query.filter(MasteryModel.concept_id.in_(concept_ids))
+
+        mastery: Dict[str, Dict[str, ConceptMastery]] = {}
+        for m in mastery_query.all():
+            mastery.setdefault(m.student_id, {})[m.concept_id] = self._build_concept_mastery(m)
+
+        profiles = []
+        ieps = {}
+        for student in students:
+            profile = self._build_student_profile(student)
+            iep_data = self._build_iep_data(student.iep_data) if student.iep_data else None
+            profiles.append(profile)
+            if iep_data:
+                ieps[student.student_id] = iep_data
+
+            # Seed identity cache so later per-student lookups skip the database
+            self._identity_cache[("profile", student.student_id)] = profile
+            self._identity_cache[("iep", student.student_id)] = iep_data
+
+        snapshot = ClassSnapshot(
+            class_id=class_obj.class_id,
+            class_name=class_obj.class_name,
+            grade_level=class_obj.grade_level,
+            subject=class_obj.subject,
+            teacher_id=class_obj.teacher_id,
+            students=profiles,
+            ieps=ieps,
+            mastery=mastery,
+            concept_ids=list(concept_ids) if concept_ids is not None else None,
+        )
+
+        self._identity_cache[key] = snapshot
+        return snapshot
+
     # ═══════════════════════════════════════════════════════════
     # MASTERY TRACKING
     # ═══════════════════════════════════════════════════════════
@@ -290,20 +508,21 @@ class StudentModelInterface:
             .all()
         )
 
-        return [
-            ConceptMastery(
-                student_id=m.student_id,
-                concept_id=m.concept_id,
-                concept_name=m.concept_name,
-                mastery_probability=m.mastery_probability,
-                p_learn=m.p_learn,
-                p_guess=m.p_guess,
-                p_slip=m.p_slip,
-                last_updated=m.last_updated,
-                num_observations=m.num_observations,
-            )
-            for m in mastery_records
-        ]
+        return [self._build_concept_mastery(m) for m in mastery_records]
+
+    def _build_concept_mastery(self, mastery: MasteryModel) -> ConceptMastery:
+        """Convert a MasteryModel row into ConceptMastery."""
+        return ConceptMastery(
+            student_id=mastery.student_id,
+            concept_id=mastery.concept_id,
+            concept_name=mastery.concept_name,
+            mastery_probability=mastery.mastery_probability,
+            p_learn=mastery.p_learn,
+            p_guess=mastery.p_guess,
+            p_slip=mastery.p_slip,
+            last_updated=mastery.last_updated,
+            num_observations=mastery.num_observations,
+        )
 
     def update_mastery_estimate(
         self, student_id: str, concept_id: str, new_mastery: float, concept_name: Optional[str] = None
@@ -344,18 +563,9 @@ class StudentModelInterface:
 
         self.db.commit()
         self.db.refresh(mastery)
+        self._invalidate_student(student_id)
 
-        return ConceptMastery(
-            student_id=mastery.student_id,
-            concept_id=mastery.concept_id,
-            concept_name=mastery.concept_name,
-            mastery_probability=mastery.mastery_probability,
-            p_learn=mastery.p_learn,
-            p_guess=mastery.p_guess,
-            p_slip=mastery.p_slip,
-            last_updated=mastery.last_updated,
-            num_observations=mastery.num_observations,
-        )
+        return self._build_concept_mastery(mastery)
 
     def get_class_mastery_distribution(self, class_id: str, concept_id: str) -> Optional[ClassMasteryDistribution]:
         """
@@ -368,39 +578,68 @@ class StudentModelInterface:
         Returns:
             ClassMasteryDistribution or None
         """
-        # Get all students in class
-        student_ids = [s.student_id for s in self.db.query(StudentModel).filter(StudentModel.class_id == class_id).all()]
+        matrix = self.get_mastery_matrix(class_id, [concept_id])
 
-        if not student_ids:
+        if not matrix.student_ids:
             return None
 
-        # Get mastery data
-        mastery_records = (
-            self.db.query(MasteryModel)
-            .filter(and_(MasteryModel.student_id.in_(student_ids), MasteryModel.concept_id == concept_id))
-            .all()
-        )
+        stats = matrix.concept_stats(concept_id)
 
-        if not mastery_records:
+        if not stats:
             return None
 
-        masteries = [m.mastery_probability for m in mastery_records]
-
-        # Calculate distribution
-        below_50 = sum(1 for m in masteries if m < 0.5)
-        between_50_75 = sum(1 for m in masteries if 0.5 <= m < 0.75)
-        above_75 = sum(1 for m in masteries if m >= 0.75)
-
         return ClassMasteryDistribution(
             class_id=class_id,
             concept_id=concept_id,
-            concept_name=mastery_records[0].concept_name,
-            mean_mastery=statistics.mean(masteries),
-            median_mastery=statistics.median(masteries),
-            std_dev=statistics.stdev(masteries) if len(masteries) > 1 else 0.0,
-            students_below_50=below_50,
-            students_50_to_75=between_50_75,
-            students_above_75=above_75,
+            concept_name=matrix.get_concept_name(concept_id),
+            mean_mastery=stats["mean"],
+            median_mastery=stats["median"],
+            std_dev=stats["std_dev"],
+            students_below_50=stats["below_50"],
+            students_50_to_75=stats["50_to_75"],
+            students_above_75=stats["above_75"],
+        )
+
+    def get_mastery_matrix(self, class_id: str, concept_ids: Optional[List[str]] = None) -> MasteryMatrix:
+        """
+        Load class mastery as a dense students × concepts matrix in one query.
+
+        Students without mastery data get all-NaN rows.
+
+        Args:
+            class_id: Class identifier
+            concept_ids: Columns (None = every concept with data, sorted)
+
+        Returns:
+            MasteryMatrix (empty if the class has no students)
+        """
+        join_condition = MasteryModel.student_id == StudentModel.student_id
+        if concept_ids is not None:
+            join_condition = and_(join_condition, MasteryModel.concept_id.in_(concept_ids))
+
+        rows = (
+            self.db.query(
+                StudentModel.student_id,
+                MasteryModel.concept_id,
+                MasteryModel.concept_name,
+                MasteryModel.mastery_probability,
+            )
+            .outerjoin(MasteryModel, join_condition)
+            .filter(StudentModel.class_id == class_id)
+            .order_by(StudentModel.student_id)
+            .all()
+        )
+
+        student_ids = list(dict.fromkeys(row[0] for row in rows))
+        concept_names = {row[1]: row[2] for row in rows if row[1] is not None}
+        if concept_ids is None:
+            concept_ids = sorted(concept_names)
+
+        return MasteryMatrix.from_records(
+            student_ids,
+            concept_ids,
+            ((row[0], row[1], row[3]) for row in rows if row[1] is not None),
+            concept_names,
         )
 
     # ═══════════════════════════════════════════════════════════
@@ -488,21 +727,37 @@ class StudentModelInterface:
         Returns:
             IEPData or None if no IEP
         """
+        cached = self._cache_get(("iep", student_id))
+        if cached is not MISSING:
+            return cached
+
         iep = self.db.query(IEPModel).filter(IEPModel.student_id == student_id).first()
 
         if not iep:
+            self._cache_set(("iep", student_id), None)
             return None
 
+        iep_data = self._build_iep_data(iep)
+
+        self._cache_set(("iep", student_id), iep_data)
+        return iep_data
+
+    def _build_iep_data(self, iep: IEPModel) -> IEPData:
+        """Convert an IEPModel row into IEPData."""
         return IEPData(
             student_id=iep.student_id,
             primary_disability=iep.primary_disability,
-            secondary_disabilities=[DisabilityCategory(d) for d in iep.secondary_disabilities],
+            secondary_disabilities=[DisabilityCategory(d) for d in (iep.secondary_disabilities or [])],
             accommodations=[
-                {"type": a["type"], "enabled": a.get("enabled", True), "settings": a.get("settings", {})}
-                for a in iep.accommodations
+                IEPAccommodation(
+                    accommodation_type=AccommodationType(a["type"]),
+                    enabled=a.get("enabled", True),
+                    settings=a.get("settings", {}),
+                )
+                for a in (iep.accommodations or [])
             ],
-            modifications=iep.modifications,
-            goals=iep.goals,
+            modifications=iep.modifications or {},
+            goals=iep.goals or [],
             last_reviewed=iep.last_reviewed,
             next_review_due=iep.next_review_due,
         )
@@ -543,6 +798,7 @@ class StudentModelInterface:
         iep.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(iep)
+        self._invalidate_student(student_id)
 
         return self.get_iep_accommodations(student_id)
 
@@ -688,6 +944,56 @@ class StudentModelInterface:
         """
         return self.vector_store.find_similar_students(student_id, n_results)
 
+    def rebuild_preference_vectors(self, class_id: Optional[str] = None, batch_size: int = BULK_IMPORT_EMBED_BATCH_SIZE) -> int:
+        """
+        Cold-start the learning preferences collection from the SQL tables.
+
+        Streams students in batches and upserts each batch at once, so the
+        whole rebuild is one bulk job (repeated texts hit the embedding cache).
+
+        Args:
+            class_id: Limit to one class (default: all students)
+            batch_size: Students per embedding upsert
+
+        Returns:
+            Number of students embedded
+        """
+        query = self.db.query(
+            StudentModel.student_id,
+            StudentModel.student_name,
+            StudentModel.reading_level,
+            StudentModel.learning_preferences,
+        ).order_by(StudentModel.student_id)
+        if class_id is not None:
+            query = query.filter(StudentModel.class_id == class_id)
+
+        embedded = 0
+        batch = []
+        for student_id, student_name, reading_level, preferences in query.yield_per(batch_size):
+            if not preferences:
+                continue
+            level = (reading_level or ReadingLevel.PROFICIENT).value
+            batch.append(
+                (
+                    student_id,
+                    build_preferences_text(student_name, preferences, level),
+                    {"learning_preferences": preferences, "reading_level": level},
+                )
+            )
+            if len(batch) >= batch_size:
+                embedded += self._upsert_preference_batch(batch)
+                batch = []
+
+        if batch:
+            embedded += self._upsert_preference_batch(batch)
+        return embedded
+
+    def _upsert_preference_batch(self, batch: List[tuple]) -> int:
+        """Upsert (student_id, text, metadata) tuples; returns batch size."""
+        student_ids, texts, metadatas = (list(column) for column in zip(*batch))
+        self.vector_store.add_student_preferences_batch(student_ids, texts, metadatas)
+        return len(batch)
+
     # ═══════════════════════════════════════════════════════════
     # PREDICTION TRACKING (Engine 6)
     # ═══════════════════════════════════════════════════════════
@@ -869,6 +1175,7 @@ Usage: python -m src.student_model.interface <command>
 
 Commands:
   stats     - Show database statistics
+  reindex   - Rebuild learning preference vectors from the database
   test      - Run basic functionality test
 
 Example:
@@ -898,6 +1205,13 @@ Example:
                 print(f"  {collection:25s}: {count:5d} documents")
             print("=" * 50 + "\n")
 
+        elif command == "reindex":
+            print("Rebuilding learning preference vectors...")
+            count = interface.rebuild_preference_vectors()
+            print(f"✅ Embedded {count} students")
+            if interface.vector_store.embedder is not None:
+                print(f"Embedding stats: {interface.vector_store.embedder.get_stats()}")
+
         elif command == "test":
             print("Testing StudentModelInterface...")
             print("✅ Interface initialized successfully!")
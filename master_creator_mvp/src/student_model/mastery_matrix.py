@@ -0,0 +1,272 @@
+"""
+MasteryMatrix - Dense students × concepts mastery array for class analytics.
+
+Stores mastery probabilities as a NumPy float32 array (NaN = no data) with
+student/concept id ↔ index maps. Class-level analytics (tiering, ZPD,
+per-concept stats, grouping) run as vectorized operations instead of
+loops over ConceptMastery objects.
+
+Thresholds match the rest of the system:
+- Tier 1 (mastered): ≥ 0.75
+- Tier 2 (developing): ≥ 0.45
+- Tier 3 (struggling): < 0.45
+- ZPD: 0.40 - 0.60
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .schemas import TierLevel
+
+# Default thresholds
+TIER_1_MIN = 0.75
+TIER_2_MIN = 0.45
+ZPD_LOW = 0.40
+ZPD_HIGH = 0.60
+
+# Tier codes used in tier arrays (0 = no data)
+TIER_CODES = {1: TierLevel.TIER_1, 2: TierLevel.TIER_2, 3: TierLevel.TIER_3}
+
+
+# ═══════════════════════════════════════════════════════════
+# MASTERY MATRIX
+# ═══════════════════════════════════════════════════════════
+
+
+class MasteryMatrix:
+    """
+    Dense mastery matrix for one class (or grade band).
+
+    Attributes:
+        values: float32 array of shape (n_students, n_concepts), NaN where missing
+        student_ids: Row order
+        concept_ids: Column order
+        student_index: student_id → row
+        concept_index: concept_id → column
+        concept_names: concept_id → human-readable name (when known)
+    """
+
+    def __init__(
+        self,
+        student_ids: List[str],
+        concept_ids: List[str],
+        values: Optional[np.ndarray] = None,
+        concept_names: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initialize matrix.
+
+        Args:
+            student_ids: Row labels
+            concept_ids: Column labels
+            values: Mastery array (defaults to all-NaN)
+            concept_names: Optional concept display names
+        """
+        self.student_ids = list(student_ids)
+        self.concept_ids = list(concept_ids)
+        self.student_index = {sid: i for i, sid in enumerate(self.student_ids)}
+        self.concept_index = {cid: j for j, cid in enumerate(self.concept_ids)}
+        self.concept_names = concept_names or {}
+
+        shape = (len(self.student_ids), len(self.concept_ids))
+        if values is None:
+            self.values = np.full(shape, np.nan, dtype=np.float32)
+        else:
+            self.values = np.asarray(values, dtype=np.float32)
+            if self.values.shape != shape:
+                raise ValueError(f"values shape {self.values.shape} does not match labels {shape}")
+
+    @classmethod
+    def from_records(
+        cls,
+        student_ids: List[str],
+        concept_ids: List[str],
+        records: Iterable[Tuple[str, str, float]],
+        concept_names: Optional[Dict[str, str]] = None,
+    ) -> "MasteryMatrix":
+        """
+        Build from (student_id, concept_id, mastery) tuples.
+
+        Records for unknown students/concepts are ignored.
+
+        Args:
+            student_ids: Row labels
+            concept_ids: Column labels
+            records: Mastery tuples
+            concept_names: Optional concept display names
+
+        Returns:
+            MasteryMatrix
+        """
+        matrix = cls(student_ids, concept_ids, concept_names=concept_names)
+        for student_id, concept_id, mastery in records:
+            i = matrix.student_index.get(student_id)
+            j = matrix.concept_index.get(concept_id)
+            if i is not None and j is not None and mastery is not None:
+                matrix.values[i, j] = mastery
+        return matrix
+
+    @classmethod
+    def from_snapshot(cls, snapshot, concept_ids: Optional[List[str]] = None) -> "MasteryMatrix":
+        """
+        Build from a ClassSnapshot (no database access).
+
+        Args:
+            snapshot: ClassSnapshot with mastery loaded
+            concept_ids: Columns (default: all concepts in the snapshot)
+
+        Returns:
+            MasteryMatrix
+        """
+        if concept_ids is None:
+            concept_ids = sorted({cid for by_concept in snapshot.mastery.values() for cid in by_concept})
+
+        concept_names = {}
+        records = []
+        for student_id, by_concept in snapshot.mastery.items():
+            for concept_id, record in by_concept.items():
+                records.append((student_id, concept_id, record.mastery_probability))
+                concept_names.setdefault(concept_id, record.concept_name)
+
+        return cls.from_records(snapshot.student_ids, concept_ids, records, concept_names)
+
+    # ───────────────────────────────────────────────────────
+    # LOOKUPS
+    # ───────────────────────────────────────────────────────
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def observed(self) -> np.ndarray:
+        """Boolean mask of cells with mastery data."""
+        return ~np.isnan(self.values)
+
+    def get(self, student_id: str, concept_id: str) -> Optional[float]:
+        """Get one mastery value (None if missing)."""
+        value = self.values[self.student_index[student_id], self.concept_index[concept_id]]
+        return None if np.isnan(value) else float(value)
+
+    def row(self, student_id: str) -> np.ndarray:
+        """Get a student's mastery vector (NaN where missing)."""
+        return self.values[self.student_index[student_id]]
+
+    def column(self, concept_id: str) -> np.ndarray:
+        """Get a concept's mastery vector across students (NaN where missing)."""
+        return self.values[:, self.concept_index[concept_id]]
+
+    def get_concept_name(self, concept_id: str) -> str:
+        """Display name for a concept (falls back to a title-cased id)."""
+        return self.concept_names.get(concept_id) or concept_id.replace("_", " ").title()
+
+    def ids_where(self, mask: np.ndarray) -> List[str]:
+        """Student ids for a boolean row mask."""
+        return [self.student_ids[i] for i in np.flatnonzero(mask)]
+
+    # ───────────────────────────────────────────────────────
+    # VECTORIZED ANALYTICS
+    # ───────────────────────────────────────────────────────
+
+    def tiers(self, tier1_min: float = TIER_1_MIN, tier2_min: float = TIER_2_MIN) -> np.ndarray:
+        """
+        Tier code per cell: 1, 2, 3, or 0 where there is no data.
+
+        Args:
+            tier1_min: Minimum mastery for Tier 1
+            tier2_min: Minimum mastery for Tier 2
+
+        Returns:
+            int8 array with the same shape as values
+        """
+        tiers = np.full(self.values.shape, 3, dtype=np.int8)
+        with np.errstate(invalid="ignore"):
+            tiers[self.values >= np.float32(tier2_min)] = 2
+            tiers[self.values >= np.float32(tier1_min)] = 1
+        tiers[~self.observed] = 0
+        return tiers
+
+    def zpd_mask(self, low: float = ZPD_LOW, high: float = ZPD_HIGH) -> np.ndarray:
+        """Boolean mask of cells in the Zone of Proximal Development."""
+        with np.errstate(invalid="ignore"):
+            return (self.values >= np.float32(low)) & (self.values <= np.float32(high))
+
+    def student_means(self, default: float = 0.5) -> np.ndarray:
+        """
+        Mean mastery per student over observed concepts.
+
+        Args:
+            default: Value for students with no data
+
+        Returns:
+            float32 array of length n_students
+        """
+        counts = self.observed.sum(axis=1)
+        sums = np.nansum(self.values, axis=1, dtype=np.float64)
+        means = np.full(len(self.student_ids), default, dtype=np.float64)
+        np.divide(sums, counts, out=means, where=counts > 0)
+        return means.astype(np.float32)
+
+    def concept_means(self) -> np.ndarray:
+        """Mean mastery per concept over students with data (NaN if none)."""
+        counts = self.observed.sum(axis=0)
+        sums = np.nansum(self.values, axis=0, dtype=np.float64)
+        means = np.full(len(self.concept_ids), np.nan, dtype=np.float64)
+        np.divide(sums, counts, out=means, where=counts > 0)
+        return means.astype(np.float32)
+
+    def concept_stats(self, concept_id: str) -> Optional[Dict]:
+        """
+        Distribution statistics for one concept.
+
+        Args:
+            concept_id: Concept identifier
+
+        Returns:
+            Dict with count, mean, median, std_dev (sample) and bucket
+            counts, or None if no student has data
+        """
+        column = self.column(concept_id)
+        observed = column[~np.isnan(column)]
+        if observed.size == 0:
+            return None
+
+        as_float64 = observed.astype(np.float64)
+        below_50 = observed < np.float32(0.5)
+        above_75 = observed >= np.float32(0.75)
+        return {
+            "count": int(observed.size),
+            "mean": float(as_float64.mean()),
+            "median": float(np.median(as_float64)),
+            "std_dev": float(as_float64.std(ddof=1)) if observed.size > 1 else 0.0,
+            "below_50": int(below_50.sum()),
+            "50_to_75": int((~below_50 & ~above_75).sum()),
+            "above_75": int(above_75.sum()),
+        }
+
+    def partition(
+        self,
+        tier1_min: float = TIER_1_MIN,
+        tier2_min: float = TIER_2_MIN,
+        default: float = 0.5,
+    ) -> Dict[str, List[str]]:
+        """
+        Partition students into groups by overall mean mastery.
+
+        Args:
+            tier1_min: Minimum mean for "advanced"
+            tier2_min: Minimum mean for "on_track"
+            default: Mean used for students with no data
+
+        Returns:
+            Dict with "advanced", "on_track", "needs_support" student id lists
+        """
+        means = self.student_means(default)
+        advanced = means >= np.float32(tier1_min)
+        on_track = (means >= np.float32(tier2_min)) & ~advanced
+        return {
+            "advanced": self.ids_where(advanced),
+            "on_track": self.ids_where(on_track),
+            "needs_support": self.ids_where(~(advanced | on_track)),
+        }
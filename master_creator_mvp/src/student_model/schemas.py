@@ -403,6 +403,11 @@ class BulkImportRow(BaseModel):
     reading_level: Optional[ReadingLevel] = ReadingLevel.PROFICIENT
     iep_status: bool = Field(False, description="Parsed from Yes/No")
     primary_disability: Optional[DisabilityCategory] = None
+    student_id: Optional[str] = Field(None, description="SIS identifier (generated if omitted)")
+    learning_preferences: List[LearningPreference] = Field(default_factory=list)
+    accommodations: List[AccommodationType] = Field(
+        default_factory=list, description="Enabled IEP accommodations"
+    )
 
 
 class BulkImportResult(BaseModel):
@@ -413,3 +418,14 @@ class BulkImportResult(BaseModel):
     failed_rows: List[int] = Field(default_factory=list)
     errors: List[str] = Field(default_factory=list)
     created_student_ids: List[str] = Field(default_factory=list)
+
+
+class BulkImportProgress(BaseModel):
+    """Progress of a streaming import (reported after each committed chunk)."""
+
+    rows_processed: int = 0
+    successful_imports: int = 0
+    failed_imports: int = 0
+    chunks_committed: int = 0
+    students_embedded: int = 0
+    elapsed_seconds: float = 0.0
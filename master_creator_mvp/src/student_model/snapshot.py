@@ -0,0 +1,156 @@
+"""
+ClassSnapshot - Materialized per-class view of Student Model data.
+
+Built once per pipeline run by StudentModelInterface.get_class_snapshot()
+and handed to every engine, so a full pipeline reads the student tables
+once instead of re-querying roster, IEP and mastery data per engine.
+
+Holds:
+- Class roster (StudentProfiles)
+- IEP data for students with IEPs
+- Current mastery records (student → concept → ConceptMastery)
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .schemas import (
+    ConceptMastery,
+    GradeLevel,
+    IEPData,
+    StudentProfile,
+    Subject,
+)
+
+
+# ═══════════════════════════════════════════════════════════
+# CLASS SNAPSHOT
+# ═══════════════════════════════════════════════════════════
+
+
+class ClassSnapshot(BaseModel):
+    """Read-only snapshot of a class roster, IEPs and mastery."""
+
+    class_id: str
+    class_name: str
+    grade_level: GradeLevel
+    subject: Subject
+    teacher_id: str
+
+    students: List[StudentProfile] = Field(default_factory=list)
+    ieps: Dict[str, IEPData] = Field(default_factory=dict, description="student_id → IEPData")
+    mastery: Dict[str, Dict[str, ConceptMastery]] = Field(
+        default_factory=dict, description="student_id → concept_id → ConceptMastery"
+    )
+
+    # Concepts loaded into `mastery` (None = all concepts)
+    concept_ids: Optional[List[str]] = None
+
+    built_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # student_id → StudentProfile, built once (engines look students up one by one)
+    _profiles: Dict[str, StudentProfile] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context) -> None:
+        self._profiles = {student.student_id: student for student in self.students}
+
+    # ───────────────────────────────────────────────────────
+    # ROSTER
+    # ───────────────────────────────────────────────────────
+
+    @property
+    def total_students(self) -> int:
+        return len(self.students)
+
+    @property
+    def students_with_ieps(self) -> int:
+        return sum(1 for s in self.students if s.has_iep)
+
+    @property
+    def student_ids(self) -> List[str]:
+        return [s.student_id for s in self.students]
+
+    def get_profile(self, student_id: str) -> Optional[StudentProfile]:
+        """Get a student profile from the snapshot (None if not in class)."""
+        return self._profiles.get(student_id)
+
+    def has_student(self, student_id: str) -> bool:
+        """Check whether a student is on this roster."""
+        return student_id in self._profiles
+
+    def get_reading_level_distribution(self) -> Dict[str, int]:
+        """Count students per reading level."""
+        counts: Dict[str, int] = {}
+        for student in self.students:
+            level = student.reading_level.value if student.reading_level else "unknown"
+            counts[level] = counts.get(level, 0) + 1
+        return counts
+
+    def get_disability_distribution(self) -> Dict[str, int]:
+        """Count IEP students per primary disability."""
+        counts: Dict[str, int] = {}
+        for iep in self.ieps.values():
+            category = iep.primary_disability.value
+            counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def to_class_context(self) -> Dict:
+        """
+        Build the class context dict used in engine prompts (Engines 0, 1).
+
+        Returns:
+            Dict with class composition summary
+        """
+        return {
+            "class_id": self.class_id,
+            "class_name": self.class_name,
+            "total_students": self.total_students,
+            "students_with_ieps": self.students_with_ieps,
+            "reading_level_distribution": self.get_reading_level_distribution(),
+            "disability_distribution": self.get_disability_distribution(),
+            "iep_accommodations_needed": self.students_with_ieps > 0,
+        }
+
+    # ───────────────────────────────────────────────────────
+    # IEP
+    # ───────────────────────────────────────────────────────
+
+    def get_iep(self, student_id: str) -> Optional[IEPData]:
+        """Get IEP data for a student (None if no IEP)."""
+        return self.ieps.get(student_id)
+
+    def get_accommodation_counts(self, student_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Count enabled accommodations across students (e.g., one tier).
+
+        Args:
+            student_ids: Students to include (default: whole class)
+
+        Returns:
+            Dict mapping accommodation type value to student count
+        """
+        ids = student_ids if student_ids is not None else list(self.ieps)
+        counts: Dict[str, int] = {}
+        for student_id in ids:
+            iep = self.ieps.get(student_id)
+            if not iep:
+                continue
+            for acc in iep.accommodations:
+                if acc.enabled:
+                    key = acc.accommodation_type.value
+                    counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    # ───────────────────────────────────────────────────────
+    # MASTERY
+    # ───────────────────────────────────────────────────────
+
+    def has_concept(self, concept_id: str) -> bool:
+        """Check whether mastery for this concept was loaded into the snapshot."""
+        return self.concept_ids is None or concept_id in self.concept_ids
+
+    def get_mastery(self, student_id: str, concept_id: str) -> Optional[ConceptMastery]:
+        """Get a mastery record (None if the student has no data for the concept)."""
+        return self.mastery.get(student_id, {}).get(concept_id)
@@ -9,18 +9,27 @@ This module handles vector embeddings for:
 Used by Engine 4 (Adaptive Personalization) for semantic matching.
 """
 
+import importlib.util
 import os
+import threading
 from typing import Dict, List, Optional
 import warnings
 
-# Try to import chromadb, but make it optional for basic functionality
-try:
-    import chromadb
-    from chromadb.config import Settings
-    from chromadb.utils import embedding_functions
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    CHROMADB_AVAILABLE = False
+from .embedding_backends import get_embedding_backend
+from .embedding_index import EMBEDDING_INDEX_ENABLED, EmbeddingIndex
+from .embedding_pipeline import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_WRITE_BATCHING,
+    CachedEmbedder,
+    EmbeddingBatcher,
+    PendingWrite,
+    get_embedding_cache,
+)
+
+# chromadb is optional; it is imported on first client creation (it takes
+# ~0.5s to import, which would otherwise land on every API cold start)
+CHROMADB_AVAILABLE = importlib.util.find_spec("chromadb") is not None
+if not CHROMADB_AVAILABLE:
     warnings.warn(
         "chromadb not available. Vector store features will be disabled. "
         "Install chromadb for full functionality: pip install chromadb"
@@ -31,6 +40,9 @@ CHROMA_HOST = os.getenv("CHROMA_HOST", "localhost")
 CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
 CHROMA_COLLECTION_NAME = os.getenv("CHROMA_COLLECTION_NAME", "master_creator_vectors")
 
+# Max documents per Chroma upsert call
+CHROMA_UPSERT_BATCH_SIZE = int(os.getenv("CHROMA_UPSERT_BATCH_SIZE", "2048"))
+
 
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # CHROMA CLIENT
@@ -50,6 +62,9 @@ def get_chroma_client(persistent: bool = True):
     if not CHROMADB_AVAILABLE:
         return None
 
+    import chromadb
+    from chromadb.config import Settings
+
     if persistent:
         # Use persistent local storage (no server needed)
         import os
@@ -82,13 +97,21 @@ class StudentVectorStore:
     - content_vectors: Learning content for similarity matching
     """
 
-    def __init__(self, client=None):
+    def __init__(self, client=None, batch_writes: bool = EMBEDDING_WRITE_BATCHING):
         """
         Initialize vector store.
 
         Args:
             client: Chroma client (creates new one if None)
+            batch_writes: Queue single adds and upsert them in micro-batches
         """
+        # In-process similarity indexes (built lazily from Chroma, kept in sync on upsert)
+        self.use_index = EMBEDDING_INDEX_ENABLED
+        self._indexes: Dict[str, EmbeddingIndex] = {}
+        self._index_lock = threading.Lock()
+        self.embedder = None
+        self.batcher = None
+
         if not CHROMADB_AVAILABLE:
             self.client = None
             self.embedding_fn = None
@@ -101,33 +124,47 @@ class StudentVectorStore:
         self.client = client if client is not None else get_chroma_client()
 
         # Use sentence transformers for embeddings
-        self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"  # Fast, good for semantic search
+        # all-MiniLM-L6-v2 via the EMBEDDING_BACKEND backend (loads on first embed)
+        self.embedding_fn = get_embedding_backend()
+
+        # All writes embed through the content-hash cache in large batches
+        self.embedder = CachedEmbedder(
+            self.embedding_fn,
+            cache=get_embedding_cache(self.embedding_fn.cache_namespace),
+            batch_size=EMBEDDING_BATCH_SIZE,
         )
+        if batch_writes:
+            self.batcher = EmbeddingBatcher(self._write_pending)
 
         # Initialize collections
         self._init_collections()
 
     def _init_collections(self):
-        """Create or get collections."""
+        """
+        Create or get collections.
+
+        Collections carry no embedding function: documents and queries are
+        embedded by self.embedding_fn, so switching backends never conflicts
+        with the function persisted in an existing collection.
+        """
         # Learning preferences collection
         self.learning_prefs_collection = self.client.get_or_create_collection(
             name="learning_preferences",
-            embedding_function=self.embedding_fn,
+            embedding_function=None,
             metadata={"description": "Student learning style and preference vectors"},
         )
 
         # Concept embeddings collection
         self.concepts_collection = self.client.get_or_create_collection(
             name="concept_embeddings",
-            embedding_function=self.embedding_fn,
+            embedding_function=None,
             metadata={"description": "Educational concept relationships and prerequisites"},
         )
 
         # Content vectors collection
         self.content_collection = self.client.get_or_create_collection(
             name="content_vectors",
-            embedding_function=self.embedding_fn,
+            embedding_function=None,
             metadata={"description": "Learning content for similarity matching"},
         )
 
@@ -153,12 +190,43 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return
 
-        self.learning_prefs_collection.upsert(
+        if self.batcher is not None:
+            self.batcher.submit("learning_preferences", student_id, preferences_text, metadata)
+            return
+
+        self._upsert_with_index(
+            "learning_preferences",
+            self.learning_prefs_collection,
             ids=[student_id],
             documents=[preferences_text],
             metadatas=[metadata or {}],
         )
 
+    def add_student_preferences_batch(
+        self,
+        student_ids: List[str],
+        preferences_texts: List[str],
+        metadatas: Optional[List[Dict]] = None,
+    ):
+        """
+        Add or update learning preference vectors for many students in one upsert.
+
+        Args:
+            student_ids: Student identifiers
+            preferences_texts: One preferences text per student
+            metadatas: Optional metadata per student
+        """
+        if not CHROMADB_AVAILABLE or self.client is None or not student_ids:
+            return
+
+        self._upsert_with_index(
+            "learning_preferences",
+            self.learning_prefs_collection,
+            ids=list(student_ids),
+            documents=list(preferences_texts),
+            metadatas=list(metadatas) if metadatas is not None else [{} for _ in student_ids],
+        )
+
     def get_student_preferences(self, student_id: str) -> Optional[Dict]:
         """
         Retrieve student learning preferences.
@@ -172,6 +240,8 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
+        self.flush()
+
         results = self.learning_prefs_collection.get(ids=[student_id], include=["documents", "metadatas", "embeddings"])
 
         if not results["ids"]:
@@ -181,7 +251,7 @@ class StudentVectorStore:
             "student_id": student_id,
             "document": results["documents"][0],
             "metadata": results["metadatas"][0],
-            "embedding": results["embeddings"][0] if results.get("embeddings") else None,
+            "embedding": results["embeddings"][0] if _has_embeddings(results) else None,
         }
 
     def find_similar_students(
@@ -202,6 +272,13 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
+        self.flush()
+
+        if self.use_index:
+            index = self._get_index("learning_preferences", self.learning_prefs_collection)
+            neighbors = index.query_ids([student_id], n_results)[student_id]
+            return self._format_hits(index, neighbors, "student_id")
+
         # Get reference student's preferences
         ref_prefs = self.get_student_preferences(student_id)
         if not ref_prefs:
@@ -228,6 +305,62 @@ class StudentVectorStore:
 
         return similar_students[:n_results]
 
+    def get_student_embeddings(self, student_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        Fetch preference embeddings for many students in one call.
+
+        Args:
+            student_ids: Student identifiers
+
+        Returns:
+            Dict mapping student_id to embedding (students without vectors omitted)
+        """
+        if not CHROMADB_AVAILABLE or self.client is None or not student_ids:
+            return {}
+
+        self.flush()
+
+        results = self.learning_prefs_collection.get(ids=list(student_ids), include=["embeddings"])
+        if not _has_embeddings(results):
+            return {}
+
+        return {sid: embedding for sid, embedding in zip(results["ids"], results["embeddings"])}
+
+    def find_similar_students_batch(
+        self,
+        student_ids: List[str],
+        n_results: int = 5,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Find similar students for a whole group with one batched k-NN.
+
+        Neighbors are searched within the given students (e.g., a class)
+        by cosine distance; one matrix multiply covers the whole group.
+
+        Args:
+            student_ids: Students to search within
+            n_results: Neighbors per student
+
+        Returns:
+            Dict mapping student_id to list of similar student dicts
+            (students without vectors map to [])
+        """
+        if not CHROMADB_AVAILABLE or self.client is None:
+            return {sid: [] for sid in student_ids}
+
+        self.flush()
+
+        if self.use_index:
+            index = self._get_index("learning_preferences", self.learning_prefs_collection)
+        else:
+            # One fetch into a throwaway index
+            index = EmbeddingIndex()
+            embeddings = self.get_student_embeddings(student_ids)
+            index.upsert(list(embeddings), list(embeddings.values()))
+
+        neighbors = index.query_ids(student_ids, n_results, within=student_ids)
+        return {sid: self._format_hits(index, hits, "student_id") for sid, hits in neighbors.items()}
+
     # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
     # CONCEPT EMBEDDINGS
     # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -249,12 +382,43 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
-        self.concepts_collection.upsert(
+        if self.batcher is not None:
+            self.batcher.submit("concept_embeddings", concept_id, concept_description, metadata)
+            return None
+
+        self._upsert_with_index(
+            "concept_embeddings",
+            self.concepts_collection,
             ids=[concept_id],
             documents=[concept_description],
             metadatas=[metadata or {}],
         )
 
+    def add_concepts_batch(
+        self,
+        concept_ids: List[str],
+        concept_descriptions: List[str],
+        metadatas: Optional[List[Dict]] = None,
+    ) -> None:
+        """
+        Add or update many concept embeddings in one upsert.
+
+        Args:
+            concept_ids: Concept identifiers
+            concept_descriptions: One description per concept
+            metadatas: Optional metadata per concept
+        """
+        if not CHROMADB_AVAILABLE or self.client is None or not concept_ids:
+            return None
+
+        self._upsert_with_index(
+            "concept_embeddings",
+            self.concepts_collection,
+            ids=list(concept_ids),
+            documents=list(concept_descriptions),
+            metadatas=list(metadatas) if metadatas is not None else [{} for _ in concept_ids],
+        )
+
     def get_concept(self, concept_id: str) -> Optional[Dict]:
         """
         Retrieve concept information.
@@ -268,6 +432,8 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
+        self.flush()
+
         results = self.concepts_collection.get(
             ids=[concept_id],
             include=["documents", "metadatas", "embeddings"],
@@ -280,7 +446,7 @@ class StudentVectorStore:
             "concept_id": concept_id,
             "document": results["documents"][0],
             "metadata": results["metadatas"][0],
-            "embedding": results["embeddings"][0] if results.get("embeddings") else None,
+            "embedding": results["embeddings"][0] if _has_embeddings(results) else None,
         }
 
     def find_related_concepts(
@@ -301,6 +467,13 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
+        self.flush()
+
+        if self.use_index:
+            index = self._get_index("concept_embeddings", self.concepts_collection)
+            neighbors = index.query_ids([concept_id], n_results)[concept_id]
+            return self._format_hits(index, neighbors, "concept_id")
+
         # Get reference concept
         ref_concept = self.get_concept(concept_id)
         if not ref_concept:
@@ -347,8 +520,10 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
+        self.flush()
+
         results = self.concepts_collection.query(
-            query_texts=[query_text],
+            query_embeddings=[self._embed_query(query_text)],
             n_results=n_results,
             where=metadata_filter,
             include=["documents", "metadatas", "distances"],
@@ -388,12 +563,43 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
-        self.content_collection.upsert(
+        if self.batcher is not None:
+            self.batcher.submit("content_vectors", content_id, content_text, metadata)
+            return None
+
+        self._upsert_with_index(
+            "content_vectors",
+            self.content_collection,
             ids=[content_id],
             documents=[content_text],
             metadatas=[metadata or {}],
         )
 
+    def add_content_batch(
+        self,
+        content_ids: List[str],
+        content_texts: List[str],
+        metadatas: Optional[List[Dict]] = None,
+    ) -> None:
+        """
+        Add many learning content items in one upsert.
+
+        Args:
+            content_ids: Content identifiers
+            content_texts: One text per content item
+            metadatas: Optional metadata per item
+        """
+        if not CHROMADB_AVAILABLE or self.client is None or not content_ids:
+            return None
+
+        self._upsert_with_index(
+            "content_vectors",
+            self.content_collection,
+            ids=list(content_ids),
+            documents=list(content_texts),
+            metadatas=list(metadatas) if metadatas is not None else [{} for _ in content_ids],
+        )
+
     def search_similar_content(
         self,
         query_text: str,
@@ -416,8 +622,10 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
+        self.flush()
+
         results = self.content_collection.query(
-            query_texts=[query_text],
+            query_embeddings=[self._embed_query(query_text)],
             n_results=n_results,
             where=metadata_filter,
             include=["documents", "metadatas", "distances"],
@@ -450,6 +658,8 @@ class StudentVectorStore:
         if not CHROMADB_AVAILABLE or self.client is None:
             return None
 
+        self.flush()
+
         return {
             "learning_preferences": self.learning_prefs_collection.count(),
             "concept_embeddings": self.concepts_collection.count(),
@@ -477,11 +687,220 @@ class StudentVectorStore:
         except:
             pass
 
-        # Recreate
+        # Recreate (queued writes targeted the deleted collections)
+        if self.batcher is not None:
+            self.batcher.discard()
+        self._indexes = {}
         self._init_collections()
         print(" Vector store collections reset!")
 
 
+    # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+    # IN-PROCESS INDEXES
+    # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+    def _get_index(self, name: str, collection) -> EmbeddingIndex:
+        """
+        Get the in-memory index for a collection, loading it on first use.
+
+        Args:
+            name: Collection name
+            collection: Chroma collection
+
+        Returns:
+            EmbeddingIndex with the collection's embeddings, documents and metadata
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            # Concurrent first queries load the collection once
+            with self._index_lock:
+                index = self._indexes.get(name)
+                if index is None:
+                    index = EmbeddingIndex()
+                    results = collection.get(include=["embeddings", "documents", "metadatas"])
+                    if results["ids"] and _has_embeddings(results):
+                        index.upsert(
+                            results["ids"],
+                            results["embeddings"],
+                            payloads=[
+                                {"document": doc, "metadata": meta}
+                                for doc, meta in zip(results["documents"], results["metadatas"])
+                            ],
+                        )
+                    self._indexes[name] = index
+        return index
+
+    def _upsert_with_index(self, name: str, collection, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        """
+        Upsert into Chroma and keep a loaded in-memory index in sync.
+
+        Embeddings are computed once here (through the embedding cache, in
+        large batches) and passed to Chroma explicitly. Duplicate ids in one
+        call keep the last document. Empty metadata is sent as None (Chroma
+        rejects empty metadata dicts).
+        """
+        metadatas = [meta or None for meta in metadatas]
+        if len(set(ids)) != len(ids):
+            latest = {item_id: (doc, meta) for item_id, doc, meta in zip(ids, documents, metadatas)}
+            ids = list(latest)
+            documents = [latest[item_id][0] for item_id in ids]
+            metadatas = [latest[item_id][1] for item_id in ids]
+
+        if self.embedder is None:
+            for start in range(0, len(ids), CHROMA_UPSERT_BATCH_SIZE):
+                end = start + CHROMA_UPSERT_BATCH_SIZE
+                collection.upsert(ids=ids[start:end], documents=documents[start:end], metadatas=metadatas[start:end])
+            return
+
+        embeddings = self.embedder(documents)
+        for start in range(0, len(ids), CHROMA_UPSERT_BATCH_SIZE):
+            end = start + CHROMA_UPSERT_BATCH_SIZE
+            collection.upsert(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end],
+            )
+
+        if self.use_index and name in self._indexes:
+            self._indexes[name].upsert(
+                ids,
+                embeddings,
+                payloads=[{"document": doc, "metadata": meta} for doc, meta in zip(documents, metadatas)],
+            )
+
+    def _write_pending(self, batch: List[PendingWrite]) -> None:
+        """Flush queued single adds, one upsert per collection."""
+        for name, collection in self._collections_by_name().items():
+            writes = [w for w in batch if w.collection == name]
+            if writes:
+                self._upsert_with_index(
+                    name,
+                    collection,
+                    ids=[w.item_id for w in writes],
+                    documents=[w.document for w in writes],
+                    metadatas=[w.metadata for w in writes],
+                )
+
+    def _collections_by_name(self) -> Dict:
+        """Collection name -> Chroma collection."""
+        return {
+            "learning_preferences": self.learning_prefs_collection,
+            "concept_embeddings": self.concepts_collection,
+            "content_vectors": self.content_collection,
+        }
+
+    def _embed_query(self, text: str) -> List[float]:
+        """Embed a search query (bypasses the embedding cache)."""
+        return [float(x) for x in self.embedding_fn([text])[0]]
+
+    def reembed_collections(self, batch_size: int = CHROMA_UPSERT_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Re-embed every stored document with the current backend.
+
+        Migration step after changing EMBEDDING_BACKEND (e.g., to onnx-int8)
+        so all vectors in a collection come from the same backend.
+
+        Args:
+            batch_size: Documents read and upserted per page
+
+        Returns:
+            Dict mapping collection name to documents re-embedded
+        """
+        if not CHROMADB_AVAILABLE or self.client is None:
+            return {}
+
+        self.flush()
+
+        counts = {}
+        for name, collection in self._collections_by_name().items():
+            total = collection.count()
+            for offset in range(0, total, batch_size):
+                page = collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+                if page["ids"]:
+                    self._upsert_with_index(
+                        name,
+                        collection,
+                        ids=list(page["ids"]),
+                        documents=list(page["documents"]),
+                        metadatas=list(page["metadatas"]),
+                    )
+            counts[name] = total
+
+        return counts
+
+    def flush(self) -> None:
+        """Write any queued adds (no-op unless batch_writes is enabled)."""
+        if self.batcher is not None:
+            self.batcher.flush()
+
+    def _format_hits(self, index: EmbeddingIndex, hits: List, id_key: str) -> List[Dict]:
+        """Convert (id, distance) hits into the dicts returned by Chroma-backed lookups."""
+        return [
+            {
+                id_key: item_id,
+                "document": index.get_payload(item_id).get("document"),
+                "metadata": index.get_payload(item_id).get("metadata"),
+                "distance": distance,
+            }
+            for item_id, distance in hits
+        ]
+
+    def refresh_indexes(self) -> None:
+        """Drop in-memory indexes so they reload from Chroma on next use."""
+        self._indexes = {}
+
+
+def build_preferences_text(student_name: str, learning_preferences: List[str], reading_level: str) -> str:
+    """
+    Build the learning preferences document embedded for a student.
+
+    Args:
+        student_name: Student name
+        learning_preferences: LearningPreference values
+        reading_level: ReadingLevel value
+
+    Returns:
+        Preferences text (e.g., "Alex is a Visual, Kinesthetic learner with Basic reading level.")
+    """
+    return f"{student_name} is a {', '.join(learning_preferences)} learner with {reading_level} reading level."
+
+
+def _has_embeddings(results: Dict) -> bool:
+    """Check a Chroma get() result for embeddings (may be a list or NumPy array)."""
+    embeddings = results.get("embeddings")
+    return embeddings is not None and len(embeddings) > 0
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# SHARED STORE
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+_shared_vector_store: Optional[StudentVectorStore] = None
+_shared_vector_store_lock = threading.Lock()
+
+
+def get_shared_vector_store() -> StudentVectorStore:
+    """
+    Get the process-level vector store (opened on first call).
+
+    StudentModelInterface instances use it unless given their own, so
+    requests and engines share one Chroma client and embedding cache.
+
+    Returns:
+        Shared StudentVectorStore
+    """
+    global _shared_vector_store
+
+    if _shared_vector_store is None:
+        with _shared_vector_store_lock:
+            if _shared_vector_store is None:
+                _shared_vector_store = StudentVectorStore()
+
+    return _shared_vector_store
+
+
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
 # CLI COMMANDS
 # PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
@@ -498,6 +917,7 @@ Commands:
   init      - Initialize vector store collections
   stats     - Show collection statistics
   reset     - Reset all collections (DESTROYS DATA!)
+  reembed   - Re-embed all documents with the configured EMBEDDING_BACKEND
   test      - Run basic functionality test
 
 Example:
@@ -530,6 +950,12 @@ Example:
         else:
             print("Cancelled.")
 
+    elif command == "reembed":
+        print(f"Re-embedding collections with backend '{store.embedding_fn.name}'...")
+        counts = store.reembed_collections()
+        for collection, count in counts.items():
+            print(f"  {collection:25s}: {count:5d} documents")
+
     elif command == "test":
         print("Running basic functionality test...")
 
@@ -0,0 +1,618 @@
+"""
+Latency metrics in Prometheus text format.
+
+A small dependency-free registry (counters, gauges, histograms) plus the
+metrics the application records:
+- HTTP route latency (API middleware)
+- LLM call latency and time-to-first-token by engine and model, coalesced calls,
+  rate-limit queue waits, retries, hedges and circuit breakers, model routing
+  and estimated spend, message batches
+- DB query latency (SQLAlchemy cursor events) and connection-pool checkouts
+- Pipeline stage durations, checkpoints and resumes
+- WebSocket broadcast latency and queue depth
+- Event-loop lag and process resident memory
+
+With METRICS_ENABLED=false every recording call returns after one flag check,
+SQLAlchemy hooks and the HTTP middleware are not installed, and /metrics is
+not mounted.
+"""
+
+import asyncio
+import functools
+import math
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Seconds; covers sub-ms DB queries through multi-minute LLM generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Event-loop lag buckets: blocking work in async handlers ranges from sub-ms to whole LLM calls
+LOOP_LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Pool checkout waits: ~0 with idle connections, up to DB_POOL_TIMEOUT when exhausted
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Message batch turnaround: seconds (local stand-in) up to the 24h processing limit
+BATCH_WAIT_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0, 21600.0, 43200.0, 86400.0)
+
+# How often the API samples event-loop lag (0 disables the monitor)
+EVENT_LOOP_MONITOR_INTERVAL_MS = float(os.getenv("EVENT_LOOP_MONITOR_INTERVAL_MS", "100"))
+
+LabelValues = Tuple[str, ...]
+
+
+# ═══════════════════════════════════════════════════════════
+# METRIC TYPES
+# ═══════════════════════════════════════════════════════════
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base class: a named family of samples keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _label_str(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, values)]
+        if extra is not None:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        """Sample lines (without HELP/TYPE header)."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Prometheus text exposition for this metric."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._label_str(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Metric):
+    """Value that goes up and down (optionally read from a callback at scrape time)."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        """
+        Initialize gauge.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Label names
+            callback: Returns {label values: value} at scrape time (replaces set/inc)
+        """
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        if self.callback is not None:
+            return self.callback().get(self._key(labels), 0.0)
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        if self.callback is not None:
+            items = list(self.callback().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{self._label_str(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(Metric):
+    """Bucketed distribution of observed values (cumulative buckets, sum, count)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts..., sum, count]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the with-block."""
+        if not METRICS_ENABLED:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[-1]) if series else 0
+
+    def sum(self, **labels) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-2] if series else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{self._label_str(key, ('le', _format_value(bound)))} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {_format_value(series[-1])}")
+        return lines
+
+
+# ═══════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together at /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ═══════════════════════════════════════════════════════════
+# APPLICATION METRICS
+# ═══════════════════════════════════════════════════════════
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+LLM_REQUEST_DURATION = REGISTRY.histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency (request to complete response)",
+    ("engine", "model", "status"),
+)
+
+LLM_TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from LLM request to first streamed token",
+    ("engine", "model"),
+)
+
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total",
+    "LLM tokens by direction (input/output)",
+    ("engine", "model", "direction"),
+)
+
+LLM_COALESCED_CALLS = REGISTRY.counter(
+    "llm_coalesced_calls_total",
+    "LLM calls answered by an identical in-flight call (scope: process or database)",
+    ("engine", "scope"),
+)
+
+LLM_STRUCTURED_OUTPUTS = REGISTRY.counter(
+    "llm_structured_outputs_total",
+    "Structured LLM responses by outcome (valid, repaired, failed)",
+    ("engine", "outcome"),
+)
+
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    "llm_queue_wait_seconds",
+    "Time LLM calls waited in the rate-limit scheduler before dispatch",
+    ("priority",),
+)
+
+LLM_RATE_LIMITED = REGISTRY.counter(
+    "llm_rate_limited_total",
+    "LLM calls rejected upstream with 429 and requeued after retry-after",
+    ("engine",),
+)
+
+LLM_RETRIES = REGISTRY.counter(
+    "llm_retries_total",
+    "LLM calls retried after a transient upstream error (reason: status code or error type)",
+    ("engine", "reason"),
+)
+
+LLM_HEDGED_CALLS = REGISTRY.counter(
+    "llm_hedged_calls_total",
+    "Duplicate LLM requests sent for slow calls (outcome: launched, won)",
+    ("engine", "outcome"),
+)
+
+LLM_CIRCUIT_STATE = REGISTRY.gauge(
+    "llm_circuit_state",
+    "LLM circuit breaker state by model (0 closed, 1 half-open, 2 open)",
+    ("model",),
+)
+
+LLM_CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "llm_circuit_rejections_total",
+    "LLM calls failed fast by an open circuit breaker",
+    ("model",),
+)
+
+LLM_DEADLINE_EXCEEDED = REGISTRY.counter(
+    "llm_deadline_exceeded_total",
+    "LLM calls not attempted because the pipeline stage deadline had passed",
+    ("engine",),
+)
+
+LLM_ROUTED_CALLS = REGISTRY.counter(
+    "llm_routed_calls_total",
+    "LLM calls by routed task and model",
+    ("engine", "task", "model"),
+)
+
+LLM_ROUTED_CALL_DURATION = REGISTRY.histogram(
+    "llm_routed_call_duration_seconds",
+    "Routed LLM call latency by task and model (including retries)",
+    ("task", "model"),
+)
+
+LLM_OUTPUT_TRUNCATED = REGISTRY.counter(
+    "llm_output_truncated_total",
+    "Routed LLM responses cut off at their adaptive max_tokens and re-requested",
+    ("task", "model"),
+)
+
+LLM_COST = REGISTRY.counter(
+    "llm_cost_dollars_total",
+    "Estimated LLM spend in dollars (model list prices)",
+    ("engine", "model"),
+)
+
+LLM_BATCH_REQUESTS = REGISTRY.counter(
+    "llm_batch_requests_total",
+    "Message batch results by outcome (succeeded, errored, expired, canceled)",
+    ("outcome",),
+)
+
+LLM_BATCH_WAIT = REGISTRY.histogram(
+    "llm_batch_wait_seconds",
+    "Time from submitting a round of message batches to having all results",
+    (),
+    buckets=BATCH_WAIT_BUCKETS,
+)
+
+CONTENT_REUSE_DECISIONS = REGISTRY.counter(
+    "content_reuse_decisions_total",
+    "Reuse lookups before lesson / unit plan generation (decision: reuse, adapt or generate)",
+    ("content_type", "decision"),
+)
+
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds",
+    "Database statement latency by operation",
+    ("operation",),
+)
+
+DB_POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to check out a pooled database connection (queueing plus connecting)",
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+DB_POOL_TIMEOUTS = REGISTRY.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT seconds",
+)
+
+# Pools of instrumented engines, read by the connections gauge at scrape time
+_POOLS: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _pool_connections() -> Dict[LabelValues, float]:
+    """Connections checked out / idle / overflow across instrumented pools."""
+    totals = {("in_use",): 0.0, ("idle",): 0.0, ("overflow",): 0.0}
+    for pool in list(_POOLS):
+        if not hasattr(pool, "checkedout"):
+            continue
+        totals[("in_use",)] += pool.checkedout()
+        totals[("idle",)] += pool.checkedin()
+        totals[("overflow",)] += max(pool.overflow(), 0)
+    return totals
+
+
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ("state",),
+    callback=_pool_connections,
+)
+
+PIPELINE_STAGE_DURATION = REGISTRY.histogram(
+    "pipeline_stage_duration_seconds",
+    "Pipeline stage duration",
+    ("pipeline", "stage", "status"),
+)
+
+PIPELINE_CHECKPOINTS = REGISTRY.counter(
+    "pipeline_checkpoints_total",
+    "Pipeline state checkpoints after completed stages",
+    ("stage", "status"),
+)
+
+PIPELINE_RESUMES = REGISTRY.counter(
+    "pipeline_resumes_total",
+    "Pipeline runs resumed from a checkpoint, by the stage they restart at",
+    ("stage",),
+)
+
+WEBSOCKET_BROADCAST_DURATION = REGISTRY.histogram(
+    "websocket_broadcast_duration_seconds",
+    "Time to deliver one broadcast to all subscribed connections",
+    ("connection_type",),
+)
+
+WEBSOCKET_QUEUE_DEPTH = REGISTRY.gauge(
+    "websocket_broadcast_queue_depth",
+    "WebSocket messages accepted for broadcast but not yet sent",
+)
+
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop resumed a timed sleep (time blocked by other work)",
+    buckets=LOOP_LAG_BUCKETS,
+)
+
+
+def _resident_memory() -> Dict[LabelValues, float]:
+    """Current RSS from /proc; peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return {(): float(int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))}
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return {}
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {(): float(peak if sys.platform == "darwin" else peak * 1024)}
+
+
+PROCESS_RESIDENT_MEMORY = REGISTRY.gauge(
+    "process_resident_memory_bytes",
+    "Resident memory of the API process",
+    callback=_resident_memory,
+)
+
+
+# ═══════════════════════════════════════════════════════════
+# INSTRUMENTATION HELPERS
+# ═══════════════════════════════════════════════════════════
+
+
+def timed_stage(pipeline: str, stage: str) -> Callable:
+    """
+    Decorator recording a pipeline stage's duration (identity when metrics are disabled).
+
+    Args:
+        pipeline: Pipeline label (e.g. "langgraph")
+        stage: Stage label
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        if not METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = "error"
+            try:
+                result = fn(*args, **kwargs)
+                status = "success"
+                return result
+            finally:
+                PIPELINE_STAGE_DURATION.observe(
+                    time.perf_counter() - start, pipeline=pipeline, stage=stage, status=status
+                )
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def stage_timer(pipeline: str, stage: str) -> Iterator[None]:
+    """Record the duration of a pipeline stage run inside the with-block."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "success"
+    finally:
+        PIPELINE_STAGE_DURATION.observe(time.perf_counter() - start, pipeline=pipeline, stage=stage, status=status)
+
+
+def instrument_sqlalchemy(engine) -> None:
+    """
+    Record statement latency for a SQLAlchemy engine via cursor events.
+
+    The engine's pool is also reported by the db_pool_connections gauge;
+    checkout waits are recorded by the pool class (see database.py).
+
+    Args:
+        engine: sqlalchemy Engine (no-op when metrics are disabled)
+    """
+    if not METRICS_ENABLED or getattr(engine, "_metrics_instrumented", False):
+        return
+
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_query_start")
+        if starts:
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+            DB_QUERY_DURATION.observe(time.perf_counter() - starts.pop(), operation=operation)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        conn = context.connection
+        starts = conn.info.get("_query_start") if conn is not None else None
+        if starts:
+            DB_QUERY_DURATION.observe(time.perf_counter() - starts.pop(), operation="ERROR")
+
+    _POOLS.add(engine.pool)
+    engine._metrics_instrumented = True
+
+
+async def monitor_event_loop_lag(interval: float = EVENT_LOOP_MONITOR_INTERVAL_MS / 1000) -> None:
+    """
+    Record event-loop lag until cancelled.
+
+    Sleeps for `interval` and records how much later than requested the loop
+    resumed it; synchronous work inside async handlers shows up as lag.
+
+    Args:
+        interval: Seconds between samples
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - start - interval))
@@ -0,0 +1,292 @@
+"""
+Distributed tracing (OpenTelemetry).
+
+Spans cover the path of a request: API route → pipeline / LangGraph node →
+engine LLM call → StudentModelInterface / ContentStorageInterface method,
+plus WebSocket broadcasts. Trace context is propagated from incoming W3C
+`traceparent` headers, into background jobs (capture_context) and into
+pipeline progress events (current_trace_id).
+
+Exporters (TRACING_EXPORTER):
+- file: one JSON span per line in TRACING_FILE (default)
+- console: pretty-printed spans on stdout
+- otlp: OTLP/HTTP (requires opentelemetry-exporter-otlp)
+- none: spans are created (ids propagate) but not exported
+
+opentelemetry is optional; without it, or with TRACING_ENABLED=false, span()
+yields a no-op span and the decorators return their target unchanged.
+"""
+
+import functools
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+
+# The SDK is imported when the first span is started, not at API import
+try:
+    from opentelemetry import trace
+    from opentelemetry.propagate import extract, inject
+    OTEL_AVAILABLE = importlib.util.find_spec("opentelemetry.sdk") is not None
+except ImportError:
+    OTEL_AVAILABLE = False
+
+logger = logging.getLogger("tracing")
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true" and OTEL_AVAILABLE
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "./traces/spans.jsonl")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "master-creator")
+
+
+# ═══════════════════════════════════════════════════════════
+# EXPORT
+# ═══════════════════════════════════════════════════════════
+
+
+class JsonLinesSpanExporter:
+    """Appends finished spans to a local file, one JSON object per line (a SpanExporter)."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = [json.dumps(json.loads(span.to_json(indent=None))) for span in spans]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def _create_exporter(name: str):
+    if name == "none":
+        return None
+    if name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("TRACING_EXPORTER=otlp needs opentelemetry-exporter-otlp; writing to file instead")
+        else:
+            return OTLPSpanExporter()
+    return JsonLinesSpanExporter(TRACING_FILE)
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_tracer_provider():
+    """
+    Get the process TracerProvider, creating it (and its exporter) on first use.
+
+    Returns:
+        TracerProvider, or None if tracing is disabled
+    """
+    global _provider
+
+    if not TRACING_ENABLED:
+        return None
+
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+                provider = TracerProvider(resource=Resource.create({"service.name": TRACING_SERVICE_NAME}))
+                exporter = _create_exporter(TRACING_EXPORTER)
+                if exporter is not None:
+                    provider.add_span_processor(BatchSpanProcessor(exporter))
+                _provider = provider
+
+    return _provider
+
+
+def shutdown_tracing():
+    """Flush and close exporters (call on process shutdown)."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+# ═══════════════════════════════════════════════════════════
+# SPANS
+# ═══════════════════════════════════════════════════════════
+
+
+class _NoopSpan:
+    """Stand-in yielded by span() when tracing is off."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Mapping[str, Any]):
+        pass
+
+    def update_name(self, name: str):
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, context=None, kind: Optional[str] = None) -> Iterator[Any]:
+    """
+    Run the with-block inside a span (child of the current span, or of context).
+
+    Args:
+        name: Span name
+        attributes: Initial attributes (None values are dropped)
+        context: Parent context from capture_context()/extract_context() (default: current)
+        kind: "server", "client" or None (internal)
+
+    Yields:
+        The span (call set_attribute to add attributes)
+    """
+    provider = get_tracer_provider()
+    if provider is None:
+        yield NOOP_SPAN
+        return
+
+    span_kind = {"server": trace.SpanKind.SERVER, "client": trace.SpanKind.CLIENT}.get(kind, trace.SpanKind.INTERNAL)
+    tracer = provider.get_tracer("master_creator")
+    clean = {k: v for k, v in (attributes or {}).items() if v is not None}
+    with tracer.start_as_current_span(name, context=context, kind=span_kind, attributes=clean) as current:
+        yield current
+
+
+def traced(name: str, attributes: Optional[Dict[str, Any]] = None) -> Callable:
+    """
+    Decorator running a function (sync or async) inside a span.
+
+    Args:
+        name: Span name
+        attributes: Static attributes
+
+    Returns:
+        Decorator (identity when tracing is disabled)
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        if not TRACING_ENABLED:
+            return fn
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, attributes):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, attributes):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _row_count(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple, set, dict)):
+        return len(result)
+    return 1
+
+
+def trace_methods(prefix: str) -> Callable:
+    """
+    Class decorator: a span around every public method, with a result.rows attribute.
+
+    Args:
+        prefix: Span name prefix (span names are "<prefix>.<method>")
+
+    Returns:
+        Class decorator (identity when tracing is disabled)
+    """
+
+    def decorator(cls):
+        if not TRACING_ENABLED:
+            return cls
+
+        for attr, fn in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(fn) or inspect.isgeneratorfunction(fn):
+                continue
+
+            def make_wrapper(fn, span_name):
+                @functools.wraps(fn)
+                def wrapper(*args, **kwargs):
+                    with span(span_name) as current:
+                        result = fn(*args, **kwargs)
+                        current.set_attribute("result.rows", _row_count(result))
+                        return result
+
+                return wrapper
+
+            setattr(cls, attr, make_wrapper(fn, f"{prefix}.{attr}"))
+        return cls
+
+    return decorator
+
+
+# ═══════════════════════════════════════════════════════════
+# CONTEXT PROPAGATION
+# ═══════════════════════════════════════════════════════════
+
+
+def current_trace_id() -> Optional[str]:
+    """Hex trace id of the current span, or None outside a trace."""
+    if not TRACING_ENABLED:
+        return None
+    context = trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else None
+
+
+def capture_context():
+    """Current trace context, to parent spans started later (e.g. in a background job)."""
+    if not TRACING_ENABLED:
+        return None
+    from opentelemetry import context as otel_context
+
+    return otel_context.get_current()
+
+
+def extract_context(headers: Mapping[str, str]):
+    """Trace context from W3C traceparent/tracestate headers (None if tracing is off)."""
+    if not TRACING_ENABLED:
+        return None
+    return extract(headers)
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add W3C traceparent/tracestate headers for the current span to headers."""
+    headers = headers if headers is not None else {}
+    if TRACING_ENABLED:
+        inject(headers)
+    return headers
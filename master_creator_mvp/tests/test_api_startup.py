@@ -0,0 +1,145 @@
+"""
+Tests for API cold start (lazy dependencies and singletons) and request handling
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestApiColdStart:
+    """Importing the API must not load heavy dependencies or open stores."""
+
+    def test_import_defers_heavy_dependencies(self):
+        """`import src.api.main` leaves anthropic, langgraph, chromadb, etc. unloaded."""
+        pytest.importorskip("fastapi")
+        deferred = ["anthropic", "langgraph", "chromadb", "pandas", "onnxruntime", "sentence_transformers", "torch"]
+        code = (
+            "import sys, src.api.main\n"
+            f"print(','.join(m for m in {deferred!r} if m in sys.modules))"
+        )
+
+        proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+
+        assert proc.returncode == 0, proc.stderr
+        assert proc.stdout.strip().splitlines()[-1:] in ([], [""])
+
+    def test_engine_routes_share_one_request_session(self):
+        """A request's sync and async interfaces share its Session, closed afterwards."""
+        pytest.importorskip("fastapi")
+        import asyncio
+
+        from sqlalchemy.orm import Session
+
+        from src.api import dependencies
+
+        async def request(fail: bool):
+            unit_of_work = dependencies.get_engine_db_session()
+            session = await unit_of_work.__anext__()
+            student_model = await dependencies.get_student_model(session)
+            storage = await dependencies.get_engine_content_storage(session)
+            assert student_model.db is session and storage.sync.session is session
+            assert not student_model._owns_session  # The dependency owns the unit of work
+            if fail:
+                with pytest.raises(ValueError):
+                    await unit_of_work.athrow(ValueError("handler failed"))
+            else:
+                with pytest.raises(StopAsyncIteration):
+                    await unit_of_work.__anext__()
+            return session
+
+        with patch.object(dependencies, "SessionLocal") as session_factory:
+            session_factory.side_effect = lambda: MagicMock(spec=Session)
+            first = asyncio.run(request(fail=False))
+            second = asyncio.run(request(fail=True))
+
+        assert first is not second
+        first.commit.assert_called_once()
+        first.close.assert_called_once()
+        second.rollback.assert_called_once()
+        second.commit.assert_not_called()
+        second.close.assert_called_once()
+
+    def test_interface_opens_vector_store_lazily(self):
+        """StudentModelInterface only opens the shared Chroma store when vector_store is used."""
+        from src.student_model import interface as interface_module
+
+        with patch.object(interface_module, "get_shared_vector_store") as shared_store:
+            interface = interface_module.StudentModelInterface(db_session=MagicMock(), shared_cache=None)
+            assert shared_store.call_count == 0
+
+            assert interface.vector_store is shared_store.return_value
+            assert interface.vector_store is shared_store.return_value
+            assert shared_store.call_count == 1
+
+
+class TestEngineRoutes:
+    """Async handlers keep engine and grader work off the event loop."""
+
+    def test_lesson_generation_runs_in_worker_thread(self):
+        """The engine's blocking generate() runs outside the event loop thread."""
+        pytest.importorskip("fastapi")
+        import asyncio
+        import threading
+        from unittest.mock import AsyncMock
+
+        from src.api.routes import lessons
+
+        threads = []
+
+        def generate(**kwargs):
+            threads.append(threading.get_ident())
+            lesson = MagicMock(lesson_id="lesson_1")
+            lesson.model_dump.return_value = {"lesson_id": "lesson_1"}
+            return lesson
+
+        engine = MagicMock(generate=MagicMock(side_effect=generate))
+        engine.get_cost_summary.return_value = {"total_cost": 0.0}
+        request = lessons.LessonRequest(topic="Photosynthesis", grade_level="9", subject="Science")
+
+        async def scenario():
+            with patch.object(lessons, "LessonArchitect", return_value=engine):
+                result = await lessons.generate_lesson(
+                    request, storage=AsyncMock(), student_model=MagicMock()
+                )
+            return result, threading.get_ident()
+
+        result, loop_thread = asyncio.run(scenario())
+
+        assert result["lesson"] == {"lesson_id": "lesson_1"}
+        assert threads and threads[0] != loop_thread
+
+    def test_mastery_is_updated_only_after_the_graded_assessment_is_saved(self):
+        """A failed save leaves mastery untouched."""
+        pytest.importorskip("fastapi")
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        from fastapi import HTTPException
+
+        from src.api.routes import assessments
+
+        grader = MagicMock()
+        grader.grade_submission.return_value.model_dump.return_value = {}
+        storage = AsyncMock()
+        storage.save_graded_assessment.side_effect = RuntimeError("database unavailable")
+        request = assessments.SubmitAssessmentRequest(
+            assessment_id="assessment_1", student_id="student_1", questions=[], responses=[]
+        )
+
+        async def submit():
+            with patch.object(assessments, "AssessmentGrader", return_value=grader):
+                await assessments.submit_assessment(
+                    request, storage=storage, student_model=MagicMock()
+                )
+
+        with pytest.raises(HTTPException):
+            asyncio.run(submit())
+
+        assert grader.grade_submission.call_args.kwargs["update_mastery"] is False
+        grader.apply_mastery_updates.assert_not_called()
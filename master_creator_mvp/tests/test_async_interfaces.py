@@ -0,0 +1,189 @@
+"""
+Tests for the data-access layer (async interfaces, units of work)
+"""
+
+import asyncio
+import inspect
+from datetime import datetime
+
+import pytest
+
+
+def _memory_session_maker():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from src.content_storage.models import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+LESSON = {
+    "lesson_id": "lesson_async_1",
+    "topic": "Photosynthesis",
+    "grade_level": "9",
+    "subject": "Science",
+    "duration_minutes": 45,
+    "created_at": datetime(2024, 1, 1).isoformat(),
+}
+
+COST = {"total_cost": 0.01, "input_tokens": 10, "output_tokens": 20}
+
+
+class TestAsyncInterfaces:
+    """Async interfaces expose the sync method surface as coroutines."""
+
+    def test_method_surface_matches_sync_interfaces(self):
+        """Every public method of the sync interfaces has an awaitable counterpart."""
+        from src.content_storage.async_interface import AsyncContentStorageInterface
+        from src.content_storage.interface import ContentStorageInterface
+        from src.student_model.async_interface import AsyncStudentModelInterface
+        from src.student_model.interface import StudentModelInterface
+
+        for sync_cls, async_cls in (
+            (StudentModelInterface, AsyncStudentModelInterface),
+            (ContentStorageInterface, AsyncContentStorageInterface),
+        ):
+            public = [n for n, m in vars(sync_cls).items() if not n.startswith("_") and inspect.isfunction(m)]
+            assert public
+            for name in public:
+                assert inspect.iscoroutinefunction(getattr(async_cls, name)), f"{async_cls.__name__}.{name}"
+
+    def test_sync_session_runs_in_worker_thread(self):
+        """Without an async driver, calls run on the sync Session off the event loop."""
+        from src.content_storage.async_interface import AsyncContentStorageInterface
+
+        session = _memory_session_maker()()
+
+        async def scenario():
+            async with AsyncContentStorageInterface(session) as storage:
+                assert not storage.is_async
+                await storage.save_lesson(lesson_data=LESSON, cost_summary=COST, class_id="class_1")
+                return await storage.get_lesson("lesson_async_1")
+
+        lesson = asyncio.run(scenario())
+
+        assert lesson["topic"] == "Photosynthesis"
+        session.close()
+
+    def test_async_session_uses_run_sync(self, tmp_path):
+        """With aiosqlite installed, calls go through AsyncSession.run_sync."""
+        pytest.importorskip("aiosqlite")
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        from src.content_storage.async_interface import AsyncContentStorageInterface
+        from src.content_storage.models import Base
+
+        async def scenario():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session = async_sessionmaker(engine, expire_on_commit=False)()
+            try:
+                storage = AsyncContentStorageInterface(session)
+                assert storage.is_async
+                await storage.save_lesson(lesson_data=LESSON, cost_summary=COST)
+                return await storage.get_lesson("lesson_async_1")
+            finally:
+                await session.close()
+                await engine.dispose()
+
+        lesson = asyncio.run(scenario())
+
+        assert lesson["lesson_id"] == "lesson_async_1"
+
+    def test_vector_store_work_runs_off_the_event_loop(self):
+        """On an AsyncSession, embedding runs in a worker thread and rows go through run_sync."""
+        import threading
+        from unittest.mock import AsyncMock, MagicMock, patch
+
+        from src.student_model.async_interface import AsyncStudentModelInterface
+        from src.student_model.schemas import GradeLevel, LearningPreference, StudentProfileCreate
+
+        threads = {}
+
+        def record(name):
+            return lambda *args, **kwargs: threads.setdefault(name, threading.get_ident())
+
+        def run_sync(fn):
+            record("db")()
+            return fn(None)
+
+        vector_store = MagicMock()
+        vector_store.find_similar_students.side_effect = record("similar")
+        vector_store.add_student_preferences.side_effect = record("embed")
+        session = MagicMock()
+        session.run_sync = AsyncMock(side_effect=run_sync)
+
+        async def scenario():
+            sm = AsyncStudentModelInterface(session, vector_store=vector_store)
+            with patch.object(sm.sync, "get_student_profile", return_value="profile"):
+                await sm.find_similar_students("s1")
+                profile = await sm.create_student_profile(
+                    StudentProfileCreate(
+                        student_name="Alex Chen",
+                        grade_level=GradeLevel.GRADE_9,
+                        class_id="class_1",
+                        learning_preferences=[LearningPreference.VISUAL],
+                    )
+                )
+            return profile, threading.get_ident()
+
+        profile, loop_thread = asyncio.run(scenario())
+
+        assert profile == "profile"
+        assert threads["db"] == loop_thread
+        assert threads["similar"] != loop_thread
+        assert threads["embed"] != loop_thread
+        session.sync_session.add.assert_called_once()
+
+    def test_async_database_url(self):
+        """Sync URLs map to their async driver, or None when it is not installed."""
+        from src.student_model import database
+
+        url = database.get_async_database_url("postgresql://u:p@db/master")
+        assert url in (None, "postgresql+asyncpg://u:p@db/master")
+        assert database.get_async_database_url("mysql://u:p@db/master") is None
+
+
+class TestUnitOfWork:
+    """session_scope() boundaries and interfaces joining the active unit of work."""
+
+    def test_interfaces_join_session_scope(self):
+        """StudentModelInterface() inside session_scope() shares its session without owning it."""
+        from unittest.mock import MagicMock, patch
+
+        from src.student_model import database
+        from src.student_model.interface import StudentModelInterface
+
+        session = MagicMock()
+        with patch.object(database, "SessionLocal", return_value=session):
+            with database.session_scope() as scoped:
+                first = StudentModelInterface(shared_cache=None)
+                second = StudentModelInterface(shared_cache=None)
+                assert first.db is scoped and second.db is scoped
+                first.close()
+                session.close.assert_not_called()
+
+            assert database.current_session() is None
+            session.commit.assert_called_once()
+            session.close.assert_called_once()
+
+    def test_session_scope_rolls_back_on_error(self):
+        """An exception inside the block rolls back instead of committing."""
+        from unittest.mock import MagicMock, patch
+
+        from src.student_model import database
+
+        session = MagicMock()
+        with patch.object(database, "SessionLocal", return_value=session):
+            with pytest.raises(RuntimeError):
+                with database.session_scope():
+                    raise RuntimeError("engine failed")
+
+        session.rollback.assert_called_once()
+        session.commit.assert_not_called()
+        session.close.assert_called_once()
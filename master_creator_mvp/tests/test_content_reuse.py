@@ -0,0 +1,170 @@
+"""
+Tests for semantic reuse of stored lessons and unit plans
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def store():
+    """In-memory vector store with hashing embeddings."""
+    chromadb = pytest.importorskip("chromadb")
+    from chromadb.config import Settings
+
+    from src.student_model.embedding_backends import HashingBackend
+    from src.student_model.embedding_pipeline import CachedEmbedder
+    from src.student_model.vector_store import StudentVectorStore
+
+    client = chromadb.EphemeralClient(Settings(anonymized_telemetry=False))
+    for name in ("learning_preferences", "concept_embeddings", "content_vectors"):
+        try:
+            client.delete_collection(name)
+        except Exception:
+            pass
+
+    vector_store = StudentVectorStore(client=client, batch_writes=False)
+    vector_store.embedding_fn = HashingBackend()
+    vector_store.embedder = CachedEmbedder(vector_store.embedding_fn)
+    return vector_store
+
+
+@pytest.fixture
+def saved(store):
+    """Reuse enabled against `store`, with stored blueprints read from a dict."""
+    from src.content_storage import reuse
+
+    contents = {}
+
+    def save(content_type, data, class_id=None):
+        content_id = data["unit_id"] if content_type == reuse.UNIT_PLAN else data["lesson_id"]
+        contents[content_id] = data
+        assert reuse.index_content(content_type, data, class_id, vector_store=store)
+
+    with patch.object(reuse, "CONTENT_REUSE_ENABLED", True), patch.object(
+        reuse, "_shared_store", return_value=store
+    ), patch.object(reuse, "_loader", return_value=contents.get):
+        yield save
+
+
+@pytest.fixture
+def generate_lesson(fake_llm_client):
+    """Generate a lesson with a new fake-backed Lesson Architect; returns (engine, lesson)."""
+    from src.engines.engine_1_lesson_architect import LessonArchitect
+
+    def generate(**kwargs):
+        request = dict(topic="Photosynthesis", grade_level="9", subject="Biology", standards=["NGSS-HS-LS1-5"])
+        request.update(kwargs)
+        engine = LessonArchitect(student_model=MagicMock(), llm_client=fake_llm_client("LessonArchitect"))
+        return engine, engine.generate(**request)
+
+    return generate
+
+
+class TestContentReuse:
+    """Reuse-or-adapt decisions before Engine 0 / Engine 1 generation."""
+
+    def test_matching_lesson_returned_without_llm_call(self, saved, generate_lesson):
+        """A repeat request (topic differing in case/spacing) gets the stored blueprint."""
+        from src.content_storage import reuse
+        from src.utils.metrics import CONTENT_REUSE_DECISIONS
+
+        _, original = generate_lesson(force_fresh=True)
+        saved(reuse.LESSON, original.model_dump())
+        before = CONTENT_REUSE_DECISIONS.value(content_type="lesson", decision="reuse")
+
+        engine, lesson = generate_lesson(topic="  photosynthesis ", standards=["ngss-hs-ls1-5"])
+
+        assert engine.client.call_count == 0
+        assert engine.get_cost_summary()["total_cost"] == 0
+        assert lesson.reused_from == original.lesson_id
+        assert lesson.lesson_id != original.lesson_id
+        assert lesson.sections == original.sections
+        assert CONTENT_REUSE_DECISIONS.value(content_type="lesson", decision="reuse") == before + 1
+
+        # Reused copies aren't indexed again
+        assert not reuse.index_content(reuse.LESSON, lesson.model_dump())
+
+    def test_force_fresh_and_other_topics_generate(self, saved, generate_lesson):
+        """force_fresh skips the lookup; a different topic or grade doesn't match."""
+        from src.content_storage import reuse
+
+        _, original = generate_lesson(force_fresh=True)
+        saved(reuse.LESSON, original.model_dump())
+
+        for request in (
+            dict(force_fresh=True),
+            dict(topic="Cellular respiration"),
+            dict(grade_level="10"),
+        ):
+            engine, lesson = generate_lesson(**request)
+            assert engine.client.call_count == 1, request
+            assert lesson.reused_from is None
+
+    def test_differences_adapt_stored_lesson(self, saved, generate_lesson, fake_llm_client):
+        """Different standards, duration or class context put the stored lesson in the prompt."""
+        from src.content_storage import reuse
+
+        _, original = generate_lesson(force_fresh=True)
+        saved(reuse.LESSON, original.model_dump())
+
+        match = reuse.find_reusable(
+            reuse.LESSON, "Photosynthesis", "9", "Biology", ["NGSS-HS-LS1-6"], size=60, class_specific=True
+        )
+        assert match.decision == "adapt"
+        assert match.reason == "standards, duration, class context"
+        assert match.content_id == original.lesson_id
+
+        from src.engines.engine_1_lesson_architect import LessonArchitect
+
+        engine = LessonArchitect(student_model=MagicMock(), llm_client=fake_llm_client("LessonArchitect"))
+        with patch.object(engine, "_call_claude", wraps=engine._call_claude) as call:
+            lesson = engine.generate(topic="Photosynthesis", grade_level="9", subject="Biology", duration_minutes=60)
+
+        assert lesson.reused_from is None
+        user_prompt = call.call_args.args[1]
+        assert "Existing Lesson to Adapt" in user_prompt
+        assert original.sections[0].content in user_prompt
+
+    def test_class_specific_content_is_not_reused_as_is(self, saved, generate_lesson):
+        """Content generated for one class is only adapted, never handed to another request."""
+        from src.content_storage import reuse
+
+        _, original = generate_lesson(force_fresh=True)
+        saved(reuse.LESSON, original.model_dump(), class_id="class_bio_101")
+
+        match = reuse.find_reusable(reuse.LESSON, "Photosynthesis", "9", "Biology", ["NGSS-HS-LS1-5"], size=45)
+
+        assert match.decision == "adapt"
+        assert match.reason == "class context"
+
+    def test_unit_plan_reuse(self, saved, fake_llm_client):
+        """Engine 0 returns a stored unit plan with the same title, grade and size."""
+        from src.content_storage import reuse
+        from src.engines.engine_0_unit_planner import UnitPlanDesigner
+
+        request = dict(unit_title="Ecosystems", grade_level="9", subject="Biology", num_lessons=3)
+        first = UnitPlanDesigner(student_model=MagicMock(), llm_client=fake_llm_client("UnitPlanDesigner"))
+        original = first.generate(**request)
+        saved(reuse.UNIT_PLAN, original.model_dump())
+
+        second = UnitPlanDesigner(student_model=MagicMock(), llm_client=fake_llm_client("UnitPlanDesigner"))
+        unit = second.generate(**request)
+
+        assert second.client.call_count == 0
+        assert unit.reused_from == original.unit_id
+        assert unit.cost == 0.0
+        assert unit.lessons == original.lessons
+
+    def test_lookup_errors_fall_back_to_generation(self):
+        """A failing vector store never fails the request."""
+        from src.content_storage import reuse
+
+        broken = MagicMock(client=object(), embedder=object())
+        broken.search_similar_content.side_effect = RuntimeError("chroma down")
+        broken.add_content.side_effect = RuntimeError("chroma down")
+
+        with patch.object(reuse, "CONTENT_REUSE_ENABLED", True):
+            assert reuse.find_reusable(reuse.LESSON, "Photosynthesis", "9", "Biology", None, 45, vector_store=broken) is None
+            assert not reuse.index_content(reuse.LESSON, {"lesson_id": "l1"}, vector_store=broken)
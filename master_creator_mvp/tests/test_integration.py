@@ -376,9 +376,10 @@ class TestCostTracking:
 class TestErrorHandling:
     """Test error handling in pipeline."""
 
+    @patch("src.engines.base_engine.StudentModelInterface")
     @patch("anthropic.Anthropic")
     @patch("src.student_model.interface.StudentModelInterface")
-    def test_pipeline_handles_engine_failure(self, mock_student_model, mock_anthropic):
+    def test_pipeline_handles_engine_failure(self, mock_student_model, mock_anthropic, mock_engine_student_model):
         """Test that pipeline handles engine failures gracefully."""
         from src.orchestration.pipeline import MasterCreatorPipeline, PipelineInput
 
@@ -0,0 +1,109 @@
+"""
+Tests for the pluggable LLM backends (fake client) and benchmark reporting
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+class TestFakeLLMClient:
+    """Canned responses, determinism and the factory."""
+
+    def test_responses_are_deterministic(self, fake_llm_client):
+        """Same seed and request give identical text and usage."""
+        request = {"model": "m", "max_tokens": 4000, "system": "s", "messages": [{"role": "user", "content": "u"}]}
+
+        first = fake_llm_client("LessonArchitect", seed=3).messages.create(**request)
+        second = fake_llm_client("LessonArchitect", seed=3).messages.create(**request)
+
+        assert first.content[0].text == second.content[0].text
+        assert first.usage == second.usage
+
+    def test_unknown_backend_rejected(self):
+        """Only the known backends can be created."""
+        from src.engines.llm_backends import create_llm_client
+
+        with pytest.raises(ValueError, match="Unknown LLM backend"):
+            create_llm_client("LessonArchitect", backend="nope")
+
+    def test_backend_selected_from_environment(self):
+        """LLM_BACKEND=fake gives engines the fake client without an API key."""
+        from src.engines import llm_backends
+        from src.grader.rubric_engine import RubricGradingEngine
+
+        with patch.object(llm_backends, "LLM_BACKEND", "fake"):
+            engine = RubricGradingEngine()
+
+        assert isinstance(engine.client, llm_backends.FakeLLMClient)
+
+
+class TestEnginesParseFakeResponses:
+    """Every LLM-backed engine accepts the fake's canned JSON."""
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_lesson_architect(self, streaming, fake_llm_client):
+        """Both the plain and streamed call paths parse."""
+        from src.engines.engine_1_lesson_architect import LessonArchitect
+
+        engine = LessonArchitect(student_model=MagicMock(), llm_client=fake_llm_client("LessonArchitect"))
+        engine.stream_responses = streaming
+        lesson = engine.generate(topic="Photosynthesis", grade_level="9", subject="Biology")
+
+        assert lesson.topic
+        assert engine.client.call_count == 1
+
+    def test_diagnostic_questions_per_concept(self, fake_llm_client):
+        from src.engines.engine_5_diagnostic import DiagnosticEngine
+
+        engine = DiagnosticEngine(student_model=MagicMock(), llm_client=fake_llm_client("DiagnosticEngine"))
+        questions = engine._generate_questions(
+            lesson_objectives=["Explain photosynthesis"],
+            concept_ids=["photosynthesis_process", "energy_flow"],
+            num_questions_per_concept=2,
+            grade_level="9",
+            subject="Biology",
+        )
+
+        assert len(questions) == 4
+        assert {q.concept_id for q in questions} == {"photosynthesis_process", "energy_flow"}
+
+    def test_rubric_grading(self, fake_llm_client):
+        from src.grader.rubric_engine import ConstructedResponse, Rubric, RubricCriterion, RubricGradingEngine
+
+        rubric = Rubric(
+            rubric_id="r1",
+            rubric_type="analytic",
+            total_points=4.0,
+            criteria=[
+                RubricCriterion(
+                    criterion_name="Content Accuracy",
+                    description="Scientific accuracy",
+                    points_possible=4.0,
+                    levels={"4": "Exemplary", "1": "Beginning"},
+                )
+            ],
+        )
+        response = ConstructedResponse(question_id="q1", student_id="s1", response_text="Light makes glucose.")
+
+        engine = RubricGradingEngine(llm_client=fake_llm_client("RubricGradingEngine"))
+        grade = engine.grade_response("Explain photosynthesis.", response, rubric)
+
+        assert 0 <= grade.total_points_earned <= 4.0
+        assert [c.criterion_name for c in grade.criterion_scores] == ["Content Accuracy"]
+
+
+class TestBenchmarkReports:
+    """Regression comparison between results files."""
+
+    def test_compare_reports_flags_slowdowns(self):
+        from benchmarks.scenarios import compare_reports
+
+        baseline = {"scenarios": {"fast": {"median_s": 1.0}, "slow": {"median_s": 1.0}}}
+        current = {"scenarios": {"fast": {"median_s": 1.1}, "slow": {"median_s": 1.5}, "new": {"median_s": 2.0}}}
+
+        comparisons = {c["scenario"]: c for c in compare_reports(current, baseline, max_regression=0.2)}
+
+        assert set(comparisons) == {"fast", "slow"}
+        assert not comparisons["fast"]["regressed"]
+        assert comparisons["slow"]["regressed"]
@@ -0,0 +1,41 @@
+"""
+Tests for the load-test harness's statistics (percentiles, /metrics parsing)
+"""
+
+
+class TestLoadTestStatistics:
+    """Percentiles and histogram quantiles between two /metrics scrapes."""
+
+    def test_percentiles(self):
+        from benchmarks.loadtest import latency_summary, percentile
+
+        values = [i / 100 for i in range(1, 101)]
+
+        assert percentile(values, 50) == 0.5
+        assert percentile(values, 99) == 0.99
+        assert percentile([], 95) is None
+        summary = latency_summary(values, duration=10.0)
+        assert summary["count"] == 100
+        assert summary["throughput_per_s"] == 10.0
+        assert summary["max_s"] == 1.0
+
+    def test_histogram_quantile_uses_delta_between_scrapes(self):
+        """Only observations between the scrapes count, interpolated within buckets."""
+        from src.utils.metrics import MetricsRegistry
+        from benchmarks.loadtest import histogram_quantile, parse_metrics
+
+        registry = MetricsRegistry()
+        lag = registry.histogram("lag_seconds", "Lag", buckets=(0.01, 0.1, 1.0))
+        for _ in range(50):
+            lag.observe(5.0)  # Before the scenario; must be ignored
+        before = parse_metrics(registry.render())
+        for _ in range(90):
+            lag.observe(0.005)
+        for _ in range(10):
+            lag.observe(0.5)
+        after = parse_metrics(registry.render())
+
+        assert after["lag_seconds_count"][0][1] == 150
+        assert histogram_quantile(0.5, before, after, "lag_seconds") < 0.01
+        assert 0.1 < histogram_quantile(0.99, before, after, "lag_seconds") <= 1.0
+        assert histogram_quantile(0.5, after, after, "lag_seconds") is None
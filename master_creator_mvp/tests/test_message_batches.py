@@ -0,0 +1,145 @@
+"""
+Tests for Message Batches execution of offline pipeline runs
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _request(user):
+    return {
+        "model": "claude-sonnet-4-5-20250929",
+        "max_tokens": 1024,
+        "system": "You are a lesson architect.",
+        "messages": [{"role": "user", "content": user}],
+    }
+
+
+def no_sleep(seconds):
+    pass
+
+
+pytestmark = pytest.mark.file_db
+
+
+class TestBatchCollector:
+    """Pending requests, submission and results."""
+
+    def test_pending_requests_are_submitted_once_and_answered(self, fake_llm_client):
+        from src.engines.message_batches import BatchCollector, BatchPending
+
+        collector = BatchCollector()
+        client = fake_llm_client("MessageBatches")
+        for user in ("Photosynthesis", "Photosynthesis", "Mitosis"):
+            with pytest.raises(BatchPending):
+                collector.response_for(_request(user))
+        assert collector.pending() == 2
+
+        with patch.object(client.messages.batches, "create", wraps=client.messages.batches.create) as create:
+            assert collector.submit(client, sleep=no_sleep) == 2
+        assert len(create.call_args.kwargs["requests"]) == 2
+        assert collector.pending() == 0
+
+        message, first = collector.response_for(_request("Mitosis"))
+        assert first and message.usage.output_tokens > 0
+        # A replayed call gets the same result, not counted again
+        assert collector.response_for(_request("Mitosis")) == (message, False)
+
+    def test_failed_requests_are_resubmitted_then_raise(self):
+        from src.engines.message_batches import BatchCollector, BatchPending, BatchRequestFailed
+
+        collector = BatchCollector(max_attempts=2)
+        client = MagicMock()
+        client.messages.batches.retrieve.return_value.processing_status = "ended"
+
+        def errored(batch_id):
+            key = next(iter(client.messages.batches.create.call_args.kwargs["requests"]))["custom_id"]
+            return [MagicMock(custom_id=key, result=MagicMock(type="errored", error="overloaded"))]
+
+        client.messages.batches.results.side_effect = errored
+
+        for attempt in range(2):
+            with pytest.raises(BatchPending):
+                collector.response_for(_request("Photosynthesis"))
+            collector.submit(client, sleep=no_sleep)
+
+        with pytest.raises(BatchRequestFailed, match="errored: overloaded"):
+            collector.response_for(_request("Photosynthesis"))
+        assert client.messages.batches.create.call_count == 2
+
+    def test_batch_still_processing_after_timeout_is_canceled(self, fake_llm_client):
+        from src.engines.message_batches import BatchCollector, BatchPending
+
+        collector = BatchCollector()
+        client = fake_llm_client("MessageBatches")
+        client.messages.batches.batch_seconds = 3600
+        with pytest.raises(BatchPending):
+            collector.response_for(_request("Photosynthesis"))
+
+        with pytest.raises(TimeoutError):
+            collector.submit(client, poll_seconds=0, timeout=0, sleep=no_sleep)
+
+        batch = client.messages.batches.retrieve(collector.batches[0])
+        assert batch.processing_status == "ended"
+        assert batch.request_counts.canceled == 1
+
+
+class TestBatchedEngines:
+    """Engines answered from message batches."""
+
+    def test_engine_call_is_billed_at_batch_price(self, fake_llm_client):
+        from src.engines import message_batches
+        from src.engines.base_engine import BaseEngine
+        from src.engines.message_batches import BatchCollector, BatchPending, batch_mode
+        from src.engines.model_routing import request_cost
+
+        class BatchedEchoEngine(BaseEngine):
+            def generate(self, **kwargs):
+                return {}
+
+        client = fake_llm_client("LessonArchitect")
+        engine = BatchedEchoEngine(student_model=MagicMock(), llm_client=client)
+        collector = BatchCollector()
+
+        with batch_mode(collector):
+            with pytest.raises(BatchPending):
+                engine._call_claude("system", "Explain photosynthesis")
+            collector.submit(client, sleep=no_sleep)
+            text = engine._call_claude("system", "Explain photosynthesis")
+
+        assert text
+        expected = request_cost(engine.model, engine.total_input_tokens, engine.total_output_tokens)
+        assert engine.total_cost == pytest.approx(expected * message_batches.BATCH_PRICE_FACTOR)
+        # Outside batch_mode() calls go to the real-time API again
+        assert message_batches.current_batch() is None
+
+    def test_pipelines_run_through_batches(self, pipeline_db, fake_llm_client):
+        from src.engines import llm_backends
+        from src.orchestration.batch_pipeline import run_batch_pipelines
+
+        runs = [
+            {
+                "lesson_topic": topic,
+                "grade_level": "9",
+                "subject": "Science",
+                "class_id": pipeline_db["class_id"],
+                "concept_ids": ["photosynthesis_process"],
+            }
+            for topic in ("Photosynthesis", "Cellular Respiration")
+        ]
+        client = fake_llm_client("MessageBatches")
+
+        real_time = AssertionError("real-time call")
+        with patch.object(llm_backends.FakeMessages, "create", side_effect=real_time), \
+                patch.object(client.messages.batches, "create", wraps=client.messages.batches.create) as create:
+            states = run_batch_pipelines(runs, client=client, sleep=no_sleep)
+
+        for state in states:
+            assert state["completed_at"]
+            assert state["lesson_id"] and state["diagnostic_id"] and state["worksheet_id"]
+            assert not any("Batch" in error for error in state["errors"])
+        # Both pipelines' calls of a stage share a batch: lesson, then the diagnostic
+        # (a parallel branch) alongside the first of the three worksheet tiers
+        sizes = [len(call.kwargs["requests"]) for call in create.call_args_list]
+        assert sizes == [2, 4, 2, 2]
@@ -0,0 +1,179 @@
+"""
+Tests for latency metrics (registry, exposition, instrumentation hooks)
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+class TestMetricsRegistry:
+    """Registry, metric types and Prometheus text format."""
+
+    def test_histogram_exposition(self):
+        """Buckets are cumulative and labelled, with _sum and _count series."""
+        from src.utils.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="a")
+        histogram.observe(0.5, stage="a")
+        histogram.observe(5.0, stage="a")
+
+        text = registry.render()
+
+        assert "# TYPE stage_seconds histogram" in text
+        assert 'stage_seconds_bucket{stage="a",le="0.1"} 1' in text
+        assert 'stage_seconds_bucket{stage="a",le="1"} 2' in text
+        assert 'stage_seconds_bucket{stage="a",le="+Inf"} 3' in text
+        assert 'stage_seconds_count{stage="a"} 3' in text
+        assert histogram.sum(stage="a") == pytest.approx(5.55)
+
+        with pytest.raises(ValueError):
+            registry.counter("stage_seconds", "duplicate")
+
+    def test_disabled_metrics_are_no_ops(self):
+        """METRICS_ENABLED=false skips recording and leaves stage functions unwrapped."""
+        from src.utils import metrics
+
+        histogram = metrics.Histogram("noop_seconds", "No-op")
+
+        def stage():
+            return "done"
+
+        with patch.object(metrics, "METRICS_ENABLED", False):
+            histogram.observe(1.0)
+            with histogram.time():
+                pass
+            assert metrics.timed_stage("sync", "noop")(stage) is stage
+
+        assert histogram.count() == 0
+
+    def test_sqlalchemy_query_latency(self):
+        """Cursor events record statement latency by operation."""
+        from sqlalchemy import create_engine, text
+        from src.utils.metrics import DB_QUERY_DURATION, instrument_sqlalchemy
+
+        engine = create_engine("sqlite://")
+        instrument_sqlalchemy(engine)
+        instrument_sqlalchemy(engine)  # Idempotent
+        before = DB_QUERY_DURATION.count(operation="SELECT")
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("select 2"))
+
+        assert DB_QUERY_DURATION.count(operation="SELECT") == before + 2
+
+    def test_pool_checkout_wait_and_timeouts(self):
+        """The instrumented pool records checkout waits, timeouts and connections in use."""
+        from sqlalchemy import create_engine, exc, text
+        from src.student_model.database import InstrumentedQueuePool
+        from src.utils import metrics
+
+        engine = create_engine(
+            "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+        )
+        metrics.instrument_sqlalchemy(engine)
+        waits, timeouts = metrics.DB_POOL_CHECKOUT_WAIT.count(), metrics.DB_POOL_TIMEOUTS.value()
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert metrics.DB_POOL_CONNECTIONS.callback()[("in_use",)] >= 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        assert metrics.DB_POOL_CHECKOUT_WAIT.count() == waits + 2
+        assert metrics.DB_POOL_TIMEOUTS.value() == timeouts + 1
+        engine.dispose()
+
+
+class TestMetricsInstrumentation:
+    """Metrics recorded by the API, engines and WebSocket manager."""
+
+    def test_metrics_endpoint_labels_route_templates(self):
+        """/metrics serves Prometheus text; HTTP latency is keyed by route template."""
+        pytest.importorskip("fastapi")
+        from fastapi.testclient import TestClient
+        from src.api.main import app
+
+        client = TestClient(app)
+        client.get("/health")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+
+        from src.api.middleware import route_template
+
+        scope = {"endpoint": object(), "path": "/api/students/students/s_1/iep", "path_params": {"student_id": "s_1"}}
+        assert route_template(scope) == "/api/students/students/{student_id}/iep"
+        assert route_template({"path": "/nope"}) == "unmatched"
+
+    @patch("anthropic.Anthropic")
+    def test_llm_latency_and_ttft(self, mock_anthropic):
+        """Streamed engine calls record latency, time to first token and tokens."""
+        from src.engines.base_engine import BaseEngine
+        from src.utils.metrics import LLM_REQUEST_DURATION, LLM_TIME_TO_FIRST_TOKEN, LLM_TOKENS
+
+        class EchoEngine(BaseEngine):
+            def generate(self, **kwargs):
+                return {}
+
+        final = MagicMock()
+        final.usage.input_tokens = 100
+        final.usage.output_tokens = 20
+        final.content = [MagicMock(text="hello")]
+        stream = MagicMock()
+        stream.text_stream = iter(["hel", "lo"])
+        stream.get_final_message.return_value = final
+        mock_anthropic.return_value.messages.stream.return_value.__enter__.return_value = stream
+
+        engine = EchoEngine(student_model=MagicMock())
+        engine.stream_responses = True
+        labels = {"engine": "EchoEngine", "model": engine.model}
+
+        assert engine._call_claude("system", "user") == "hello"
+        assert LLM_REQUEST_DURATION.count(status="success", **labels) == 1
+        assert LLM_TIME_TO_FIRST_TOKEN.count(**labels) == 1
+        assert LLM_TOKENS.value(direction="output", **labels) == 20
+
+    def test_websocket_broadcast_latency_and_queue_depth(self):
+        """Broadcasts record delivery latency; queue depth returns to zero."""
+        from src.api.websocket.connection_manager import ConnectionManager
+        from src.utils.metrics import WEBSOCKET_BROADCAST_DURATION, WEBSOCKET_QUEUE_DEPTH
+
+        manager = ConnectionManager()
+        sockets = [AsyncMock(), AsyncMock()]
+        sockets[1].send_json.side_effect = RuntimeError("closed")
+        manager.active_connections["dashboard"]["class_1"] = list(sockets)
+        before = WEBSOCKET_BROADCAST_DURATION.count(connection_type="dashboard")
+
+        asyncio.run(manager.broadcast_to_type("dashboard", "class_1", {"type": "ping"}))
+
+        assert WEBSOCKET_BROADCAST_DURATION.count(connection_type="dashboard") == before + 1
+        assert WEBSOCKET_QUEUE_DEPTH.value() == 0
+        assert manager.get_connection_count("dashboard", "class_1") == 1
+
+    def test_event_loop_lag_and_memory(self):
+        """Blocking the loop shows up as lag; resident memory is exposed."""
+        import time
+
+        from src.utils.metrics import EVENT_LOOP_LAG, PROCESS_RESIDENT_MEMORY, monitor_event_loop_lag
+
+        before = EVENT_LOOP_LAG.count()
+
+        async def block_loop():
+            monitor = asyncio.create_task(monitor_event_loop_lag(interval=0.01))
+            await asyncio.sleep(0)
+            time.sleep(0.05)  # Synchronous work inside a coroutine
+            await asyncio.sleep(0.03)
+            monitor.cancel()
+
+        asyncio.run(block_loop())
+
+        assert EVENT_LOOP_LAG.count() > before
+        assert EVENT_LOOP_LAG.sum() >= 0.03
+        assert PROCESS_RESIDENT_MEMORY.value() > 0
@@ -0,0 +1,158 @@
+"""
+Tests for per-task model routing and adaptive max_tokens
+"""
+
+from unittest.mock import MagicMock, patch
+
+
+def _response(text, output_tokens, stop_reason="end_turn"):
+    response = MagicMock()
+    response.usage.input_tokens, response.usage.output_tokens = 100, output_tokens
+    response.content = [MagicMock(text=text)]
+    response.stop_reason = stop_reason
+    return response
+
+
+class TestRoutingPolicy:
+    """Model and max_tokens choices per task."""
+
+    def test_short_structured_tasks_use_fast_model(self):
+        from src.engines import model_routing
+
+        assert model_routing.model_for("diagnostic") == model_routing.MODEL_FAST
+        assert model_routing.model_for("worksheet_tier3") == model_routing.MODEL_FAST
+        assert model_routing.model_for("grade_short") == model_routing.MODEL_FAST
+        assert model_routing.model_for("lesson") == model_routing.MODEL_LARGE
+        assert model_routing.model_for("unit_plan") == model_routing.MODEL_LARGE
+        assert model_routing.model_for("unknown") == model_routing.MODEL_LARGE
+
+    def test_overrides_and_disabled_routing(self):
+        from src.engines import model_routing
+
+        with patch.object(model_routing, "MODEL_ROUTES", "diagnostic=large, lesson=claude-opus-4-1"):
+            assert model_routing.model_for("diagnostic") == model_routing.MODEL_LARGE
+            assert model_routing.model_for("lesson") == "claude-opus-4-1"
+
+        with patch.object(model_routing, "ROUTING_ENABLED", False):
+            assert model_routing.model_for("diagnostic") == model_routing.MODEL_LARGE
+
+    def test_max_tokens_scales_with_items_then_follows_history(self):
+        from src.engines import model_routing
+        from src.engines.model_routing import OutputLengths, max_tokens_for
+
+        lengths = OutputLengths()
+        three, source = max_tokens_for("worksheet_tier3", 3, lengths)
+        twenty, _ = max_tokens_for("worksheet_tier3", 20, lengths)
+        assert source == "prior"
+        assert model_routing.MAX_TOKENS_FLOOR <= three < twenty <= model_routing.MAX_TOKENS_CEILING
+        assert max_tokens_for("lesson", 100, lengths)[0] == model_routing.MAX_TOKENS_CEILING
+
+        # p95 of observed output per item, with headroom
+        for tokens in [100] * 19 + [200]:
+            lengths.record("diagnostic", tokens * 10, items=10)
+        with patch.object(model_routing, "MAX_TOKENS_FLOOR", 1):
+            expected = int(100 * 5 * model_routing.OUTPUT_TOKENS_HEADROOM)
+            assert max_tokens_for("diagnostic", 5, lengths) == (expected, "history")
+
+    def test_model_pricing(self):
+        from src.engines.model_routing import request_cost
+
+        assert request_cost("claude-sonnet-4-5-20250929", 1_000_000, 1_000_000) == 18.0
+        assert request_cost("claude-haiku-4-5-20251001", 1_000_000, 1_000_000) == 6.0
+
+
+class TestRoutedEngines:
+    """Engines request the routed model and sized max_tokens."""
+
+    def test_tier_3_worksheet_uses_fast_model(self, fake_llm_client):
+        from src.engines import model_routing
+        from src.engines.engine_2_worksheet_designer import WorksheetDesigner
+        from src.utils.metrics import LLM_ROUTED_CALLS
+
+        engine = WorksheetDesigner(student_model=MagicMock(), llm_client=fake_llm_client("WorksheetDesigner"))
+        before = LLM_ROUTED_CALLS.value(
+            engine="WorksheetDesigner", task="worksheet_tier3", model=model_routing.MODEL_FAST
+        )
+        with patch.object(engine.client.messages, "create", wraps=engine.client.messages.create) as create:
+            for tier in ("tier_1", "tier_3"):
+                questions = engine._generate_tier_questions(
+                    tier_level=tier,
+                    learning_objective="Explain photosynthesis",
+                    lesson_topic="Photosynthesis",
+                    grade_level="9",
+                    subject="Biology",
+                    num_questions=3,
+                    student_profiles=[],
+                    standards=None,
+                )
+                assert len(questions) == 3
+
+        large, fast = (call.kwargs for call in create.call_args_list)
+        assert large["model"] == model_routing.MODEL_LARGE
+        assert fast["model"] == model_routing.MODEL_FAST
+        assert fast["max_tokens"] < model_routing.MAX_TOKENS_CEILING
+        assert LLM_ROUTED_CALLS.value(
+            engine="WorksheetDesigner", task="worksheet_tier3", model=model_routing.MODEL_FAST
+        ) == before + 1
+
+    def test_truncated_response_is_requested_again_at_ceiling(self):
+        from src.engines import model_routing
+        from src.engines.base_engine import BaseEngine
+        from src.engines.model_routing import OutputLengths
+        from src.utils.metrics import LLM_OUTPUT_TRUNCATED
+
+        class EchoEngine(BaseEngine):
+            def generate(self, **kwargs):
+                return {}
+
+        client = MagicMock()
+        client.messages.create.side_effect = [_response("cut", 300, "max_tokens"), _response("whole", 900)]
+        engine = EchoEngine(student_model=MagicMock(), llm_client=client)
+        lengths = OutputLengths()
+        before = LLM_OUTPUT_TRUNCATED.value(task="diagnostic", model=model_routing.MODEL_FAST)
+
+        with patch.object(model_routing, "_output_lengths", lengths):
+            call_route = engine._route("diagnostic", 3)
+            assert engine._call_claude("system", "truncate me", call_route=call_route) == "whole"
+
+        first, second = (call.kwargs for call in client.messages.create.call_args_list)
+        assert first["max_tokens"] == call_route.max_tokens
+        assert second["max_tokens"] == model_routing.MAX_TOKENS_CEILING
+        assert LLM_OUTPUT_TRUNCATED.value(task="diagnostic", model=model_routing.MODEL_FAST) == before + 1
+        # Only the complete response enters the output history
+        assert lengths.per_item("diagnostic") == (300, 1)
+        # Both calls are charged at the fast model's prices
+        assert engine.get_cost_summary()["total_cost"] == round(
+            model_routing.request_cost(model_routing.MODEL_FAST, 200, 1200), 4
+        )
+
+    def test_short_answers_graded_by_fast_model(self, fake_llm_client):
+        from src.engines import model_routing
+        from src.grader.rubric_engine import ConstructedResponse, Rubric, RubricCriterion, RubricGradingEngine
+
+        rubric = Rubric(
+            rubric_id="r1",
+            rubric_type="analytic",
+            total_points=4.0,
+            criteria=[
+                RubricCriterion(
+                    criterion_name="Content Accuracy",
+                    description="Scientific accuracy",
+                    points_possible=4.0,
+                    levels={"4": "Exemplary", "1": "Beginning"},
+                )
+            ],
+        )
+        engine = RubricGradingEngine(llm_client=fake_llm_client("RubricGradingEngine"))
+
+        with patch.object(engine.client.messages, "create", wraps=engine.client.messages.create) as create:
+            for text in ("Light makes glucose.", "Light energy is captured by chlorophyll. " * 30):
+                engine.grade_response(
+                    "Explain photosynthesis.",
+                    ConstructedResponse(question_id="q1", student_id="s1", response_text=text),
+                    rubric,
+                )
+
+        short, long = (call.kwargs["model"] for call in create.call_args_list)
+        assert short == model_routing.MODEL_FAST
+        assert long == model_routing.MODEL_LARGE
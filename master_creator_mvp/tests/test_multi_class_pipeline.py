@@ -0,0 +1,108 @@
+"""
+Tests for multi-class pipeline runs sharing class-independent content
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+
+pytestmark = pytest.mark.file_db
+
+
+@pytest.fixture
+def two_classes(db_session, pipeline_db):
+    """Seed a second section of the course next to pipeline_db's class."""
+    from src.student_model.database import ClassModel, StudentModel
+    from src.student_model.schemas import GradeLevel, ReadingLevel, Subject
+
+    db_session.add(
+        ClassModel(
+            class_id="class_test_002",
+            class_name="Test Biology 102",
+            grade_level=GradeLevel.GRADE_9,
+            subject=Subject.SCIENCE,
+            teacher_id="teacher_test_001",
+        )
+    )
+    for i in range(1, 4):
+        db_session.add(
+            StudentModel(
+                student_id=f"student_2{i:02d}",
+                student_name=f"Section 2 Student {i}",
+                grade_level=GradeLevel.GRADE_9,
+                class_id="class_test_002",
+                reading_level=ReadingLevel.PROFICIENT,
+                learning_preferences=["Visual"],
+                has_iep=False,
+            )
+        )
+    db_session.commit()
+
+    return [pipeline_db["class_id"], "class_test_002"]
+
+
+def inputs(class_ids, topics=None):
+    from src.orchestration.pipeline import PipelineInput
+
+    topics = topics or ["Photosynthesis"] * len(class_ids)
+    return [
+        PipelineInput(
+            lesson_topic=topic,
+            grade_level="9",
+            subject="Science",
+            class_id=class_id,
+            concept_ids=["photosynthesis_process"],
+        )
+        for topic, class_id in zip(topics, class_ids)
+    ]
+
+
+class TestMultiClassPipeline:
+    """Sections of one course share the lesson, diagnostic items and tier questions."""
+
+    def test_sections_share_generations(self, two_classes, llm_calls):
+        from src.orchestration.pipeline import run_multi_class_pipeline
+
+        calls = llm_calls()
+        result = run_multi_class_pipeline(inputs(two_classes))
+
+        # Lesson, diagnostic and three worksheet tiers, once for both sections
+        assert llm_calls() == calls + 5
+        assert result.status == "success"
+        assert result.shared_generations == 1
+        first, second = result.classes
+        assert first.lesson.lesson_id == second.lesson.lesson_id
+        assert first.diagnostic.questions == second.diagnostic.questions
+        assert first.worksheets.tier_1.questions == second.worksheets.tier_1.questions
+
+        # Per-class work stays per class
+        assert [output.diagnostic.class_id for output in result.classes] == two_classes
+        assert first.diagnostic.diagnostic_id != second.diagnostic.diagnostic_id
+        assert first.worksheets.total_students == 6
+        assert second.worksheets.total_students == 3
+        assert first.lesson.class_context["total_students"] == 6
+        assert second.lesson.class_context["total_students"] == 3
+        assert result.total_cost >= result.shared_cost
+
+    def test_distinct_lessons_are_generated_separately(self, two_classes, llm_calls):
+        from src.orchestration.pipeline import run_multi_class_pipeline
+
+        calls = llm_calls()
+        topics = ["Photosynthesis", "Cellular Respiration"]
+        result = run_multi_class_pipeline(inputs(two_classes, topics))
+
+        assert llm_calls() == calls + 10
+        assert result.shared_generations == 2
+        first, second = result.classes
+        assert first.lesson.lesson_id != second.lesson.lesson_id
+
+    def test_failed_shared_generation_fails_its_sections(self, two_classes):
+        from src.engines.engine_1_lesson_architect import LessonArchitect
+        from src.orchestration.pipeline import run_multi_class_pipeline
+
+        with patch.object(LessonArchitect, "generate", side_effect=RuntimeError("overloaded")):
+            result = run_multi_class_pipeline(inputs(two_classes))
+
+        assert result.status == "failure"
+        assert all("overloaded" in output.errors[0] for output in result.classes)
@@ -0,0 +1,119 @@
+"""
+Tests for pipeline stage checkpoints and resume-from-stage
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+
+pytestmark = pytest.mark.file_db
+
+
+def run(seeded_class):
+    from src.orchestration.langgraph_pipeline import run_sync_pipeline
+
+    return run_sync_pipeline(
+        lesson_topic="Photosynthesis",
+        grade_level="9",
+        subject="Science",
+        class_id=seeded_class["class_id"],
+        concept_ids=["photosynthesis_process"],
+    )
+
+
+class TestPipelineCheckpoints:
+    """Stage checkpoints and resuming runs from them."""
+
+    def test_completed_stages_are_checkpointed(self, pipeline_db):
+        from src.content_storage.interface import ContentStorageInterface
+        from src.student_model.database import session_scope
+
+        state = run(pipeline_db)
+
+        with session_scope() as session:
+            checkpoints = ContentStorageInterface(session).list_pipeline_checkpoints(state["pipeline_id"])
+        stages = [checkpoint["stage"] for checkpoint in checkpoints]
+        assert stages[:3] == ["initialization", "class_snapshot", "lesson_architect"]
+        # Diagnostic and worksheets run in parallel branches
+        assert set(stages[3:5]) == {"diagnostic", "worksheet_designer"}
+        assert stages[5:] == ["iep_specialist", "finalize"]
+
+    def test_resume_reruns_only_later_stages(self, pipeline_db, llm_calls):
+        from src.orchestration.langgraph_pipeline import resume_sync_pipeline
+
+        state = run(pipeline_db)
+        calls = llm_calls()
+
+        resumed = resume_sync_pipeline(state["pipeline_id"], from_stage="iep_specialist")
+
+        # Lesson, diagnostic and worksheets come from the checkpoint; no Claude calls
+        assert llm_calls() == calls
+        assert resumed["pipeline_id"] == state["pipeline_id"]
+        assert resumed["lesson_id"] == state["lesson_id"]
+        assert resumed["worksheet_id"] == state["worksheet_id"]
+        assert resumed["modified_worksheet_id"]
+
+    def test_resume_defaults_to_failed_stage(self, pipeline_db, llm_calls):
+        from src.engines.engine_2_worksheet_designer import WorksheetDesigner
+        from src.orchestration.langgraph_pipeline import resume_sync_pipeline
+
+        with patch.object(WorksheetDesigner, "generate", side_effect=RuntimeError("overloaded")):
+            failed = run(pipeline_db)
+        assert failed["worksheet_id"] is None
+        calls = llm_calls()
+
+        resumed = resume_sync_pipeline(failed["pipeline_id"])
+
+        assert llm_calls() == calls + 3  # One call per worksheet tier
+        assert resumed["lesson_id"] == failed["lesson_id"]
+        assert resumed["worksheet_id"] and resumed["modified_worksheet_id"]
+        assert not any("Engine 2" in error for error in resumed["errors"])
+
+    def test_resume_reruns_every_failed_branch(self, pipeline_db, llm_calls):
+        from src.engines.engine_2_worksheet_designer import WorksheetDesigner
+        from src.engines.engine_5_diagnostic import DiagnosticEngine
+        from src.orchestration.langgraph_pipeline import load_resume_state, resume_sync_pipeline
+        from src.student_model.database import session_scope
+
+        with patch.object(WorksheetDesigner, "generate", side_effect=RuntimeError("overloaded")), \
+                patch.object(DiagnosticEngine, "generate", side_effect=RuntimeError("overloaded")):
+            failed = run(pipeline_db)
+        assert failed["diagnostic_id"] is None and failed["worksheet_id"] is None
+        with session_scope():
+            assert load_resume_state(failed["pipeline_id"])["resume_from"] == ["diagnostic", "worksheet_designer"]
+        calls = llm_calls()
+
+        resumed = resume_sync_pipeline(failed["pipeline_id"])
+
+        assert llm_calls() == calls + 4  # Diagnostic and the three worksheet tiers
+        assert resumed["lesson_id"] == failed["lesson_id"]
+        assert resumed["diagnostic_id"] and resumed["worksheet_id"] and resumed["modified_worksheet_id"]
+        assert not resumed["errors"]
+
+    def test_regenerate_single_tier(self, pipeline_db, llm_calls):
+        from src.orchestration.langgraph_pipeline import resume_sync_pipeline
+
+        state = run(pipeline_db)
+        calls = llm_calls()
+
+        regenerated = resume_sync_pipeline(state["pipeline_id"], regenerate_tiers=["tier_3"])
+
+        assert llm_calls() == calls + 1
+        old, new = state["worksheets"], regenerated["worksheets"]
+        assert new["worksheet_id"] != old["worksheet_id"]
+        assert new["tier_1"]["questions"] == old["tier_1"]["questions"]
+        assert new["tier_2"]["questions"] == old["tier_2"]["questions"]
+        assert regenerated["regenerate_tiers"] is None
+
+    def test_invalid_resume_requests(self, pipeline_db):
+        from src.orchestration.langgraph_pipeline import resume_sync_pipeline
+
+        with pytest.raises(ValueError, match="No checkpoint"):
+            resume_sync_pipeline("pipeline_missing")
+
+        state = run(pipeline_db)
+        with pytest.raises(ValueError, match="Unknown stage"):
+            resume_sync_pipeline(state["pipeline_id"], from_stage="grading")
+        with pytest.raises(ValueError, match="Unknown tiers"):
+            resume_sync_pipeline(state["pipeline_id"], regenerate_tiers=["tier_4"])
@@ -0,0 +1,177 @@
+"""
+Tests for the process-wide LLM rate limiter and priority scheduler
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _scheduler(**kwargs):
+    """Scheduler with an empty request bucket refilling 10 requests/second."""
+    from src.engines.rate_limiter import LLMScheduler
+
+    options = dict(requests_per_minute=600, tokens_per_minute=6_000_000, max_wait=5)
+    options.update(kwargs)
+    scheduler = LLMScheduler(**options)
+    scheduler.requests.level = 0
+    return scheduler
+
+
+def _enqueue(scheduler, order, priority, tenant, label):
+    """Start a thread that acquires, then wait until it's queued."""
+    queued = len(scheduler._waiting)
+
+    def run():
+        scheduler.acquire(100, priority=priority, tenant=tenant)
+        order.append(label)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while len(scheduler._waiting) == queued:
+        time.sleep(0.001)
+    return thread
+
+
+def _rate_limit_error(headers):
+    error = RuntimeError("rate limited")
+    error.status_code = 429
+    error.response = MagicMock(headers=headers)
+    return error
+
+
+class TestLLMScheduler:
+    """Priority lanes, fair sharing and 429 handling."""
+
+    def test_higher_priority_lanes_dispatch_first(self):
+        """Queued batch work waits behind later interactive and pipeline calls."""
+        scheduler = _scheduler()
+        order = []
+
+        threads = [
+            _enqueue(scheduler, order, "batch", "d1", "batch"),
+            _enqueue(scheduler, order, "pipeline", "d1", "pipeline"),
+            _enqueue(scheduler, order, "interactive", "d1", "interactive"),
+        ]
+        for thread in threads:
+            thread.join(5)
+
+        assert order == ["interactive", "pipeline", "batch"]
+
+    def test_tenants_share_a_lane_fairly(self):
+        """A district with a backlog doesn't block another district in the same lane."""
+        scheduler = _scheduler()
+        order = []
+
+        threads = [_enqueue(scheduler, order, "batch", "district_a", f"a{i}") for i in range(3)]
+        threads.append(_enqueue(scheduler, order, "batch", "district_b", "b0"))
+        for thread in threads:
+            thread.join(5)
+
+        assert order[:2] == ["a0", "b0"]
+        assert sorted(order) == ["a0", "a1", "a2", "b0"]
+
+    def test_interactive_reserve_is_kept_from_lower_lanes(self):
+        """Only interactive calls may take the last LLM_RATE_LIMIT_INTERACTIVE_RESERVE of tokens."""
+        from src.engines.rate_limiter import LLMQueueTimeout
+
+        scheduler = _scheduler(requests_per_minute=6000, tokens_per_minute=60, max_wait=0.05)
+        scheduler.requests.level = 100
+        scheduler.tokens.level = 10
+
+        with pytest.raises(LLMQueueTimeout):
+            scheduler.acquire(5, priority="batch")
+        grant = scheduler.acquire(5, priority="interactive")
+
+        assert grant.priority == "interactive"
+        assert scheduler.tokens.level <= 5.1
+
+    def test_queue_wait_stops_at_stage_deadline(self):
+        """A call doesn't queue past its stage deadline, even within max_wait."""
+        from src.engines.resilience import LLMDeadlineExceeded, llm_deadline
+
+        scheduler = _scheduler(requests_per_minute=6, max_wait=5)
+        start = time.monotonic()
+
+        with llm_deadline(0.05), pytest.raises(LLMDeadlineExceeded):
+            scheduler.acquire(5, priority="pipeline")
+
+        assert time.monotonic() - start < 1
+        assert scheduler._waiting == []
+
+    def test_usage_settles_token_estimate(self):
+        """The bucket is charged the actual tokens, not the max_tokens estimate."""
+        scheduler = _scheduler(tokens_per_minute=100_000)
+        scheduler.requests.level = 10
+        response = MagicMock()
+        response.usage.input_tokens, response.usage.output_tokens = 300, 200
+        request = {"system": "s", "messages": [{"role": "user", "content": "u"}], "max_tokens": 4000}
+
+        assert scheduler.dispatch(request, lambda: response, "Test") is response
+        assert 99_400 < scheduler.tokens.level <= 99_500 + 1
+
+    def test_failed_call_returns_its_estimate(self):
+        """Errors other than 429 don't keep the token estimate deducted."""
+        scheduler = _scheduler(tokens_per_minute=100_000)
+        scheduler.requests.level = 10
+
+        with pytest.raises(TimeoutError):
+            scheduler.dispatch({"max_tokens": 4000}, MagicMock(side_effect=TimeoutError("upstream")), "Test")
+        assert scheduler.tokens.level > 99_900
+
+    def test_rate_limited_call_pauses_dispatch_and_requeues(self):
+        """A 429 pauses the scheduler for retry-after, then the call is retried."""
+        from src.utils.metrics import LLM_RATE_LIMITED
+
+        scheduler = _scheduler()
+        scheduler.requests.level = 10
+        before = LLM_RATE_LIMITED.value(engine="Test")
+        response = MagicMock()
+        response.usage.input_tokens, response.usage.output_tokens = 10, 10
+        send = MagicMock(side_effect=[_rate_limit_error({"retry-after": "0.2"}), response])
+
+        start = time.monotonic()
+        assert scheduler.dispatch({"max_tokens": 10}, send, "Test") is response
+
+        assert send.call_count == 2
+        assert time.monotonic() - start >= 0.2
+        assert LLM_RATE_LIMITED.value(engine="Test") == before + 1
+
+    def test_other_errors_and_exhausted_retries_raise(self):
+        scheduler = _scheduler(max_retries=1)
+        scheduler.requests.level = 10
+
+        with pytest.raises(ValueError):
+            scheduler.dispatch({}, MagicMock(side_effect=ValueError("bad request")), "Test")
+
+        send = MagicMock(side_effect=_rate_limit_error({"retry-after-ms": "10"}))
+        with pytest.raises(RuntimeError, match="rate limited"):
+            scheduler.dispatch({}, send, "Test")
+        assert send.call_count == 2
+
+
+class TestCallerContext:
+    """Lanes and tenants come from the caller's context."""
+
+    def test_llm_priority_nests_and_restores(self):
+        from src.engines.rate_limiter import DEFAULT_PRIORITY, current_priority, current_tenant, llm_priority
+
+        with llm_priority("interactive", tenant="district_a"):
+            with llm_priority("batch"):
+                assert (current_priority(), current_tenant()) == ("batch", "district_a")
+            assert current_priority() == "interactive"
+
+        assert current_priority() == DEFAULT_PRIORITY
+        with pytest.raises(ValueError, match="Unknown LLM priority"):
+            with llm_priority("urgent"):
+                pass
+
+    def test_retry_after_header_formats(self):
+        from src.engines.rate_limiter import retry_after_seconds
+
+        assert retry_after_seconds(_rate_limit_error({"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(_rate_limit_error({"retry-after": "7"})) == 7.0
+        assert retry_after_seconds(_rate_limit_error({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+        assert retry_after_seconds(_rate_limit_error({}), attempt=3) == 8.0
@@ -0,0 +1,218 @@
+"""
+Tests for LLM call retries, hedging, circuit breakers and stage deadlines
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _error(status):
+    error = RuntimeError(f"upstream {status}")
+    error.status_code = status
+    return error
+
+
+@pytest.fixture
+def fast_retries():
+    """Millisecond backoff so retries don't slow the suite."""
+    from src.engines import resilience
+
+    with patch.object(resilience, "RETRY_BASE_SECONDS", 0.001), patch.object(resilience, "RETRY_MAX_SECONDS", 0.001):
+        yield
+
+
+class TestRetries:
+    """Backoff retries of transient errors."""
+
+    def test_transient_overload_is_retried_through_engine(self, fast_retries):
+        """A 529 from Claude no longer fails the call."""
+        from src.engines.base_engine import BaseEngine
+        from src.utils.metrics import LLM_RETRIES
+
+        class EchoEngine(BaseEngine):
+            def generate(self, **kwargs):
+                return {}
+
+        response = MagicMock()
+        response.usage.input_tokens, response.usage.output_tokens = 10, 5
+        response.content = [MagicMock(text="hello")]
+        client = MagicMock()
+        client.messages.create.side_effect = [_error(529), response]
+        engine = EchoEngine(student_model=MagicMock(), llm_client=client)
+        engine.model = "model-retry"
+        before = LLM_RETRIES.value(engine="EchoEngine", reason="529")
+
+        assert engine._call_claude("system", "user") == "hello"
+        assert client.messages.create.call_count == 2
+        assert LLM_RETRIES.value(engine="EchoEngine", reason="529") == before + 1
+
+    def test_client_errors_are_not_retried(self, fast_retries):
+        from src.engines.resilience import call_with_resilience
+
+        send = MagicMock(side_effect=_error(400))
+
+        with pytest.raises(RuntimeError, match="upstream 400"):
+            call_with_resilience(send, engine="Test", model="model-400")
+        assert send.call_count == 1
+
+    def test_retries_exhausted_raise_last_error(self, fast_retries):
+        from src.engines.resilience import call_with_resilience
+
+        send = MagicMock(side_effect=ConnectionError("reset"))
+
+        with pytest.raises(ConnectionError):
+            call_with_resilience(send, engine="Test", model="model-reset", max_attempts=3)
+        assert send.call_count == 3
+
+
+class TestCircuitBreaker:
+    """Fail fast while the upstream is degraded."""
+
+    def test_opens_fails_fast_and_recovers_through_probe(self):
+        from src.engines.resilience import CircuitBreaker, CircuitOpenError
+        from src.utils.metrics import LLM_CIRCUIT_REJECTIONS, LLM_CIRCUIT_STATE
+
+        now = [0.0]
+        breaker = CircuitBreaker("model-breaker", failure_threshold=2, reset_seconds=30, clock=lambda: now[0])
+        before = LLM_CIRCUIT_REJECTIONS.value(model="model-breaker")
+
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert LLM_CIRCUIT_STATE.value(model="model-breaker") == 2
+        assert LLM_CIRCUIT_REJECTIONS.value(model="model-breaker") == before + 1
+
+        # After the reset period one probe goes through; others still fail fast
+        now[0] = 31
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+
+        breaker.before_call()
+        assert breaker.state == "closed"
+        assert LLM_CIRCUIT_STATE.value(model="model-breaker") == 0
+
+    def test_open_circuit_is_not_retried(self, fast_retries):
+        from src.engines.resilience import CircuitOpenError, call_with_resilience, get_circuit_breaker
+
+        breaker = get_circuit_breaker("model-open")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        send = MagicMock()
+
+        with pytest.raises(CircuitOpenError):
+            call_with_resilience(send, engine="Test", model="model-open")
+        send.assert_not_called()
+
+
+class TestHedgingAndDeadlines:
+    """Tail-latency hedges and per-stage deadlines."""
+
+    def test_slow_call_is_hedged_and_first_response_wins(self):
+        from src.engines.resilience import HedgePolicy, call_with_resilience
+        from src.utils.metrics import LLM_HEDGED_CALLS
+
+        policy = HedgePolicy(min_delay=0.02, min_samples=1, budget=1.0)
+        policy.record("Test", "model-hedge", 0.01)
+        calls = []
+
+        def send(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                time.sleep(1.0)
+                return "slow"
+            return "fast"
+
+        before = LLM_HEDGED_CALLS.value(engine="Test", outcome="won")
+        start = time.monotonic()
+
+        assert call_with_resilience(send, engine="Test", model="model-hedge", policy=policy) == "fast"
+        assert time.monotonic() - start < 0.5
+        assert len(calls) == 2
+        assert LLM_HEDGED_CALLS.value(engine="Test", outcome="won") == before + 1
+
+    def test_hedge_timeout_is_the_time_left_when_it_starts(self):
+        """A hedge sent later under a stage deadline gets a shorter request timeout."""
+        from src.engines.resilience import HedgePolicy, call_with_resilience, llm_deadline
+
+        policy = HedgePolicy(min_delay=0.1, min_samples=1, budget=1.0)
+        policy.record("Test", "model-late", 0.01)
+        timeouts = []
+
+        def send(timeout):
+            timeouts.append(timeout)
+            if len(timeouts) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        with llm_deadline(5):
+            result = call_with_resilience(send, engine="Test", model="model-late", policy=policy)
+
+        assert result == "fast"
+        primary, hedge = timeouts
+        assert primary - hedge >= 0.09
+
+    def test_concurrent_hedge_responses_are_all_accounted(self):
+        """Usage recorded from racing hedge threads is never lost."""
+        import threading
+
+        from src.engines.base_engine import BaseEngine
+        from src.engines.model_routing import request_cost
+
+        class HedgeAccountingEngine(BaseEngine):
+            def generate(self, **kwargs):
+                return {}
+
+        engine = HedgeAccountingEngine(student_model=MagicMock(), llm_client=MagicMock())
+        response = MagicMock()
+        response.usage.input_tokens, response.usage.output_tokens = 3, 2
+
+        def record():
+            for _ in range(500):
+                engine._record_usage(response, "claude-sonnet-4-5-20250929")
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert (engine.total_input_tokens, engine.total_output_tokens) == (12_000, 8_000)
+        expected = 4000 * request_cost("claude-sonnet-4-5-20250929", 3, 2)
+        assert engine.total_cost == pytest.approx(expected)
+
+    def test_hedges_are_bounded_by_budget(self):
+        from src.engines.resilience import HedgePolicy, call_with_resilience
+
+        policy = HedgePolicy(min_delay=0.01, min_samples=1, budget=0.0)
+        policy.record("Test", "model-budget", 0.001)
+        send = MagicMock(side_effect=lambda timeout: time.sleep(0.05) or "done")
+
+        assert call_with_resilience(send, engine="Test", model="model-budget", policy=policy) == "done"
+        assert send.call_count == 1
+
+    def test_stage_deadline_bounds_timeouts_and_retries(self, fast_retries):
+        from src.engines.resilience import LLMDeadlineExceeded, call_with_resilience, llm_deadline, remaining_time
+
+        timeouts = []
+
+        def send(timeout):
+            timeouts.append(timeout)
+            time.sleep(0.03)
+            raise _error(503)
+
+        with llm_deadline(0.05):
+            with llm_deadline(60):
+                assert remaining_time() <= 0.05
+            with pytest.raises((RuntimeError, LLMDeadlineExceeded)):
+                call_with_resilience(send, engine="Test", model="model-deadline", max_attempts=10)
+
+        assert 1 <= len(timeouts) <= 3
+        assert all(t <= 0.05 for t in timeouts)
+        assert remaining_time() is None
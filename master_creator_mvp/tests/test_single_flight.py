@@ -0,0 +1,258 @@
+"""
+Tests for single-flight coalescing of identical LLM calls
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _slow(result, started=None, release=None, calls=None):
+    """fn that records its call and blocks until released."""
+
+    def fn():
+        if calls is not None:
+            calls.append(1)
+        if started is not None:
+            started.set()
+        if release is not None:
+            release.wait(5)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    return fn
+
+
+class TestSingleFlight:
+    """In-process coalescing."""
+
+    def test_concurrent_identical_calls_share_one_upstream_call(self):
+        """Followers wait for the leader and get its result."""
+        from src.engines.single_flight import SingleFlight
+
+        group = SingleFlight()
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            leader = pool.submit(group.do, "key", _slow("lesson", started, release, calls))
+            started.wait(5)
+            followers = [pool.submit(group.do, "key", _slow("other")) for _ in range(4)]
+            time.sleep(0.05)
+            release.set()
+
+            assert leader.result() == ("lesson", None)
+            assert [f.result() for f in followers] == [("lesson", "process")] * 4
+
+        assert len(calls) == 1
+        assert group.in_flight() == 0
+
+    def test_leader_error_is_shared_and_key_released(self):
+        """Followers see the leader's exception; the next call runs again."""
+        from src.engines.single_flight import SingleFlight
+
+        group = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(group.do, "key", _slow(RuntimeError("overloaded"), started, release))
+            started.wait(5)
+            follower = pool.submit(group.do, "key", _slow("unused"))
+            time.sleep(0.05)
+            release.set()
+
+            with pytest.raises(RuntimeError, match="overloaded"):
+                leader.result()
+            with pytest.raises(RuntimeError, match="overloaded"):
+                follower.result()
+
+        assert group.do("key", lambda: "retried") == ("retried", None)
+
+    def test_follower_wait_is_bounded_by_its_deadline(self):
+        """A follower gives up at its own stage deadline; the leader keeps going."""
+        from src.engines.resilience import LLMDeadlineExceeded, llm_deadline
+        from src.engines.single_flight import SingleFlight
+
+        group = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def follow():
+            with llm_deadline(0.05):
+                return group.do("key", _slow("unused"))
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(group.do, "key", _slow("lesson", started, release))
+            started.wait(5)
+            follower = pool.submit(follow)
+
+            with pytest.raises(LLMDeadlineExceeded):
+                follower.result(timeout=5)
+            release.set()
+            assert leader.result() == ("lesson", None)
+
+    def test_follower_retries_after_caller_specific_error(self):
+        """A leader's own deadline or queue timeout isn't passed on to followers."""
+        from src.engines.rate_limiter import LLMQueueTimeout
+        from src.engines.single_flight import SingleFlight
+
+        group = SingleFlight()
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            queued = _slow(LLMQueueTimeout("queued too long"), started, release)
+            leader = pool.submit(group.do, "key", queued)
+            started.wait(5)
+            follower = pool.submit(group.do, "key", _slow("retried", calls=calls))
+            time.sleep(0.05)
+            release.set()
+
+            with pytest.raises(LLMQueueTimeout):
+                leader.result()
+            assert follower.result() == ("retried", None)
+
+        assert len(calls) == 1
+
+    def test_request_key_normalizes_whitespace_only(self):
+        """Whitespace differences coalesce; different prompts or parameters don't."""
+        from src.engines.single_flight import request_key
+
+        base = {
+            "model": "m",
+            "max_tokens": 100,
+            "temperature": 0.7,
+            "system": "You are\n  a planner",
+            "messages": [{"role": "user", "content": "Photosynthesis,  grade 9"}],
+        }
+        spaced = dict(base, system="You are a planner ", messages=[{"role": "user", "content": "Photosynthesis, grade 9 "}])
+        other_topic = dict(base, messages=[{"role": "user", "content": "Mitosis, grade 9"}])
+        other_temperature = dict(base, temperature=0.2)
+
+        assert request_key(base) == request_key(spaced)
+        assert request_key(base) != request_key(other_topic)
+        assert request_key(base) != request_key(other_temperature)
+
+    def test_engines_coalesce_and_report_metric(self):
+        """Two engines making the same call concurrently reach the client once."""
+        from src.engines import base_engine
+        from src.engines.base_engine import BaseEngine
+        from src.engines.single_flight import SingleFlight
+        from src.utils.metrics import LLM_COALESCED_CALLS
+
+        class EchoEngine(BaseEngine):
+            def generate(self, **kwargs):
+                return {}
+
+        started, release = threading.Event(), threading.Event()
+
+        def create(**request):
+            started.set()
+            release.wait(5)
+            response = MagicMock()
+            response.usage.input_tokens, response.usage.output_tokens = 100, 20
+            response.content = [MagicMock(text="hello")]
+            return response
+
+        client = MagicMock()
+        client.messages.create.side_effect = create
+        engines = [EchoEngine(student_model=MagicMock(), llm_client=client) for _ in range(2)]
+        before = LLM_COALESCED_CALLS.value(engine="EchoEngine", scope="process")
+
+        with patch.object(base_engine, "get_single_flight", return_value=SingleFlight()):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                first = pool.submit(engines[0]._call_claude, "system", "user")
+                started.wait(5)
+                second = pool.submit(engines[1]._call_claude, "system", "user")
+                time.sleep(0.05)
+                release.set()
+                assert first.result() == second.result() == "hello"
+
+        assert client.messages.create.call_count == 1
+        assert sorted(e.total_output_tokens for e in engines) == [0, 20]
+        assert LLM_COALESCED_CALLS.value(engine="EchoEngine", scope="process") == before + 1
+
+
+class TestDatabaseFlights:
+    """Cross-worker coalescing through lease rows."""
+
+    @staticmethod
+    def _session_factory(tmp_path):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from src.content_storage.models import LLMInflightCallModel
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'flights.db'}", connect_args={"check_same_thread": False})
+        LLMInflightCallModel.__table__.create(engine)
+        return sessionmaker(bind=engine)
+
+    def test_other_worker_waits_for_lease_holder(self, tmp_path):
+        """A second worker polls the lease row and uses the holder's response."""
+        from src.engines.single_flight import DatabaseFlights
+
+        factory = self._session_factory(tmp_path)
+        worker_a = DatabaseFlights(factory, poll_interval=0.01)
+        worker_b = DatabaseFlights(factory, poll_interval=0.01)
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            holder = pool.submit(worker_a.run, "key", _slow("lesson", started, release, calls))
+            started.wait(5)
+            waiter = pool.submit(worker_b.run, "key", _slow("duplicate", calls=calls))
+            time.sleep(0.05)
+            release.set()
+
+            assert holder.result() == ("lesson", None)
+            assert waiter.result() == ("lesson", "database")
+
+        assert len(calls) == 1
+
+    def test_failed_call_releases_lease(self, tmp_path):
+        """A failing holder deletes its row so the next call can lead."""
+        from src.engines.single_flight import DatabaseFlights
+
+        flights = DatabaseFlights(self._session_factory(tmp_path), poll_interval=0.01)
+
+        with pytest.raises(RuntimeError):
+            flights.run("key", _slow(RuntimeError("overloaded")))
+
+        assert flights.run("key", lambda: "retried") == ("retried", None)
+
+    def test_waiting_worker_stops_at_its_deadline(self, tmp_path):
+        """Polling another worker's lease ends at the caller's stage deadline."""
+        from src.engines.resilience import LLMDeadlineExceeded, llm_deadline
+        from src.engines.single_flight import DatabaseFlights
+
+        factory = self._session_factory(tmp_path)
+        worker_a = DatabaseFlights(factory, poll_interval=0.01)
+        worker_b = DatabaseFlights(factory, poll_interval=0.01)
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        def wait_for_holder():
+            with llm_deadline(0.1):
+                return worker_b.run("key", _slow("duplicate", calls=calls))
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            holder = pool.submit(worker_a.run, "key", _slow("lesson", started, release))
+            started.wait(5)
+            waiter = pool.submit(wait_for_holder)
+
+            with pytest.raises(LLMDeadlineExceeded):
+                waiter.result(timeout=5)
+            release.set()
+            assert holder.result() == ("lesson", None)
+
+        assert calls == []
+
+    def test_missing_table_falls_back_to_direct_call(self, tmp_path):
+        """Without the lease table the call still goes through."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from src.engines.single_flight import DatabaseFlights
+
+        factory = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+
+        assert DatabaseFlights(factory).run("key", lambda: "direct") == ("direct", None)
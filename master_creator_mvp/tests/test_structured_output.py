@@ -0,0 +1,141 @@
+"""
+Tests for structured (tool-use) engine output and fragment repair
+"""
+
+import json
+from typing import List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+
+class Item(BaseModel):
+    name: str
+    points: float
+
+
+class ItemSet(BaseModel):
+    title: str
+    items: List[Item]
+    note: Optional[str] = None
+
+
+def _output(**kwargs):
+    from src.engines.structured_output import StructuredOutput
+
+    return StructuredOutput("record_items", ItemSet, "Record the items", **kwargs)
+
+
+def _items(n, bad=()):
+    return [{"name": f"item {i}"} if i in bad else {"name": f"item {i}", "points": float(i)} for i in range(n)]
+
+
+class TestStructuredOutput:
+    """Validation, fragment repair and the outcome metric."""
+
+    def test_tool_schema_is_self_contained(self):
+        """Nested models are inlined so the tool input_schema has no $refs."""
+        output = _output()
+
+        assert output.tool["name"] == "record_items"
+        assert "$defs" not in output.schema and "$ref" not in json.dumps(output.schema)
+        assert output.schema["properties"]["items"]["items"]["required"] == ["name", "points"]
+
+    def test_valid_response_makes_no_repair_call(self):
+        from src.utils.metrics import LLM_STRUCTURED_OUTPUTS
+
+        before = LLM_STRUCTURED_OUTPUTS.value(engine="Test", outcome="valid")
+        call = MagicMock()
+
+        result, repaired = _output().parse(json.dumps({"title": "t", "items": _items(3)}), "prompt", call, "Test")
+
+        assert [i.points for i in result.items] == [0.0, 1.0, 2.0]
+        assert repaired == []
+        call.assert_not_called()
+        assert LLM_STRUCTURED_OUTPUTS.value(engine="Test", outcome="valid") == before + 1
+
+    def test_only_invalid_item_is_repaired(self):
+        """A bad list item is re-requested against the item schema and spliced back in."""
+        from src.engines.structured_output import REPAIR_TOOL_NAME
+        from src.utils.metrics import LLM_STRUCTURED_OUTPUTS
+
+        before = LLM_STRUCTURED_OUTPUTS.value(engine="Test", outcome="repaired")
+        calls = []
+
+        def call(prompt, tool):
+            calls.append((prompt, tool))
+            return json.dumps({"value": {"name": "item 1", "points": 9.0}})
+
+        data = {"title": "t", "items": _items(3, bad={1})}
+        result, repaired = _output().parse(json.dumps(data), "Make 3 items", call, "Test")
+
+        assert repaired == ["items[1]"]
+        assert [i.points for i in result.items] == [0.0, 9.0, 2.0]
+        prompt, tool = calls[0]
+        assert tool["name"] == REPAIR_TOOL_NAME
+        assert tool["input_schema"]["properties"]["value"]["required"] == ["name", "points"]
+        assert prompt.startswith("Make 3 items") and "items[1].points" in prompt
+        assert LLM_STRUCTURED_OUTPUTS.value(engine="Test", outcome="repaired") == before + 1
+
+    def test_many_invalid_items_repair_whole_list(self):
+        from src.engines.structured_output import STRUCTURED_MAX_FRAGMENTS
+
+        bad = set(range(STRUCTURED_MAX_FRAGMENTS + 1))
+        tools = []
+
+        def call(prompt, tool):
+            tools.append(tool)
+            return json.dumps({"value": _items(len(bad))})
+
+        data = {"title": "t", "items": _items(len(bad), bad=bad)}
+        result, repaired = _output().parse(json.dumps(data), "prompt", call, "Test")
+
+        assert repaired == ["items"]
+        assert len(tools) == 1 and tools[0]["input_schema"]["properties"]["value"]["type"] == "array"
+        assert len(result.items) == len(bad)
+
+    def test_unparseable_response_raises_after_repairs(self):
+        """No placeholder content: the call fails once max_repairs rounds are used."""
+        from src.engines.structured_output import StructuredOutputError
+        from src.utils.metrics import LLM_STRUCTURED_OUTPUTS
+
+        before = LLM_STRUCTURED_OUTPUTS.value(engine="Test", outcome="failed")
+        call = MagicMock(return_value="not json")
+
+        with pytest.raises(StructuredOutputError, match="record_items output invalid after 2 repair rounds"):
+            _output(max_repairs=2).parse("Here is your lesson: {", "prompt", call, "Test")
+
+        assert call.call_count == 2
+        assert LLM_STRUCTURED_OUTPUTS.value(engine="Test", outcome="failed") == before + 1
+
+    def test_engine_forces_tool_and_repairs_through_client(self):
+        """_call_claude_structured sends the tool and routes repairs through the same client."""
+        from src.engines.engine_5_diagnostic import DiagnosticEngine
+        from src.engines.llm_backends import FakeToolUseBlock, FakeUsage, create_llm_client
+
+        fake = create_llm_client("DiagnosticEngine", backend="fake", latency_ms=0, latency_jitter_ms=0)
+        real_create = fake.messages.create
+        requests = []
+
+        def create(**request):
+            requests.append(request)
+            message = real_create(**request)
+            if len(requests) == 1:
+                del message.content[0].input["questions"][0]["question_text"]
+            else:
+                question = real_create(**requests[0]).content[0].input["questions"][0]
+                message.content = [FakeToolUseBlock(name=request["tool_choice"]["name"], input={"value": question})]
+                message.usage = FakeUsage(input_tokens=10, output_tokens=10)
+            return message
+
+        client = MagicMock()
+        client.messages.create.side_effect = create
+        engine = DiagnosticEngine(student_model=MagicMock(), llm_client=client)
+
+        questions = engine._generate_questions(["Explain photosynthesis"], ["photosynthesis"], 2, "9", "Biology")
+
+        assert len(questions) == 2 and questions[0].question_text
+        assert requests[0]["tool_choice"] == {"type": "tool", "name": "record_diagnostic_questions"}
+        assert requests[1]["tool_choice"]["name"] == "repair_output"
+        assert len(requests) == 2
@@ -4,6 +4,8 @@ Student Model Tests
 Tests for Student Model Interface and data operations.
 """
 
+import threading
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
@@ -367,3 +369,833 @@ Carlos Martinez,9,true,grade_level"""
         assert result.successful_imports == 8
         assert result.failed_imports == 2
         assert len(result.errors) == 2
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# READ-THROUGH CACHE TESTS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+class TestReadThroughCache:
+    """Test profile/IEP read-through caching in StudentModelInterface."""
+
+    def _interface(self, db_session, shared_cache=None):
+        from src.student_model.interface import StudentModelInterface
+
+        return StudentModelInterface(db_session=db_session, vector_store=MagicMock(), shared_cache=shared_cache)
+
+    def test_repeated_profile_lookup_hits_identity_cache(self, db_session, seeded_class):
+        """Second lookup of the same student is served from memory."""
+        interface = self._interface(db_session)
+
+        first = interface.get_student_profile("student_001")
+        second = interface.get_student_profile("student_001")
+
+        assert first is second
+        stats = interface.get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["shared"] is None
+
+    def test_missing_iep_is_cached(self, db_session, seeded_class):
+        """Students without an IEP are cached as None (no repeat query)."""
+        interface = self._interface(db_session)
+
+        assert interface.get_iep_accommodations("student_001") is None
+        assert interface.get_iep_accommodations("student_001") is None
+        assert interface.get_cache_stats()["hits"] == 1
+
+    def test_iep_update_invalidates(self, db_session, seeded_class):
+        """update_iep_accommodations drops the stale cached IEP."""
+        from src.student_model.schemas import IEPUpdate
+
+        interface = self._interface(db_session)
+        before = interface.get_iep_accommodations("student_003")
+        assert before.modifications == {"reduced_content": False}
+
+        updated = interface.update_iep_accommodations(
+            "student_003", IEPUpdate(modifications={"reduced_content": True})
+        )
+
+        assert updated.modifications == {"reduced_content": True}
+        assert interface.get_iep_accommodations("student_003").modifications == {"reduced_content": True}
+
+    def test_shared_cache_across_interfaces(self, db_session, seeded_class):
+        """Process-level TTL cache serves lookups made by other interface instances."""
+        from src.student_model.cache import TTLCache
+
+        shared = TTLCache(ttl_seconds=60)
+        self._interface(db_session, shared).get_iep_accommodations("student_003")
+
+        other = self._interface(db_session, shared)
+        other.get_iep_accommodations("student_003")
+
+        assert other.get_cache_stats()["hits"] == 1
+        assert shared.get_stats()["hits"] == 1
+
+    def test_shared_cache_entries_are_isolated(self, db_session, seeded_class):
+        """Mutating a profile from the shared cache doesn't change what other requests get."""
+        from src.student_model.cache import TTLCache
+
+        shared = TTLCache(ttl_seconds=60)
+        first = self._interface(db_session, shared).get_student_profile("student_002")
+        first.student_name = "Changed"
+
+        second = self._interface(db_session, shared).get_student_profile("student_002")
+        second.learning_preferences.append("Kinesthetic")
+
+        third = self._interface(db_session, shared).get_student_profile("student_002")
+        assert third.student_name == "Student 2"
+        assert third.learning_preferences == ["Visual"]
+        assert shared.get_stats()["hits"] == 2
+
+    def test_mastery_update_invalidates_shared_cache(self, db_session, seeded_class):
+        """Writes evict the student from the shared cache too."""
+        from src.student_model.cache import MISSING, TTLCache
+
+        shared = TTLCache(ttl_seconds=60)
+        interface = self._interface(db_session, shared)
+        interface.get_student_profile("student_002")
+
+        interface.update_mastery_estimate("student_002", "photosynthesis_process", 0.5)
+
+        assert shared.get(("profile", "student_002")) is MISSING
+
+    def test_ttl_expiry(self):
+        """Entries expire after the TTL."""
+        from src.student_model.cache import MISSING, TTLCache
+
+        cache = TTLCache(ttl_seconds=60)
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+        with patch("src.student_model.cache.time.monotonic", return_value=10**9):
+            assert cache.get("key") is MISSING
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# CLASS SNAPSHOT TESTS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+class TestClassSnapshot:
+    """Test per-class roster snapshot shared across engines."""
+
+    def _interface(self, db_session):
+        from src.student_model.interface import StudentModelInterface
+
+        return StudentModelInterface(db_session=db_session, vector_store=MagicMock())
+
+    def test_snapshot_contents(self, db_session, seeded_class):
+        """Snapshot holds roster, IEPs and mastery for the class."""
+        from src.student_model.schemas import AccommodationType
+
+        snapshot = self._interface(db_session).get_class_snapshot("class_test_001")
+
+        assert snapshot.total_students == 6
+        assert snapshot.students_with_ieps == 2
+        assert set(snapshot.ieps) == {"student_003", "student_006"}
+        assert snapshot.get_iep("student_003").accommodations[0].accommodation_type == AccommodationType.EXTENDED_TIME
+        assert snapshot.get_mastery("student_001", "photosynthesis_process").mastery_probability == 0.85
+        assert snapshot.get_mastery("student_006", "photosynthesis_process") is None
+        assert snapshot.get_accommodation_counts() == {"Extended Time": 2, "Movement Breaks": 1}
+        assert snapshot.get_profile("student_004").student_name == "Student 4"
+        assert snapshot.has_student("student_006") and not snapshot.has_student("student_999")
+        assert snapshot.model_copy().get_profile("student_004") is snapshot.get_profile("student_004")
+
+    def test_snapshot_concept_filter(self, db_session, seeded_class):
+        """Only requested concepts are loaded."""
+        snapshot = self._interface(db_session).get_class_snapshot(
+            "class_test_001", concept_ids=["photosynthesis_process"]
+        )
+
+        assert snapshot.has_concept("photosynthesis_process")
+        assert not snapshot.has_concept("cellular_respiration")
+        assert snapshot.get_mastery("student_001", "cellular_respiration") is None
+
+    def test_snapshot_query_count(self, db_session, seeded_class, query_log):
+        """Snapshot is built with a fixed number of queries and seeds the identity cache."""
+        interface = self._interface(db_session)
+
+        interface.get_class_snapshot("class_test_001")
+        assert len(query_log) == 4  # class, students, IEPs (selectin), mastery
+
+        for student_id in seeded_class["student_ids"]:
+            interface.get_student_profile(student_id)
+            interface.get_iep_accommodations(student_id)
+        interface.get_class_snapshot("class_test_001")
+
+        assert len(query_log) == 4
+
+    def test_unknown_class(self, db_session, seeded_class):
+        """Missing class returns None."""
+        assert self._interface(db_session).get_class_snapshot("class_missing") is None
+
+    def test_write_invalidates_snapshot(self, db_session, seeded_class):
+        """Mastery updates drop cached snapshots containing the student."""
+        interface = self._interface(db_session)
+        before = interface.get_class_snapshot("class_test_001")
+
+        interface.update_mastery_estimate("student_002", "photosynthesis_process", 0.9)
+        after = interface.get_class_snapshot("class_test_001")
+
+        assert after is not before
+        assert after.get_mastery("student_002", "photosynthesis_process").mastery_probability == 0.9
+
+    def test_engines_use_attached_snapshot(self, db_session, seeded_class):
+        """Engines read class context and mastery from the attached snapshot."""
+        from src.engines.engine_1_lesson_architect import LessonArchitect
+        from src.engines.engine_5_diagnostic import DiagnosticEngine
+        from src.student_model.schemas import TierLevel
+
+        interface = self._interface(db_session)
+        snapshot = interface.get_class_snapshot("class_test_001")
+        student_model = MagicMock()
+
+        architect = LessonArchitect(student_model=student_model)
+        architect.set_class_snapshot(snapshot)
+        context = architect._get_class_context("class_test_001")
+
+        assert context["total_students"] == 6
+        assert context["iep_accommodations_needed"] is True
+
+        diagnostic = DiagnosticEngine(student_model=student_model)
+        diagnostic.set_class_snapshot(snapshot)
+        estimate = diagnostic._estimate_student_mastery(
+            "student_002", "photosynthesis_process", snapshot=snapshot
+        )
+
+        assert estimate.recommended_tier == TierLevel.TIER_3
+        student_model.get_class_snapshot.assert_not_called()
+        student_model.retrieve_concept_mastery.assert_not_called()
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# MASTERY MATRIX TESTS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+class TestMasteryMatrix:
+    """Test dense students × concepts mastery matrix."""
+
+    def _matrix(self):
+        from src.student_model.mastery_matrix import MasteryMatrix
+
+        return MasteryMatrix.from_records(
+            ["s1", "s2", "s3", "s4"],
+            ["c1", "c2"],
+            [("s1", "c1", 0.85), ("s1", "c2", 0.75), ("s2", "c1", 0.45), ("s2", "c2", 0.60), ("s3", "c1", 0.2)],
+        )
+
+    def test_tiers_and_zpd(self):
+        """Tier boundaries are inclusive at 0.75 / 0.45 despite float32 storage."""
+        import numpy as np
+
+        matrix = self._matrix()
+
+        assert matrix.values.dtype == np.float32
+        assert matrix.tiers().tolist() == [[1, 1], [2, 2], [3, 0], [0, 0]]
+        assert matrix.zpd_mask().tolist() == [[False, False], [True, True], [False, False], [False, False]]
+
+    def test_student_means_and_partition(self):
+        """Students without data get the default mean and land on_track."""
+        matrix = self._matrix()
+
+        assert matrix.student_means().tolist() == pytest.approx([0.8, 0.525, 0.2, 0.5], abs=1e-6)
+        assert matrix.partition() == {
+            "advanced": ["s1"],
+            "on_track": ["s2", "s4"],
+            "needs_support": ["s3"],
+        }
+
+    def test_concept_stats_match_statistics_module(self):
+        """Per-concept stats use sample standard deviation."""
+        import statistics
+
+        stats = self._matrix().concept_stats("c1")
+        values = [0.85, 0.45, 0.2]
+
+        assert stats["count"] == 3
+        assert stats["mean"] == pytest.approx(statistics.mean(values), abs=1e-6)
+        assert stats["std_dev"] == pytest.approx(statistics.stdev(values), abs=1e-6)
+        assert (stats["below_50"], stats["50_to_75"], stats["above_75"]) == (2, 0, 1)
+
+    def test_load_in_one_query(self, db_session, seeded_class, query_log):
+        """get_mastery_matrix loads roster + mastery with a single query."""
+        from src.student_model.interface import StudentModelInterface
+
+        interface = StudentModelInterface(db_session=db_session, vector_store=MagicMock())
+        matrix = interface.get_mastery_matrix("class_test_001")
+
+        assert len(query_log) == 1
+        assert matrix.shape == (6, 2)
+        assert matrix.get("student_001", "photosynthesis_process") == pytest.approx(0.85)
+        assert matrix.get("student_006", "photosynthesis_process") is None
+
+        distribution = interface.get_class_mastery_distribution("class_test_001", "photosynthesis_process")
+        assert distribution.mean_mastery == pytest.approx(0.63, abs=1e-6)
+        assert distribution.concept_name == "Photosynthesis Process"
+
+    def test_adaptive_class_plan(self, db_session, seeded_class):
+        """AdaptiveEngine groups students and flags concepts from the matrix."""
+        from src.engines.engine_4_adaptive import AdaptiveEngine
+        from src.student_model.interface import StudentModelInterface
+
+        interface = StudentModelInterface(db_session=db_session, vector_store=MagicMock())
+        interface.vector_store.find_similar_students_batch.return_value = {
+            "student_001": [{"student_id": "student_002", "distance": 0.1}],
+        }
+
+        plan = AdaptiveEngine(student_model=interface).generate(
+            class_id="class_test_001", concept_ids=seeded_class["concept_ids"]
+        )
+
+        assert plan.total_students == 6
+        assert plan.advanced_group == ["student_001", "student_004"]
+        assert plan.support_group == ["student_002"]
+        assert plan.on_track_group == ["student_003", "student_005", "student_006"]
+        assert plan.concepts_to_reteach == []
+        assert plan.student_paths[0].similar_students == ["student_002"]
+        assert plan.student_paths[0].extension_concepts == ["photosynthesis_process_advanced"]
+
+    def test_batched_similar_students(self):
+        """Class-wide k-NN uses one embedding fetch and ranks by cosine distance."""
+        import numpy as np
+        from src.student_model.vector_store import StudentVectorStore
+
+        store = StudentVectorStore.__new__(StudentVectorStore)
+        store.client = MagicMock()
+        store.use_index = True
+        store._indexes = {}
+        store._index_lock = threading.Lock()
+        store.batcher = None
+        store.embedder = None
+        store.learning_prefs_collection = MagicMock()
+        store.learning_prefs_collection.get.return_value = {
+            "ids": ["a", "b", "c", "d"],
+            "embeddings": np.array([[0.0, 1.0], [1.0, 0.0], [1.0, 1.0], [2.0, 0.1]]),
+            "documents": ["a", "b", "c", "d"],
+            "metadatas": [{}, {}, {}, {}],
+        }
+
+        similar = store.find_similar_students_batch(["a", "b", "c", "d", "e"], n_results=2)
+
+        store.learning_prefs_collection.get.assert_called_once()
+        assert [s["student_id"] for s in similar["b"]] == ["d", "c"]
+        assert similar["b"][1]["distance"] == pytest.approx(1 - np.sqrt(0.5), abs=1e-6)
+        assert similar["e"] == []
+
+        # Restricted to the given group
+        similar = store.find_similar_students_batch(["b", "c"], n_results=2)
+        assert [s["student_id"] for s in similar["b"]] == ["c"]
+        store.learning_prefs_collection.get.assert_called_once()
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# EMBEDDING INDEX TESTS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+class TestEmbeddingIndex:
+    """Test the in-process embedding index."""
+
+    def test_top_k_matches_brute_force(self):
+        """Top-k cosine neighbors match a direct computation."""
+        import numpy as np
+        from src.student_model.embedding_index import EmbeddingIndex
+
+        rng = np.random.default_rng(7)
+        vectors = rng.normal(size=(50, 16)).astype(np.float32)
+        ids = [f"s{i}" for i in range(50)]
+
+        index = EmbeddingIndex()
+        index.upsert(ids, vectors)
+
+        unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        similarity = unit @ unit.T
+        np.fill_diagonal(similarity, -np.inf)
+        expected = [ids[j] for j in np.argsort(-similarity[3])[:5]]
+
+        neighbors = index.query_ids(["s3", "missing"], k=5)
+        assert [item_id for item_id, _ in neighbors["s3"]] == expected
+        assert neighbors["s3"][0][1] == pytest.approx(1 - similarity[3].max(), abs=1e-5)
+        assert neighbors["missing"] == []
+
+    def test_upsert_replace_and_remove(self):
+        """Upserts replace vectors in place; removed ids are no longer returned."""
+        from src.student_model.embedding_index import EmbeddingIndex
+
+        index = EmbeddingIndex()
+        index.upsert(["a", "b", "c"], [[1.0, 0.0], [0.0, 1.0], [0.9, 0.1]], payloads=[{"n": 1}, {"n": 2}, {"n": 3}])
+        assert index.query_ids(["a"], k=1)["a"][0][0] == "c"
+
+        index.upsert(["b"], [[1.0, 0.01]], payloads=[{"n": 20}])
+        assert len(index) == 3
+        assert index.query_ids(["a"], k=1)["a"][0][0] == "b"
+        assert index.get_payload("b") == {"n": 20}
+
+        index.remove(["b"])
+        assert "b" not in index
+        assert index.query_ids(["a"], k=2)["a"][0][0] == "c"
+
+        with pytest.raises(ValueError):
+            index.upsert(["d"], [[1.0, 0.0, 0.0]])
+
+    def test_hnsw_graph_is_updated_in_place(self):
+        """Upserts add to the built HNSW graph and removals mark items deleted, without rebuilds."""
+        import numpy as np
+        from src.student_model import embedding_index
+        from src.student_model.embedding_index import EmbeddingIndex
+
+        class FakeHNSW:
+            """Brute-force stand-in with the hnswlib.Index calls the index uses."""
+
+            builds = 0
+
+            def __init__(self, space, dim):
+                FakeHNSW.builds += 1
+                self.vectors, self.deleted = {}, set()
+
+            def init_index(self, max_elements, ef_construction, M):
+                self.max_elements = max_elements
+
+            def get_max_elements(self):
+                return self.max_elements
+
+            def resize_index(self, size):
+                self.max_elements = size
+
+            def add_items(self, vectors, labels):
+                assert len(self.vectors.keys() | set(labels.tolist())) <= self.max_elements
+                for vector, label in zip(vectors, labels.tolist()):
+                    self.vectors[label] = vector / np.linalg.norm(vector)
+
+            def mark_deleted(self, label):
+                self.deleted.add(label)
+
+            def set_ef(self, ef):
+                pass
+
+            def knn_query(self, queries, k):
+                labels = np.array([label for label in self.vectors if label not in self.deleted])
+                matrix = np.array([self.vectors[label] for label in labels])
+                distances = 1.0 - queries @ matrix.T
+                order = np.argsort(distances, axis=1)[:, :k]
+                return labels[order], np.take_along_axis(distances, order, axis=1)
+
+        fake = MagicMock(Index=FakeHNSW)
+        with patch.object(embedding_index, "hnswlib", fake), \
+                patch.object(embedding_index, "HNSWLIB_AVAILABLE", True):
+            index = EmbeddingIndex(hnsw_threshold=3)
+            index.upsert(["a", "b", "c", "d"], [[1.0, 0.0], [0.0, 1.0], [0.9, 0.1], [0.1, 0.9]])
+            assert index.query_ids(["a"], k=1)["a"][0][0] == "c"
+            assert index.uses_hnsw
+
+            index.upsert(["e"], [[1.0, 0.01]])
+            index.remove(["b"])
+            assert [hits[0][0] for hits in index.query_ids(["a", "d"], k=1).values()] == ["e", "c"]
+            index.upsert(["c"], [[0.0, 1.0]])
+            assert index.query_ids(["d"], k=1)["d"][0][0] == "c"
+
+        assert FakeHNSW.builds == 1
+        assert index.uses_hnsw
+
+    def test_concurrent_first_queries_load_index_once(self):
+        """Threads racing to the first lookup share one index load from Chroma."""
+        import time
+        from src.student_model.vector_store import StudentVectorStore
+
+        store = StudentVectorStore.__new__(StudentVectorStore)
+        store._indexes = {}
+        store._index_lock = threading.Lock()
+        collection = MagicMock()
+
+        def slow_get(**kwargs):
+            time.sleep(0.05)
+            return {"ids": ["a"], "embeddings": [[1.0, 0.0]], "documents": ["a"], "metadatas": [{}]}
+
+        collection.get.side_effect = slow_get
+        indexes = []
+
+        def load():
+            indexes.append(store._get_index("learning_preferences", collection))
+
+        threads = [threading.Thread(target=load) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        collection.get.assert_called_once()
+        assert all(index is indexes[0] for index in indexes)
+
+    def test_vector_store_uses_index(self):
+        """Similar-student lookups load the index once and never call Chroma query."""
+        from src.student_model.embedding_pipeline import CachedEmbedder
+        from src.student_model.vector_store import StudentVectorStore
+
+        store = StudentVectorStore.__new__(StudentVectorStore)
+        store.client = MagicMock()
+        store.use_index = True
+        store._indexes = {}
+        store._index_lock = threading.Lock()
+        store.batcher = None
+        store.embedding_fn = MagicMock(return_value=[[0.0, 1.0]])
+        store.embedder = CachedEmbedder(store.embedding_fn)
+        store.learning_prefs_collection = MagicMock()
+        store.learning_prefs_collection.get.return_value = {
+            "ids": ["a", "b", "c"],
+            "embeddings": [[1.0, 0.0], [0.9, 0.2], [0.1, 1.0]],
+            "documents": ["doc a", "doc b", "doc c"],
+            "metadatas": [{"grade": "9"}, {"grade": "9"}, {"grade": "10"}],
+        }
+
+        similar = store.find_similar_students("a", n_results=1)
+        assert similar == [
+            {"student_id": "b", "document": "doc b", "metadata": {"grade": "9"}, "distance": pytest.approx(0.0239, abs=1e-3)}
+        ]
+
+        # New vectors are visible without reloading from Chroma
+        store.add_student_preferences("d", "doc d")
+        assert store.find_similar_students("c", n_results=1)[0]["student_id"] == "d"
+
+        store.learning_prefs_collection.get.assert_called_once()
+        store.learning_prefs_collection.query.assert_not_called()
+        assert store.learning_prefs_collection.upsert.call_args.kwargs["embeddings"] == [[0.0, 1.0]]
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# STREAMING BULK IMPORT TESTS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+class TestStreamingBulkImport:
+    """Test chunked CSV/NDJSON student import."""
+
+    CSV_UPLOAD = (
+        "student_id,student_name,grade_level,iep_status,primary_disability,reading_level,learning_preferences,accommodations\n"
+        "S1001,Alex Chen,9,No,,Proficient,Visual;Kinesthetic,\n"
+        "S1002,Maria Gonzalez,9,Yes,ADHD,below_grade_level,Auditory,Extended Time;Movement Breaks\n"
+        "S1003,Bad Grade,13,No,,Basic,,\n"
+        "S1001,Duplicate Id,10,No,,Basic,Visual,\n"
+        "S1004,,9,No,,Basic,,\n"
+        "S1005,Sam Lee,10,No,,,,\n"
+    )
+
+    def test_csv_stream_import(self, db_session, seeded_class):
+        """Valid rows are inserted in chunks; bad rows are reported without aborting."""
+        import io
+        from src.student_model.database import IEPModel, StudentModel
+        from src.student_model.interface import StudentModelInterface
+        from src.student_model.schemas import AccommodationType, DisabilityCategory, ReadingLevel
+
+        vector_store = MagicMock()
+        interface = StudentModelInterface(db_session=db_session, vector_store=vector_store, shared_cache=None)
+        progress = []
+
+        result = interface.import_students_stream(
+            io.BytesIO(self.CSV_UPLOAD.encode("utf-8")),
+            seeded_class["class_id"],
+            on_progress=progress.append,
+            chunk_size=2,
+        )
+
+        assert result.total_rows == 6
+        assert result.successful_imports == 3
+        assert result.created_student_ids == ["S1001", "S1002", "S1005"]
+        assert result.failed_rows == [3, 4, 5]
+        assert "invalid grade_level '13'" in result.errors[0]
+        assert "student_name is required" in result.errors[2]
+
+        # One progress report per chunk plus the final embedding flush
+        assert [p.chunks_committed for p in progress] == [1, 2, 3, 3]
+        assert progress[-1].students_embedded == 2
+
+        maria = db_session.query(StudentModel).filter_by(student_id="S1002").one()
+        assert maria.reading_level == ReadingLevel.BASIC
+        assert maria.primary_disability == DisabilityCategory.ADHD
+        iep = db_session.query(IEPModel).filter_by(student_id="S1002").one()
+        assert [a["type"] for a in iep.accommodations] == ["Extended Time", "Movement Breaks"]
+        assert interface.get_iep_accommodations("S1002").accommodations[1].accommodation_type == AccommodationType.MOVEMENT_BREAKS
+
+        # Preference texts embedded in one batch, students without preferences skipped
+        vector_store.add_student_preferences_batch.assert_called_once()
+        ids, texts, metadatas = vector_store.add_student_preferences_batch.call_args.args
+        assert ids == ["S1001", "S1002"]
+        assert texts[0] == "Alex Chen is a Visual, Kinesthetic learner with Proficient reading level."
+        assert metadatas[1] == {"learning_preferences": ["Auditory"], "reading_level": "Basic"}
+
+    def test_ndjson_stream_import(self, db_session, seeded_class):
+        """NDJSON lines accept native JSON types; malformed lines become row errors."""
+        import io
+        from src.student_model.interface import StudentModelInterface
+
+        upload = (
+            '{"student_name": "Ana Ruiz", "grade_level": 11, "has_iep": true, '
+            '"primary_disability": "Autism Spectrum Disorder", "learning_preferences": ["Visual"]}\n'
+            "\n"
+            "{not json}\n"
+            '{"student_name": "Ben Ode", "grade_level": "12", "learning_preferences": ["Telepathic"]}\n'
+        )
+
+        interface = StudentModelInterface(db_session=db_session, vector_store=MagicMock(), shared_cache=None)
+        result = interface.import_students_stream(io.StringIO(upload), seeded_class["class_id"], fmt="ndjson")
+
+        assert result.successful_imports == 1
+        assert result.failed_rows == [2, 3]
+        assert result.errors[0].startswith("Row 2: Invalid JSON")
+        assert "invalid learning_preference 'Telepathic'" in result.errors[1]
+
+        profile = interface.get_student_profile(result.created_student_ids[0])
+        assert profile.has_iep and profile.grade_level.value == "11"
+
+    def test_bulk_import_batches_inserts(self, db_session, seeded_class, query_log):
+        """List-based bulk import writes each chunk with one executemany, not one INSERT per row."""
+        from src.student_model.interface import StudentModelInterface
+        from src.student_model.schemas import BulkImportRow, GradeLevel
+
+        rows = [BulkImportRow(student_name=f"Student {i}", grade_level=GradeLevel.GRADE_10) for i in range(40)]
+        interface = StudentModelInterface(db_session=db_session, vector_store=MagicMock(), shared_cache=None)
+        roster_before = interface.get_class_snapshot(seeded_class["class_id"])
+
+        query_log.clear()
+        result = interface.bulk_import_students(rows, seeded_class["class_id"])
+
+        assert result.successful_imports == 40
+        assert sum("INSERT INTO students" in statement for statement in query_log) == 1
+        assert roster_before.total_students == 6
+        assert interface.get_class_snapshot(seeded_class["class_id"]).total_students == 46
+
+    def test_unknown_class_rejected(self, db_session):
+        """Imports into a missing class fail up front."""
+        import io
+        from src.student_model.interface import StudentModelInterface
+
+        interface = StudentModelInterface(db_session=db_session, vector_store=MagicMock(), shared_cache=None)
+        with pytest.raises(ValueError):
+            interface.import_students_stream(io.StringIO(self.CSV_UPLOAD), "class_missing")
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# EMBEDDING PIPELINE TESTS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+class TestEmbeddingPipeline:
+    """Test the embedding cache, batched embedder and write batcher."""
+
+    @staticmethod
+    def _fake_embed(texts):
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts]
+
+    def test_cache_persists_across_instances(self, tmp_path):
+        """Cached vectors are memory-mapped from disk and survive a reload (and growth)."""
+        import numpy as np
+        from src.student_model.embedding_pipeline import EmbeddingCache
+
+        cache = EmbeddingCache(str(tmp_path), namespace="test-model", initial_capacity=2)
+        texts = [f"text {i}" for i in range(5)]
+        cache.put_many(texts, self._fake_embed(texts))
+        assert len(cache) == 5
+
+        reloaded = EmbeddingCache(str(tmp_path), namespace="test-model")
+        vectors = reloaded.get_many(["text 3", "unseen"])
+        np.testing.assert_allclose(vectors[0], self._fake_embed(["text 3"])[0])
+        assert vectors[1] is None
+        assert reloaded.get_stats()["hits"] == 1
+
+        # Different model namespace never shares vectors
+        assert EmbeddingCache(str(tmp_path), namespace="other-model").get_many(["text 3"]) == [None]
+
+    def test_embedder_dedupes_and_batches(self):
+        """Identical texts are embedded once; misses are embedded in batches."""
+        from src.student_model.embedding_pipeline import CachedEmbedder, EmbeddingCache
+
+        embed_fn = MagicMock(side_effect=self._fake_embed)
+        embedder = CachedEmbedder(embed_fn, cache=EmbeddingCache(), batch_size=2)
+
+        texts = ["Visual learner", "Auditory learner", "Visual learner", "Kinesthetic learner"]
+        vectors = embedder(texts)
+
+        assert vectors[0] == vectors[2]
+        assert [len(call.args[0]) for call in embed_fn.call_args_list] == [2, 1]
+
+        embedder(["Visual learner", "Auditory learner"])
+        assert embed_fn.call_count == 2
+        assert embedder.get_stats()["texts_embedded"] == 3
+
+    def test_batcher_flushes_by_size_and_time(self):
+        """Queued writes flush at max_batch, after max_wait, or before reads."""
+        import time
+        from src.student_model.embedding_pipeline import EmbeddingBatcher
+
+        batches = []
+        batcher = EmbeddingBatcher(batches.append, max_batch=3, max_wait_ms=50)
+
+        for i in range(3):
+            batcher.submit("learning_preferences", f"s{i}", f"doc {i}")
+        assert [len(b) for b in batches] == [3]
+
+        batcher.submit("learning_preferences", "s3", "doc 3")
+        deadline = time.time() + 2
+        while len(batches) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert [w.item_id for w in batches[1]] == ["s3"]
+        assert batcher.pending == 0
+
+    def test_vector_store_batched_writes(self):
+        """Queued single adds become one Chroma upsert per collection with precomputed embeddings."""
+        from src.student_model.embedding_pipeline import CachedEmbedder, EmbeddingBatcher, EmbeddingCache
+        from src.student_model.vector_store import StudentVectorStore
+
+        store = StudentVectorStore.__new__(StudentVectorStore)
+        store.client = MagicMock()
+        store.use_index = False
+        store._indexes = {}
+        store._index_lock = threading.Lock()
+        store.learning_prefs_collection = MagicMock()
+        store.concepts_collection = MagicMock()
+        store.content_collection = MagicMock()
+        store.embedding_fn = MagicMock(side_effect=self._fake_embed)
+        store.embedder = CachedEmbedder(store.embedding_fn, cache=EmbeddingCache())
+        store.batcher = EmbeddingBatcher(store._write_pending, max_batch=100, max_wait_ms=10_000)
+
+        store.add_student_preferences("s1", "Visual learner")
+        store.add_student_preferences("s2", "Visual learner")
+        store.add_student_preferences("s1", "Auditory learner")
+        store.add_concept("c1", "Photosynthesis")
+        store.learning_prefs_collection.upsert.assert_not_called()
+
+        store.learning_prefs_collection.get.return_value = {"ids": [], "documents": [], "metadatas": []}
+        store.get_student_preferences("s1")
+
+        kwargs = store.learning_prefs_collection.upsert.call_args.kwargs
+        assert kwargs["ids"] == ["s1", "s2"]
+        assert kwargs["documents"] == ["Auditory learner", "Visual learner"]
+        assert len(kwargs["embeddings"]) == 2
+        store.concepts_collection.upsert.assert_called_once()
+        assert [len(call.args[0]) for call in store.embedding_fn.call_args_list] == [2, 1]
+
+    def test_rebuild_preference_vectors(self, db_session, seeded_class):
+        """Cold start embeds every student with preferences in bulk batches."""
+        from src.student_model.interface import StudentModelInterface
+
+        vector_store = MagicMock()
+        interface = StudentModelInterface(db_session=db_session, vector_store=vector_store, shared_cache=None)
+
+        assert interface.rebuild_preference_vectors(batch_size=4) == 6
+        assert [len(call.args[0]) for call in vector_store.add_student_preferences_batch.call_args_list] == [4, 2]
+        first_texts = vector_store.add_student_preferences_batch.call_args_list[0].args[1]
+        assert first_texts[0] == "Student 1 is a Visual learner with Basic reading level."
+
+
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+# EMBEDDING BACKEND TESTS
+# PPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPPP
+
+
+class TestEmbeddingBackends:
+    """Test backend selection, ONNX pooling and backend migration."""
+
+    def test_backend_selection(self):
+        """Backends are chosen by name and cache vectors under separate namespaces."""
+        from src.student_model.embedding_backends import SentenceTransformerBackend, get_embedding_backend
+
+        backend = get_embedding_backend("sentence-transformers")
+        assert isinstance(backend, SentenceTransformerBackend)
+        assert backend._model is None  # Nothing loaded until first embed
+        assert backend.cache_namespace == "all-MiniLM-L6-v2"
+
+        pytest.importorskip("onnxruntime")
+        assert get_embedding_backend("onnx-int8").cache_namespace == "all-MiniLM-L6-v2-onnx-int8"
+
+        with pytest.raises(ValueError):
+            get_embedding_backend("word2vec")
+
+    def test_onnx_mean_pooling_preserves_order(self):
+        """ONNX backend pools over real tokens only and returns rows in input order."""
+        import numpy as np
+
+        pytest.importorskip("onnxruntime")
+        from src.student_model.embedding_backends import OnnxBackend
+
+        class FakeEncoding:
+            def __init__(self, n, length):
+                self.ids = [n] * n + [0] * (length - n)
+                self.attention_mask = [1] * n + [0] * (length - n)
+
+        tokenizer = MagicMock()
+        tokenizer.encode_batch.side_effect = lambda texts: [
+            FakeEncoding(len(t), max(map(len, texts))) for t in texts
+        ]
+
+        def run(_, feeds):
+            ids = feeds["input_ids"].astype(np.float32)
+            # Token vector [id, 1, 0, ...]; padding tokens get a huge value that must be masked out
+            hidden = np.zeros(ids.shape + (4,), dtype=np.float32)
+            hidden[..., 0] = np.where(feeds["attention_mask"] == 1, ids, 1000.0)
+            hidden[..., 1] = 1.0
+            return [hidden]
+
+        backend = OnnxBackend(batch_size=2)
+        backend._tokenizer = tokenizer
+        backend._session = MagicMock(run=MagicMock(side_effect=run))
+        backend._input_names = ["input_ids", "attention_mask"]
+        backend.dimension = 4
+
+        vectors = backend.embed(["abc", "a", "ab"])
+
+        # Token value n for an n-char text -> pooled [n, 1] normalized
+        for row, n in zip(vectors, [3, 1, 2]):
+            np.testing.assert_allclose(row[:2], np.array([n, 1.0]) / np.hypot(n, 1.0), rtol=1e-6)
+        # Length-sorted batches: ("a", "ab") then ("abc")
+        assert [call.args[0] for call in tokenizer.encode_batch.call_args_list] == [["a", "ab"], ["abc"]]
+
+    def test_store_embeds_queries_and_reembeds(self):
+        """Collections store backend vectors; queries and migrations use the configured backend."""
+        import numpy as np
+
+        chromadb = pytest.importorskip("chromadb")
+        from chromadb.config import Settings
+        from src.student_model.embedding_backends import EmbeddingBackend
+        from src.student_model.embedding_pipeline import CachedEmbedder
+        from src.student_model.vector_store import StudentVectorStore
+
+        class LetterBackend(EmbeddingBackend):
+            name = "letters"
+            dimension = 26
+
+            def __init__(self, weight=1.0):
+                super().__init__()
+                self.weight = weight
+
+            def embed(self, texts):
+                out = np.full((len(texts), 26), 0.01, dtype=np.float32)
+                for i, text in enumerate(texts):
+                    for ch in text.lower():
+                        if ch.isalpha():
+                            out[i, ord(ch) - 97] += self.weight
+                return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+        client = chromadb.EphemeralClient(Settings(anonymized_telemetry=False))
+        for name in ("learning_preferences", "concept_embeddings", "content_vectors"):
+            try:
+                client.delete_collection(name)
+            except Exception:
+                pass
+
+        store = StudentVectorStore(client=client)
+        store.embedding_fn = LetterBackend()
+        store.embedder = CachedEmbedder(store.embedding_fn)
+
+        store.add_concepts_batch(["c1", "c2"], ["photosynthesis", "zzz quiz"])
+        assert [c["concept_id"] for c in store.search_concepts("photo synthesis", n_results=1)] == ["c1"]
+
+        before = store.get_concept("c1")["embedding"]
+        store.embedding_fn = LetterBackend(weight=2.0)
+        store.embedder = CachedEmbedder(store.embedding_fn)
+        assert store.reembed_collections(batch_size=1)["concept_embeddings"] == 2
+
+        after = store.get_concept("c1")["embedding"]
+        np.testing.assert_allclose(after, store.embedding_fn.embed(["photosynthesis"])[0], rtol=1e-5)
+        assert not np.allclose(before, after)
@@ -0,0 +1,153 @@
+"""
+Tests for distributed tracing (spans, attributes and context propagation)
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+
+@pytest.fixture
+def spans():
+    """Finished spans, captured in memory for the duration of a test."""
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from src.utils.tracing import get_tracer_provider
+
+    exporter = InMemorySpanExporter()
+    processor = SimpleSpanProcessor(exporter)
+    provider = get_tracer_provider()
+    provider.add_span_processor(processor)
+    yield exporter
+    # Processors can't be removed from a provider; a shut-down exporter drops spans
+    processor.shutdown()
+
+
+class TestTracingPrimitives:
+    """span(), decorators and propagation helpers."""
+
+    def test_trace_methods_records_rows_and_nesting(self, spans):
+        """Decorated methods nest under the caller's span with a row count."""
+        from src.utils.tracing import span, trace_methods
+
+        @trace_methods("store")
+        class Store:
+            def list_items(self):
+                return [1, 2, 3]
+
+            def _private(self):
+                return None
+
+        with span("request") as parent:
+            assert Store().list_items() == [1, 2, 3]
+            Store()._private()
+
+        finished = {s.name: s for s in spans.get_finished_spans()}
+        assert set(finished) == {"request", "store.list_items"}
+        child = finished["store.list_items"]
+        assert child.attributes["result.rows"] == 3
+        assert child.parent.span_id == parent.get_span_context().span_id
+
+    def test_disabled_tracing_is_no_op(self):
+        """TRACING_ENABLED=false yields a no-op span and leaves targets unwrapped."""
+        from src.utils import tracing
+
+        def stage():
+            return "done"
+
+        with patch.object(tracing, "TRACING_ENABLED", False):
+            with tracing.span("noop") as current:
+                current.set_attribute("ignored", 1)
+                assert current is tracing.NOOP_SPAN
+            assert tracing.traced("noop")(stage) is stage
+            assert tracing.current_trace_id() is None
+            assert tracing.inject_headers() == {}
+
+
+class TestTracePropagation:
+    """Trace ids flow from the API into engines, background jobs and events."""
+
+    def test_request_continues_incoming_traceparent(self, spans):
+        """A traceparent header is continued and echoed back as X-Trace-Id."""
+        pytest.importorskip("fastapi")
+        from fastapi.testclient import TestClient
+        from src.api.main import app
+
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        client = TestClient(app)
+        response = client.get(
+            "/health", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+        )
+
+        assert response.headers["x-trace-id"] == trace_id
+        server = [s for s in spans.get_finished_spans() if s.name == "GET /health"]
+        assert len(server) == 1
+        assert format(server[0].context.trace_id, "032x") == trace_id
+        assert server[0].attributes["http.status_code"] == 200
+
+    @patch("anthropic.Anthropic")
+    def test_llm_span_records_tokens(self, mock_anthropic, spans):
+        """Engine LLM calls are client spans carrying token counts."""
+        from src.engines.base_engine import BaseEngine
+        from src.utils.tracing import span
+
+        class TracedEngine(BaseEngine):
+            def generate(self, **kwargs):
+                return {}
+
+        response = MagicMock()
+        response.usage.input_tokens = 120
+        response.usage.output_tokens = 30
+        response.content = [MagicMock(text="hello")]
+        mock_anthropic.return_value.messages.create.return_value = response
+
+        engine = TracedEngine(student_model=MagicMock())
+        with span("langgraph.lesson_architect"):
+            assert engine._call_claude("system", "user") == "hello"
+
+        finished = {s.name: s for s in spans.get_finished_spans()}
+        llm = finished["llm.call"]
+        assert llm.attributes["llm.engine"] == "TracedEngine"
+        assert llm.attributes["llm.input_tokens"] == 120
+        assert llm.attributes["llm.output_tokens"] == 30
+        assert llm.parent.span_id == finished["langgraph.lesson_architect"].context.span_id
+
+    def test_background_job_and_progress_events_share_trace(self, spans):
+        """Captured context parents later spans; broadcasts carry the trace id."""
+        from src.api.websocket.connection_manager import ConnectionManager
+        from src.orchestration.state_management import initialize_pipeline_state
+        from src.orchestration.langgraph_pipeline import progress_event
+        from src.utils.tracing import capture_context, current_trace_id, span
+
+        manager = ConnectionManager()
+        socket = AsyncMock()
+        manager.active_connections["pipeline"]["job_1"] = [socket]
+
+        with span("POST /api/pipeline/run") as request_span:
+            context = capture_context()
+            request_trace_id = current_trace_id()
+
+        async def background_job():
+            with span("pipeline.background_job", context=context):
+                state = initialize_pipeline_state(
+                    lesson_topic="Fractions", grade_level="5", subject="Math",
+                    class_id="class_1", concept_ids=["fractions"],
+                )
+                await manager.broadcast_to_type("pipeline", "job_1", progress_event(state))
+
+        asyncio.run(background_job())
+
+        event = socket.send_json.call_args.args[0]
+        assert event["type"] == "pipeline_progress"
+        assert event["trace_id"] == request_trace_id
+
+        finished = {s.name: s for s in spans.get_finished_spans()}
+        job = finished["pipeline.background_job"]
+        assert job.parent.span_id == request_span.get_span_context().span_id
+        broadcast = finished["websocket.broadcast"]
+        assert broadcast.parent.span_id == job.context.span_id
+        assert broadcast.attributes["websocket.connections"] == 1
+        assert broadcast.attributes["websocket.failed"] == 0